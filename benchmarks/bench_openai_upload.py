@@ -0,0 +1,107 @@
+"""Tiempo de pared y bytes subidos de TRANSCRIBER=openai según concurrencia y códec.
+
+Uso (con el extra ``openai`` instalado; no hace falta API key ni red):
+
+    python benchmarks/bench_openai_upload.py reunion_larga.mp4 --concurrency 1 4 \\
+        --codecs wav flac opus --chunk-sec 120 600
+
+Levanta ``openai_stub.py`` en un puerto libre, con ``--latency`` segundos por
+pedido, ``--mbps`` de subida y ``--rpm`` como tope, preprocesa el archivo una
+vez y lo transcribe con cada combinación de OPENAI_UPLOAD_CODEC,
+OPENAI_CHUNK_SEC y OPENAI_CONCURRENCY, sin checkpoints. Imprime tiempo,
+aceleración contra la primera, pedidos, MB que recibió el server, 429, el
+máximo de pedidos en curso y si los textos volvieron en orden.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import tempfile
+import threading
+import time
+
+from openai_stub import make_server
+
+from video_tranquitor.config import load_config
+from video_tranquitor.preprocessor import format_time, get_audio_duration, preprocess_audio
+from video_tranquitor.transcribers.openai_api import transcribe_openai
+
+
+def _in_order(texts: list[str]) -> bool:
+    offsets = [int(m.group(1)) for t in texts if (m := re.search(r"chunk_(\d+)", t))]
+    return len(offsets) == len(texts) and offsets == sorted(offsets)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=3.0)
+    parser.add_argument("--mbps", type=float, default=20.0)
+    parser.add_argument("--rpm", type=float, default=50.0)
+    parser.add_argument("--codecs", nargs="+", default=["wav"], choices=["wav", "flac", "opus"])
+    parser.add_argument("--chunk-sec", type=int, nargs="+", default=[120])
+    args = parser.parse_args()
+
+    server, stats = make_server(0, args.latency, args.mbps, args.rpm)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-stub")
+    os.environ.setdefault("TRANSCRIBER", "openai")
+
+    config = load_config()
+    with tempfile.TemporaryDirectory(prefix="vt-bench-") as tmp:
+        wav = os.path.join(tmp, "audio.wav")
+        if not preprocess_audio(args.file, wav, config.audio_filter, config.target_sample_rate):
+            raise SystemExit(f"No se pudo preprocesar {args.file}")
+        duration = get_audio_duration(wav)
+        print(
+            f"Audio: {format_time(duration)} — stub con {args.latency:.1f} s por pedido, "
+            f"{args.mbps:g} Mbps y {args.rpm:g} RPM\n"
+        )
+        print(
+            f"{'códec':>5} {'chunk':>5} {'a la vez':>8} {'tiempo':>9} {'vs 1º':>6} "
+            f"{'pedidos':>7} {'MB':>7} {'429':>4} {'máx':>4} orden"
+        )
+
+        baseline: float | None = None
+        runs = [
+            (codec, chunk_sec, concurrency)
+            for codec in args.codecs
+            for chunk_sec in args.chunk_sec
+            for concurrency in args.concurrency
+        ]
+        for codec, chunk_sec, concurrency in runs:
+            with stats.lock:
+                stats.requests = stats.bytes_received = stats.rate_limited = 0
+                stats.max_in_flight = 0
+            start = time.time()
+            result = transcribe_openai(
+                wav,
+                config.openai_api_key,
+                config.transcribe_model,
+                "",
+                config.target_sample_rate,
+                config.language,
+                None,
+                concurrency,
+                args.rpm,
+                codec,
+                chunk_sec,
+            )
+            elapsed = time.time() - start
+            baseline = baseline or elapsed
+            ordered = "ok" if _in_order([t.texto for t in result]) else "MAL"
+            print(
+                f"{codec:>5} {chunk_sec:>5} {concurrency:>8} {format_time(elapsed):>9} "
+                f"{baseline / elapsed:>5.2f}x {stats.requests:>7} "
+                f"{stats.bytes_received / 1e6:>7.1f} {stats.rate_limited:>4} "
+                f"{stats.max_in_flight:>4} {ordered}"
+            )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
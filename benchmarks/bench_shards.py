@@ -0,0 +1,72 @@
+"""Tiempo de pared de whisper.cpp según la cantidad de tramos paralelos.
+
+Uso (con el .env del proyecto cargado, TRANSCRIBER=local):
+
+    python benchmarks/bench_shards.py reunion_larga.mp4 --shards 1 2 4 8
+
+Preprocesa el archivo una vez y lo transcribe con cada WHISPER_SHARDS pedido,
+con un CACHE_DIR temporal para que los tramos guardados de una corrida no
+favorezcan a la siguiente. Apaga WHISPER_WATCHDOG (que solo corre con un
+tramo) aunque el .env lo prenda, para que todas las filas usen el mismo
+``whisper-cli`` pelado. Imprime tiempo, RTF y aceleración contra 1 tramo.
+
+Necesita un modelo ggml con pesos reales y varios núcleos: en una máquina de
+un núcleo ``WHISPER_SHARDS=0`` resuelve a un tramo y no hay nada que comparar.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from video_tranquitor.config import load_config
+from video_tranquitor.preprocessor import format_time, get_audio_duration, preprocess_audio
+from video_tranquitor.resources import get_budget
+from video_tranquitor.transcribers.whispercpp import MAX_WHISPER_THREADS, transcribe_local
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    config = load_config()
+    with tempfile.TemporaryDirectory(prefix="vt-bench-") as tmp:
+        wav = os.path.join(tmp, "audio.wav")
+        if not preprocess_audio(args.file, wav, config.audio_filter, config.target_sample_rate):
+            raise SystemExit(f"No se pudo preprocesar {args.file}")
+        duration = get_audio_duration(wav)
+        print(f"Audio: {format_time(duration)} — {os.cpu_count()} núcleos\n")
+        print(
+            f"{'tramos':>6} {'hilos c/u':>9} {'tiempo':>9} {'RTF':>6} {'vs 1':>6} "
+            f"{'segmentos':>9}"
+        )
+
+        baseline: float | None = None
+        for shards in args.shards:
+            run_config = config.model_copy(
+                update={
+                    "whisper_backend": "cli",
+                    "whisper_shards": shards,
+                    "whisper_watchdog": False,
+                    "cache_dir": os.path.join(tmp, f"cache-{shards}"),
+                }
+            )
+            start = time.time()
+            result = transcribe_local(wav, run_config)
+            elapsed = time.time() - start
+            baseline = baseline or elapsed
+            total = min(get_budget(run_config).total, shards * MAX_WHISPER_THREADS)
+            threads = max(1, total // shards) if shards > 1 else "-"
+            print(
+                f"{shards:>6} {threads!s:>9} {format_time(elapsed):>9} "
+                f"{elapsed / duration:>6.3f} {baseline / elapsed:>5.2f}x "
+                f"{len(result.segments):>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
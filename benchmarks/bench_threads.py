@@ -0,0 +1,116 @@
+"""Rendimiento con hilos elegidos a ojo contra el presupuesto de CPU repartido.
+
+Uso (con el .env del proyecto cargado y WHISPER_CPP_PATH configurado):
+
+    python benchmarks/bench_threads.py reunion.mp4 --jobs 2
+    python benchmarks/bench_threads.py reunion.mp4 --jobs 3 --pin
+
+Reproduce lo que pasa en el ensemble o con archivos que se pisan: ``--jobs``
+whisper-cli en paralelo sobre el mismo audio más un ffmpeg preprocesando el
+original. Se corre dos veces:
+
+- a ojo: como antes del presupuesto, cada whisper-cli con la mitad de los
+  núcleos (entre 4 y 8) y ffmpeg con todos los que quiera;
+- presupuesto: los núcleos repartidos entre los procesos con ``CpuBudget``
+  (y fijados a sus núcleos con ``--pin``).
+
+Imprime el tiempo de pared de cada tanda y el rendimiento en segundos de audio
+procesados por segundo. Necesita un modelo ggml con pesos reales y varios
+núcleos: con uno solo no hay nada que repartir.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from video_tranquitor.config import load_config
+from video_tranquitor.preprocessor import format_time, get_audio_duration, preprocess_audio
+from video_tranquitor.resources import CpuBudget, Lease, available_cpus
+from video_tranquitor.transcribers.whispercpp import MAX_WHISPER_THREADS, run_whisper_cli
+
+
+def _batch(
+    source: str,
+    wav: str,
+    tmp: str,
+    jobs: int,
+    whisper_leases: list[Lease],
+    ffmpeg_lease: Lease | None,
+) -> float:
+    config = load_config().model_copy(update={"enable_diarization": False})
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=jobs + 1) as pool:
+        futures = [
+            pool.submit(
+                preprocess_audio,
+                source,
+                os.path.join(tmp, "again.wav"),
+                config.audio_filter,
+                config.target_sample_rate,
+                ffmpeg_lease,
+            )
+        ]
+        for i in range(jobs):
+            copy = os.path.join(tmp, f"job{i}.wav")
+            with open(wav, "rb") as src, open(copy, "wb") as dst:
+                dst.write(src.read())
+            futures.append(pool.submit(run_whisper_cli, copy, config, whisper_leases[i], True))
+        for future in futures:
+            future.result()
+    return time.time() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--jobs", type=int, default=2)
+    parser.add_argument("--pin", action="store_true")
+    args = parser.parse_args()
+
+    config = load_config()
+    cores = len(available_cpus())
+    with tempfile.TemporaryDirectory(prefix="vt-bench-") as tmp:
+        wav = os.path.join(tmp, "audio.wav")
+        if not preprocess_audio(args.file, wav, config.audio_filter, config.target_sample_rate):
+            raise SystemExit(f"No se pudo preprocesar {args.file}")
+        duration = get_audio_duration(wav)
+        audio_total = duration * (args.jobs + 1)
+        print(
+            f"Audio: {format_time(duration)} — {cores} núcleos, "
+            f"{args.jobs} whisper-cli + 1 ffmpeg\n"
+        )
+        print(f"{'modo':<12} {'hilos whisper':>13} {'tiempo':>9} {'audio/s':>8}")
+
+        adhoc = max(4, min(MAX_WHISPER_THREADS, cores // 2))
+        runs = {
+            "a ojo": (
+                [Lease(stage=f"whisper.cpp#{i}", threads=adhoc) for i in range(args.jobs)],
+                None,
+            ),
+        }
+        budget = CpuBudget(config.cpu_threads or cores, args.pin)
+        weights = {f"whisper.cpp#{i}": 1.0 for i in range(args.jobs)} | {"ffmpeg": 1.0}
+        caps = {f"whisper.cpp#{i}": MAX_WHISPER_THREADS for i in range(args.jobs)}
+        leases = budget.acquire_split(weights, caps)
+        runs["presupuesto"] = (
+            [leases[f"whisper.cpp#{i}"] for i in range(args.jobs)],
+            leases["ffmpeg"],
+        )
+
+        baseline: float | None = None
+        for mode, (whisper_leases, ffmpeg_lease) in runs.items():
+            elapsed = _batch(args.file, wav, tmp, args.jobs, whisper_leases, ffmpeg_lease)
+            baseline = baseline or elapsed
+            threads = ",".join(str(lease.threads) for lease in whisper_leases)
+            print(
+                f"{mode:<12} {threads:>13} {format_time(elapsed):>9} "
+                f"{audio_total / elapsed:>7.1f}x  ({baseline / elapsed:.2f}x vs a ojo)"
+            )
+
+
+if __name__ == "__main__":
+    main()
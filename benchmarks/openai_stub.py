@@ -0,0 +1,134 @@
+"""Server local que imita ``POST /v1/audio/transcriptions`` de OpenAI.
+
+Uso:
+
+    python benchmarks/openai_stub.py --port 8089 --latency 3 --rpm 50
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=sk-stub \\
+        TRANSCRIBER=openai python -m video_tranquitor reunion.mp4
+
+Responde ``{"text": "[<nombre del archivo subido>]"}`` después de
+``--latency`` segundos más lo que tardaría la subida a ``--mbps``, así el
+orden de los chunks y el efecto de subirlos a la vez se ven sin gastar cuota.
+Con ``--rpm`` limita los pedidos por minuto como la API: el que se pasa recibe
+un 429 con ``Retry-After``. Cuenta pedidos, bytes recibidos, 429 y el máximo
+de pedidos en curso a la vez (``StubStats``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubStats:
+    """Lo que vio el server, compartido entre los hilos de los pedidos."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.bytes_received = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+def _uploaded_name(content_type: str, body: bytes) -> str:
+    message = BytesParser(policy=default).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    for part in message.iter_parts():
+        if part.get_param("name", header="content-disposition") == "file":
+            return part.get_filename() or "sin-nombre"
+    return "sin-archivo"
+
+
+def make_server(
+    port: int = 0, latency: float = 1.0, mbps: float = 0.0, rpm: float = 0.0
+) -> tuple[ThreadingHTTPServer, StubStats]:
+    """El server (sin arrancar) y sus contadores. ``port=0`` elige uno libre."""
+    stats = StubStats()
+    window: list[float] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+        def _reply(self, status: int, payload: dict, headers: dict | None = None) -> None:
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.endswith("/audio/transcriptions"):
+                self._reply(404, {"error": {"message": f"{self.path} no existe"}})
+                return
+
+            now = time.monotonic()
+            with stats.lock:
+                stats.requests += 1
+                stats.bytes_received += len(body)
+                window[:] = [t for t in window if now - t < 60]
+                if rpm and len(window) >= rpm:
+                    stats.rate_limited += 1
+                    retry_after = math.ceil(60 - (now - window[0]))
+                else:
+                    window.append(now)
+                    retry_after = 0
+                    stats.in_flight += 1
+                    stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            if retry_after:
+                self._reply(
+                    429,
+                    {"error": {"message": "Rate limit", "type": "requests"}},
+                    {"Retry-After": str(retry_after)},
+                )
+                return
+
+            try:
+                upload_sec = len(body) * 8 / (mbps * 1e6) if mbps else 0.0
+                time.sleep(latency + upload_sec)
+                name = _uploaded_name(self.headers.get("Content-Type", ""), body)
+                self._reply(200, {"text": f"[{name}]"})
+            finally:
+                with stats.lock:
+                    stats.in_flight -= 1
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler), stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=1.0, help="segundos por pedido")
+    parser.add_argument("--mbps", type=float, default=0.0, help="subida simulada (0 = sin tope)")
+    parser.add_argument("--rpm", type=float, default=0.0, help="pedidos por minuto (0 = sin tope)")
+    args = parser.parse_args()
+
+    server, stats = make_server(args.port, args.latency, args.mbps, args.rpm)
+    print(f"Stub de OpenAI en http://127.0.0.1:{server.server_address[1]}/v1 (Ctrl+C corta)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(
+            f"\n{stats.requests} pedidos, {stats.bytes_received / 1e6:.1f} MB, "
+            f"{stats.rate_limited} con 429, hasta {stats.max_in_flight} a la vez"
+        )
+
+
+if __name__ == "__main__":
+    main()
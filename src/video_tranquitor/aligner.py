@@ -89,6 +89,31 @@ def _join_words(words: list[WhisperWord], leading_space: bool) -> str:
     return " ".join(w.word for w in words if w.word).strip()
 
 
+def segments_near_turns(
+    whisper_result: WhisperResult,
+    speakers: list[DiarizationSegment],
+    tolerance_ms: int = 500,
+) -> list[int]:
+    """Índices de los segmentos de Whisper donde puede cambiar el hablante.
+
+    Son los que tienen un cambio de hablante de la diarización dentro de su
+    tramo (ampliado en ``tolerance_ms``). En el resto habla una sola persona
+    y alcanza con los tiempos del segmento para atribuirlo: no hace falta
+    alinearlo palabra por palabra.
+    """
+    tolerance_sec = tolerance_ms / 1000.0
+    turns = [
+        (previous.end + current.start) / 2
+        for previous, current in zip(speakers, speakers[1:], strict=False)
+        if previous.speaker != current.speaker
+    ]
+    return [
+        i
+        for i, seg in enumerate(whisper_result.segments)
+        if any(seg.start - tolerance_sec <= turn <= seg.end + tolerance_sec for turn in turns)
+    ]
+
+
 def align_speakers(
     whisper_result: WhisperResult,
     speakers: list[DiarizationSegment],
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
+from collections.abc import Callable
 
 from video_tranquitor.llm_client import call_llm_with_schema
 from video_tranquitor.types import (
@@ -190,6 +192,24 @@ def _build_consolidation_prompt(analisis: list[AnalysisResult]) -> str:
     )
 
 
+def analysis_fingerprint(config: PipelineConfig) -> str:
+    """Huella de todo lo que cambia el resultado del análisis.
+
+    Incluye el texto de los prompts, no solo la configuración: editar el prompt
+    en este archivo tiene que invalidar lo ya reanalizado igual que cambiar de
+    proveedor.
+    """
+    prompts = _build_prompt("") + _build_consolidation_prompt([])
+    partes = [
+        config.analysis_provider,
+        config.analysis_model,
+        config.analysis_effort,
+        str(max(1, config.analysis_passes)),
+        hashlib.sha256(prompts.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\n".join(partes).encode("utf-8")).hexdigest()[:16]
+
+
 async def _una_pasada(prompt: str, config: PipelineConfig) -> AnalysisResult | None:
     return await call_llm_with_schema(
         prompt=prompt,
@@ -207,6 +227,7 @@ async def _una_pasada(prompt: str, config: PipelineConfig) -> AnalysisResult | N
 async def analyze_transcription(
     transcription: list[AttributedSegment],
     config: PipelineConfig,
+    on_partial: Callable[[AnalysisResult, str], None] | None = None,
 ) -> AnalysisResult | None:
     """Analiza una transcripción y devuelve el resultado estructurado.
 
@@ -219,6 +240,13 @@ async def analyze_transcription(
     Degradación: si algunas pasadas fallan se consolidan las que sobrevivieron;
     si sobrevive una sola se devuelve tal cual; si falla la consolidación se
     devuelve la primera pasada en vez de perder todo el trabajo.
+
+    Args:
+        transcription: Segmentos a analizar.
+        config:        Configuración del pipeline.
+        on_partial:    Se llama con cada pasada apenas termina, junto con una
+                       línea de estado, para que la nota no espere a la
+                       consolidación. No se llama con el resultado final.
     """
     prompt = _build_prompt(_build_transcription_text(transcription))
     pasadas = max(1, config.analysis_passes)
@@ -227,7 +255,24 @@ async def analyze_transcription(
         return await _una_pasada(prompt, config)
 
     print(f"  Análisis: {pasadas} pasadas en paralelo, después se consolidan...")
-    resultados = await asyncio.gather(*(_una_pasada(prompt, config) for _ in range(pasadas)))
+    terminadas = 0
+
+    async def _pasada_con_aviso() -> AnalysisResult | None:
+        nonlocal terminadas
+        resultado = await _una_pasada(prompt, config)
+        terminadas += 1
+        if resultado is not None and on_partial is not None:
+            try:
+                on_partial(
+                    resultado,
+                    f"Análisis parcial: {terminadas} de {pasadas} pasadas terminadas, "
+                    "falta consolidar.",
+                )
+            except Exception as error:  # noqa: BLE001 — un aviso no puede tumbar el análisis
+                logger.warning("No se pudo publicar la pasada parcial: %s", error)
+        return resultado
+
+    resultados = await asyncio.gather(*(_pasada_con_aviso() for _ in range(pasadas)))
     validos = [r for r in resultados if r is not None]
 
     if not validos:
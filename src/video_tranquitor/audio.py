@@ -0,0 +1,188 @@
+"""Lectura del WAV preprocesado como muestras float32 en memoria.
+
+El preprocess deja un WAV PCM mono. Varias etapas necesitan las muestras ya
+decodificadas (pyannote, whisper.cpp por bindings, WhisperX) y cada una las
+leía a su manera; este módulo es el único lector. numpy es una dependencia
+opcional (extra ``gpu``): se importa recién al leer.
+
+Para una etapa en otro proceso (el worker de WhisperX) las muestras viajan
+por memoria compartida (``shared_samples``) en vez de volver a decodificarse.
+Los chunks que se suben a la API de OpenAI se cortan del mismo WAV
+(``wav_slice``), también sin decodificar de nuevo, y los tramos y muestras en
+disco (shards, watchdog, calibraciones) con ``slice_wav`` y ``wav_duration``.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import wave
+from collections.abc import Iterator
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def read_wav_float32(audio_path: str) -> tuple[np.ndarray, int] | None:
+    """Lee un WAV PCM y lo devuelve como (muestras, sample_rate).
+
+    Las muestras quedan en float32 en [-1, 1] con forma (canales, tiempo).
+
+    Returns:
+        None si el archivo no es un WAV PCM legible, para que el llamador caiga
+        a su camino alternativo (pasar la ruta, correr el binario).
+    """
+    import numpy as np  # noqa: PLC0415
+
+    # ffmpeg escribe pcm_s16le por defecto; contemplamos igual 8 y 32 bits.
+    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            sample_width = wav.getsampwidth()
+            dtype = dtypes.get(sample_width)
+            if dtype is None:
+                logger.info("WAV de %d bytes por muestra no soportado en memoria.", sample_width)
+                return None
+
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, OSError, EOFError) as error:
+        logger.info("No se pudo leer %s en memoria: %s", audio_path, error)
+        return None
+
+    samples = np.frombuffer(frames, dtype=dtype)
+    if sample_width == 1:
+        # PCM de 8 bits es sin signo, centrado en 128.
+        waveform = (samples.astype(np.float32) - 128.0) / 128.0
+    else:
+        waveform = samples.astype(np.float32) / float(2 ** (8 * sample_width - 1))
+
+    return np.ascontiguousarray(waveform.reshape(-1, channels).T), sample_rate
+
+
+def read_wav_mono_float32(audio_path: str) -> tuple[np.ndarray, int] | None:
+    """Como ``read_wav_float32`` pero con un solo canal (promedio si hay varios)."""
+    loaded = read_wav_float32(audio_path)
+    if loaded is None:
+        return None
+    waveform, sample_rate = loaded
+    mono = waveform[0] if waveform.shape[0] == 1 else waveform.mean(axis=0)
+    return mono.astype("float32", copy=False), sample_rate
+
+
+# Lo que esperan Whisper y WhisperX: mono a 16 kHz.
+WHISPER_SAMPLE_RATE = 16000
+
+
+def read_whisper_audio(audio_path: str) -> np.ndarray | None:
+    """Muestras mono float32 a 16 kHz, como las de ``whisperx.load_audio``.
+
+    Returns:
+        None si el WAV no se puede leer o está a otra frecuencia (el
+        llamador cae a decodificar con ffmpeg, que además remuestrea).
+    """
+    loaded = read_wav_mono_float32(audio_path)
+    if loaded is None:
+        return None
+    samples, sample_rate = loaded
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        logger.info("%s está a %d Hz; se decodifica con ffmpeg.", audio_path, sample_rate)
+        return None
+    return samples
+
+
+def wav_slice(
+    audio_path: str, start_sec: float, duration_sec: float, sample_rate: int
+) -> bytes | None:
+    """Un tramo del WAV como otro WAV completo (cabecera y muestras), en memoria.
+
+    El WAV del preprocess ya está decodificado: cortar es posicionarse en la
+    primera muestra del tramo y copiar sus bytes, sin ffmpeg ni numpy.
+
+    Returns:
+        None si el archivo no es PCM de 16 bits mono a ``sample_rate`` (el
+        llamador lo corta con ffmpeg, que además convierte).
+    """
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            layout = (wav.getsampwidth(), wav.getnchannels(), wav.getframerate())
+            if layout != (2, 1, sample_rate):
+                logger.info("%s no es PCM 16 bits mono a %d Hz.", audio_path, sample_rate)
+                return None
+            wav.setpos(min(round(start_sec * sample_rate), wav.getnframes()))
+            frames = wav.readframes(round(duration_sec * sample_rate))
+    except (wave.Error, OSError, EOFError) as error:
+        logger.info("No se pudo cortar %s en memoria: %s", audio_path, error)
+        return None
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(frames)
+    return buffer.getvalue()
+
+
+def wav_duration(wav_path: str) -> float:
+    """Duración en segundos de un WAV PCM, leída de la cabecera (sin ffprobe)."""
+    with wave.open(wav_path, "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def slice_wav(wav_path: str, start_sec: float, end_sec: float, out_path: str) -> None:
+    """Copia el tramo [start_sec, end_sec) de un WAV PCM a ``out_path``."""
+    with wave.open(wav_path, "rb") as src:
+        rate = src.getframerate()
+        first = int(start_sec * rate)
+        last = min(src.getnframes(), int(end_sec * rate))
+        src.setpos(first)
+        frames = src.readframes(last - first)
+        with wave.open(out_path, "wb") as dst:
+            dst.setparams(src.getparams())
+            dst.writeframes(frames)
+
+
+@contextmanager
+def shared_samples(samples: np.ndarray) -> Iterator[dict]:
+    """Copia ``samples`` a un bloque de memoria compartida mientras dura el bloque.
+
+    Entrega la referencia que viaja al otro proceso (nombre y largo, nada de
+    audio); al salir el bloque se libera.
+    """
+    import numpy as np  # noqa: PLC0415
+
+    samples = np.ascontiguousarray(samples, dtype=np.float32)
+    block = shared_memory.SharedMemory(create=True, size=max(1, samples.nbytes))
+    try:
+        np.ndarray(samples.shape, dtype=np.float32, buffer=block.buf)[:] = samples
+        yield {"name": block.name, "length": int(samples.size)}
+    finally:
+        block.close()
+        block.unlink()
+
+
+def samples_from_shared(ref: dict) -> np.ndarray:
+    """Las muestras de ``shared_samples`` en el proceso que las recibe.
+
+    Se copian a un array propio y el bloque se suelta enseguida: un worker
+    residente que guardara vistas sobre el bloque lo dejaría mapeado (y sin
+    poder cerrarlo) hasta que termine el proceso.
+    """
+    import numpy as np  # noqa: PLC0415
+
+    block = shared_memory.SharedMemory(name=ref["name"])
+    try:
+        view = np.ndarray((ref["length"],), dtype=np.float32, buffer=block.buf)
+        samples = view.copy()
+        del view
+    finally:
+        block.close()
+    return samples
@@ -0,0 +1,270 @@
+"""Re-transcripción en segundo plano del archivo histórico con un modelo nuevo.
+
+Al actualizar ``WHISPER_MODEL_PATH`` o ``WHISPERX_MODEL`` las reuniones viejas
+quedan transcritas con el modelo anterior. El backfill las recorre de a una,
+con la máquina compartida con el uso normal:
+
+- CPU: el proceso baja su prioridad y se restringe (afinidad, que heredan
+  ffmpeg y whisper-cli) a ``BACKFILL_CPU_SHARE`` de los núcleos. Donde no hay
+  afinidad (macOS) se cae al ciclo de trabajo, igual que la GPU.
+- GPU: después de cada archivo que usó la GPU se descansa lo necesario para que
+  el uso promedio no pase de ``BACKFILL_GPU_SHARE``.
+
+El progreso va a un journal JSONL, una línea por archivo y con fsync, atado a
+la huella del modelo: se puede cortar con Ctrl+C y volver a lanzar sin repetir
+nada, y cambiar de modelo arranca un backfill nuevo.
+
+Solo re-transcribe. Las notas se regeneran después con ``--reanalyze``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections.abc import Callable, Coroutine
+from pathlib import Path
+from typing import Any
+
+from video_tranquitor.gpu import release_gpu_memory
+from video_tranquitor.pipeline import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS, run_pipeline
+from video_tranquitor.preprocessor import format_time
+from video_tranquitor.state import cache_root
+from video_tranquitor.types import PipelineConfig, PipelineResult
+from video_tranquitor.writers.artifact_writer import (
+    artifact_path,
+    load_transcript_artifact,
+    model_fingerprint,
+    write_transcript_artifact,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_NICENESS = 10
+
+
+def enumerate_media(archive_dir: str) -> list[str]:
+    """Archivos de audio/video bajo ``archive_dir``, recursivo y en orden estable."""
+    found: list[str] = []
+    for root, dirs, files in os.walk(archive_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith(".") or name.startswith("temp_"):
+                continue
+            if Path(name).suffix.lower() in VIDEO_EXTENSIONS | AUDIO_EXTENSIONS:
+                found.append(os.path.abspath(os.path.join(root, name)))
+    return found
+
+
+def duplicate_stems(media: list[str]) -> dict[str, list[str]]:
+    """Nombres base que se repiten en ``media``, con sus archivos.
+
+    El pipeline guarda el artefacto y el TOON por nombre base en
+    ``OUTPUT_DIR``: ``2024/03/reunion.mp4`` y ``2024/04/reunion.mp4`` pisarían
+    el mismo artefacto.
+    """
+    by_stem: dict[str, list[str]] = {}
+    for path in media:
+        by_stem.setdefault(Path(path).stem, []).append(path)
+    return {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+
+
+def uses_gpu(config: PipelineConfig) -> bool:
+    return config.transcriber in ("whisperx", "ensemble") or config.enable_diarization
+
+
+class BackfillJournal:
+    """Journal append-only del backfill para una huella de modelo."""
+
+    def __init__(self, config: PipelineConfig, fingerprint: str) -> None:
+        directory = cache_root(config) / "backfill"
+        directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", fingerprint)
+        self.path = directory / f"{slug}.jsonl"
+        self.done: set[str] = set()
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Una línea a medio escribir por un corte: se ignora y ese
+                    # archivo se vuelve a procesar.
+                    continue
+                if entry.get("status") == "done":
+                    self.done.add(entry["path"])
+
+    def record(self, **entry: object) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if entry.get("status") == "done":
+            self.done.add(str(entry["path"]))
+
+
+def _already_transcribed(media: str, config: PipelineConfig, fingerprint: str) -> bool:
+    """True si el artefacto de ``media`` ya es de este motor y modelo."""
+    try:
+        artifact = load_transcript_artifact(artifact_path(config.output_dir, Path(media).stem))
+    except (OSError, ValueError):
+        return False
+    return artifact.model_fingerprint == fingerprint
+
+
+def limit_cpu(share: float) -> bool:
+    """Baja la prioridad y restringe el proceso a ``share`` de sus núcleos.
+
+    Returns:
+        True si se pudo fijar la afinidad; False si el límite de CPU tiene que
+        hacerse con el ciclo de trabajo.
+    """
+    try:
+        os.nice(BACKFILL_NICENESS)
+    except OSError as error:
+        logger.debug("No se pudo bajar la prioridad: %s", error)
+
+    if not hasattr(os, "sched_setaffinity"):
+        return False
+    cores = sorted(os.sched_getaffinity(0))
+    keep = max(1, int(len(cores) * share))
+    os.sched_setaffinity(0, cores[:keep])
+    print(f"Backfill: usando {keep} de {len(cores)} núcleos.")
+    return True
+
+
+def duty_cycle_pause(busy_sec: float, share: float) -> float:
+    """Descanso que hace falta tras ``busy_sec`` de trabajo para promediar ``share``."""
+    if share >= 1:
+        return 0.0
+    return busy_sec * (1 / share - 1)
+
+
+async def run_backfill(
+    archive_dir: str,
+    config: PipelineConfig,
+    process: Callable[[str, PipelineConfig], Coroutine[Any, Any, PipelineResult]] = run_pipeline,
+    sleep: Callable[[float], Coroutine[Any, Any, None]] = asyncio.sleep,
+    apply_cpu_limit: bool = True,
+) -> BackfillJournal:
+    """Re-transcribe ``archive_dir`` con el motor y modelo de ``config``.
+
+    Args:
+        archive_dir:     Raíz del archivo histórico.
+        config:          Configuración con el modelo nuevo. El análisis y la nota
+                         se desactivan: acá solo se paga el ASR.
+        process:         Procesa un archivo (inyectable para los tests).
+        sleep:           Espera del ciclo de trabajo (inyectable para los tests).
+        apply_cpu_limit: Fijar nice y afinidad al proceso actual.
+
+    Returns:
+        El journal, con lo hecho hasta ahora.
+
+    Raises:
+        ValueError: Si dos archivos comparten nombre base: sus artefactos se
+                    pisarían y el segundo se saltearía como ya hecho.
+    """
+    fingerprint = model_fingerprint(config)
+    journal = BackfillJournal(config, fingerprint)
+    # El modelo queda fijo: el backfill existe para llevar todo a una misma huella.
+    job_config = config.model_copy(
+        update={
+            "enable_analysis": False,
+            "enable_obsidian": False,
+            "whisper_latency_target_sec": 0.0,
+        }
+    )
+
+    media = enumerate_media(archive_dir)
+    duplicated = duplicate_stems(media)
+    if duplicated:
+        listing = "\n".join(
+            f"  {stem}: {', '.join(os.path.relpath(p, archive_dir) for p in paths)}"
+            for stem, paths in sorted(duplicated.items())
+        )
+        raise ValueError(
+            "El backfill guarda cada transcripción por nombre de archivo y estos se "
+            f"repiten en {archive_dir}:\n{listing}\nRenombralos para que no se pisen."
+        )
+    pending = [
+        m
+        for m in media
+        if m not in journal.done and not _already_transcribed(m, config, fingerprint)
+    ]
+    print(
+        f"Backfill con {fingerprint}: {len(media)} archivos, "
+        f"{len(media) - len(pending)} ya hechos, {len(pending)} pendientes."
+    )
+    print(f"Progreso en: {journal.path}")
+
+    cpu_by_affinity = apply_cpu_limit and limit_cpu(config.backfill_cpu_share)
+    share = 1.0 if cpu_by_affinity else config.backfill_cpu_share
+    if uses_gpu(config):
+        share = min(share, config.backfill_gpu_share)
+
+    wall_start = time.time()
+    audio_done = 0.0
+    for index, media_path in enumerate(pending, 1):
+        previous_note = _previous_note(media_path, config)
+        start = time.time()
+        try:
+            result = await process(media_path, job_config)
+        except Exception as error:  # noqa: BLE001 — un archivo roto no frena el backfill
+            logger.error("Backfill: %s falló: %s", media_path, error)
+            journal.record(path=media_path, status="failed", error=str(error))
+            continue
+        finally:
+            release_gpu_memory()
+        busy = time.time() - start
+
+        if previous_note:
+            _keep_note_link(media_path, config, previous_note)
+
+        rtf = busy / result.audio_duration_sec if result.audio_duration_sec else 0.0
+        audio_done += result.audio_duration_sec
+        journal.record(
+            path=media_path,
+            status="done",
+            fingerprint=fingerprint,
+            audio_sec=round(result.audio_duration_sec, 1),
+            busy_sec=round(busy, 1),
+            rtf=round(rtf, 3),
+        )
+
+        pause = duty_cycle_pause(busy, share)
+        wall = time.time() - wall_start + pause
+        throughput = audio_done / wall if wall else 0.0
+        remaining = len(pending) - index
+        eta = remaining * (wall / index)
+        print(
+            f"Backfill {index}/{len(pending)}: {Path(media_path).name} — RTF {rtf:.2f}, "
+            f"{throughput:.1f}x tiempo real en promedio, faltan {remaining} "
+            f"(~{format_time(eta)})"
+        )
+        if pause and remaining:
+            await sleep(pause)
+
+    return journal
+
+
+def _previous_note(media: str, config: PipelineConfig) -> str | None:
+    try:
+        return load_transcript_artifact(
+            artifact_path(config.output_dir, Path(media).stem)
+        ).obsidian_note_path
+    except (OSError, ValueError):
+        return None
+
+
+def _keep_note_link(media: str, config: PipelineConfig, note: str) -> None:
+    """El backfill corre sin nota; conserva el vínculo a la nota original para
+    que ``--reanalyze`` la actualice en su lugar en vez de crear otra."""
+    path = artifact_path(config.output_dir, Path(media).stem)
+    try:
+        artifact = load_transcript_artifact(path)
+    except (OSError, ValueError):
+        return
+    if artifact.obsidian_note_path is None:
+        write_transcript_artifact(artifact.model_copy(update={"obsidian_note_path": note}), path)
@@ -3,13 +3,21 @@
 from __future__ import annotations
 
 import asyncio
+import os
 import sys
 
 import click
 
+from video_tranquitor.backfill import run_backfill
 from video_tranquitor.config import load_config
+from video_tranquitor.live import run_live
+from video_tranquitor.model_selection import calibrate_models
 from video_tranquitor.pipeline import run_pipeline
+from video_tranquitor.planner import format_plan, plan_for
+from video_tranquitor.preprocessor import get_audio_duration
+from video_tranquitor.reanalyze import DEFAULT_CONCURRENCY, reanalyze
 from video_tranquitor.watcher import start_watcher
+from video_tranquitor.whisperx_tuning import tune_whisperx
 
 
 @click.command()
@@ -27,6 +35,73 @@ from video_tranquitor.watcher import start_watcher
     default=False,
     help="Modo watcher (daemon)",
 )
+@click.option(
+    "--plan",
+    "plan_mode",
+    is_flag=True,
+    default=False,
+    help="Solo estimar cuánto tardaría cada etapa, sin procesar",
+)
+@click.option(
+    "--reanalyze",
+    "reanalyze_targets",
+    multiple=True,
+    metavar="RUTA",
+    help=(
+        "Reanalizar transcripciones guardadas (*_transcript.json, un directorio "
+        "o un glob) sin volver a transcribir. Se puede repetir."
+    ),
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=DEFAULT_CONCURRENCY,
+    show_default=True,
+    help="Reuniones en paralelo para --reanalyze",
+)
+@click.option(
+    "--backfill",
+    "backfill_dir",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    metavar="DIR",
+    help=(
+        "Re-transcribir en segundo plano el archivo histórico con el modelo actual. "
+        "Se puede cortar y retomar."
+    ),
+)
+@click.option(
+    "--live",
+    "live_source",
+    default=None,
+    metavar="FUENTE",
+    help=(
+        "Transcribir en vivo: '-' lee PCM s16le mono de stdin; una ruta sigue un "
+        "archivo que todavía se está grabando."
+    ),
+)
+@click.option(
+    "--calibrate-models",
+    "calibration_sample",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    metavar="MUESTRA",
+    help=(
+        "Medir velocidad y precisión de cada modelo ggml local sobre un audio de "
+        "muestra, para WHISPER_LATENCY_TARGET_SEC."
+    ),
+)
+@click.option(
+    "--tune-whisperx",
+    "tuning_sample",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    metavar="MUESTRA",
+    help=(
+        "Medir compute type, batch e hilos de WhisperX en CPU sobre un audio de "
+        "muestra y guardar el más rápido para este host."
+    ),
+)
 @click.argument(
     "positional",
     required=False,
@@ -36,6 +111,13 @@ from video_tranquitor.watcher import start_watcher
 def main(
     file_path: str | None,
     watch_mode: bool,
+    plan_mode: bool,
+    reanalyze_targets: tuple[str, ...],
+    concurrency: int,
+    backfill_dir: str | None,
+    live_source: str | None,
+    calibration_sample: str | None,
+    tuning_sample: str | None,
     positional: str | None,
 ) -> None:
     """Pipeline de transcripción y análisis de audio/video."""
@@ -49,6 +131,64 @@ def main(
         click.echo(f"Error de configuración: {exc}", err=True)
         sys.exit(1)
 
+    if reanalyze_targets:
+        summary = asyncio.run(reanalyze(list(reanalyze_targets), config, concurrency))
+        click.echo(
+            f"\nReanálisis: {len(summary.done)} hechos, {len(summary.skipped)} ya estaban, "
+            f"{len(summary.failed)} fallaron."
+        )
+        sys.exit(1 if summary.failed else 0)
+
+    if calibration_sample:
+        try:
+            calibrate_models(calibration_sample, config)
+        except (RuntimeError, FileNotFoundError) as exc:
+            click.echo(f"Error de calibración: {exc}", err=True)
+            sys.exit(1)
+        return
+
+    if tuning_sample:
+        try:
+            tune_whisperx(tuning_sample, config)
+        except (RuntimeError, FileNotFoundError) as exc:
+            click.echo(f"Error de ajuste: {exc}", err=True)
+            sys.exit(1)
+        return
+
+    if live_source:
+        if live_source != "-" and not os.path.exists(live_source):
+            click.echo(f"No existe {live_source}.", err=True)
+            sys.exit(1)
+        try:
+            run_live(live_source, config)
+        except ValueError as exc:
+            click.echo(str(exc), err=True)
+            sys.exit(1)
+        return
+
+    if backfill_dir:
+        try:
+            journal = asyncio.run(run_backfill(backfill_dir, config))
+        except KeyboardInterrupt:
+            click.echo("\nBackfill interrumpido; la próxima corrida retoma donde quedó.")
+            sys.exit(130)
+        except ValueError as exc:
+            click.echo(str(exc), err=True)
+            sys.exit(1)
+        click.echo(f"\nBackfill: {len(journal.done)} archivos al día.")
+        return
+
+    if plan_mode:
+        if not target_file:
+            click.echo("--plan necesita un archivo (--file o posicional).", err=True)
+            sys.exit(1)
+        duration = get_audio_duration(target_file)
+        if not duration:
+            click.echo(f"No se pudo leer la duración de {target_file}.", err=True)
+            sys.exit(1)
+        click.echo(format_plan(plan_for(duration, config), os.path.basename(target_file)))
+        return
+
     if target_file:
         # Modo de archivo único
         try:
@@ -34,6 +34,18 @@ EFFORT_LEVELS_BY_PROVIDER = {
 }
 
 
+def _parse_share(name: str, default: str = "0.5") -> float:
+    """Lee una fracción de la máquina: mayor que 0 y como mucho 1."""
+    raw = os.environ.get(name, default)
+    try:
+        share = float(raw)
+    except ValueError:
+        raise ValueError(f"{name}='{raw}' no es un número.") from None
+    if not 0 < share <= 1:
+        raise ValueError(f"{name}={share} no es válido: tiene que estar entre 0 (excluido) y 1.")
+    return share
+
+
 def load_config() -> PipelineConfig:
     """Lee el archivo .env y construye un PipelineConfig validado.
 
@@ -43,10 +55,10 @@ def load_config() -> PipelineConfig:
     load_dotenv()
 
     transcriber = os.environ.get("TRANSCRIBER", "local")
-    if transcriber not in ("local", "openai", "whisperx", "ensemble"):
+    if transcriber not in ("local", "openai", "whisperx", "ensemble", "faster-whisper"):
         raise ValueError(
             f"TRANSCRIBER='{transcriber}' no es válido. "
-            "Valores aceptados: local, openai, whisperx, ensemble"
+            "Valores aceptados: local, openai, whisperx, ensemble, faster-whisper"
         )
 
     enable_diarization = os.environ.get("ENABLE_DIARIZATION", "").lower() == "true"
@@ -113,6 +125,97 @@ def load_config() -> PipelineConfig:
             "Configurala en tu archivo .env"
         )
 
+    cpu_threads = int(os.environ.get("CPU_THREADS", "0"))
+    if cpu_threads < 0:
+        raise ValueError(f"CPU_THREADS={cpu_threads} no es válido: 0 usa todos los núcleos.")
+
+    backfill_cpu_share = _parse_share("BACKFILL_CPU_SHARE")
+    backfill_gpu_share = _parse_share("BACKFILL_GPU_SHARE")
+
+    whisper_backend = os.environ.get("WHISPER_BACKEND", "cli").lower()
+    if whisper_backend not in ("cli", "server", "bindings"):
+        raise ValueError(
+            f"WHISPER_BACKEND='{whisper_backend}' no es válido. "
+            "Valores aceptados: cli, server, bindings"
+        )
+    whisper_server_idle_sec = float(os.environ.get("WHISPER_SERVER_IDLE_SEC", "600"))
+    whisper_shards = int(os.environ.get("WHISPER_SHARDS", "1"))
+    if whisper_shards < 0:
+        raise ValueError(
+            f"WHISPER_SHARDS={whisper_shards} no es válido: 1 lo apaga, 0 es automático."
+        )
+
+    whisper_stream = os.environ.get("WHISPER_STREAM", "").lower() == "true"
+    # El streaming lee un solo whisper-cli; con tramos en paralelo no hay un
+    # stream que leer y WHISPER_SHARDS quedaba ignorado sin avisar.
+    if (
+        whisper_stream
+        and whisper_shards != 1
+        and transcriber == "local"
+        and whisper_backend == "cli"
+    ):
+        raise ValueError(
+            f"WHISPER_STREAM=true no se puede combinar con WHISPER_SHARDS={whisper_shards}: "
+            "el streaming lee un solo whisper-cli. Apagá uno de los dos."
+        )
+
+    whisper_stall_sec = float(os.environ.get("WHISPER_STALL_SEC", "120"))
+    if whisper_stall_sec <= 0:
+        raise ValueError(
+            f"WHISPER_STALL_SEC={whisper_stall_sec} no es válido: tiene que ser mayor a 0. "
+            "Para apagar el watchdog usá WHISPER_WATCHDOG=false."
+        )
+
+    whisperx_microbatch_sec = float(os.environ.get("WHISPERX_MICROBATCH_SEC", "0"))
+    if whisperx_microbatch_sec < 0:
+        raise ValueError(
+            f"WHISPERX_MICROBATCH_SEC={whisperx_microbatch_sec} no es válido: "
+            "0 lo apaga, si no son los segundos que se esperan notas."
+        )
+
+    whisperx_align = os.environ.get("WHISPERX_ALIGN", "auto").lower()
+    if whisperx_align not in ("auto", "always", "turns"):
+        raise ValueError(
+            f"WHISPERX_ALIGN='{whisperx_align}' no es válido. "
+            "Valores aceptados: auto, always, turns"
+        )
+
+    openai_concurrency = int(os.environ.get("OPENAI_CONCURRENCY", "4"))
+    if openai_concurrency < 1:
+        raise ValueError(
+            f"OPENAI_CONCURRENCY={openai_concurrency} no es válido: mínimo 1 chunk a la vez."
+        )
+    openai_requests_per_minute = float(os.environ.get("OPENAI_RPM", "50"))
+    if openai_requests_per_minute <= 0:
+        raise ValueError(
+            f"OPENAI_RPM={openai_requests_per_minute} no es válido: tiene que ser mayor a 0."
+        )
+
+    openai_upload_codec = os.environ.get("OPENAI_UPLOAD_CODEC", "wav").lower()
+    if openai_upload_codec not in ("wav", "flac", "opus"):
+        raise ValueError(
+            f"OPENAI_UPLOAD_CODEC='{openai_upload_codec}' no es válido. "
+            "Valores aceptados: wav, flac, opus"
+        )
+    openai_chunk_sec = int(os.environ.get("OPENAI_CHUNK_SEC", "120"))
+    # gpt-4o-transcribe no acepta más de 1500 s por pedido.
+    if not 10 <= openai_chunk_sec <= 1400:
+        raise ValueError(
+            f"OPENAI_CHUNK_SEC={openai_chunk_sec} no es válido: entre 10 y 1400 segundos."
+        )
+    # Un WAV de 16 kHz y 16 bits son ~32 KB/s: más de 780 s pasa los 25 MB de la API.
+    if openai_upload_codec == "wav" and openai_chunk_sec > 780:
+        raise ValueError(
+            f"OPENAI_CHUNK_SEC={openai_chunk_sec} no entra en un pedido con "
+            "OPENAI_UPLOAD_CODEC=wav (máximo 780 segundos). Usá flac u opus para chunks "
+            "más largos."
+        )
+
+    live_window_sec = int(os.environ.get("LIVE_WINDOW_SEC", "20"))
+    if live_window_sec < 5:
+        raise ValueError(f"LIVE_WINDOW_SEC={live_window_sec} no es válido: mínimo 5 segundos.")
+    live_idle_timeout_sec = float(os.environ.get("LIVE_IDLE_TIMEOUT_SEC", "30"))
+
     target_sample_rate_raw = os.environ.get("TARGET_SAMPLE_RATE")
     target_sample_rate = (
         int(target_sample_rate_raw) if target_sample_rate_raw else 16000
@@ -147,5 +250,33 @@ def load_config() -> PipelineConfig:
         analysis_effort=analysis_effort,
         analysis_passes=analysis_passes,
         whisperx_beam_size=int(os.environ.get("WHISPERX_BEAM_SIZE", "5")),
+        whisperx_worker_idle_sec=float(os.environ.get("WHISPERX_WORKER_IDLE_SEC", "600")),
+        whisperx_microbatch_sec=whisperx_microbatch_sec,
+        whisperx_align=whisperx_align,
+        faster_whisper_model=os.environ.get("FASTER_WHISPER_MODEL", "large-v3-turbo"),
+        faster_whisper_compute_type=os.environ.get("FASTER_WHISPER_COMPUTE_TYPE", "int8"),
+        openai_concurrency=openai_concurrency,
+        openai_requests_per_minute=openai_requests_per_minute,
+        openai_upload_codec=openai_upload_codec,  # type: ignore[arg-type]
+        openai_chunk_sec=openai_chunk_sec,
+        whisperx_microbatch_max_sec=float(
+            os.environ.get("WHISPERX_MICROBATCH_MAX_SEC", "90")
+        ),
         target_sample_rate=target_sample_rate,
+        cache_dir=os.environ.get("CACHE_DIR", "~/.cache/video-tranquitor"),
+        cpu_threads=cpu_threads,
+        cpu_pinning=os.environ.get("CPU_PINNING", "").lower() == "true",
+        backfill_cpu_share=backfill_cpu_share,
+        backfill_gpu_share=backfill_gpu_share,
+        live_window_sec=live_window_sec,
+        live_idle_timeout_sec=live_idle_timeout_sec,
+        whisper_backend=whisper_backend,
+        whisper_server_path=os.environ.get("WHISPER_SERVER_PATH", ""),
+        whisper_server_idle_sec=whisper_server_idle_sec,
+        whisper_shards=whisper_shards,
+        whisper_latency_target_sec=float(os.environ.get("WHISPER_LATENCY_TARGET_SEC", "0")),
+        whisper_models_dir=os.environ.get("WHISPER_MODELS_DIR", ""),
+        whisper_stream=whisper_stream,
+        whisper_watchdog=os.environ.get("WHISPER_WATCHDOG", "false").lower() == "true",
+        whisper_stall_sec=whisper_stall_sec,
     )
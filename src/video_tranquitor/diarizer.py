@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import logging
 
+from video_tranquitor.audio import read_wav_float32
 from video_tranquitor.gpu import release_gpu_memory
+from video_tranquitor.resources import cpu_lease, limit_current_process
 from video_tranquitor.types import DiarizationSegment, PipelineConfig
 
 logger = logging.getLogger(__name__)
@@ -20,47 +22,14 @@ def _load_audio_in_memory(audio_path: str) -> dict | None:
     Devuelve None si el archivo no es un WAV PCM legible, para que el llamador
     caiga al comportamiento anterior (pasarle la ruta a pyannote).
     """
-    import wave  # noqa: PLC0415
-
-    import numpy as np  # noqa: PLC0415
     import torch  # noqa: PLC0415
 
-    # ffmpeg escribe pcm_s16le por defecto; contemplamos igual 8 y 32 bits.
-    dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
-
-    try:
-        with wave.open(audio_path, "rb") as wav:
-            sample_width = wav.getsampwidth()
-            dtype = dtypes.get(sample_width)
-            if dtype is None:
-                logger.info(
-                    "WAV de %d bytes por muestra no soportado en memoria; "
-                    "delegando la decodificación a pyannote.",
-                    sample_width,
-                )
-                return None
-
-            channels = wav.getnchannels()
-            sample_rate = wav.getframerate()
-            frames = wav.readframes(wav.getnframes())
-    except (wave.Error, OSError, EOFError) as error:
-        logger.info("No se pudo precargar el audio (%s); usando la ruta directa.", error)
+    loaded = read_wav_float32(audio_path)
+    if loaded is None:
         return None
-
-    samples = np.frombuffer(frames, dtype=dtype)
-    if sample_width == 1:
-        # PCM de 8 bits es sin signo, centrado en 128.
-        waveform = (samples.astype(np.float32) - 128.0) / 128.0
-    else:
-        waveform = samples.astype(np.float32) / float(2 ** (8 * sample_width - 1))
-
-    # pyannote espera forma (channel, time).
-    waveform = waveform.reshape(-1, channels).T
-
-    return {
-        "waveform": torch.from_numpy(np.ascontiguousarray(waveform)),
-        "sample_rate": sample_rate,
-    }
+    # pyannote espera forma (channel, time), que es la que devuelve el lector.
+    waveform, sample_rate = loaded
+    return {"waveform": torch.from_numpy(waveform), "sample_rate": sample_rate}
 
 
 def _load_pipeline(checkpoint: str, hf_token: str):
@@ -144,10 +113,11 @@ def diarize(audio_path: str, config: PipelineConfig) -> list[DiarizationSegment]
         # Precargar en memoria evita el decoder de torchcodec (roto con ffmpeg 8+).
         audio_input = _load_audio_in_memory(audio_path) or audio_path
 
-        annotation = _resolve_annotation(
-            pipeline(audio_input),
-            config.diarization_exclusive,
-        )
+        with cpu_lease(config, "pyannote") as lease, limit_current_process(lease):
+            annotation = _resolve_annotation(
+                pipeline(audio_input),
+                config.diarization_exclusive,
+            )
 
         segments: list[DiarizationSegment] = []
         for turn, _, speaker in annotation.itertracks(yield_label=True):
@@ -0,0 +1,418 @@
+"""Transcripción en vivo de una reunión que todavía se está grabando.
+
+Dos fuentes posibles:
+
+- PCM crudo por stdin (s16le, mono, a ``TARGET_SAMPLE_RATE``), por ejemplo
+  ``parec --format=s16le --channels=1 --rate=16000 | python -m video_tranquitor --live -``.
+- Un archivo que se sigue escribiendo (la grabación de OBS, por ejemplo). ffmpeg
+  lo lee con ``-follow 1`` y lo da por terminado cuando deja de crecer durante
+  ``LIVE_IDLE_TIMEOUT_SEC``. Necesita un contenedor que se pueda leer mientras se
+  escribe: mkv, ogg o wav sí; un mp4 común no, porque el índice va al final.
+
+El audio se junta en ventanas de ``LIVE_WINDOW_SEC`` que se cortan en el punto
+más silencioso de sus últimos segundos, para no partir palabras. Cada ventana
+pasa por whisper.cpp con el modelo residente (``WHISPER_BACKEND=server`` o
+``bindings``): con ``cli`` cada ventana lanzaría un whisper-cli que vuelve a
+cargar el modelo, y en una reunión larga el atraso no pararía de crecer. Sus
+tiempos se corren al lugar que ocupan en la
+grabación y el TOON y la nota se reescriben con la misma grilla de chunks que
+usa el pipeline (``result_to_transcriptions``).
+
+El atraso se mide desde que llega el último sample de una ventana hasta que su
+texto está publicado. Si whisper.cpp se queda atrás, la ventana siguiente junta
+todo lo pendiente (hasta ``MAX_CATCHUP_SEC``): un solo pedido para más audio.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+from video_tranquitor.pipeline import (
+    NOTE_STATUS_IN_PROGRESS,
+    obsidian_safe,
+    time_string_to_seconds,
+)
+from video_tranquitor.preprocessor import format_time
+from video_tranquitor.transcribers.chunking import result_to_transcriptions, shift_segments
+from video_tranquitor.transcribers.whispercpp import transcribe_local
+from video_tranquitor.types import (
+    AttributedSegment,
+    PipelineConfig,
+    PipelineResult,
+    TranscriptArtifact,
+    Transcription,
+    WhisperResult,
+    WhisperSegment,
+)
+from video_tranquitor.writers.artifact_writer import (
+    artifact_path,
+    model_fingerprint,
+    today,
+    write_transcript_artifact,
+)
+from video_tranquitor.writers.obsidian_writer import update_obsidian_note, write_obsidian_note
+from video_tranquitor.writers.toon_writer import write_toon
+
+logger = logging.getLogger(__name__)
+
+BYTES_PER_SAMPLE = 2  # s16le
+READ_BLOCK_SEC = 0.5
+# Dónde buscar el corte: los últimos segundos de la ventana, en tramos de 20 ms.
+CUT_SEARCH_SEC = 2.0
+CUT_FRAME_MS = 20
+# Techo de una ventana de recuperación cuando whisper.cpp quedó atrás.
+MAX_CATCHUP_SEC = 60
+# Atraso a partir del cual se avisa: ya no es "en vivo".
+MAX_LAG_SEC = 30
+
+type WindowTranscriber = Callable[[bytes, int], WhisperResult]
+
+
+# ---------------------------------------------------------------------------
+# Fuentes de PCM
+# ---------------------------------------------------------------------------
+
+
+def pcm_from_stdin(sample_rate: int) -> Iterator[bytes]:
+    """Bloques de PCM s16le mono leídos de stdin hasta EOF."""
+    block = int(sample_rate * READ_BLOCK_SEC) * BYTES_PER_SAMPLE
+    stream = sys.stdin.buffer
+    while data := stream.read(block):
+        yield data
+
+
+def pcm_from_growing_file(
+    path: str, config: PipelineConfig, idle_timeout_sec: float
+) -> Iterator[bytes]:
+    """Decodifica con ffmpeg un archivo que se sigue escribiendo.
+
+    Termina cuando el archivo pasa ``idle_timeout_sec`` sin crecer.
+    """
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-follow", "1",
+        "-rw_timeout", str(int(idle_timeout_sec * 1_000_000)),
+        "-i", path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(config.target_sample_rate),
+    ]
+    if config.audio_filter:
+        command += ["-af", config.audio_filter]
+    command += ["-f", "s16le", "-"]
+
+    block = int(config.target_sample_rate * READ_BLOCK_SEC) * BYTES_PER_SAMPLE
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    try:
+        assert process.stdout is not None
+        while data := process.stdout.read(block):
+            yield data
+    finally:
+        process.kill()
+        process.wait()
+
+
+# ---------------------------------------------------------------------------
+# Ventanas
+# ---------------------------------------------------------------------------
+
+
+def quietest_cut(pcm: bytes | bytearray, end: int, sample_rate: int) -> int:
+    """Offset en bytes, antes de ``end``, donde conviene cortar la ventana.
+
+    Busca el tramo de ``CUT_FRAME_MS`` con menos energía dentro de los últimos
+    ``CUT_SEARCH_SEC`` y corta en su centro.
+    """
+    frame = sample_rate * CUT_FRAME_MS // 1000
+    search = int(sample_rate * CUT_SEARCH_SEC)
+    end_sample = end // BYTES_PER_SAMPLE
+    start_sample = max(0, end_sample - search)
+    samples = array("h")
+    samples.frombytes(bytes(pcm[start_sample * BYTES_PER_SAMPLE : end_sample * BYTES_PER_SAMPLE]))
+    if sys.byteorder == "big":
+        samples.byteswap()
+
+    best_at, best_energy = len(samples), None
+    for i in range(0, len(samples) - frame + 1, frame):
+        energy = sum(s * s for s in samples[i : i + frame])
+        if best_energy is None or energy < best_energy:
+            best_at, best_energy = i + frame // 2, energy
+    return (start_sample + best_at) * BYTES_PER_SAMPLE
+
+
+def whispercpp_window(config: PipelineConfig, scratch_dir: str) -> WindowTranscriber:
+    """Transcriptor de ventanas con whisper-cli, a través de un WAV temporal."""
+    wav_path = os.path.join(scratch_dir, f"temp_live_{os.getpid()}.wav")
+    # En vivo no se diariza: alcanza con la salida JSON liviana, sin tokens.
+    window_config = config.model_copy(update={"enable_diarization": False})
+
+    def _transcribe(pcm: bytes, sample_rate: int) -> WhisperResult:
+        with wave.open(wav_path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(BYTES_PER_SAMPLE)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+        try:
+            return transcribe_local(wav_path, window_config)
+        finally:
+            if os.path.exists(wav_path):
+                os.unlink(wav_path)
+
+    return _transcribe
+
+
+# ---------------------------------------------------------------------------
+# Sesión
+# ---------------------------------------------------------------------------
+
+
+class LiveSession:
+    """Acumula el PCM que llega y publica la transcripción ventana por ventana.
+
+    Args:
+        name:       Nombre base de las salidas (TOON, nota, artefacto).
+        config:     Configuración del pipeline.
+        transcribe: Transcribe una ventana de PCM. Default: whisper.cpp.
+        clock:      Reloj para medir el atraso (inyectable para los tests).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: PipelineConfig,
+        transcribe: WindowTranscriber | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        os.makedirs(config.output_dir, exist_ok=True)
+        self.name = name
+        self.config = config
+        self.sample_rate = config.target_sample_rate
+        self._transcribe = transcribe or whispercpp_window(config, config.output_dir)
+        self._clock = clock
+        self._window_bytes = int(config.live_window_sec * self.sample_rate) * BYTES_PER_SAMPLE
+        self._catchup_bytes = MAX_CATCHUP_SEC * self.sample_rate * BYTES_PER_SAMPLE
+
+        self._pending = bytearray()
+        self._received = 0  # bytes recibidos en total
+        self._consumed = 0  # bytes ya transcritos
+        self._arrivals: deque[tuple[int, float]] = deque()
+
+        self.segments: list[WhisperSegment] = []
+        self.transcriptions: list[Transcription] = []
+        self.language = config.language
+        self.lags: list[float] = []
+        self.fecha = today()
+        self.toon_path = Path(config.output_dir) / f"{name}_transcription.toon"
+        self.note_path: Path | None = None
+
+    @property
+    def received_sec(self) -> float:
+        return self._received / (self.sample_rate * BYTES_PER_SAMPLE)
+
+    def feed(self, data: bytes) -> None:
+        self._pending.extend(data)
+        self._received += len(data)
+        self._arrivals.append((self._received, self._clock()))
+
+    def ready(self) -> bool:
+        return len(self._pending) >= self._window_bytes
+
+    def flush(self, final: bool = False) -> None:
+        """Transcribe la próxima ventana (o todo lo pendiente si ``final``) y publica."""
+        if not self._pending:
+            return
+        if final:
+            cut = len(self._pending)
+        else:
+            end = self._window_bytes
+            if len(self._pending) >= 2 * self._window_bytes:
+                # Quedó más de una ventana esperando: se recupera de una vez.
+                end = min(len(self._pending), max(self._window_bytes, self._catchup_bytes))
+            cut = quietest_cut(self._pending, end, self.sample_rate)
+        cut -= cut % BYTES_PER_SAMPLE
+        if cut <= 0:
+            return
+
+        window = bytes(self._pending[:cut])
+        del self._pending[:cut]
+        offset = self._consumed / (self.sample_rate * BYTES_PER_SAMPLE)
+        self._consumed += cut
+
+        result = self._transcribe(window, self.sample_rate)
+        self.language = result.language or self.language
+        self.segments.extend(
+            shift_segments([s for s in result.segments if s.text.strip()], offset)
+        )
+        self._publish()
+        self._track_lag()
+
+    def _arrival_of(self, byte_total: int) -> float:
+        """Momento en que llegó el byte ``byte_total`` del stream."""
+        while len(self._arrivals) > 1 and self._arrivals[0][0] < byte_total:
+            self._arrivals.popleft()
+        return self._arrivals[0][1]
+
+    def _track_lag(self) -> None:
+        lag = self._clock() - self._arrival_of(self._consumed)
+        self.lags.append(lag)
+        print(
+            f"  [live] {format_time(self._consumed / (self.sample_rate * BYTES_PER_SAMPLE))} "
+            f"transcritos, {lag:.1f}s de atraso"
+        )
+        if lag > MAX_LAG_SEC:
+            logger.warning(
+                "El live va %.0fs atrasado (máximo %ds): whisper.cpp no sigue el ritmo. "
+                "Probá un modelo ggml más chico o una LIVE_WINDOW_SEC más larga.",
+                lag,
+                MAX_LAG_SEC,
+            )
+
+    def _snapshot(self) -> PipelineResult:
+        return PipelineResult(
+            input_file=self.name,
+            wav_path="",
+            transcription=[
+                AttributedSegment(
+                    speaker=None,
+                    text=t.texto,
+                    start=time_string_to_seconds(t.inicio),
+                    end=time_string_to_seconds(t.fin),
+                )
+                for t in self.transcriptions
+            ],
+            analysis=None,
+            toon_output_path=str(self.toon_path),
+            obsidian_output_path=str(self.note_path) if self.note_path else None,
+            duration_ms=0.0,
+            audio_duration_sec=self._consumed / (self.sample_rate * BYTES_PER_SAMPLE),
+            stages_run=["transcribe"],
+            whisper_result=WhisperResult(segments=self.segments, language=self.language),
+        )
+
+    def _publish(self, estado: str = NOTE_STATUS_IN_PROGRESS) -> None:
+        self.transcriptions = result_to_transcriptions(
+            WhisperResult(segments=self.segments, language=self.language)
+        )
+        if self.config.enable_toon:
+            write_toon(self.transcriptions, self.toon_path)
+        if not self.config.enable_obsidian:
+            return
+        if self.note_path is None:
+            self.note_path = obsidian_safe(
+                lambda: write_obsidian_note(
+                    self._snapshot(), self.config, estado=estado, fecha=self.fecha
+                )
+            )
+            if self.note_path is not None:
+                print(f"Nota de Obsidian en vivo: {self.note_path}")
+        else:
+            note_path = self.note_path
+            obsidian_safe(
+                lambda: update_obsidian_note(
+                    note_path, self._snapshot(), ("frontmatter", "transcripcion"), estado=estado
+                )
+            )
+
+    def close(self) -> None:
+        """Transcribe lo que quedó, cierra la nota y deja el artefacto para ``--reanalyze``."""
+        self.flush(final=True)
+        self._publish(estado="completado")
+        snapshot = self._snapshot()
+        try:
+            write_transcript_artifact(
+                TranscriptArtifact(
+                    input_file=self.name,
+                    fecha=self.fecha,
+                    audio_duration_sec=snapshot.audio_duration_sec,
+                    transcriber="local",
+                    model_fingerprint=model_fingerprint(
+                        self.config.model_copy(update={"transcriber": "local"})
+                    ),
+                    transcription=snapshot.transcription,
+                    raw_transcriptions=self.transcriptions,
+                    obsidian_note_path=str(self.note_path) if self.note_path else None,
+                ),
+                artifact_path(self.config.output_dir, self.name),
+            )
+        except OSError as error:
+            logger.warning("No se pudo guardar el artefacto de transcripción: %s", error)
+
+
+def run_live(
+    source: str,
+    config: PipelineConfig,
+    name: str | None = None,
+    transcribe: WindowTranscriber | None = None,
+) -> LiveSession:
+    """Transcribe en vivo desde stdin (``source == "-"``) o un archivo que crece.
+
+    La lectura corre en un hilo aparte para que el audio siga entrando mientras
+    whisper.cpp trabaja una ventana; el hilo principal solo transcribe y publica.
+
+    Raises:
+        ValueError: Si ``WHISPER_BACKEND=cli``: en vivo el modelo tiene que
+                    quedar cargado entre ventanas.
+    """
+    if transcribe is None and config.whisper_backend == "cli":
+        raise ValueError(
+            "--live necesita el modelo residente: configurá WHISPER_BACKEND=server "
+            "(o bindings, con el extra whispercpp). Con cli cada ventana vuelve a "
+            "cargar el modelo y en una reunión larga el atraso no para de crecer."
+        )
+    if source == "-":
+        name = name or f"live-{time.strftime('%H%M%S')}"
+        blocks = pcm_from_stdin(config.target_sample_rate)
+    else:
+        name = name or Path(source).stem
+        blocks = pcm_from_growing_file(source, config, config.live_idle_timeout_sec)
+
+    session = LiveSession(name, config, transcribe)
+    incoming: queue.Queue[bytes | None] = queue.Queue()
+
+    def _reader() -> None:
+        try:
+            for block in blocks:
+                incoming.put(block)
+        finally:
+            incoming.put(None)
+
+    threading.Thread(target=_reader, name="live-reader", daemon=True).start()
+    print(f"Transcripción en vivo de {source} (ventanas de {config.live_window_sec}s)...")
+
+    try:
+        while True:
+            block = incoming.get()
+            if block is None:
+                break
+            session.feed(block)
+            # Lo que llegó mientras se transcribía la ventana anterior entra
+            # antes de decidir el próximo corte.
+            while not incoming.empty() and (block := incoming.get_nowait()) is not None:
+                session.feed(block)
+            if session.ready():
+                session.flush()
+            if block is None:
+                break
+    except KeyboardInterrupt:
+        print("\nCorte manual; se cierra con lo recibido hasta ahora.")
+
+    session.close()
+    if session.lags:
+        print(
+            f"Live terminado: {format_time(session.received_sec)} de audio, atraso máximo "
+            f"{max(session.lags):.1f}s."
+        )
+    return session
@@ -0,0 +1,251 @@
+"""Elección del modelo ggml por archivo según lo medido en este host.
+
+Es común tener varios ggml bajados (large-v3-turbo, sus cuantizaciones q5_0 y
+q8_0, medium) y ``WHISPER_MODEL_PATH`` fija uno solo. ``--calibrate-models``
+corre cada modelo del directorio sobre una muestra de audio y guarda, por
+host, su factor de tiempo real (RTF) y un indicador de precisión: cuánto
+coincide su texto con el del modelo más grande, que hace de referencia.
+
+Con ``WHISPER_LATENCY_TARGET_SEC`` cada archivo usa el modelo más preciso que
+llega al objetivo según su duración y el audio que espera en cola detrás de
+él. Una nota suelta sale con el modelo completo; una ráfaga de archivos en el
+watcher baja a una cuantización hasta vaciar la cola.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import re
+import tempfile
+import time
+
+from pydantic import BaseModel
+
+from video_tranquitor.audio import slice_wav, wav_duration
+from video_tranquitor.preprocessor import format_time, preprocess_audio
+from video_tranquitor.state import load_host_state, save_host_state
+from video_tranquitor.transcribers.whispercpp import run_whisper_cli
+from video_tranquitor.types import PipelineConfig, WhisperResult
+
+logger = logging.getLogger(__name__)
+
+MODELS_STATE = "models"
+
+# Lo que se transcribe con cada modelo al calibrar: alcanza para un RTF
+# estable y no convierte la calibración en una hora de espera.
+CALIBRATION_SAMPLE_SEC = 120
+# Por debajo de esta coincidencia con la referencia un modelo solo se usa si
+# ningún otro llega al objetivo ni supera el umbral.
+MIN_AGREEMENT = 0.85
+
+_READ_BLOCK = 8 * 1024 * 1024
+_WORD_RE = re.compile(r"\w+")
+
+# Audio (en segundos) esperando en la cola del watcher detrás del archivo
+# actual. Lo actualiza el watcher antes de cada archivo.
+_queued_audio_sec = 0.0
+
+
+class ModelCalibration(BaseModel):
+    path: str
+    size: int
+    rtf: float
+    agreement: float
+    reference: bool = False
+    updated: str = ""
+
+
+def set_queued_audio(seconds: float) -> None:
+    """Registra cuánto audio espera en cola detrás del archivo que arranca."""
+    global _queued_audio_sec
+    _queued_audio_sec = max(0.0, seconds)
+
+
+def models_dir(config: PipelineConfig) -> str:
+    return config.whisper_models_dir or os.path.dirname(config.whisper_model_path)
+
+
+def discover_models(config: PipelineConfig) -> list[str]:
+    """Modelos ggml de whisper en ``models_dir``, sin los de VAD ni los de prueba."""
+    paths = glob.glob(os.path.join(models_dir(config), "ggml-*.bin"))
+    return sorted(
+        p
+        for p in paths
+        if "silero" not in os.path.basename(p) and "for-tests" not in os.path.basename(p)
+    )
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def agreement(hypothesis: str, reference: str) -> float:
+    """1 - WER de ``hypothesis`` contra ``reference``, acotado a [0, 1]."""
+    hyp, ref = _words(hypothesis), _words(reference)
+    if not ref:
+        return 1.0 if not hyp else 0.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (ref_word != hyp_word),
+                )
+            )
+        previous = current
+    return max(0.0, 1.0 - previous[-1] / len(ref))
+
+
+def _text(result: WhisperResult) -> str:
+    return " ".join(seg.text for seg in result.segments)
+
+
+def load_model_calibration(config: PipelineConfig) -> list[ModelCalibration]:
+    """Modelos calibrados en este host que siguen en disco sin cambios.
+
+    Un archivo reemplazado por otra versión (mismo nombre, otro tamaño) se
+    descarta hasta recalibrar.
+    """
+    entries = load_host_state(config, MODELS_STATE).get("models", {})
+    models: list[ModelCalibration] = []
+    for entry in entries.values():
+        try:
+            model = ModelCalibration.model_validate(entry)
+        except ValueError:
+            continue
+        try:
+            if os.path.getsize(model.path) != model.size:
+                continue
+        except OSError:
+            continue
+        models.append(model)
+    return models
+
+
+def _read_through(path: str) -> None:
+    with open(path, "rb") as f:
+        while f.read(_READ_BLOCK):
+            pass
+
+
+def calibrate_models(sample_path: str, config: PipelineConfig) -> list[ModelCalibration]:
+    """Mide RTF y coincidencia de cada modelo local sobre ``sample_path``.
+
+    El modelo más grande del directorio es la referencia de precisión.
+    Guarda el resultado en el estado del host y lo devuelve.
+
+    Raises:
+        RuntimeError: Si no hay modelos o la muestra no se puede preprocesar.
+    """
+    paths = discover_models(config)
+    if not paths:
+        raise RuntimeError(f"No hay modelos ggml-*.bin en {models_dir(config)}.")
+    paths.sort(key=os.path.getsize, reverse=True)
+
+    with tempfile.TemporaryDirectory(prefix="vt-calibrate-") as scratch:
+        full_wav = os.path.join(scratch, "full.wav")
+        if not preprocess_audio(
+            sample_path, full_wav, config.audio_filter, config.target_sample_rate
+        ):
+            raise RuntimeError(f"No se pudo preprocesar la muestra: {sample_path}")
+        sample_wav = os.path.join(scratch, "sample.wav")
+        slice_wav(full_wav, 0.0, CALIBRATION_SAMPLE_SEC, sample_wav)
+        duration = wav_duration(sample_wav)
+        print(
+            f"Calibrando {len(paths)} modelos sobre {format_time(duration)} de "
+            f"{os.path.basename(sample_path)}..."
+        )
+
+        reference_text = ""
+        results: list[ModelCalibration] = []
+        for index, path in enumerate(paths):
+            # En el uso normal el .bin ya está en el page cache (warmup.py);
+            # leerlo antes deja la carga desde disco frío fuera del RTF.
+            _read_through(path)
+            model_config = config.model_copy(
+                update={"whisper_model_path": path, "enable_diarization": False}
+            )
+            start = time.time()
+            result = run_whisper_cli(sample_wav, model_config, quiet=True)
+            elapsed = time.time() - start
+            text = _text(result)
+            if index == 0:
+                reference_text = text
+            calibration = ModelCalibration(
+                path=path,
+                size=os.path.getsize(path),
+                rtf=elapsed / duration if duration else 0.0,
+                agreement=1.0 if index == 0 else agreement(text, reference_text),
+                reference=index == 0,
+                updated=time.strftime("%Y-%m-%dT%H:%M:%S"),
+            )
+            results.append(calibration)
+            print(
+                f"  {os.path.basename(path):<32} RTF {calibration.rtf:.2f}  "
+                f"coincidencia {calibration.agreement:.0%}"
+                + ("  (referencia)" if calibration.reference else "")
+            )
+
+    save_host_state(
+        config,
+        MODELS_STATE,
+        {"models": {os.path.basename(m.path): m.model_dump() for m in results}},
+    )
+    return results
+
+
+def select_model(
+    duration_sec: float,
+    config: PipelineConfig,
+    models: list[ModelCalibration] | None = None,
+    queued_sec: float | None = None,
+) -> ModelCalibration | None:
+    """Modelo para un archivo de ``duration_sec`` según el objetivo de latencia.
+
+    El objetivo cubre el archivo y el audio en cola detrás de él: entre los
+    modelos que lo cumplen gana el de mayor coincidencia (y a igualdad, el más
+    rápido). Si ninguno llega, el más rápido de los que superan
+    ``MIN_AGREEMENT``, o el más rápido de todos.
+
+    Returns:
+        None si la selección está apagada o no hay modelos calibrados.
+    """
+    if config.whisper_latency_target_sec <= 0:
+        return None
+    if models is None:
+        models = load_model_calibration(config)
+    if not models:
+        return None
+    if queued_sec is None:
+        queued_sec = _queued_audio_sec
+
+    workload = duration_sec + queued_sec
+    fitting = [m for m in models if m.rtf * workload <= config.whisper_latency_target_sec]
+    if fitting:
+        return max(fitting, key=lambda m: (m.agreement, -m.rtf))
+    acceptable = [m for m in models if m.agreement >= MIN_AGREEMENT] or models
+    return min(acceptable, key=lambda m: m.rtf)
+
+
+def config_for_file(duration_sec: float, config: PipelineConfig) -> PipelineConfig:
+    """``config`` con ``whisper_model_path`` elegido para este archivo.
+
+    Sin selección activa (o sin calibración) devuelve ``config`` tal cual.
+    """
+    if config.transcriber not in ("local", "ensemble"):
+        return config
+    chosen = select_model(duration_sec, config)
+    if chosen is None:
+        return config
+    if chosen.path != config.whisper_model_path:
+        print(
+            f"Modelo elegido: {os.path.basename(chosen.path)} "
+            f"(~{format_time(chosen.rtf * duration_sec)} estimados, "
+            f"objetivo {format_time(config.whisper_latency_target_sec)})"
+        )
+    return config.model_copy(update={"whisper_model_path": chosen.path})
@@ -6,30 +6,49 @@ import asyncio
 import logging
 import os
 import time
+from collections.abc import Callable
+from pathlib import Path
 
-from video_tranquitor.aligner import align_speakers
+from video_tranquitor.aligner import align_speakers, segments_near_turns
 from video_tranquitor.analyzer import analyze_transcription
 from video_tranquitor.diarizer import diarize
+from video_tranquitor.model_selection import config_for_file
+from video_tranquitor.planner import analysis_stage_key, record_stage, transcribe_stage_key
 from video_tranquitor.preprocessor import format_time, get_audio_duration, preprocess_audio
+from video_tranquitor.resources import cpu_lease
+from video_tranquitor.transcribers.chunking import StreamingChunker
 from video_tranquitor.transcribers.ensemble import transcribe_ensemble
+from video_tranquitor.transcribers.fasterwhisper import transcribe_faster_whisper
+from video_tranquitor.transcribers.microbatch import transcribe_whisperx_batched
 from video_tranquitor.transcribers.openai_api import transcribe_openai
+from video_tranquitor.transcribers.whisper_watchdog import estimated_words, transcribe_watched
 from video_tranquitor.transcribers.whispercpp import (
     transcribe_local,
     whisper_result_to_transcriptions,
 )
-from video_tranquitor.transcribers.whisperx import (
-    transcribe_whisperx,
-    whisperx_result_to_transcriptions,
-)
+from video_tranquitor.transcribers.whisperx import whisperx_result_to_transcriptions
+from video_tranquitor.transcribers.whisperx_worker import align_in_worker
 from video_tranquitor.types import (
     AnalysisResult,
     AttributedSegment,
+    DiarizationSegment,
     PipelineConfig,
     PipelineResult,
+    TranscriptArtifact,
     Transcription,
     WhisperResult,
+    WhisperSegment,
+)
+from video_tranquitor.writers.artifact_writer import (
+    artifact_path,
+    model_fingerprint,
+    today,
+    write_transcript_artifact,
+)
+from video_tranquitor.writers.obsidian_writer import (
+    update_obsidian_note,
+    write_obsidian_note,
 )
-from video_tranquitor.writers.obsidian_writer import write_obsidian_note
 from video_tranquitor.writers.toon_writer import write_toon
 
 logger = logging.getLogger(__name__)
@@ -37,29 +56,120 @@ logger = logging.getLogger(__name__)
 VIDEO_EXTENSIONS: frozenset[str] = frozenset({".mp4", ".mkv", ".avi", ".mov"})
 AUDIO_EXTENSIONS: frozenset[str] = frozenset({".ogg", ".mp3", ".wav", ".m4a", ".flac"})
 
+NOTE_STATUS_IN_PROGRESS = "en-proceso"
+
 
 def _stage_log(label: str, start_time: float) -> None:
     elapsed = time.time() - start_time
     print(f"  [{label}] completado en {elapsed:.2f}s")
 
 
-def _time_string_to_seconds(time_str: str) -> float:
+def obsidian_safe(write: Callable[[], Path]) -> Path | None:
+    """Corre una escritura de la nota sin dejar que un fallo tumbe el pipeline."""
+    try:
+        return write()
+    except Exception as exc:  # noqa: BLE001 — la nota es opcional
+        message = str(exc)
+        if message.startswith("E_VAULT_NOT_FOUND"):
+            print(f"  {message}")
+        else:
+            logger.error("Error al escribir nota de Obsidian: %s", message)
+        print("  Nota de Obsidian omitida. El pipeline continúa.")
+        return None
+
+
+def time_string_to_seconds(time_str: str) -> float:
     """Convierte "HH:MM:SS" a segundos."""
     parts = time_str.split(":")
     h, m, s = int(parts[0]), int(parts[1]), int(parts[2])
     return float(h * 3600 + m * 60 + s)
 
 
+async def _transcribe_local_streaming(
+    wav_path: str, config: PipelineConfig, toon_path: str | None
+) -> WhisperResult:
+    """whisper.cpp con los segmentos consumidos a medida que salen.
+
+    Mientras decodifica se informa el progreso y, cada vez que se cierra un
+    chunk de la grilla, se reescribe el TOON con lo que ya hay: en una reunión
+    de una hora los primeros minutos se pueden leer mucho antes del final. La
+    Etapa 5 lo pisa con la versión definitiva. Corre bajo el watchdog de loops
+    y cuelgues, que solo entrega segmentos confirmados.
+    """
+    chunker = StreamingChunker()
+    reported = -1
+
+    def _progress(percent: int) -> None:
+        nonlocal reported
+        if percent // 10 > reported:
+            reported = percent // 10
+            print(f"  whisper.cpp: {percent}%")
+
+    def _segment(segment: WhisperSegment) -> None:
+        if chunker.add(segment) is not None and toon_path:
+            write_toon(chunker.closed, toon_path)
+
+    print("Ejecutando whisper.cpp (GPU/CUDA), leyendo segmentos en vivo...")
+    return await transcribe_watched(
+        wav_path, config, on_segment=_segment, on_progress=_progress
+    )
+
+
+def _aligns_after_diarization(config: PipelineConfig, whisper_result: WhisperResult) -> bool:
+    """WHISPERX_ALIGN=turns: WhisperX entregó segmentos sin palabras a propósito."""
+    return (
+        config.whisperx_align == "turns"
+        and config.transcriber in ("whisperx", "ensemble")
+        and not any(seg.words for seg in whisper_result.segments)
+    )
+
+
+def _with_spread_words(segment: WhisperSegment) -> WhisperSegment:
+    # Sin el espacio inicial de estimated_words: las palabras de WhisperX
+    # vienen sin él, y align_speakers decide cómo unirlas mirando todas juntas.
+    words = [w.model_copy(update={"word": w.word.strip()}) for w in estimated_words(segment)]
+    return segment.model_copy(update={"words": words})
+
+
+async def _align_near_turns(
+    wav_path: str,
+    config: PipelineConfig,
+    whisper_result: WhisperResult,
+    speakers: list[DiarizationSegment],
+) -> WhisperResult:
+    """Palabras para ``align_speakers`` alineando solo cerca de los cambios de hablante.
+
+    Los segmentos donde puede cambiar el hablante pasan por wav2vec2 en el
+    worker de WhisperX. En el resto habla uno solo y las palabras se reparten
+    a lo largo del segmento, como en el watchdog de whisper.cpp: el hablante
+    sale igual y la alineación cuesta una fracción.
+    """
+    segments = whisper_result.segments
+    near = set(segments_near_turns(whisper_result, speakers))
+    aligned: list[WhisperSegment] = []
+    if near:
+        aligned = await asyncio.to_thread(
+            align_in_worker, wav_path, config, [segments[i] for i in sorted(near)]
+        )
+    print(f"  Alineados palabra por palabra {len(near)} de {len(segments)} segmentos.")
+    merged = [seg for i, seg in enumerate(segments) if i not in near] + aligned
+    merged = [seg if seg.words else _with_spread_words(seg) for seg in merged]
+    return whisper_result.model_copy(
+        update={"segments": sorted(merged, key=lambda seg: seg.start)}
+    )
+
+
 async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult:
     """Ejecuta el pipeline completo de transcripción para un archivo de video o audio.
 
     Etapas:
     1. Preprocesamiento de audio (ffmpeg).
-    2. Transcripción (local / openai / whisperx / ensemble).
+    2. Transcripción (local / openai / whisperx / ensemble / faster-whisper).
     3. Diarización de hablantes (pyannote, opcional).
     4. Análisis con IA (Codex, opcional).
     5. Escritura TOON (opcional).
-    6. Nota de Obsidian (opcional).
+    6. Nota de Obsidian (opcional). Se escribe apenas termina la transcripción
+       y las etapas 3 y 4 la van completando; acá solo se cierra.
 
     Args:
         file_path: Ruta al archivo de entrada (video o audio).
@@ -79,6 +189,7 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
     is_video = ext in VIDEO_EXTENSIONS
 
     temp_wav_path = os.path.join(config.output_dir, f"temp_{base_name}.wav")
+    fecha = today()
 
     os.makedirs(config.output_dir, exist_ok=True)
 
@@ -95,12 +206,14 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
             else "Optimizando audio..."
         )
 
-        preprocess_ok = preprocess_audio(
-            file_path,
-            temp_wav_path,
-            config.audio_filter,
-            config.target_sample_rate,
-        )
+        with cpu_lease(config, "ffmpeg") as lease:
+            preprocess_ok = preprocess_audio(
+                file_path,
+                temp_wav_path,
+                config.audio_filter,
+                config.target_sample_rate,
+                lease=lease,
+            )
 
         if not preprocess_ok:
             raise RuntimeError(f"No se pudo preprocesar el archivo: {file_path}")
@@ -110,6 +223,10 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
 
         audio_duration_sec = get_audio_duration(temp_wav_path)
         print(f"Duración total del audio: {format_time(audio_duration_sec)}")
+        record_stage(config, "preprocess", time.time() - stage_start, audio_duration_sec)
+        # Con WHISPER_LATENCY_TARGET_SEC el ggml se elige según la duración; el
+        # resto del pipeline (y la huella del artefacto) usa el elegido.
+        config = config_for_file(audio_duration_sec, config)
 
         # -------------------------------------------------------------------------
         # Etapa 2: Transcripción
@@ -129,37 +246,109 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
                 config.transcription_prompt,
                 config.target_sample_rate,
                 config.language,
+                config.cache_dir,
+                config.openai_concurrency,
+                config.openai_requests_per_minute,
+                config.openai_upload_codec,
+                config.openai_chunk_sec,
             )
         elif config.transcriber == "whisperx":
-            whisper_result = await asyncio.to_thread(
-                transcribe_whisperx, temp_wav_path, config, config.whisperx_model
+            # Dentro de un micro-batch del watcher espera a las otras notas y
+            # se transcribe junto con ellas.
+            whisper_result = await transcribe_whisperx_batched(
+                temp_wav_path, config, config.whisperx_model
             )
             raw_transcriptions = whisperx_result_to_transcriptions(whisper_result)
+        elif config.transcriber == "faster-whisper":
+            whisper_result = await asyncio.to_thread(
+                transcribe_faster_whisper, temp_wav_path, config
+            )
+            raw_transcriptions = whisper_result_to_transcriptions(whisper_result)
         elif config.transcriber == "ensemble":
             ensemble_result = await transcribe_ensemble(temp_wav_path, config)
             whisper_result = ensemble_result.whisper_result
             raw_transcriptions = ensemble_result.arbitrated
         else:
             # config.transcriber == "local"
-            whisper_result = await asyncio.to_thread(
-                transcribe_local, temp_wav_path, config
-            )
+            if (
+                config.whisper_stream
+                and config.whisper_backend == "cli"
+                and config.whisper_shards == 1
+            ):
+                whisper_result = await _transcribe_local_streaming(
+                    temp_wav_path,
+                    config,
+                    os.path.join(config.output_dir, f"{base_name}_transcription.toon")
+                    if config.enable_toon
+                    else None,
+                )
+            else:
+                whisper_result = await asyncio.to_thread(
+                    transcribe_local, temp_wav_path, config
+                )
             raw_transcriptions = whisper_result_to_transcriptions(whisper_result)
 
         stages_run.append("transcribe")
         _stage_log("transcribe", stage_start)
+        record_stage(
+            config,
+            transcribe_stage_key(config),
+            time.time() - stage_start,
+            audio_duration_sec,
+        )
 
         # Mapear Transcription[] -> AttributedSegment[] (sin hablantes aún)
         transcription: list[AttributedSegment] = [
             AttributedSegment(
                 speaker=None,
                 text=t.texto,
-                start=_time_string_to_seconds(t.inicio),
-                end=_time_string_to_seconds(t.fin),
+                start=time_string_to_seconds(t.inicio),
+                end=time_string_to_seconds(t.fin),
             )
             for t in raw_transcriptions
         ]
 
+        analysis: AnalysisResult | None = None
+        toon_output_path: str | None = None
+
+        def _snapshot() -> PipelineResult:
+            return PipelineResult(
+                input_file=file_path,
+                wav_path=temp_wav_path,
+                transcription=transcription,
+                analysis=analysis,
+                toon_output_path=toon_output_path,
+                obsidian_output_path=None,
+                duration_ms=(time.time() - pipeline_start) * 1000,
+                audio_duration_sec=audio_duration_sec,
+                stages_run=list(stages_run),
+                whisper_result=whisper_result,
+            )
+
+        # -------------------------------------------------------------------------
+        # Nota temprana de Obsidian
+        # -------------------------------------------------------------------------
+        # Se escribe apenas existe la transcripción, con un placeholder donde irá
+        # el análisis. Con ANALYSIS_PASSES>1 el análisis suma más de diez minutos
+        # y no hay por qué esperar para leer la reunión. Cada etapa siguiente
+        # reescribe solo su sección.
+        note_path: Path | None = None
+        if config.enable_obsidian:
+            stage_start = time.time()
+            print("Generando nota en Obsidian...")
+            note_path = obsidian_safe(
+                lambda: write_obsidian_note(
+                    _snapshot(),
+                    config,
+                    estado=NOTE_STATUS_IN_PROGRESS,
+                    pending_analysis=config.enable_analysis,
+                    fecha=fecha,
+                )
+            )
+            if note_path is not None:
+                _stage_log("obsidian (temprana)", stage_start)
+                print(f"Nota de Obsidian guardada en: {note_path}")
+
         # -------------------------------------------------------------------------
         # Etapa 3: Diarización
         # -------------------------------------------------------------------------
@@ -167,7 +356,10 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
             if (
                 whisper_result is None
                 or not whisper_result.segments
-                or not whisper_result.segments[0].words
+                or not (
+                    whisper_result.segments[0].words
+                    or _aligns_after_diarization(config, whisper_result)
+                )
             ):
                 print(
                     "⚠  Diarización requiere timestamps a nivel de palabra. Omitiendo diarización."
@@ -181,29 +373,95 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
                 )
 
                 if diarization_segments:
+                    if _aligns_after_diarization(config, whisper_result):
+                        whisper_result = await _align_near_turns(
+                            temp_wav_path, config, whisper_result, diarization_segments
+                        )
                     transcription = align_speakers(whisper_result, diarization_segments)
+                    if note_path is not None:
+                        obsidian_safe(
+                            lambda: update_obsidian_note(
+                                note_path,
+                                _snapshot(),
+                                ("frontmatter", "transcripcion"),
+                                estado=NOTE_STATUS_IN_PROGRESS,
+                            )
+                        )
 
                 stages_run.append("diarization")
                 _stage_log("diarization", stage_start)
+                record_stage(
+                    config, "diarization", time.time() - stage_start, audio_duration_sec
+                )
+
+        # -------------------------------------------------------------------------
+        # Artefacto de transcripción
+        # -------------------------------------------------------------------------
+        # Se guarda antes del análisis: si el análisis falla, o si después se
+        # cambia el prompt o el proveedor, `--reanalyze` parte de acá sin volver
+        # a pagar la transcripción.
+        try:
+            write_transcript_artifact(
+                TranscriptArtifact(
+                    input_file=file_path,
+                    fecha=fecha,
+                    audio_duration_sec=audio_duration_sec,
+                    transcriber=config.transcriber,
+                    model_fingerprint=model_fingerprint(config),
+                    transcription=transcription,
+                    raw_transcriptions=raw_transcriptions,
+                    obsidian_note_path=str(note_path) if note_path else None,
+                ),
+                artifact_path(config.output_dir, base_name),
+            )
+        except OSError as error:
+            logger.warning("No se pudo guardar el artefacto de transcripción: %s", error)
 
         # -------------------------------------------------------------------------
         # Etapa 4: Análisis
         # -------------------------------------------------------------------------
-        analysis: AnalysisResult | None = None
         if config.enable_analysis:
             stage_start = time.time()
             print("Analizando transcripción con IA...")
-            analysis = await analyze_transcription(transcription, config)
+            primera_pasada: AnalysisResult | None = None
+
+            def _publicar_pasada(parcial: AnalysisResult, estado_analisis: str) -> None:
+                # Se muestra siempre la primera pasada que llegó: reemplazarla por
+                # cada pasada nueva haría saltar el contenido sin ganar nada, y la
+                # mejor versión es la consolidación, que llega al final.
+                nonlocal primera_pasada
+                primera_pasada = primera_pasada or parcial
+                if note_path is None:
+                    return
+                preview = _snapshot().model_copy(update={"analysis": primera_pasada})
+                obsidian_safe(
+                    lambda: update_obsidian_note(
+                        note_path,
+                        preview,
+                        ("analisis",),
+                        estado=NOTE_STATUS_IN_PROGRESS,
+                        analysis_status=estado_analisis,
+                    )
+                )
+
+            analysis = await analyze_transcription(
+                transcription, config, on_partial=_publicar_pasada
+            )
             if analysis:
                 stages_run.append("analysis")
                 _stage_log("analysis", stage_start)
+                record_stage(
+                    config,
+                    analysis_stage_key(config),
+                    time.time() - stage_start,
+                    audio_duration_sec,
+                )
             else:
                 print("  Análisis omitido (falló o no disponible). El pipeline continúa.")
 
         # -------------------------------------------------------------------------
         # Etapa 5: Escritura TOON
         # -------------------------------------------------------------------------
-        toon_output_path: str | None = None
         if config.enable_toon:
             stage_start = time.time()
             toon_path = os.path.join(config.output_dir, f"{base_name}_transcription.toon")
@@ -217,33 +475,23 @@ async def run_pipeline(file_path: str, config: PipelineConfig) -> PipelineResult
         # Etapa 6: Obsidian
         # -------------------------------------------------------------------------
         obsidian_output_path: str | None = None
-        if config.enable_obsidian:
+        if note_path is not None:
             stage_start = time.time()
-            print("Generando nota en Obsidian...")
-            try:
-                partial_result = PipelineResult(
-                    input_file=file_path,
-                    wav_path=temp_wav_path,
-                    transcription=transcription,
-                    analysis=analysis,
-                    toon_output_path=toon_output_path,
-                    obsidian_output_path=None,
-                    duration_ms=(time.time() - pipeline_start) * 1000,
-                    audio_duration_sec=audio_duration_sec,
-                    stages_run=list(stages_run),
-                    whisper_result=whisper_result,
+            # El cierre reescribe todo: frontmatter con el estado final, la
+            # transcripción definitiva y el análisis (o la quita del placeholder
+            # si el análisis falló).
+            final_path = obsidian_safe(
+                lambda: update_obsidian_note(
+                    note_path,
+                    _snapshot(),
+                    ("frontmatter", "transcripcion", "analisis"),
                 )
-                obsidian_output_path = str(write_obsidian_note(partial_result, config))
+            )
+            if final_path is not None:
+                obsidian_output_path = str(final_path)
                 stages_run.append("obsidian")
                 _stage_log("obsidian", stage_start)
-                print(f"Nota de Obsidian guardada en: {obsidian_output_path}")
-            except Exception as exc:
-                message = str(exc)
-                if message.startswith("E_VAULT_NOT_FOUND"):
-                    print(f"  {message}")
-                else:
-                    logger.error("Error al escribir nota de Obsidian: %s", message)
-                print("  Nota de Obsidian omitida. El pipeline continúa.")
+                print(f"Nota de Obsidian completada en: {obsidian_output_path}")
 
         duration_ms = (time.time() - pipeline_start) * 1000
         print(
@@ -0,0 +1,214 @@
+"""Estimación de cuánto va a tardar el pipeline sobre un archivo dado.
+
+Cada etapa se modela con un factor de tiempo real (RTF): segundos de trabajo
+por segundo de audio. Los valores de partida son conservadores y salen de las
+mediciones documentadas en el README; cada corrida real los corrige con un
+promedio móvil guardado por host (ver state.py), así que el planner aprende el
+hardware donde corre sin que nadie lo configure.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from pydantic import BaseModel
+
+from video_tranquitor.preprocessor import format_time
+from video_tranquitor.state import load_host_state, save_host_state
+from video_tranquitor.types import PipelineConfig
+from video_tranquitor.writers.artifact_writer import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_STATE = "calibration"
+
+# Peso de la corrida nueva en el promedio móvil. Alto a propósito: pocas
+# corridas alcanzan para olvidar los defaults, y si cambia el hardware (otra
+# GPU, otro modelo ggml) la estimación se acomoda en dos o tres archivos.
+EMA_ALPHA = 0.3
+
+# Puntos de partida antes de la primera medición en este host.
+DEFAULT_RTF: dict[str, float] = {
+    # Sin loudnorm el preprocess de 49 min bajó a ~10 s.
+    "preprocess": 0.01,
+    # whisper.cpp en CPU corre alrededor de 0.5x tiempo real (README).
+    "transcribe:local": 2.0,
+    "transcribe:whisperx": 0.15,
+    "transcribe:openai": 0.1,
+    # large-v3-turbo int8 en CPU; se corrige sola con la primera medición.
+    "transcribe:faster-whisper": 0.3,
+    # whisper.cpp y WhisperX en paralelo más 195 s de arbitración por reunión.
+    "transcribe:ensemble": 2.1,
+    "diarization": 0.05,
+    # 3 pasadas más la consolidación costaron unos 130 s sobre 49 min.
+    "analysis": 0.045,
+}
+
+# Cada pasada extra corre en paralelo con las otras; lo que agrega al camino
+# crítico es la consolidación y la cola de la pasada más lenta.
+MULTI_PASS_OVERHEAD = 0.5
+
+
+class StageEstimate(BaseModel):
+    stage: str
+    seconds: float
+    calibrated: bool
+    detail: str = ""
+
+
+class Plan(BaseModel):
+    audio_duration_sec: float
+    stages: list[StageEstimate]
+
+    @property
+    def total_sec(self) -> float:
+        """Camino crítico. Las etapas del pipeline son secuenciales entre sí; el
+        paralelismo interno (ensemble, pasadas de análisis) ya está en el RTF
+        medido de cada una."""
+        return sum(s.seconds for s in self.stages)
+
+    @property
+    def first_note_sec(self) -> float:
+        """Cuándo aparece la nota temprana: al terminar la transcripción."""
+        total = 0.0
+        for stage in self.stages:
+            total += stage.seconds
+            if stage.stage.startswith("transcribe:"):
+                break
+        return total
+
+
+def analysis_stage_key(config: PipelineConfig) -> str:
+    return f"analysis:{max(1, config.analysis_passes)}"
+
+
+def transcribe_stage_key(config: PipelineConfig) -> str:
+    """Clave de calibración del ASR: el motor, el modelo y, con whisper.cpp, el
+    backend. Un ``medium`` no tarda lo que un ``large-v3``, ni un whisper-cli que
+    recarga el modelo lo que un whisper-server que ya lo tiene cargado."""
+    key = f"transcribe:{model_fingerprint(config)}"
+    if config.transcriber in ("local", "ensemble"):
+        key += f"|{config.whisper_backend}"
+    return key
+
+
+def _stage_label(key: str) -> tuple[str, str]:
+    """Nombre corto de la etapa para mostrar, y el resto de la clave como detalle."""
+    if key.startswith("transcribe:"):
+        transcriber, _, model = key.split(":", 1)[1].partition(":")
+        return f"transcribe:{transcriber}", model
+    return key, ""
+
+
+def planned_stage_keys(config: PipelineConfig) -> list[str]:
+    """Claves de calibración de las etapas que va a correr ``config``, en orden."""
+    keys = ["preprocess", transcribe_stage_key(config)]
+    if config.enable_diarization:
+        keys.append("diarization")
+    if config.enable_analysis:
+        keys.append(analysis_stage_key(config))
+    return keys
+
+
+def _default_rtf(key: str) -> float:
+    if key.startswith("analysis:"):
+        passes = int(key.split(":", 1)[1])
+        factor = 1.0 if passes == 1 else 1.0 + MULTI_PASS_OVERHEAD
+        return DEFAULT_RTF["analysis"] * factor
+    return DEFAULT_RTF.get(_stage_label(key)[0], 1.0)
+
+
+def load_calibration(config: PipelineConfig) -> dict[str, dict]:
+    """Devuelve {clave: {"rtf": float, "runs": int}} medido en este host."""
+    return load_host_state(config, CALIBRATION_STATE).get("stages", {})
+
+
+def rtf_for(key: str, calibration: dict[str, dict]) -> tuple[float, bool]:
+    """RTF de la etapa y si viene de una medición (True) o del default (False)."""
+    entry = calibration.get(key)
+    if entry and entry.get("rtf", 0) > 0:
+        return float(entry["rtf"]), True
+    return _default_rtf(key), False
+
+
+def plan_for(
+    audio_duration_sec: float,
+    config: PipelineConfig,
+    calibration: dict[str, dict] | None = None,
+) -> Plan:
+    """Predice la duración de cada etapa para un audio de ``audio_duration_sec``."""
+    if calibration is None:
+        calibration = load_calibration(config)
+
+    stages: list[StageEstimate] = []
+    for key in planned_stage_keys(config):
+        rtf, calibrated = rtf_for(key, calibration)
+        stage, detail = _stage_label(key)
+        if key.startswith("analysis:") and config.analysis_passes > 1:
+            detail = f"{config.analysis_passes} pasadas en paralelo + consolidación"
+        stages.append(
+            StageEstimate(
+                stage=stage,
+                seconds=rtf * audio_duration_sec,
+                calibrated=calibrated,
+                detail=detail,
+            )
+        )
+    return Plan(audio_duration_sec=audio_duration_sec, stages=stages)
+
+
+def record_stage(
+    config: PipelineConfig,
+    key: str,
+    elapsed_sec: float,
+    audio_duration_sec: float,
+) -> None:
+    """Incorpora una medición real al promedio móvil de la etapa.
+
+    Best-effort: si el estado no se puede escribir se pierde la medición, no
+    el procesamiento. Audios de menos de 5 s no se registran: su tiempo lo
+    domina el arranque y arruinarían el RTF de los archivos largos.
+    """
+    if audio_duration_sec < 5 or elapsed_sec <= 0:
+        return
+    try:
+        state = load_host_state(config, CALIBRATION_STATE)
+        stages = state.setdefault("stages", {})
+        measured = elapsed_sec / audio_duration_sec
+        entry = stages.get(key)
+        if entry and entry.get("rtf", 0) > 0:
+            entry["rtf"] = (1 - EMA_ALPHA) * float(entry["rtf"]) + EMA_ALPHA * measured
+            entry["runs"] = int(entry.get("runs", 0)) + 1
+        else:
+            stages[key] = {"rtf": measured, "runs": 1}
+        stages[key]["updated"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        save_host_state(config, CALIBRATION_STATE, state)
+    except OSError as error:
+        logger.warning("No se pudo guardar la calibración de %s: %s", key, error)
+
+
+def format_plan(plan: Plan, name: str = "") -> str:
+    """Texto listo para imprimir con la estimación por etapa y el total."""
+    header = f"Plan para {name}" if name else "Plan"
+    lines = [f"{header} — audio de {format_time(plan.audio_duration_sec)}"]
+    for stage in plan.stages:
+        origen = "medido" if stage.calibrated else "estimado"
+        detail = f" ({stage.detail})" if stage.detail else ""
+        lines.append(
+            f"  {stage.stage:<24} {format_time(stage.seconds)}  [{origen}]{detail}"
+        )
+    lines.append(f"  {'nota temprana':<24} {format_time(plan.first_note_sec)}")
+    lines.append(f"  {'total (camino crítico)':<24} {format_time(plan.total_sec)}")
+    return "\n".join(lines)
+
+
+def queue_eta(
+    durations_sec: list[float],
+    config: PipelineConfig,
+    calibration: dict[str, dict] | None = None,
+) -> float:
+    """Segundos hasta vaciar una cola de archivos que se procesan de a uno."""
+    if calibration is None:
+        calibration = load_calibration(config)
+    return sum(plan_for(d, config, calibration).total_sec for d in durations_sec)
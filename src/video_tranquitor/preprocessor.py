@@ -5,26 +5,44 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
+import threading
+from collections import OrderedDict
+
+from video_tranquitor.resources import Lease
 
 logger = logging.getLogger(__name__)
 
+# Duraciones ya sondeadas, por (ruta, tamaño, mtime): el calentamiento sondea
+# cada archivo al llegar y el watcher vuelve a pedirlas para cada ETA y cada
+# micro-batch. Si el archivo cambia (una copia que sigue creciendo) la clave
+# cambia y se vuelve a sondear.
+_DURATION_CACHE_SIZE = 1024
+_durations: OrderedDict[tuple[str, int, int], float] = OrderedDict()
+_durations_lock = threading.Lock()
+
 
 def preprocess_audio(
     input_path: str,
     output_path: str,
     audio_filter: str,
     target_sample_rate: int,
+    lease: Lease | None = None,
 ) -> bool:
     """Convierte el audio a WAV mono normalizado usando ffmpeg.
 
     Intenta primero con los filtros de audio. Si falla y hay filtros
-    configurados, reintenta sin ellos.
+    configurados, reintenta sin ellos. Con ``lease`` ffmpeg usa sus hilos (y
+    núcleos) del presupuesto de CPU en vez de elegirlos solo.
 
     Returns:
         True si la conversión fue exitosa, False en caso contrario.
     """
+    # -threads va dos veces: antes de -i acota el decoder (el pesado con video)
+    # y después, el filtro y el encoder.
+    threads = ["-threads", str(lease.threads)] if lease is not None else []
     base_command = [
         "ffmpeg",
+        *threads,
         "-i", input_path,
         "-vn",
         "-ac", "1",
@@ -39,7 +57,9 @@ def preprocess_audio(
         El stderr se devuelve en vez de descartarse: esta etapa tarda minutos, y
         cuando falla el motivo real lo tiene ffmpeg, no el returncode.
         """
-        cmd = base_command + extra_args + ["-y", output_path]
+        cmd = base_command + extra_args + threads + ["-y", output_path]
+        if lease is not None:
+            cmd = lease.wrap_command(cmd)
         try:
             result = subprocess.run(cmd, capture_output=True)
         except OSError as error:  # ffmpeg ausente o no ejecutable
@@ -67,8 +87,29 @@ def preprocess_audio(
     return False
 
 
-def get_audio_duration(path: str) -> float:
-    """Devuelve la duración del archivo de audio en segundos usando ffprobe."""
+def _duration_key(path: str) -> tuple[str, int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def get_audio_duration(path: str, warn_on_failure: bool = True) -> float:
+    """Devuelve la duración del archivo de audio en segundos usando ffprobe.
+
+    ``warn_on_failure=False`` es para sondeos especulativos sobre archivos que
+    todavía se están copiando, donde fallar es lo esperable.
+
+    El resultado queda en memoria mientras el archivo no cambie: sondear de
+    nuevo el mismo archivo no vuelve a correr ffprobe. Los fallos no se guardan.
+    """
+    key = _duration_key(path)
+    if key is not None:
+        with _durations_lock:
+            if key in _durations:
+                _durations.move_to_end(key)
+                return _durations[key]
     try:
         result = subprocess.run(
             [
@@ -82,8 +123,10 @@ def get_audio_duration(path: str) -> float:
             text=True,
             check=True,
         )
-        return float(result.stdout.strip())
+        duration = float(result.stdout.strip())
     except Exception as error:
+        if not warn_on_failure:
+            return 0.0
         # Devolver 0.0 en silencio hacía que el pipeline reportara "00:00:00" y
         # siguiera como si nada, escondiendo un ffprobe roto o un WAV corrupto.
         logger.warning(
@@ -92,6 +135,12 @@ def get_audio_duration(path: str) -> float:
             error,
         )
         return 0.0
+    if key is not None and duration > 0:
+        with _durations_lock:
+            _durations[key] = duration
+            if len(_durations) > _DURATION_CACHE_SIZE:
+                _durations.popitem(last=False)
+    return duration
 
 
 def get_file_size_mb(path: str) -> float:
@@ -0,0 +1,192 @@
+"""Reanálisis en lote sobre transcripciones ya guardadas.
+
+Cuando cambia el prompt del análisis, el proveedor o ``ANALYSIS_PASSES``, las
+notas viejas se regeneran desde los artefactos ``*_transcript.json`` que deja el
+pipeline: se corre solo ``analyze_transcription`` y los writers, nunca el ASR.
+
+Varias reuniones se analizan a la vez, con un tope. Cada reunión terminada se
+anota en un journal atado a la huella del análisis, así que si el lote se
+corta, la próxima corrida con la misma configuración retoma donde quedó, y una
+con otro prompt vuelve a procesar todo.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from video_tranquitor.analyzer import analysis_fingerprint, analyze_transcription
+from video_tranquitor.state import atomic_write_text, cache_root
+from video_tranquitor.types import PipelineConfig, PipelineResult, TranscriptArtifact
+from video_tranquitor.writers.artifact_writer import (
+    ARTIFACT_SUFFIX,
+    load_transcript_artifact,
+    write_transcript_artifact,
+)
+from video_tranquitor.writers.obsidian_writer import update_obsidian_note, write_obsidian_note
+from video_tranquitor.writers.toon_writer import write_toon
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 2
+
+
+class ReanalysisSummary(BaseModel):
+    done: list[str] = []
+    skipped: list[str] = []
+    failed: list[str] = []
+
+
+def expand_artifact_paths(targets: list[str]) -> list[str]:
+    """Convierte directorios y globs en la lista ordenada de artefactos."""
+    paths: list[str] = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths += glob.glob(os.path.join(target, f"*{ARTIFACT_SUFFIX}"))
+        else:
+            paths += glob.glob(target) or [target]
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+class _Journal:
+    """Artefactos ya reanalizados con una huella de análisis dada."""
+
+    def __init__(self, config: PipelineConfig) -> None:
+        directory = cache_root(config) / "reanalyze"
+        directory.mkdir(parents=True, exist_ok=True)
+        self._path = directory / f"{analysis_fingerprint(config)}.json"
+        try:
+            self._done: dict[str, float] = json.loads(self._path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            self._done = {}
+
+    def is_done(self, artifact: str) -> bool:
+        # Si el artefacto cambió (se re-transcribió) hay que reanalizarlo igual.
+        recorded = self._done.get(artifact)
+        return recorded is not None and recorded == _mtime(artifact)
+
+    def mark_done(self, artifact: str) -> None:
+        self._done[artifact] = _mtime(artifact)
+        atomic_write_text(self._path, json.dumps(self._done, indent=2, sort_keys=True))
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return -1.0
+
+
+def _rewrite_outputs(
+    artifact: TranscriptArtifact,
+    artifact_file: str,
+    result: PipelineResult,
+    config: PipelineConfig,
+) -> None:
+    """Regenera el TOON y la nota. Si la nota original sigue en el vault se
+    parchea en su lugar, conservando lo que el usuario haya agregado."""
+    if config.enable_toon:
+        base_name = Path(artifact.input_file).stem
+        write_toon(
+            artifact.raw_transcriptions,
+            os.path.join(config.output_dir, f"{base_name}_transcription.toon"),
+        )
+
+    if not config.enable_obsidian:
+        return
+
+    note = artifact.obsidian_note_path
+    if note and os.path.exists(note):
+        update_obsidian_note(note, result, ("frontmatter", "transcripcion", "analisis"))
+        return
+
+    new_note = write_obsidian_note(result, config, fecha=artifact.fecha)
+    updated = artifact.model_copy(update={"obsidian_note_path": str(new_note)})
+    write_transcript_artifact(updated, artifact_file)
+
+
+async def _reanalyze_one(artifact_file: str, config: PipelineConfig) -> bool:
+    artifact = load_transcript_artifact(artifact_file)
+    name = Path(artifact.input_file).stem
+    start = time.time()
+    print(f"Reanalizando: {name}")
+
+    analysis = await analyze_transcription(artifact.transcription, config)
+    if analysis is None:
+        print(f"  {name}: el análisis falló; queda pendiente para la próxima corrida.")
+        return False
+
+    result = PipelineResult(
+        input_file=artifact.input_file,
+        wav_path="",
+        transcription=artifact.transcription,
+        analysis=analysis,
+        toon_output_path=None,
+        obsidian_output_path=artifact.obsidian_note_path,
+        duration_ms=(time.time() - start) * 1000,
+        audio_duration_sec=artifact.audio_duration_sec,
+        stages_run=["analysis"],
+        whisper_result=None,
+    )
+    await asyncio.to_thread(_rewrite_outputs, artifact, artifact_file, result, config)
+    print(f"  {name}: listo en {time.time() - start:.1f}s")
+    return True
+
+
+async def reanalyze(
+    targets: list[str],
+    config: PipelineConfig,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> ReanalysisSummary:
+    """Reanaliza los artefactos de ``targets`` con la configuración actual.
+
+    Args:
+        targets:     Artefactos, directorios que los contienen o globs.
+        config:      Configuración del pipeline (análisis y writers).
+        concurrency: Reuniones en paralelo. Cada una abre además
+                     ``ANALYSIS_PASSES`` llamadas al CLI del proveedor.
+
+    Returns:
+        Qué se reanalizó, qué ya estaba hecho y qué falló.
+    """
+    if config.enable_toon:
+        os.makedirs(config.output_dir, exist_ok=True)
+
+    journal = _Journal(config)
+    summary = ReanalysisSummary()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    pending: list[str] = []
+    for artifact_file in expand_artifact_paths(targets):
+        if journal.is_done(artifact_file):
+            summary.skipped.append(artifact_file)
+        else:
+            pending.append(artifact_file)
+
+    print(
+        f"Reanálisis: {len(pending)} pendientes, {len(summary.skipped)} ya hechos "
+        f"con esta configuración, {max(1, concurrency)} en paralelo."
+    )
+
+    async def _guarded(artifact_file: str) -> None:
+        async with semaphore:
+            try:
+                ok = await _reanalyze_one(artifact_file, config)
+            except Exception as error:  # noqa: BLE001 — una reunión rota no frena el lote
+                logger.error("Reanálisis de %s falló: %s", artifact_file, error)
+                ok = False
+            if ok:
+                journal.mark_done(artifact_file)
+                summary.done.append(artifact_file)
+            else:
+                summary.failed.append(artifact_file)
+
+    await asyncio.gather(*(_guarded(p) for p in pending))
+    return summary
@@ -0,0 +1,298 @@
+"""Presupuesto de núcleos de CPU repartido entre las etapas que corren a la vez.
+
+Cada herramienta elige sus hilos por su cuenta: ffmpeg usa todos los núcleos,
+whisper-cli los que le pasemos y torch (WhisperX, pyannote) todos los que ve.
+Solas está bien; en el ensemble whisper.cpp y WhisperX corren en paralelo y
+entre los dos piden el doble de la máquina, y el cambio de contexto se come
+lo que se esperaba ganar.
+
+Las etapas piden un *lease* al presupuesto del proceso (``CPU_THREADS``
+núcleos): el lease dice cuántos hilos usar y, con ``CPU_PINNING=true``, en qué
+núcleos. Mientras dura, esos núcleos no se le dan a nadie más, salvo que lo
+libre no llegue a la parte justa de la etapa que pide: ahí se comparten. Cuando
+dos etapas arrancan juntas (el ensemble) se pide un ``split`` para que la
+primera no se quede con todo.
+
+Quien recibe el lease lo traduce a la herramienta: ``-threads`` de ffmpeg,
+``--threads`` de whisper-cli, ``torch.set_num_threads`` en los procesos de
+Python. El pinning de subprocesos va con ``taskset`` y el de Python con
+``os.sched_setaffinity`` sobre el hilo que corre la etapa; donde no existen,
+solo se limitan hilos.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import shutil
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from pydantic import BaseModel
+
+from video_tranquitor.types import PipelineConfig
+
+logger = logging.getLogger(__name__)
+
+
+class Lease(BaseModel):
+    """Hilos (y núcleos, si hay pinning) asignados a una etapa."""
+
+    stage: str
+    threads: int
+    cpus: list[int] = []
+
+    def wrap_command(self, command: list[str]) -> list[str]:
+        """``command`` fijado a los núcleos del lease vía ``taskset``, si hay pinning."""
+        if not self.cpus:
+            return command
+        taskset = shutil.which("taskset")
+        if taskset is None:
+            return command
+        return [taskset, "-c", ",".join(map(str, self.cpus)), *command]
+
+    def split(self, parts: int) -> list[Lease]:
+        """Reparte el lease en ``parts`` partes (los shards de whisper.cpp)."""
+        parts = max(1, parts)
+        threads = max(1, self.threads // parts)
+        cpus = [self.cpus[i::parts] for i in range(parts)] if self.cpus else [[]] * parts
+        return [
+            Lease(stage=f"{self.stage}[{i}]", threads=threads, cpus=cpus[i])
+            for i in range(parts)
+        ]
+
+
+def available_cpus() -> list[int]:
+    """Núcleos donde este proceso puede correr (respeta taskset y cgroups)."""
+    getaffinity = getattr(os, "sched_getaffinity", None)
+    if getaffinity is not None:
+        return sorted(getaffinity(0))
+    return list(range(os.cpu_count() or 4))
+
+
+def _split_shares(count: int, weights: dict[str, float], caps: dict[str, int]) -> dict[str, int]:
+    """Hilos por etapa según su peso, sin pasar ningún tope.
+
+    Una etapa cuya parte proporcional supera su tope se queda con el tope y
+    sale del reparto; el resto se vuelve a repartir entre las que quedan,
+    hasta que ninguna lo supere. Así los núcleos que el tope deja libres no
+    quedan ociosos.
+    """
+    shares: dict[str, int] = {}
+    open_weights = dict(weights)
+    left = count
+    while open_weights:
+        total_weight = sum(open_weights.values()) or 1.0
+        capped = [
+            stage
+            for stage, weight in open_weights.items()
+            if caps.get(stage) and left * weight / total_weight >= caps[stage]
+        ]
+        if not capped:
+            break
+        for stage in capped:
+            shares[stage] = caps[stage]
+            left -= caps[stage]
+            del open_weights[stage]
+
+    total_weight = sum(open_weights.values()) or 1.0
+    stages = list(open_weights)
+    for index, stage in enumerate(stages):
+        if index == len(stages) - 1:
+            # La última se lleva lo que dejó el redondeo de las anteriores.
+            share = left - sum(shares[s] for s in stages[:index])
+        else:
+            share = round(left * open_weights[stage] / total_weight)
+        shares[stage] = max(1, share)
+    return shares
+
+
+class CpuBudget:
+    """Los núcleos del proceso y quién tiene cada uno.
+
+    Sin pinning solo se cuentan hilos, y ``total`` puede pasar los núcleos
+    reales si alguien quiere sobresuscribir a propósito. Con pinning cada
+    lease se lleva núcleos concretos, que no se repiten entre leases.
+    """
+
+    def __init__(self, total: int, pin: bool, cpus: list[int] | None = None) -> None:
+        cpus = cpus if cpus is not None else available_cpus()
+        self.total = max(1, total)
+        self.pin = pin and bool(cpus)
+        self.cpus = cpus[: self.total]
+        self._held: dict[int, Lease] = {}
+        self._lock = threading.Lock()
+
+    def _free(self) -> tuple[int, list[int]]:
+        """Hilos libres y, con pinning, cuáles núcleos."""
+        if self.pin:
+            busy = {cpu for lease in self._held.values() for cpu in lease.cpus}
+            free_cpus = [cpu for cpu in self.cpus if cpu not in busy]
+            return len(free_cpus), free_cpus
+        used = sum(lease.threads for lease in self._held.values())
+        return max(0, self.total - used), []
+
+    def _grant(self, stage: str, count: int, cpus: list[int], cap: int | None) -> Lease:
+        # Sin núcleos libres igual se da uno: la etapa tiene que avanzar, y un
+        # hilo de más es mejor que quedar esperando a que termine otra.
+        threads = max(1, min(count, cap or count))
+        if self.pin and not cpus:
+            cpus = self.cpus[-1:]
+        lease = Lease(stage=stage, threads=threads, cpus=cpus[:threads] if self.pin else [])
+        self._held[id(lease)] = lease
+        return lease
+
+    def acquire(self, stage: str, cap: int | None = None) -> Lease:
+        """Lease de ``stage``: lo libre, pero nunca menos que su parte justa.
+
+        La parte justa es ``total`` entre los leases vivos más este. La primera
+        etapa que arranca sola se lleva todo y no lo devuelve hasta terminar;
+        sin este piso, las que llegan después quedaban con un hilo. Con pinning
+        lo que falta se toma de los núcleos ocupados, empezando por los últimos.
+        """
+        with self._lock:
+            count, cpus = self._free()
+            fair = max(1, self.total // (len(self._held) + 1))
+            if count < fair:
+                if self.pin:
+                    busy = [cpu for cpu in reversed(self.cpus) if cpu not in cpus]
+                    cpus = cpus + busy[: fair - count]
+                count = fair
+            return self._grant(stage, count, cpus, cap)
+
+    def acquire_split(
+        self, weights: dict[str, float], caps: dict[str, int] | None = None
+    ) -> dict[str, Lease]:
+        """Leases simultáneos para etapas que arrancan juntas, por peso.
+
+        Lo que una etapa con tope no puede usar se reparte entre las demás.
+        """
+        with self._lock:
+            count, cpus = self._free()
+            shares = _split_shares(count, weights, caps or {})
+            leases: dict[str, Lease] = {}
+            start = 0
+            for stage in weights:
+                share = shares[stage]
+                leases[stage] = self._grant(stage, share, cpus[start : start + share], share)
+                start += share
+            return leases
+
+    def release(self, lease: Lease) -> None:
+        with self._lock:
+            self._held.pop(id(lease), None)
+
+
+_budget: CpuBudget | None = None
+_budget_key: tuple | None = None
+_budget_lock = threading.Lock()
+
+# Lease ya asignado a una etapa por quien la lanzó (el ensemble). Se hereda en
+# ``asyncio.to_thread``, así la etapa lo usa en vez de pedir otro.
+_assigned: contextvars.ContextVar[dict[str, Lease] | None] = contextvars.ContextVar(
+    "vt_assigned_leases", default=None
+)
+
+
+def get_budget(config: PipelineConfig) -> CpuBudget:
+    """El presupuesto del proceso. Se rehace si cambia la configuración o la
+    afinidad del proceso (el backfill la recorta al arrancar)."""
+    global _budget, _budget_key
+    cpus = available_cpus()
+    total = config.cpu_threads or len(cpus)
+    key = (total, config.cpu_pinning, tuple(cpus))
+    with _budget_lock:
+        if _budget is None or _budget_key != key:
+            _budget, _budget_key = CpuBudget(total, config.cpu_pinning, cpus), key
+        return _budget
+
+
+@contextmanager
+def cpu_lease(config: PipelineConfig, stage: str, cap: int | None = None) -> Iterator[Lease]:
+    """Lease de ``stage`` mientras dura el bloque.
+
+    Si quien lanzó la etapa ya le reservó uno (``cpu_split``), se usa ese.
+    """
+    assigned = (_assigned.get() or {}).get(stage)
+    if assigned is not None:
+        yield assigned
+        return
+    budget = get_budget(config)
+    lease = budget.acquire(stage, cap)
+    logger.debug("CPU: %s usa %d hilos %s", stage, lease.threads, lease.cpus or "")
+    try:
+        yield lease
+    finally:
+        budget.release(lease)
+
+
+@contextmanager
+def use_leases(leases: dict[str, Lease]) -> Iterator[None]:
+    """Asigna ``leases`` a sus etapas en el contexto actual.
+
+    Lo usa ``cpu_split`` y también un proceso hijo que recibe su lease del
+    padre (el worker de WhisperX): su propio presupuesto no sabe del resto.
+    """
+    token = _assigned.set({**(_assigned.get() or {}), **leases})
+    try:
+        yield
+    finally:
+        _assigned.reset(token)
+
+
+@contextmanager
+def cpu_split(
+    config: PipelineConfig, weights: dict[str, float], caps: dict[str, int] | None = None
+) -> Iterator[dict[str, Lease]]:
+    """Leases para etapas concurrentes, asignados en el contexto actual."""
+    budget = get_budget(config)
+    leases = budget.acquire_split(weights, caps)
+    try:
+        with use_leases(leases):
+            yield leases
+    finally:
+        for lease in leases.values():
+            budget.release(lease)
+
+
+@contextmanager
+def limit_current_process(lease: Lease) -> Iterator[None]:
+    """Limita los hilos de torch (y la afinidad) al lease mientras dura el bloque.
+
+    Para las etapas de Python: pyannote dentro del proceso principal y
+    WhisperX en el suyo. Al salir se restaura lo anterior, porque el proceso
+    principal sigue con otras etapas. torch es opcional (extra ``gpu``).
+
+    En Linux ``sched_setaffinity(0, ...)`` fija solo el hilo que llama y los
+    que cree a partir de ahí, no el proceso entero: el pool de torch que ya
+    estaba corriendo conserva su afinidad y solo queda limitado en cantidad
+    de hilos. Fijar todos los hilos del proceso principal arrastraría también
+    a las otras etapas que corren en él.
+    """
+    try:
+        import torch  # noqa: PLC0415
+    except ImportError:
+        torch = None
+
+    previous_threads = torch.get_num_threads() if torch is not None else None
+    getaffinity = getattr(os, "sched_getaffinity", None)
+    setaffinity = getattr(os, "sched_setaffinity", None)
+    previous_cpus = getaffinity(0) if lease.cpus and getaffinity is not None else None
+
+    if torch is not None:
+        torch.set_num_threads(lease.threads)
+    if previous_cpus is not None and setaffinity is not None:
+        try:
+            setaffinity(0, lease.cpus)
+        except OSError as error:
+            logger.debug("No se pudo fijar la afinidad de %s: %s", lease.stage, error)
+            previous_cpus = None
+    try:
+        yield
+    finally:
+        if torch is not None and previous_threads is not None:
+            torch.set_num_threads(previous_threads)
+        if previous_cpus is not None and setaffinity is not None:
+            setaffinity(0, previous_cpus)
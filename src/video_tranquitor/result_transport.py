@@ -0,0 +1,153 @@
+"""WhisperResult en binario para pasarlo entre procesos.
+
+El worker de WhisperX devolvía ``result.model_dump()``: el dict se picklea, se
+despicklea en el proceso principal y ``WhisperResult.model_validate`` arma un
+objeto validado por palabra. En una reunión de tres horas son cientos de miles
+de palabras, serializadas dos veces y validadas una por una.
+
+Acá el resultado viaja como arrays de tiempos (uno por campo, no uno por
+palabra) y un único blob de texto, en un bloque de memoria compartida. Por el
+pipe pasa solo la referencia. Del otro lado se arma el WhisperResult con
+``model_construct``, sin validar: los datos ya salieron de un WhisperResult
+válido.
+
+Lo que se ahorra es el pickle de ida y vuelta y la validación. Los objetos
+siguen siendo uno por palabra y se crean en el proceso principal:
+``model_construct`` es más barato que validar, pero no es gratis.
+
+Formato (little endian)::
+
+    cabecera  "VTR1", segmentos, palabras, bytes de idioma, bytes de texto
+    float64   inicio y fin de cada segmento
+    int64     palabras de cada segmento
+    float64   inicio y fin de cada palabra
+    utf-8     idioma
+    utf-8     textos de segmentos y después de palabras, separados por NUL
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+
+from video_tranquitor.types import WhisperResult, WhisperSegment, WhisperWord
+
+_MAGIC = b"VTR1"
+_HEADER = struct.Struct("<4sIIIQ")
+_SEPARATOR = "\x00"
+
+
+def _packed(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _unpacked(typecode: str, data: memoryview) -> list:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tolist()
+
+
+def pack_result(result: WhisperResult) -> bytes:
+    """``result`` en el formato binario del módulo."""
+    segments = result.segments
+    words = [word for seg in segments for word in seg.words]
+    texts = [seg.text for seg in segments] + [word.word for word in words]
+    # Un NUL dentro de un texto correría todos los que siguen; whisper no los
+    # emite, pero un texto corrupto no tiene que romper el resto.
+    text = _SEPARATOR.join(t.replace(_SEPARATOR, "") for t in texts).encode("utf-8")
+    language = result.language.encode("utf-8")
+    return b"".join(
+        [
+            _HEADER.pack(_MAGIC, len(segments), len(words), len(language), len(text)),
+            _packed(array("d", [seg.start for seg in segments])),
+            _packed(array("d", [seg.end for seg in segments])),
+            _packed(array("q", [len(seg.words) for seg in segments])),
+            _packed(array("d", [word.start for word in words])),
+            _packed(array("d", [word.end for word in words])),
+            language,
+            text,
+        ]
+    )
+
+
+def unpack_result(data: bytes | memoryview) -> WhisperResult:
+    """El WhisperResult de ``pack_result``, armado sin validar palabra por palabra.
+
+    Lee directo de ``data`` (puede ser el buffer del bloque compartido): solo
+    se copian los arrays y el texto, no el bloque entero.
+
+    Raises:
+        ValueError: Si ``data`` no está en el formato del módulo.
+    """
+    view = memoryview(data)
+    magic, n_segments, n_words, language_len, text_len = _HEADER.unpack_from(view)
+    if magic != _MAGIC:
+        raise ValueError("No es un WhisperResult empaquetado.")
+    offset = _HEADER.size
+
+    def _take(typecode: str, count: int) -> list:
+        nonlocal offset
+        size = count * 8
+        values = _unpacked(typecode, view[offset : offset + size])
+        offset += size
+        return values
+
+    seg_starts, seg_ends = _take("d", n_segments), _take("d", n_segments)
+    seg_words = _take("q", n_segments)
+    word_starts, word_ends = _take("d", n_words), _take("d", n_words)
+    language = str(view[offset : offset + language_len], "utf-8")
+    offset += language_len
+    raw = str(view[offset : offset + text_len], "utf-8")
+    texts = raw.split(_SEPARATOR) if n_segments + n_words else []
+    if len(texts) != n_segments + n_words:
+        raise ValueError("El texto de un WhisperResult empaquetado no coincide con la cabecera.")
+
+    words = [
+        WhisperWord.model_construct(word=text, start=start, end=end)
+        for text, start, end in zip(texts[n_segments:], word_starts, word_ends, strict=True)
+    ]
+    segments: list[WhisperSegment] = []
+    first = 0
+    for i in range(n_segments):
+        last = first + seg_words[i]
+        segments.append(
+            WhisperSegment.model_construct(
+                text=texts[i], start=seg_starts[i], end=seg_ends[i], words=words[first:last]
+            )
+        )
+        first = last
+    return WhisperResult.model_construct(segments=segments, language=language)
+
+
+def share_result(result: WhisperResult) -> dict:
+    """Deja ``result`` empaquetado en un bloque de memoria compartida.
+
+    El bloque queda vivo para el proceso que lo recibe, que lo libera en
+    ``result_from_shared``. Devuelve la referencia que viaja por el pipe.
+    """
+    data = pack_result(result)
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    try:
+        block.buf[: len(data)] = data
+        return {"shm": block.name, "size": len(data)}
+    finally:
+        block.close()
+
+
+def result_from_shared(ref: dict) -> WhisperResult:
+    """El WhisperResult de ``share_result``; libera el bloque al leerlo."""
+    block = shared_memory.SharedMemory(name=ref["shm"])
+    try:
+        # La vista se suelta antes de cerrar: con exportaciones vivas close() falla.
+        with block.buf[: ref["size"]] as view:
+            return unpack_result(view)
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,76 @@
+"""Estado persistente del pipeline entre corridas (calibraciones, progreso).
+
+Todo vive bajo ``config.cache_dir``. Lo que depende de la máquina —tiempos
+medidos, ajustes de hilos— va en un subdirectorio por host, porque el mismo
+``CACHE_DIR`` puede estar en un home compartido por NFS y una calibración de la
+notebook no dice nada de la workstation con GPU.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import tempfile
+from pathlib import Path
+
+from video_tranquitor.types import PipelineConfig
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_text(path: str | Path, content: str) -> None:
+    """Reescribe ``path`` sin dejar nunca un archivo a medio escribir.
+
+    Escribe a un temporal oculto en el mismo directorio y lo mueve con
+    ``os.replace``: quien lea en paralelo ve la versión anterior o la nueva,
+    nunca una mezcla, y un corte de luz no deja un JSON truncado. El temporal
+    tiene nombre único: dos escritores a la vez (el watcher y un ``--backfill``)
+    no se pisan el archivo a medio escribir.
+    """
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp",
+        delete=False,
+    ) as tmp:
+        tmp.write(content)
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
+
+
+def cache_root(config: PipelineConfig) -> Path:
+    """Directorio raíz del estado, compartido entre hosts."""
+    return Path(os.path.expanduser(config.cache_dir))
+
+
+def host_state_dir(config: PipelineConfig) -> Path:
+    """Directorio del estado que solo vale para esta máquina."""
+    return cache_root(config) / socket.gethostname()
+
+
+def load_host_state(config: PipelineConfig, name: str) -> dict:
+    """Lee ``<host>/<name>.json``. Devuelve {} si no existe o está corrupto."""
+    path = host_state_dir(config) / f"{name}.json"
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as error:
+        # Un estado ilegible se trata como vacío: se recalibra solo.
+        logger.warning("Estado %s ilegible (%s); se ignora.", path, error)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_host_state(config: PipelineConfig, name: str, data: dict) -> Path:
+    """Escribe ``<host>/<name>.json`` de forma atómica."""
+    directory = host_state_dir(config)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{name}.json"
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True))
+    return path
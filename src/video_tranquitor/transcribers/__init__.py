@@ -1,6 +1,8 @@
-"""Transcriptores de audio: whisper.cpp (subprocess), WhisperX (directo), OpenAI API y ensemble."""
+"""Transcriptores de audio: whisper.cpp (subprocess), WhisperX (directo), faster-whisper,
+OpenAI API y ensemble."""
 
 from video_tranquitor.transcribers.ensemble import transcribe_ensemble
+from video_tranquitor.transcribers.fasterwhisper import transcribe_faster_whisper
 from video_tranquitor.transcribers.openai_api import transcribe_openai
 from video_tranquitor.transcribers.whispercpp import (
     transcribe_local,
@@ -18,4 +20,5 @@ __all__ = [
     "whisperx_result_to_transcriptions",
     "transcribe_openai",
     "transcribe_ensemble",
+    "transcribe_faster_whisper",
 ]
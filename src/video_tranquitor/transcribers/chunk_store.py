@@ -0,0 +1,96 @@
+"""Checkpoints por chunk para las transcripciones que se hacen por partes.
+
+Un audio de dos horas son 60 llamadas pagas a la API. Si la número 45 falla
+por cuota, la corrida entera se pierde y el reintento vuelve a pagar las 44
+anteriores. El store guarda cada chunk apenas termina, con una clave que
+depende solo del contenido del audio, del tramo y de cómo se transcribió, así
+que un reintento (o un reproceso del mismo archivo) solo hace lo que falta.
+
+Cualquier transcriptor que trabaje por tramos —la API de OpenAI hoy, los
+shards locales de whisper.cpp— usa este mismo store.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+from video_tranquitor.state import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def hash_audio_file(path: str) -> str:
+    """SHA-256 del contenido del archivo, leído por bloques.
+
+    Se hashea el WAV ya preprocesado: el mismo archivo de entrada con el mismo
+    filtro produce el mismo WAV, y cambiar el filtro cambia el audio que se
+    transcribe, así que está bien que invalide los checkpoints.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK_BYTES):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", text).strip("_") or "default"
+
+
+class ChunkStore:
+    """Resultados de chunks de un audio, transcritos con un modelo y opciones dados.
+
+    Args:
+        root:       Directorio raíz del store (``<cache_dir>/chunks``).
+        audio_hash: Hash del audio, ver ``hash_audio_file``.
+        model:      Modelo o binario con el que se transcribió.
+        options:    Todo lo demás que cambia el resultado (idioma, prompt,
+                    parámetros de decodificación). Entra a la clave por hash.
+    """
+
+    def __init__(self, root: str | Path, audio_hash: str, model: str, options: str = "") -> None:
+        variant = hashlib.sha256(options.encode("utf-8")).hexdigest()[:12]
+        self._dir = (
+            Path(root).expanduser() / audio_hash[:2] / audio_hash / f"{_slug(model)}-{variant}"
+        )
+
+    @classmethod
+    def for_audio(
+        cls, cache_dir: str | Path, audio_path: str, model: str, options: str = ""
+    ) -> ChunkStore:
+        """Store del audio en ``audio_path`` bajo ``<cache_dir>/chunks``."""
+        return cls(
+            Path(cache_dir).expanduser() / "chunks", hash_audio_file(audio_path), model, options
+        )
+
+    def _path(self, offset_ms: int, duration_ms: int) -> Path:
+        return self._dir / f"{offset_ms:010d}-{duration_ms}.json"
+
+    def get(self, offset_ms: int, duration_ms: int) -> dict | None:
+        """Devuelve el resultado guardado del tramo, o None si falta o está dañado."""
+        path = self._path(offset_ms, duration_ms)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as error:
+            logger.warning("Checkpoint ilegible %s (%s); se vuelve a transcribir.", path, error)
+            return None
+        return data if isinstance(data, dict) else None
+
+    def put(self, offset_ms: int, duration_ms: int, payload: dict) -> None:
+        """Guarda el resultado del tramo. Un fallo al guardar no tumba la corrida."""
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            atomic_write_text(
+                self._path(offset_ms, duration_ms), json.dumps(payload, ensure_ascii=False)
+            )
+        except OSError as error:
+            logger.warning("No se pudo guardar el checkpoint del chunk %d: %s", offset_ms, error)
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from video_tranquitor.preprocessor import format_time
-from video_tranquitor.types import Transcription, WhisperResult
+from video_tranquitor.types import Transcription, WhisperResult, WhisperSegment, WhisperWord
 
 CHUNK_DURATION_SEC = 120  # 2 minutos
 
@@ -29,40 +29,81 @@ def result_to_transcriptions(
         Lista de Transcription con tiempos en formato HH:MM:SS. Las ventanas sin
         habla no aparecen.
     """
-    if not result.segments:
-        return []
+    chunker = StreamingChunker(chunk_seconds)
+    for seg in result.segments:
+        chunker.add(seg)
+    return chunker.finish()
 
-    transcriptions: list[Transcription] = []
-    inicio = 0
-    fin = chunk_seconds
-    textos: list[str] = []
 
-    for seg in result.segments:
-        if seg.start >= fin:
-            if textos:
-                transcriptions.append(
-                    Transcription(
-                        inicio=format_time(inicio),
-                        fin=format_time(fin),
-                        texto=" ".join(textos).strip(),
-                    )
+class StreamingChunker:
+    """La misma grilla que ``result_to_transcriptions``, alimentada de a un segmento.
+
+    Para quien recibe los segmentos mientras el transcriptor todavía corre:
+    cada chunk sale apenas llega un segmento de una ventana posterior, sin
+    esperar al resto del audio. ``result_to_transcriptions`` está escrita
+    sobre esta clase, así que las dos no pueden dar resultados distintos.
+    """
+
+    def __init__(self, chunk_seconds: int = CHUNK_DURATION_SEC) -> None:
+        self.chunk_seconds = chunk_seconds
+        self.closed: list[Transcription] = []
+        self._inicio = 0
+        self._fin = chunk_seconds
+        self._textos: list[str] = []
+        self._last_end = 0.0
+
+    def add(self, seg: WhisperSegment) -> Transcription | None:
+        """Suma un segmento; devuelve el chunk que quedó cerrado, si alguno."""
+        closed: Transcription | None = None
+        if seg.start >= self._fin:
+            if self._textos:
+                closed = Transcription(
+                    inicio=format_time(self._inicio),
+                    fin=format_time(self._fin),
+                    texto=" ".join(self._textos).strip(),
                 )
+                self.closed.append(closed)
             # Saltar directo a la ventana del segmento: las intermedias no
             # tienen habla y no deben generar chunks vacíos.
-            inicio = int(seg.start / chunk_seconds) * chunk_seconds
-            fin = inicio + chunk_seconds
-            textos = []
-        textos.append(seg.text.strip())
-
-    if textos:
-        transcriptions.append(
-            Transcription(
-                inicio=format_time(inicio),
-                # El último chunk cierra donde termina el habla, no donde
-                # terminaría la ventana.
-                fin=format_time(min(fin, result.segments[-1].end)),
-                texto=" ".join(textos).strip(),
+            self._inicio = int(seg.start / self.chunk_seconds) * self.chunk_seconds
+            self._fin = self._inicio + self.chunk_seconds
+            self._textos = []
+        self._textos.append(seg.text.strip())
+        self._last_end = seg.end
+        return closed
+
+    def finish(self) -> list[Transcription]:
+        """Cierra el último chunk y devuelve todos, en orden."""
+        if self._textos:
+            self.closed.append(
+                Transcription(
+                    inicio=format_time(self._inicio),
+                    # El último chunk cierra donde termina el habla, no donde
+                    # terminaría la ventana.
+                    fin=format_time(min(self._fin, self._last_end)),
+                    texto=" ".join(self._textos).strip(),
+                )
             )
-        )
+            self._textos = []
+        return self.closed
+
 
-    return transcriptions
+def shift_segments(segments: list[WhisperSegment], offset: float) -> list[WhisperSegment]:
+    """Corre segmentos y palabras ``offset`` segundos.
+
+    Para los transcriptores que trabajan por tramos (ventanas en vivo, shards
+    de whisper.cpp): cada tramo se transcribe desde 0 y hay que llevarlo a su
+    lugar en el audio completo antes de agruparlo.
+    """
+    return [
+        WhisperSegment(
+            text=seg.text,
+            start=seg.start + offset,
+            end=seg.end + offset,
+            words=[
+                WhisperWord(word=w.word, start=w.start + offset, end=w.end + offset)
+                for w in seg.words
+            ],
+        )
+        for seg in segments
+    ]
@@ -4,37 +4,24 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import multiprocessing
-from concurrent.futures import ProcessPoolExecutor
 
 from video_tranquitor.llm_client import call_llm_with_schema
+from video_tranquitor.resources import cpu_split
 from video_tranquitor.transcribers.whispercpp import (
+    MAX_WHISPER_THREADS,
+    WHISPER_STAGE,
     transcribe_local,
     whisper_result_to_transcriptions,
 )
 from video_tranquitor.transcribers.whisperx import (
+    WHISPERX_STAGE,
     whisperx_result_to_transcriptions,
 )
-from video_tranquitor.types import EnsembleResult, PipelineConfig, Transcription, WhisperResult
+from video_tranquitor.transcribers.whisperx_worker import transcribe_in_worker
+from video_tranquitor.types import EnsembleResult, PipelineConfig, Transcription
 
 logger = logging.getLogger(__name__)
 
-def _run_whisperx_in_subprocess(
-    audio_path: str, config_json: str, model_size: str
-) -> dict:
-    """Wrapper picklable para correr WhisperX en un proceso separado.
-
-    Recibe el config serializado como JSON (evita problemas de pickling de pydantic
-    con tipos complejos en algunos entornos), reconstruye el modelo adentro del
-    worker, y retorna el WhisperResult serializado como dict.
-    """
-    from video_tranquitor.transcribers.whisperx import transcribe_whisperx as _tx
-    from video_tranquitor.types import PipelineConfig as _Cfg
-
-    cfg = _Cfg.model_validate_json(config_json)
-    result = _tx(audio_path, cfg, model_size)
-    return result.model_dump()
-
 
 ENSEMBLE_SCHEMA = {
     "type": "object",
@@ -153,34 +140,27 @@ async def transcribe_ensemble(
         "(procesos separados, CUDA context aislado)..."
     )
 
-    loop = asyncio.get_running_loop()
-    # spawn context → cada proceso arranca fresh, sin heredar CUDA state del padre
-    spawn_ctx = multiprocessing.get_context("spawn")
-
-    # turbo corre en thread (thin subprocess wrapper, sin carga de Python GPU)
-    turbo_task = asyncio.to_thread(transcribe_local, audio_path, config)
-
-    # whisperx corre en su propio proceso (GPU-pesado en Python)
-    with ProcessPoolExecutor(max_workers=1, mp_context=spawn_ctx) as pool:
-        whisperx_future = loop.run_in_executor(
-            pool,
-            _run_whisperx_in_subprocess,
-            audio_path,
-            config.model_dump_json(),
-            config.whisperx_model,
+    # Los dos legs arrancan juntos: se reparten los núcleos a la par en vez de
+    # que cada uno pida la máquina entera (whisper.cpp no pasa de 8 hilos).
+    with cpu_split(
+        config,
+        {WHISPER_STAGE: 1.0, WHISPERX_STAGE: 1.0},
+        caps={WHISPER_STAGE: MAX_WHISPER_THREADS},
+    ):
+        # turbo corre en thread (thin subprocess wrapper, sin carga de Python GPU);
+        # to_thread copia el contexto, así que usa el lease asignado.
+        turbo_task = asyncio.to_thread(transcribe_local, audio_path, config)
+
+        # whisperx corre en el worker residente (GPU-pesado en Python, proceso
+        # spawn propio), con el lease que le tocó en el split.
+        whisperx_task = asyncio.to_thread(
+            transcribe_in_worker, audio_path, config, config.whisperx_model
         )
 
-        turbo_settled_raw, whisperx_raw = await asyncio.gather(
-            turbo_task, whisperx_future, return_exceptions=True
+        turbo_settled, whisperx_settled = await asyncio.gather(
+            turbo_task, whisperx_task, return_exceptions=True
         )
 
-    # Reconstruir WhisperResult desde el dict serializado
-    turbo_settled = turbo_settled_raw
-    if isinstance(whisperx_raw, dict):
-        whisperx_settled: WhisperResult | BaseException = WhisperResult.model_validate(whisperx_raw)
-    else:
-        whisperx_settled = whisperx_raw  # excepción
-
     turbo_ok = not isinstance(turbo_settled, BaseException)
     whisperx_ok = not isinstance(whisperx_settled, BaseException)
 
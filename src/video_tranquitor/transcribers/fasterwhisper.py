@@ -0,0 +1,129 @@
+"""Transcriptor con faster-whisper (CTranslate2) directo, sin torch.
+
+WhisperX es faster-whisper más VAD de pyannote y alineación con wav2vec2: las
+dos etapas extra son las que arrastran torch. En los perfiles ``cpu`` y
+``vulkan`` no hay torch, y whisper.cpp es lo único disponible.
+
+Con ``TRANSCRIBER=faster-whisper`` se llama a CTranslate2 directo: inferencia
+int8 en CPU, el VAD Silero que trae faster-whisper (ONNX, sin torch) y las
+palabras con tiempos de sus propios pesos de atención cruzada, sin la etapa
+de alineación. El ``WhisperResult`` trae las palabras como las de whisper.cpp
+(con el espacio inicial incluido) y va tal cual a ``align_speakers``.
+
+El modelo queda cargado en el proceso entre archivos, como con
+``WHISPER_BACKEND=bindings``. faster-whisper es opcional (extra
+``fasterwhisper``) y se importa recién al usarlo.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+from video_tranquitor.audio import read_whisper_audio
+from video_tranquitor.resources import cpu_lease
+from video_tranquitor.transcribers.whispercpp import needs_word_timestamps
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+
+logger = logging.getLogger(__name__)
+
+# Nombre de la etapa en el presupuesto de CPU.
+FASTER_WHISPER_STAGE = "faster-whisper"
+
+_model: Any = None
+_model_key: tuple | None = None
+# Un modelo de CTranslate2 admite llamadas concurrentes, pero la carga no: el
+# calentamiento y el pipeline podrían pedirlo a la vez.
+_lock = threading.Lock()
+
+
+def _import_faster_whisper() -> Any:
+    try:
+        import faster_whisper  # noqa: PLC0415
+    except ImportError as exc:
+        raise RuntimeError(
+            "TRANSCRIBER=faster-whisper necesita faster-whisper. "
+            "Instalalo con `uv sync --extra fasterwhisper`."
+        ) from exc
+    return faster_whisper
+
+
+def get_model(config: PipelineConfig, threads: int) -> Any:
+    """El modelo cargado del proceso. Cambiar de modelo, de compute type o de
+    hilos lo recarga.
+
+    Los hilos de CTranslate2 se fijan al cargar: si el lease cambia, el modelo
+    se recarga con los nuevos en vez de quedarse con los del primero.
+    """
+    global _model, _model_key
+    key = (config.faster_whisper_model, config.faster_whisper_compute_type, threads)
+    with _lock:
+        if _model is None or _model_key != key:
+            faster_whisper = _import_faster_whisper()
+            print(
+                f"Cargando faster-whisper {config.faster_whisper_model} "
+                f"({config.faster_whisper_compute_type}, queda residente)..."
+            )
+            _model = faster_whisper.WhisperModel(
+                config.faster_whisper_model,
+                device="cpu",
+                compute_type=config.faster_whisper_compute_type,
+                cpu_threads=threads,
+            )
+            _model_key = key
+        return _model
+
+
+def _words(segment: Any) -> list[WhisperWord]:
+    return [
+        WhisperWord(word=word.word, start=float(word.start), end=float(word.end))
+        for word in segment.words or []
+    ]
+
+
+def transcribe_faster_whisper(audio_path: str, config: PipelineConfig) -> WhisperResult:
+    """Transcribe ``audio_path`` con faster-whisper en CPU.
+
+    Las palabras con tiempos se piden solo si la diarización las va a usar,
+    como con whisper.cpp.
+
+    Raises:
+        RuntimeError: Si faster-whisper no está instalado.
+    """
+    words_needed = needs_word_timestamps(config)
+
+    with cpu_lease(config, FASTER_WHISPER_STAGE) as lease:
+        model = get_model(config, lease.threads)
+        # El WAV del preprocess ya es mono a 16 kHz: se lee directo, sin pasar
+        # por el decodificador de faster-whisper (PyAV).
+        samples = read_whisper_audio(audio_path)
+        audio = samples if samples is not None else audio_path
+        print(
+            f"Ejecutando faster-whisper ({config.faster_whisper_compute_type}, "
+            f"{lease.threads} hilos, VAD integrado)..."
+        )
+        segments, info = model.transcribe(
+            audio,
+            language=config.language,
+            vad_filter=True,
+            word_timestamps=words_needed,
+        )
+        # ``segments`` es un generador: la transcripción corre mientras se itera.
+        result = [
+            WhisperSegment(
+                text=segment.text.strip(),
+                start=float(segment.start),
+                end=float(segment.end),
+                words=_words(segment) if words_needed else [],
+            )
+            for segment in segments
+        ]
+
+    return WhisperResult(segments=result, language=info.language or config.language)
+
+
+def preload_faster_whisper(config: PipelineConfig) -> None:
+    """Carga el modelo antes de que llegue el audio (calentamiento del daemon)."""
+    with cpu_lease(config, FASTER_WHISPER_STAGE) as lease:
+        get_model(config, lease.threads)
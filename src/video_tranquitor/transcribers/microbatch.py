@@ -0,0 +1,146 @@
+"""Micro-batches de notas de voz cortas para WhisperX.
+
+Una ráfaga de audios de WhatsApp (decenas de notas de 20 a 60 s) pasaba por
+el pipeline de a una: cada nota un ``model.transcribe`` con dos o tres chunks
+del VAD, y los batches de WhisperX casi vacíos. El modelo residente ya está
+cargado; lo que se desperdicia es la GPU (o los núcleos) entre batches.
+
+El watcher junta las notas cortas que llegan dentro de
+``WHISPERX_MICROBATCH_SEC`` y corre sus pipelines a la vez bajo un
+``MicroBatch``. Cada pipeline llega a la transcripción por su cuenta y
+espera; cuando todos llegaron (o terminaron antes, por un error), las notas
+van juntas al worker en una sola pasada (``transcribe_batch_in_worker``) y
+cada pipeline sigue con su ``WhisperResult``: diarización, análisis y nota
+propios, como si se hubiera transcrito sola.
+
+Solo la pasada compartida aprovecha el batch. Lo que viene después sigue
+siendo una diarización de pyannote y un análisis con varias pasadas por nota:
+32 a la vez se pelearían la GPU y los núcleos, y abrirían decenas de CLIs del
+LLM. Eso corre con el mismo tope que ``--reanalyze`` (``POST_ASR_CONCURRENCY``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+from video_tranquitor.reanalyze import DEFAULT_CONCURRENCY
+from video_tranquitor.transcribers.whisperx_worker import (
+    transcribe_batch_in_worker,
+    transcribe_in_worker,
+)
+from video_tranquitor.types import PipelineConfig, WhisperResult
+
+logger = logging.getLogger(__name__)
+
+# Tope de notas por pasada: más que esto ya no suma y demora la primera.
+MICROBATCH_MAX_FILES = 32
+# Notas que siguen a la vez con diarización, análisis y nota después del ASR.
+POST_ASR_CONCURRENCY = DEFAULT_CONCURRENCY
+
+_current: contextvars.ContextVar[MicroBatch | None] = contextvars.ContextVar(
+    "vt_microbatch", default=None
+)
+
+
+class MicroBatch:
+    """Las notas de una ráfaga: junta sus WAVs y los transcribe en una pasada."""
+
+    def __init__(self, members: int, post_asr_limit: int = POST_ASR_CONCURRENCY) -> None:
+        # Pipelines que todavía pueden pedir transcripción.
+        self._open = members
+        self._pending: list[tuple[str, asyncio.Future[WhisperResult]]] = []
+        self._submitted: set[asyncio.Task] = set()
+        # Turnos para lo que sigue al ASR; cada pipeline lo suelta al terminar.
+        self._post_asr = asyncio.Semaphore(max(1, post_asr_limit))
+        self._holding: set[asyncio.Task] = set()
+        self._config: PipelineConfig | None = None
+        self._model_size = ""
+
+    async def member(self, coro: Coroutine[Any, Any, None]) -> None:
+        """Corre el pipeline de una nota como parte del batch."""
+        _current.set(self)
+        task = asyncio.current_task()
+        try:
+            await coro
+        finally:
+            if task in self._holding:
+                self._holding.discard(task)
+                self._post_asr.release()
+            if task not in self._submitted:
+                # Terminó (o falló) sin llegar a transcribir: no hay que esperarlo.
+                self._open -= 1
+                await self._flush_if_ready()
+
+    async def transcribe(
+        self, wav_path: str, config: PipelineConfig, model_size: str
+    ) -> WhisperResult:
+        future: asyncio.Future[WhisperResult] = asyncio.get_running_loop().create_future()
+        self._pending.append((wav_path, future))
+        task = asyncio.current_task()
+        if task is not None:
+            self._submitted.add(task)
+        if self._config is None:
+            self._config, self._model_size = config, model_size
+        self._open -= 1
+        await self._flush_if_ready()
+        result = await future
+        # El pipeline sigue con su diarización y análisis: espera turno y lo
+        # conserva hasta que ``member`` termina.
+        await self._post_asr.acquire()
+        if task is not None:
+            self._holding.add(task)
+        return result
+
+    async def _flush_if_ready(self) -> None:
+        if self._open > 0 or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        assert self._config is not None
+        print(f"\nTranscribiendo {len(pending)} notas en una sola pasada de WhisperX...")
+        try:
+            results = await asyncio.to_thread(
+                transcribe_batch_in_worker,
+                [path for path, _ in pending],
+                self._config,
+                self._model_size,
+            )
+        except Exception as error:  # noqa: BLE001 — cada pipeline recibe el error
+            for _, future in pending:
+                future.set_exception(error)
+            return
+        for (_, future), result in zip(pending, results, strict=True):
+            future.set_result(result)
+
+
+async def transcribe_whisperx_batched(
+    wav_path: str, config: PipelineConfig, model_size: str
+) -> WhisperResult:
+    """``transcribe_in_worker``, o la pasada compartida si el pipeline corre en un batch."""
+    batch = _current.get()
+    if batch is None:
+        return await asyncio.to_thread(transcribe_in_worker, wav_path, config, model_size)
+    return await batch.transcribe(wav_path, config, model_size)
+
+
+async def run_micro_batch(
+    paths: list[str],
+    on_file: Callable[[str], Coroutine[Any, Any, None]],
+    post_asr_limit: int = POST_ASR_CONCURRENCY,
+) -> list[BaseException | None]:
+    """Corre ``on_file`` sobre cada nota a la vez, con la transcripción compartida.
+
+    Hasta la transcripción las notas van en paralelo; después siguen de a
+    ``post_asr_limit``.
+
+    Returns:
+        El error de cada nota (None si salió bien), en el orden de ``paths``.
+    """
+    batch = MicroBatch(len(paths), post_asr_limit)
+    results = await asyncio.gather(
+        *(batch.member(on_file(path)) for path in paths), return_exceptions=True
+    )
+    return [result if isinstance(result, BaseException) else None for result in results]
@@ -1,60 +1,261 @@
-"""Transcriptor legacy usando la API de OpenAI (gpt-4o-transcribe, whisper-1, etc.)."""
+"""Transcriptor legacy usando la API de OpenAI (gpt-4o-transcribe, whisper-1, etc.).
+
+Los chunks se suben de a varios a la vez (``OPENAI_CONCURRENCY``) en vez de
+uno por uno con una pausa fija: en un audio de dos horas casi todo el tiempo
+era espera de red. Un ``TokenBucket`` compartido mantiene el ritmo por debajo
+de ``OPENAI_RPM`` y, si la API responde 429 o 5xx, frena a todos los hilos lo
+que pida ``Retry-After`` antes de reintentar. Los textos se rearman en el
+orden del audio aunque vuelvan desordenados.
+
+Un WAV de 16 bits son ~3,8 MB cada 2 minutos. Con ``OPENAI_UPLOAD_CODEC``
+cada chunk se comprime antes de subirlo: FLAC (sin pérdida, 46 % de los
+bytes) u Opus (con pérdida, 8,2 veces menos), medido en un chunk de 2 minutos
+de voz preprocesada. Eso deja lugar para chunks más largos
+(``OPENAI_CHUNK_SEC``) y menos pedidos sin acercarse al límite de 25 MB de
+la API.
+"""
 
 from __future__ import annotations
 
 import logging
+import math
 import os
 import subprocess
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 
-from video_tranquitor.preprocessor import format_time, get_audio_duration, get_file_size_mb
+from video_tranquitor.audio import wav_slice
+from video_tranquitor.preprocessor import format_time, get_audio_duration
+from video_tranquitor.transcribers.chunk_store import ChunkStore
 from video_tranquitor.types import Transcription
 
 logger = logging.getLogger(__name__)
 
 _CHUNK_LENGTH_SEC = 120  # 2 minutos
 
+# Extensión, MIME y argumentos de ffmpeg de cada códec de subida. Opus va en
+# un contenedor Ogg (la API no acepta .opus suelto); 32 kb/s en modo voip
+# sobra para voz a 16 kHz.
+_UPLOAD_CODECS: dict[str, tuple[str, str, list[str]]] = {
+    "wav": (".wav", "audio/wav", []),
+    "flac": (".flac", "audio/flac", ["-c:a", "flac", "-f", "flac"]),
+    "opus": (
+        ".ogg",
+        "audio/ogg",
+        ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "ogg"],
+    ),
+}
+_MIME_TYPES = {ext: mime for ext, mime, _ in _UPLOAD_CODECS.values()}
+
+# La API rechaza archivos de más de 25 MB; el resto queda para el multipart.
+_MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+
+# Reintentos por chunk ante 429/5xx o cortes de conexión, y el tope de espera
+# entre uno y otro (tanto el backoff propio como un Retry-After exagerado).
+_MAX_RETRIES = 5
+_MAX_RETRY_WAIT_SEC = 60.0
+_RETRY_STATUS = (408, 409, 429)
+
+
+class TokenBucket:
+    """Limitador de pedidos compartido entre hilos.
+
+    Se recargan ``rate`` fichas por segundo hasta ``burst``; cada pedido gasta
+    una. ``pause`` no da fichas hasta que pase la espera, así un 429 frena a
+    todos los hilos y no solo al que lo recibió.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self._rate = rate
+        self._burst = max(1, burst)
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Bloquea hasta que haya una ficha y la gasta."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    elapsed = max(0.0, now - self._updated)
+                    self._tokens = min(self._burst, self._tokens + elapsed * self._rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self._rate
+                else:
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Ninguna ficha hasta dentro de ``seconds``; después hay una sola, no la ráfaga."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 1.0
+                self._updated = until
+
+
+def _retry_after(exc: Exception) -> float | None:
+    """Los segundos que pide la respuesta en ``retry-after-ms`` o ``Retry-After``."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # Retry-After también puede venir como fecha HTTP.
+            return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float | None:
+    """Cuánto esperar antes de reintentar, o None si el error no se arregla reintentando."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        retryable = status in _RETRY_STATUS or status >= 500
+    else:
+        import openai  # noqa: PLC0415 — importación tardía
+
+        # APIConnectionError incluye los timeouts.
+        retryable = isinstance(exc, getattr(openai, "APIConnectionError", ()))
+    if not retryable:
+        return None
+    delay = _retry_after(exc)
+    if delay is None:
+        delay = 2.0**attempt
+    return min(max(delay, 0.0), _MAX_RETRY_WAIT_SEC)
+
 
 def _transcribe_chunk(
-    audio_path: str,
+    filename: str,
+    audio: bytes,
     client: object,  # openai.OpenAI — importación tardía
     transcribe_model: str,
     transcription_prompt: str,
     language: str,
-) -> str:
-    """Transcribe un chunk de audio con la API de OpenAI. Devuelve el texto o ""."""
+    limiter: TokenBucket | None = None,
+) -> str | None:
+    """Transcribe un chunk de audio con la API de OpenAI.
+
+    Devuelve el texto ("" si el chunk no tiene habla) o None si la llamada
+    falló. La diferencia importa: un chunk vacío se guarda como checkpoint, uno
+    fallido no, para que el reintento lo vuelva a pedir.
+
+    Los 429, 5xx y cortes de conexión se reintentan hasta ``_MAX_RETRIES``
+    veces, esperando lo que pida ``Retry-After`` (o un backoff exponencial).
+    Con ``limiter`` cada intento gasta una ficha y la espera frena a todos.
+    """
     try:
         from openai import OpenAI  # noqa: PLC0415 — importación tardía
 
         assert isinstance(client, OpenAI)
+    except Exception as exc:
+        logger.error("Error en transcripción con OpenAI: %s", exc)
+        return None
 
-        file_size = get_file_size_mb(audio_path)
-        if file_size > 24:
-            logger.warning("Chunk grande: %.2f MB", file_size)
+    file_size = len(audio) / (1024 * 1024)
+    if len(audio) > _MAX_UPLOAD_BYTES:
+        logger.warning("Chunk grande: %.2f MB", file_size)
 
-        ext = os.path.splitext(audio_path)[1].lower()
-        mime = "audio/wav" if ext == ".wav" else "audio/mpeg"
+    ext = os.path.splitext(filename)[1].lower()
+    mime = _MIME_TYPES.get(ext, "application/octet-stream")
+    prompt = transcription_prompt.strip()
+
+    for attempt in range(_MAX_RETRIES + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = client.audio.transcriptions.create(
+                model=transcribe_model,
+                file=(filename, audio, mime),
+                language=language,
+                response_format="json",
+                **({"prompt": prompt} if prompt else {}),
+            )
+            return response.text.strip()
+        except Exception as exc:
+            delay = _retry_delay(exc, attempt)
+            if delay is None or attempt == _MAX_RETRIES:
+                logger.error("Error en transcripción con OpenAI: %s", exc)
+                return None
+            logger.warning(
+                "OpenAI respondió %s; reintento %d/%d en %.1f s",
+                exc,
+                attempt + 1,
+                _MAX_RETRIES,
+                delay,
+            )
+            if limiter is not None:
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+    return None
 
-        with open(audio_path, "rb") as raw:
-            file_bytes = raw.read()
 
-        from io import BytesIO  # noqa: PLC0415
-        audio_file = BytesIO(file_bytes)
-        audio_file.name = os.path.basename(audio_path)
+def _ffmpeg_chunk(
+    audio_path: str, start_sec: float, duration_sec: float, target_sample_rate: int
+) -> bytes | None:
+    """El tramo como WAV PCM cortado con ffmpeg, para audios que ``wav_slice`` no lee.
 
-        prompt = transcription_prompt.strip()
-        response = client.audio.transcriptions.create(
-            model=transcribe_model,
-            file=(os.path.basename(audio_path), audio_file, mime),
-            language=language,
-            response_format="json",
-            **({"prompt": prompt} if prompt else {}),
+    ``-ss`` va antes de ``-i``: así ffmpeg salta al tramo en vez de decodificar
+    desde el principio del archivo en cada chunk.
+    """
+    with tempfile.TemporaryDirectory(prefix="vt-openai-chunk-") as temp_dir:
+        chunk_filename = os.path.join(temp_dir, "chunk.wav")
+        try:
+            subprocess.run(
+                [
+                    "ffmpeg",
+                    "-ss", str(start_sec),
+                    "-t", str(duration_sec),
+                    "-i", audio_path,
+                    "-ac", "1",
+                    "-ar", str(target_sample_rate),
+                    "-sample_fmt", "s16",
+                    "-c:a", "pcm_s16le",
+                    "-y", chunk_filename,
+                ],
+                check=True,
+                capture_output=True,
+            )
+        except subprocess.CalledProcessError:
+            return None
+        with open(chunk_filename, "rb") as raw:
+            return raw.read()
+
+
+def _encode_chunk(audio: bytes, codec: str) -> bytes | None:
+    """El chunk WAV comprimido con ``codec`` por ffmpeg, de memoria a memoria.
+
+    El WAV entra por stdin y el resultado sale por stdout: un subproceso
+    corto por chunk, sin archivo temporal. None si ffmpeg falla.
+    """
+    _, _, args = _UPLOAD_CODECS[codec]
+    try:
+        completed = subprocess.run(
+            ["ffmpeg", "-f", "wav", "-i", "pipe:0", *args, "pipe:1"],
+            input=audio,
+            check=True,
+            capture_output=True,
         )
-        return response.text.strip()
-    except Exception as exc:
-        logger.error("Error en transcripción con OpenAI: %s", exc)
-        return ""
+    except (subprocess.CalledProcessError, OSError) as error:
+        logger.warning("No se pudo comprimir el chunk a %s: %s", codec, error)
+        return None
+    return completed.stdout
 
 
 def transcribe_openai(
@@ -64,11 +265,25 @@ def transcribe_openai(
     transcription_prompt: str,
     target_sample_rate: int,
     language: str = "es",
+    cache_dir: str | None = None,
+    concurrency: int = 4,
+    requests_per_minute: float = 50.0,
+    codec: str = "wav",
+    chunk_sec: int = _CHUNK_LENGTH_SEC,
 ) -> list[Transcription]:
-    """Transcribe un archivo largo usando la API de OpenAI dividiendo en chunks de 2 minutos.
+    """Transcribe un archivo largo con la API de OpenAI, dividido en chunks de ``chunk_sec``.
+
+    Cada chunk se corta del WAV ya decodificado directo en memoria
+    (``wav_slice``, sin subproceso ni archivo temporal; ffmpeg solo si el
+    audio no es PCM 16 bits mono a ``target_sample_rate``) y se envía por
+    separado a la API, hasta ``concurrency`` a la vez y sin pasar de
+    ``requests_per_minute``. Con ``codec`` "flac" u "opus" se comprime antes
+    de subirlo; si la compresión falla, ese chunk sube como WAV, partido en
+    tramos más cortos si así no entra en los 25 MB de la API.
 
-    Cada chunk se crea con ffmpeg y se envía por separado a la API.
-    Los archivos temporales se eliminan al finalizar cada chunk.
+    Con ``cache_dir`` cada chunk transcrito se guarda en un ``ChunkStore``
+    apenas vuelve de la API. Si la corrida se corta (cuota, crash, Ctrl+C), la
+    siguiente sobre el mismo audio solo paga los chunks que faltan.
 
     Args:
         audio_path:           Ruta al archivo de audio WAV de entrada.
@@ -77,81 +292,133 @@ def transcribe_openai(
         transcription_prompt: Prompt contextual para mejorar la transcripción.
         target_sample_rate:   Sample rate para los chunks WAV generados.
         language:             Código de idioma (default "es").
+        cache_dir:            Raíz del estado persistente; None desactiva los checkpoints.
+        concurrency:          Chunks subiéndose a la vez.
+        requests_per_minute:  Tope de pedidos a la API, reintentos incluidos.
+        codec:                "wav", "flac" u "opus".
+        chunk_sec:            Segundos de audio por chunk.
 
     Returns:
-        Lista de Transcription con inicio/fin/texto por chunk.
+        Lista de Transcription con inicio/fin/texto por chunk, en el orden del audio.
     """
     from openai import OpenAI  # noqa: PLC0415 — importación tardía
 
-    client = OpenAI(api_key=openai_api_key)
+    # Los reintentos los maneja _transcribe_chunk, con el limitador compartido.
+    client = OpenAI(api_key=openai_api_key, max_retries=0)
     duration = get_audio_duration(audio_path)
     duration_ms = duration * 1000
-    chunk_length_ms = _CHUNK_LENGTH_SEC * 1000
-    transcriptions: list[Transcription] = []
-    total_chunks = max(
-        1,
-        int(duration_ms / chunk_length_ms) + (1 if duration_ms % chunk_length_ms else 0),
-    )
+    chunk_length_ms = chunk_sec * 1000
+    offsets_ms = list(range(0, math.ceil(duration_ms), chunk_length_ms))
+    total_chunks = max(1, len(offsets_ms))
 
-    temp_dir = tempfile.mkdtemp(prefix="vt-openai-chunks-")
+    store: ChunkStore | None = None
+    if cache_dir:
+        store = ChunkStore.for_audio(
+            cache_dir,
+            audio_path,
+            transcribe_model,
+            # Opus es con pérdida y puede cambiar el texto; FLAC es el mismo audio
+            # que el WAV y reusa sus checkpoints.
+            options=f"{language}\n{transcription_prompt.strip()}"
+            + ("\nopus" if codec == "opus" else ""),
+        )
 
-    try:
-        chunk_index = 0
-        offset_ms = 0
-        while offset_ms < duration_ms:
-            chunk_index += 1
-            start_sec = offset_ms / 1000.0
-            duration_sec = min(_CHUNK_LENGTH_SEC, (duration_ms - offset_ms) / 1000.0)
-            chunk_filename = os.path.join(temp_dir, f"chunk_{offset_ms}.wav")
-
-            try:
-                subprocess.run(
-                    [
-                        "ffmpeg",
-                        "-i", audio_path,
-                        "-ss", str(start_sec),
-                        "-t", str(duration_sec),
-                        "-ac", "1",
-                        "-ar", str(target_sample_rate),
-                        "-sample_fmt", "s16",
-                        "-c:a", "pcm_s16le",
-                        "-y", chunk_filename,
-                    ],
-                    check=True,
-                    capture_output=True,
-                )
-            except subprocess.CalledProcessError:
-                logger.error("Error al crear chunk %d/%d", chunk_index, total_chunks)
-                offset_ms += int(chunk_length_ms)
-                continue
-
-            file_size = get_file_size_mb(chunk_filename)
-            print(
-                f"Transcribiendo segmento {chunk_index}/{total_chunks} "
-                f"(Tamaño: {file_size:.2f} MB)"
-            )
+    texts: dict[int, str | None] = {}
+    pending: list[tuple[int, int]] = []
+    for chunk_index, offset_ms in enumerate(offsets_ms, start=1):
+        cached = store.get(offset_ms, int(chunk_length_ms)) if store else None
+        if cached is not None:
+            print(f"Segmento {chunk_index}/{total_chunks} recuperado del checkpoint")
+            texts[offset_ms] = cached.get("text", "")
+        else:
+            pending.append((chunk_index, offset_ms))
 
-            text = _transcribe_chunk(
-                chunk_filename, client, transcribe_model, transcription_prompt, language
-            )
+    limiter = TokenBucket(requests_per_minute / 60, burst=concurrency)
+    # Bytes del WAV y bytes subidos por chunk, para medir lo que ahorra el códec.
+    sizes: list[tuple[int, int]] = []
+
+    def upload_range(
+        chunk_index: int, start_sec: float, duration_sec: float, chunk_codec: str
+    ) -> str | None:
+        audio = wav_slice(audio_path, start_sec, duration_sec, target_sample_rate)
+        if audio is None:
+            audio = _ffmpeg_chunk(audio_path, start_sec, duration_sec, target_sample_rate)
+        if audio is None:
+            logger.error("Error al crear chunk %d/%d", chunk_index, total_chunks)
+            return None
 
-            if text:
-                end_sec = min((offset_ms + chunk_length_ms) / 1000.0, duration)
-                transcriptions.append(
-                    Transcription(
-                        inicio=format_time(start_sec),
-                        fin=format_time(end_sec),
-                        texto=text,
-                    )
+        upload_codec = chunk_codec
+        encoded = _encode_chunk(audio, chunk_codec) if chunk_codec != "wav" else None
+        if encoded is None:
+            upload_codec, encoded = "wav", audio
+            if len(audio) > _MAX_UPLOAD_BYTES:
+                # Sin comprimir no entra en un pedido: se sube en tramos como WAV.
+                parts = len(audio) // _MAX_UPLOAD_BYTES + 1
+                logger.warning(
+                    "Chunk %d/%d sin comprimir pesa %.1f MB: se sube en %d partes",
+                    chunk_index,
+                    total_chunks,
+                    len(audio) / (1024 * 1024),
+                    parts,
                 )
+                step = duration_sec / parts
+                part_texts = [
+                    upload_range(chunk_index, start_sec + i * step, step, "wav")
+                    for i in range(parts)
+                ]
+                if any(text is None for text in part_texts):
+                    return None
+                return " ".join(text for text in part_texts if text)
+        sizes.append((len(audio), len(encoded)))
+
+        print(
+            f"Transcribiendo segmento {chunk_index}/{total_chunks} "
+            f"(Tamaño: {len(encoded) / (1024 * 1024):.2f} MB, {upload_codec})"
+        )
+        return _transcribe_chunk(
+            f"chunk_{round(start_sec * 1000)}{_UPLOAD_CODECS[upload_codec][0]}",
+            encoded,
+            client,
+            transcribe_model,
+            transcription_prompt,
+            language,
+            limiter,
+        )
 
-            if os.path.exists(chunk_filename):
-                os.unlink(chunk_filename)
+    def upload(chunk_index: int, offset_ms: int) -> str | None:
+        start_sec = offset_ms / 1000.0
+        duration_sec = min(chunk_sec, (duration_ms - offset_ms) / 1000.0)
+        text = upload_range(chunk_index, start_sec, duration_sec, codec)
+        if text is not None and store is not None:
+            store.put(offset_ms, int(chunk_length_ms), {"text": text})
+        return text
 
-            time.sleep(0.5)
-            offset_ms += int(chunk_length_ms)
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="vt-openai")
+    try:
+        futures = {offset_ms: pool.submit(upload, index, offset_ms) for index, offset_ms in pending}
+        for offset_ms, future in futures.items():
+            texts[offset_ms] = future.result()
     finally:
-        import shutil  # noqa: PLC0415
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        # Con Ctrl+C no se siguen subiendo los chunks que faltan.
+        pool.shutdown(cancel_futures=True)
+
+    if sizes:
+        wav_bytes = sum(raw for raw, _ in sizes)
+        sent_bytes = sum(sent for _, sent in sizes)
+        print(
+            f"Subidos {sent_bytes / (1024 * 1024):.1f} MB en {len(sizes)} chunks "
+            f"({codec}, {100 * sent_bytes / max(1, wav_bytes):.0f}% del WAV)"
+        )
 
+    transcriptions: list[Transcription] = []
+    for offset_ms in offsets_ms:
+        text = texts.get(offset_ms)
+        if text:
+            transcriptions.append(
+                Transcription(
+                    inicio=format_time(offset_ms / 1000.0),
+                    fin=format_time(min((offset_ms + chunk_length_ms) / 1000.0, duration)),
+                    texto=text,
+                )
+            )
     return transcriptions
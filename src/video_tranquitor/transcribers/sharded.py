@@ -0,0 +1,204 @@
+"""whisper.cpp repartido en varios procesos sobre cortes en silencios.
+
+Un ``whisper-cli`` en CPU no escala más allá de ``MAX_WHISPER_THREADS`` hilos:
+en una máquina de 32 núcleos, una reunión larga deja la mayor parte del
+procesador sin usar. Con ``WHISPER_SHARDS`` el audio se corta en N tramos,
+cada uno en un silencio detectado por ffmpeg (``silencedetect``) cerca del
+punto ideal, y se transcriben en paralelo con un lease del presupuesto de CPU
+(ver resources.py) repartido entre los procesos. Cada tramo se corre a su lugar y el resultado es
+un solo WhisperResult ordenado, con las palabras intactas.
+
+Cortar en silencio evita partir una palabra al medio; aun así el tramo pierde
+el contexto previo del decoder, así que conviene que los tramos sean largos
+(``MIN_SHARD_SEC``). Pensado para builds de CPU: con CUDA cada proceso carga
+su propia copia del modelo en la VRAM.
+
+Cada tramo terminado se guarda en el ChunkStore: si la corrida se corta, la
+siguiente solo transcribe los tramos que faltan.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import subprocess
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from video_tranquitor.audio import slice_wav, wav_duration
+from video_tranquitor.resources import Lease, cpu_lease, get_budget
+from video_tranquitor.transcribers.chunk_store import ChunkStore
+from video_tranquitor.transcribers.chunking import shift_segments
+from video_tranquitor.transcribers.whispercpp import (
+    MAX_WHISPER_THREADS,
+    WHISPER_STAGE,
+    needs_word_timestamps,
+    run_whisper_cli,
+)
+from video_tranquitor.types import PipelineConfig, WhisperResult
+from video_tranquitor.writers.artifact_writer import model_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Menos de esto por tramo no compensa: la carga del modelo en cada proceso y
+# el contexto perdido en cada corte pesan más que el paralelismo ganado.
+MIN_SHARD_SEC = 5 * 60
+# Hilos por proceso cuando WHISPER_SHARDS=0 (automático).
+AUTO_THREADS_PER_SHARD = 4
+# Cuánto puede alejarse un corte de su punto ideal para caer en un silencio,
+# como fracción del largo de un tramo.
+MAX_CUT_DRIFT = 0.15
+SILENCE_NOISE = "-35dB"
+SILENCE_MIN_SEC = 0.4
+
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+
+def shard_count(config: PipelineConfig, duration_sec: float) -> int:
+    """Cantidad de tramos para un audio de ``duration_sec``.
+
+    ``WHISPER_SHARDS=0`` elige según los núcleos; cualquier valor se recorta
+    para que ningún tramo quede por debajo de ``MIN_SHARD_SEC``.
+    """
+    wanted = config.whisper_shards
+    if wanted == 0:
+        wanted = max(1, get_budget(config).total // AUTO_THREADS_PER_SHARD)
+    return max(1, min(wanted, int(duration_sec // MIN_SHARD_SEC)))
+
+
+def detect_silences(wav_path: str) -> list[tuple[float, float]]:
+    """Silencios del audio como (inicio, fin) en segundos, vía ``silencedetect``.
+
+    Si ffmpeg falla devuelve una lista vacía: los cortes caen en el punto ideal.
+    """
+    command = [
+        "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-i", wav_path,
+        "-af", f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_SEC}",
+        "-f", "null",
+        "-",
+    ]
+    try:
+        result = subprocess.run(command, capture_output=True, check=True)
+    except (OSError, subprocess.CalledProcessError) as error:
+        logger.warning("silencedetect falló (%s); se corta sin buscar silencios.", error)
+        return []
+
+    silences: list[tuple[float, float]] = []
+    start: float | None = None
+    for kind, value in _SILENCE_RE.findall(result.stderr.decode("utf-8", errors="replace")):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+
+def plan_cuts(
+    duration_sec: float, shards: int, silences: list[tuple[float, float]]
+) -> list[float]:
+    """Puntos de corte internos (N-1) para ``shards`` tramos.
+
+    Cada corte va al centro del silencio más cercano a su punto ideal, si hay
+    uno a menos de ``MAX_CUT_DRIFT`` del largo de tramo; si no, al punto ideal.
+    """
+    shard_len = duration_sec / shards
+    cuts: list[float] = []
+    for k in range(1, shards):
+        ideal = k * shard_len
+        best = ideal
+        best_distance = MAX_CUT_DRIFT * shard_len
+        for start, end in silences:
+            middle = (start + end) / 2
+            if abs(middle - ideal) <= best_distance:
+                best, best_distance = middle, abs(middle - ideal)
+        previous = cuts[-1] if cuts else 0.0
+        cuts.append(best if best > previous else ideal)
+    return cuts
+
+
+def transcribe_sharded(audio_path: str, config: PipelineConfig) -> WhisperResult | None:
+    """Transcribe ``audio_path`` repartido en tramos paralelos.
+
+    Returns:
+        El resultado unido, o None si el audio es demasiado corto para más de
+        un tramo (el llamador corre un solo whisper-cli).
+    """
+    try:
+        duration = wav_duration(audio_path)
+    except (OSError, wave.Error, EOFError) as error:
+        logger.warning("No se pudo leer %s como WAV para repartirlo: %s", audio_path, error)
+        return None
+
+    shards = shard_count(config, duration)
+    if shards <= 1:
+        return None
+
+    cuts = plan_cuts(duration, shards, detect_silences(audio_path))
+    bounds = list(zip([0.0, *cuts], [*cuts, duration], strict=True))
+    store = ChunkStore.for_audio(
+        config.cache_dir,
+        audio_path,
+        model_fingerprint(config.model_copy(update={"transcriber": "local"})),
+        # Un tramo guardado sin palabras no sirve si después se activa la diarización.
+        options=f"whisper-cli\n{config.language}\nwords={needs_word_timestamps(config)}",
+    )
+
+    with cpu_lease(config, WHISPER_STAGE, cap=shards * MAX_WHISPER_THREADS) as lease:
+        shard_leases = lease.split(shards)
+        print(
+            f"Ejecutando whisper.cpp en {shards} tramos paralelos "
+            f"({shard_leases[0].threads} hilos cada uno, "
+            f"cortes en {', '.join(f'{c:.0f}s' for c in cuts)})..."
+        )
+        parts = _run_shards(audio_path, config, bounds, shard_leases, store)
+
+    return WhisperResult(
+        segments=[seg for part in parts for seg in part.segments],
+        language=parts[0].language,
+    )
+
+
+def _run_shards(
+    audio_path: str,
+    config: PipelineConfig,
+    bounds: list[tuple[float, float]],
+    leases: list[Lease],
+    store: ChunkStore,
+) -> list[WhisperResult]:
+    shards = len(bounds)
+
+    def _one(index: int, start: float, end: float) -> WhisperResult:
+        offset_ms, duration_ms = round(start * 1000), round((end - start) * 1000)
+        cached = store.get(offset_ms, duration_ms)
+        if cached is not None:
+            print(f"  Tramo {index + 1}/{shards}: ya estaba transcrito.")
+            part = WhisperResult.model_validate(cached)
+        else:
+            shard_path = f"{os.path.splitext(audio_path)[0]}.shard{index}.wav"
+            slice_wav(audio_path, start, end, shard_path)
+            shard_start = time.time()
+            try:
+                part = run_whisper_cli(shard_path, config, leases[index], quiet=True)
+            finally:
+                if os.path.exists(shard_path):
+                    os.unlink(shard_path)
+            store.put(offset_ms, duration_ms, part.model_dump())
+            print(
+                f"  Tramo {index + 1}/{shards} listo en {time.time() - shard_start:.0f}s "
+                f"({end - start:.0f}s de audio)"
+            )
+        return WhisperResult(
+            segments=shift_segments(part.segments, start), language=part.language
+        )
+
+    with ThreadPoolExecutor(max_workers=shards) as pool:
+        futures = [pool.submit(_one, i, start, end) for i, (start, end) in enumerate(bounds)]
+        # Si un tramo falla, ``result()`` propaga el error después de que los
+        # demás terminaron y quedaron guardados: el reintento solo repite el que falló.
+        return [future.result() for future in futures]
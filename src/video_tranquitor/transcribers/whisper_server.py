@@ -0,0 +1,320 @@
+"""Backend de whisper.cpp con el modelo residente en un ``whisper-server`` local.
+
+``whisper-cli`` carga el ggml en cada llamada. Con large-v3-turbo son ~1.5 GB
+por archivo, y en el daemon una nota de voz de 20 s pasa más tiempo cargando el
+modelo que transcribiendo. Con ``WHISPER_BACKEND=server`` el modelo se carga una
+vez en un ``whisper-server`` atado a 127.0.0.1 y cada archivo es un POST.
+
+El proceso es nuestro: se levanta la primera vez que hace falta (o en el
+calentamiento del watcher), se verifica con ``/health`` antes de usarlo, se
+reinicia si se cayó y se apaga solo tras ``WHISPER_SERVER_IDLE_SEC`` sin
+pedidos, para devolver la memoria (y la VRAM) cuando no hay trabajo.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from video_tranquitor.state import cache_root
+from video_tranquitor.transcribers.whispercpp import _whisper_threads
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TIMEOUT_SEC = 180
+HEALTH_POLL_SEC = 0.25
+# Misma cota que whisper-cli: un pedido no puede tardar más que el archivo entero.
+REQUEST_TIMEOUT_SEC = 30 * 60
+
+
+def server_binary(config: PipelineConfig) -> str:
+    """``whisper-server`` compilado junto al ``whisper-cli`` configurado."""
+    if config.whisper_server_path:
+        return config.whisper_server_path
+    return os.path.join(os.path.dirname(config.whisper_cpp_path), "whisper-server")
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _multipart(fields: dict[str, str], file_field: str, file_path: str) -> tuple[bytes, str]:
+    """Cuerpo multipart/form-data con ``fields`` y el archivo; devuelve (cuerpo, content-type)."""
+    boundary = f"vt-{uuid.uuid4().hex}"
+    parts: list[bytes] = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+        )
+    with open(file_path, "rb") as f:
+        audio = f.read()
+    parts.append(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+        f'filename="{os.path.basename(file_path)}"\r\nContent-Type: audio/wav\r\n\r\n'.encode()
+        + audio
+        + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def parse_verbose_json(data: dict, language: str) -> WhisperResult:
+    """Convierte la respuesta ``verbose_json`` de whisper-server en WhisperResult.
+
+    Los tiempos ya vienen en segundos. Las palabras salen de ``words`` cuando el
+    server las manda; los tokens especiales (``[_BEG_]``, ``[_TT_…]``) se
+    descartan igual que en la salida JSON de whisper-cli.
+    """
+    segments: list[WhisperSegment] = []
+    for seg in data.get("segments", []):
+        words = [
+            WhisperWord(word=w.get("word", ""), start=float(w["start"]), end=float(w["end"]))
+            for w in seg.get("words", [])
+            if not w.get("word", "").strip().startswith("[_")
+            and w.get("start", -1) >= 0
+            and w.get("end", -1) >= 0
+        ]
+        segments.append(
+            WhisperSegment(
+                text=seg.get("text", "").strip(),
+                start=float(seg["start"]),
+                end=float(seg["end"]),
+                words=words,
+            )
+        )
+    # El server reporta el nombre completo ("spanish"); el resto del pipeline
+    # trabaja con el código que se le pidió.
+    return WhisperResult(segments=segments, language=language)
+
+
+class WhisperServer:
+    """Un ``whisper-server`` propio, con arranque perezoso y apagado por inactividad."""
+
+    def __init__(self, config: PipelineConfig) -> None:
+        self.binary = server_binary(config)
+        self.model_path = config.whisper_model_path
+        self.language = config.language
+        self.threads = _whisper_threads(config)
+        self.idle_sec = config.whisper_server_idle_sec
+        # El server loguea cada pedido por stderr. Un PIPE que nadie lee se
+        # llena a los 64 KB y lo deja colgado, así que va a un archivo.
+        self.log_path = cache_root(config) / "whisper-server.log"
+        self.port = 0
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+        self._idle_timer: threading.Timer | None = None
+        self._busy = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def matches(self, config: PipelineConfig) -> bool:
+        return (
+            self.binary == server_binary(config)
+            and self.model_path == config.whisper_model_path
+            and self.language == config.language
+        )
+
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def ensure_started(self) -> None:
+        """Deja el server listo para recibir pedidos, levantándolo si hace falta."""
+        with self._lock:
+            if self.running():
+                return
+            if self._process is not None:
+                logger.warning(
+                    "whisper-server terminó (código %s); se vuelve a levantar.",
+                    self._process.returncode,
+                )
+            self._start()
+
+    def _start(self) -> None:
+        if not os.path.exists(self.binary):
+            raise FileNotFoundError(
+                f"E_WHISPER_NOT_FOUND: whisper-server no encontrado en: {self.binary}. "
+                "Se compila junto a whisper-cli; configurá WHISPER_SERVER_PATH o usá "
+                "WHISPER_BACKEND=cli."
+            )
+        self.port = _free_port()
+        args = [
+            self.binary,
+            "-m", self.model_path,
+            "-l", self.language,
+            "-t", str(self.threads),
+            "--host", "127.0.0.1",
+            "--port", str(self.port),
+        ]
+        print("Levantando whisper-server (el modelo queda cargado)...")
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        start = time.time()
+        with open(self.log_path, "ab") as log:
+            self._process = subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT)
+        while time.time() - start < STARTUP_TIMEOUT_SEC:
+            if self._process.poll() is not None:
+                returncode = self._process.returncode
+                self._process = None
+                raise RuntimeError(
+                    f"whisper-server no arrancó (código {returncode}): {self._log_tail()}"
+                )
+            if self._healthy():
+                print(f"  whisper-server listo en {time.time() - start:.1f}s ({self.url})")
+                return
+            time.sleep(HEALTH_POLL_SEC)
+        self._kill()
+        raise RuntimeError(f"whisper-server no respondió en {STARTUP_TIMEOUT_SEC}s.")
+
+    def _log_tail(self) -> str:
+        try:
+            return self.log_path.read_text(encoding="utf-8", errors="replace")[-800:]
+        except OSError:
+            return "(sin log)"
+
+    def _healthy(self) -> bool:
+        """True cuando el server terminó de cargar el modelo.
+
+        Mientras carga, ``/health`` responde 503. Builds viejos no tienen
+        ``/health``: un 404 alcanza para saber que el HTTP ya atiende, y en esos
+        builds el modelo se carga antes de abrir el puerto.
+        """
+        try:
+            with urllib.request.urlopen(f"{self.url}/health", timeout=2) as response:
+                return response.status == 200
+        except urllib.error.HTTPError as error:
+            return error.code == 404
+        except OSError:
+            return False
+
+    def transcribe(self, audio_path: str) -> WhisperResult:
+        """Transcribe ``audio_path``. Si el server se cayó, lo levanta y reintenta una vez."""
+        self._cancel_idle_timer()
+        with self._lock:
+            self._busy += 1
+        try:
+            self.ensure_started()
+            try:
+                return parse_verbose_json(self._post(audio_path), self.language)
+            except (ConnectionError, urllib.error.URLError) as error:
+                if not self._exited():
+                    raise RuntimeError(f"whisper-server falló: {error}") from error
+                logger.warning("whisper-server se cayó durante el pedido; reintentando.")
+            self.ensure_started()
+            return parse_verbose_json(self._post(audio_path), self.language)
+        finally:
+            with self._lock:
+                self._busy -= 1
+                if not self._busy:
+                    self._schedule_idle_stop()
+
+    def _exited(self, grace_sec: float = 2.0) -> bool:
+        """Si el proceso murió. Espera un poco: tras un corte de conexión el
+        kernel puede tardar en reportar la salida del proceso."""
+        process = self._process
+        if process is None:
+            return True
+        try:
+            process.wait(timeout=grace_sec)
+        except subprocess.TimeoutExpired:
+            return False
+        return True
+
+    def _post(self, audio_path: str) -> dict:
+        body, content_type = _multipart(
+            {"response_format": "verbose_json", "temperature": "0.0"}, "file", audio_path
+        )
+        request = urllib.request.Request(
+            f"{self.url}/inference",
+            data=body,
+            headers={"Content-Type": content_type},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_SEC) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            detail = error.read().decode("utf-8", errors="replace")[:800]
+            raise RuntimeError(f"whisper-server respondió {error.code}: {detail}") from error
+
+    def _schedule_idle_stop(self) -> None:
+        if self.idle_sec <= 0:
+            return
+        self._idle_timer = threading.Timer(self.idle_sec, self._stop_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self) -> None:
+        timer, self._idle_timer = self._idle_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _stop_if_idle(self) -> None:
+        with self._lock:
+            if self._busy or not self.running():
+                return
+            logger.info("whisper-server inactivo %ss; se apaga.", self.idle_sec)
+            self._kill()
+
+    def stop(self) -> None:
+        self._cancel_idle_timer()
+        with self._lock:
+            self._kill()
+
+    def _kill(self) -> None:
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._process = None
+
+
+_server: WhisperServer | None = None
+_server_lock = threading.Lock()
+
+
+def get_server(config: PipelineConfig) -> WhisperServer:
+    """El server del proceso para ``config``. Cambiar de modelo reemplaza al anterior."""
+    global _server
+    with _server_lock:
+        if _server is not None and not _server.matches(config):
+            _server.stop()
+            _server = None
+        if _server is None:
+            _server = WhisperServer(config)
+        return _server
+
+
+def transcribe_server(audio_path: str, config: PipelineConfig) -> WhisperResult:
+    """Equivalente a ``transcribe_local`` usando el server residente."""
+    print("Transcribiendo con whisper-server...")
+    return get_server(config).transcribe(audio_path)
+
+
+def shutdown_server() -> None:
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.stop()
+            _server = None
+
+
+atexit.register(shutdown_server)
@@ -0,0 +1,302 @@
+"""Watchdog de loops y cuelgues para una corrida de ``whisper-cli``.
+
+whisper.cpp a veces entra en un loop de alucinación (el mismo segmento una y
+otra vez, o una frase repetida dentro de uno) o se queda trabado en un tramo
+malo. Sin vigilancia eso se descubre recién al agotar ``WHISPER_TIMEOUT_SEC``:
+media hora perdida y el archivo sin transcribir.
+
+Acá se lee la corrida en streaming (``WhisperCliStream``) y se mira cada
+segmento que sale:
+
+- loop: los últimos segmentos repiten el mismo texto, o uno repite pegado un
+  n-grama (``find_loop``);
+- cuelgue: pasan ``WHISPER_STALL_SEC`` sin segmentos ni progreso. whisper-cli
+  informa el progreso cada 5 %, así que en un audio largo o una CPU lenta el
+  umbral crece con lo que tarda ese 5 % según el RTF medido (``stall_sec``).
+
+Ante cualquiera de los dos se mata el proceso, se conserva lo bueno hasta
+ahí y se re-transcribe solo la ventana siguiente (``RETRY_WINDOW_SEC``) con
+otra decodificación: sin el contexto de los segmentos previos, que es lo que
+alimenta el loop, y con temperatura. Después se sigue en streaming desde el
+final de la ventana. Una falla cuesta unos segundos, no la corrida entera.
+
+Los segmentos conservados de una corrida cortada vienen de stdout, sin
+tokens. Si la diarización necesita palabras, se reparten a lo largo del
+segmento (``estimated_words``): alcanza para asignar el hablante.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import wave
+from collections.abc import Callable
+
+from video_tranquitor.audio import slice_wav, wav_duration
+from video_tranquitor.planner import load_calibration, rtf_for, transcribe_stage_key
+from video_tranquitor.transcribers.chunking import shift_segments
+from video_tranquitor.transcribers.whispercpp import (
+    WhisperCliStream,
+    WhisperStalled,
+    needs_word_timestamps,
+    run_whisper_cli,
+)
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+
+logger = logging.getLogger(__name__)
+
+# Segmentos recientes donde se buscan repeticiones. Es también lo que se
+# retiene antes de pasarlos a ``on_segment``: un loop detectado puede haber
+# empezado unos segmentos atrás y esos no tienen que llegar al TOON parcial.
+LOOP_WINDOW_SEGMENTS = 8
+# El mismo texto en segmentos seguidos: con 3 o más palabras, 3 veces ya es
+# loop; los segmentos cortos ("Sí.", "Gracias.") necesitan más, porque en una
+# charla se repiten de verdad.
+LOOP_REPEATS = 3
+LOOP_SHORT_REPEATS = 5
+LOOP_SHORT_WORDS = 3
+# Un n-grama (hasta MAX_NGRAM palabras) repetido pegado dentro de un segmento,
+# al menos NGRAM_REPEATS veces y cubriendo NGRAM_MIN_WORDS palabras.
+MAX_NGRAM = 4
+NGRAM_REPEATS = 4
+NGRAM_MIN_WORDS = 12
+
+# Ventana que se re-transcribe después de un loop o un cuelgue.
+RETRY_WINDOW_SEC = 60.0
+# Tope para la corrida de una ventana, en vez de los 30 minutos de una entera.
+RETRY_TIMEOUT_SEC = 5 * 60
+# Sin el contexto previo (-mc 0), que es lo que arrastra el loop, y con algo
+# de temperatura para que el decoder no vuelva al mismo camino.
+RETRY_ARGS = ["--max-context", "0", "--temperature", "0.4"]
+# Más recuperaciones que esto en un archivo ya no es un tramo malo.
+MAX_RECOVERIES = 5
+# whisper-cli imprime el progreso cada 5 %; un cuelgue es no ver avance en lo
+# que deberían tardar STALL_PROGRESS_STEPS de esos pasos.
+PROGRESS_STEP = 0.05
+STALL_PROGRESS_STEPS = 3
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _repeats_ngram(words: list[str]) -> bool:
+    """Si ``words`` tiene un n-grama repetido pegado lo suficiente para ser loop."""
+    for n in range(1, MAX_NGRAM + 1):
+        needed = max(NGRAM_REPEATS, -(-NGRAM_MIN_WORDS // n))
+        for i in range(len(words) - n * needed + 1):
+            gram = words[i : i + n]
+            repeats, j = 1, i + n
+            while words[j : j + n] == gram:
+                repeats, j = repeats + 1, j + n
+            if repeats >= needed:
+                return True
+    return False
+
+
+def find_loop(segments: list[WhisperSegment]) -> int | None:
+    """Índice del primer segmento del loop entre los recientes, o None.
+
+    Del texto repetido en segmentos seguidos se conserva la primera aparición:
+    puede ser lo que de verdad se dijo. Un segmento con un n-grama repetido se
+    descarta entero.
+    """
+    start = max(0, len(segments) - LOOP_WINDOW_SEGMENTS)
+    recent = [_words(seg.text) for seg in segments[start:]]
+
+    run = 1
+    for i in range(1, len(recent)):
+        run = run + 1 if recent[i] and recent[i] == recent[i - 1] else 1
+        needed = LOOP_REPEATS if len(recent[i]) >= LOOP_SHORT_WORDS else LOOP_SHORT_REPEATS
+        if run >= needed:
+            return start + i - run + 2
+
+    for i, words in enumerate(recent):
+        if _repeats_ngram(words):
+            return start + i
+    return None
+
+
+def stall_sec(config: PipelineConfig, audio_sec: float) -> float:
+    """Segundos sin avance para dar por colgada una corrida sobre ``audio_sec``.
+
+    Nunca menos que ``WHISPER_STALL_SEC``; en audios largos, lo que tardarían
+    ``STALL_PROGRESS_STEPS`` pasos de progreso con el RTF de este host.
+    """
+    rtf, _ = rtf_for(transcribe_stage_key(config), load_calibration(config))
+    return max(config.whisper_stall_sec, STALL_PROGRESS_STEPS * PROGRESS_STEP * audio_sec * rtf)
+
+
+def estimated_words(segment: WhisperSegment) -> list[WhisperWord]:
+    """Palabras del segmento con tiempos repartidos según el largo de cada una."""
+    tokens = segment.text.split()
+    total = sum(len(token) for token in tokens) or 1
+    span = segment.end - segment.start
+    words: list[WhisperWord] = []
+    at = segment.start
+    for token in tokens:
+        end = at + span * len(token) / total
+        words.append(WhisperWord(word=f" {token}", start=at, end=end))
+        at = end
+    return words
+
+
+async def transcribe_watched(
+    audio_path: str,
+    config: PipelineConfig,
+    on_segment: Callable[[WhisperSegment], None] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> WhisperResult:
+    """Transcribe ``audio_path`` con ``whisper-cli`` bajo el watchdog.
+
+    Args:
+        audio_path:  WAV a transcribir.
+        config:      Configuración del pipeline.
+        on_segment:  Se llama con cada segmento confirmado, ya en su tiempo
+                     absoluto y en orden (el streaming del pipeline).
+        on_progress: Porcentaje sobre el audio completo.
+
+    Raises:
+        FileNotFoundError: Si el binario de whisper.cpp no existe (E_WHISPER_NOT_FOUND).
+        RuntimeError:      Si whisper.cpp falla, o si el archivo necesitó más de
+                           ``MAX_RECOVERIES`` recuperaciones.
+    """
+    watch = config.whisper_watchdog
+    words_needed = needs_word_timestamps(config)
+    base = os.path.splitext(audio_path)[0]
+    done: list[WhisperSegment] = []
+    language = config.language
+    source, offset = audio_path, 0.0
+    total: float | None = None
+    recoveries = 0
+
+    def _confirm(segments: list[WhisperSegment]) -> None:
+        done.extend(segments)
+        if on_segment is not None:
+            for segment in segments:
+                on_segment(segment)
+
+    def _progress(percent: int) -> None:
+        if on_progress is None:
+            return
+        if total is None:
+            on_progress(percent)
+        else:
+            on_progress(int((offset + (total - offset) * percent / 100) / total * 100))
+
+    try:
+        while True:
+            run_stall = 0.0
+            if watch:
+                try:
+                    run_stall = stall_sec(config, wav_duration(source))
+                except (OSError, wave.Error, EOFError):
+                    run_stall = config.whisper_stall_sec
+            stream = WhisperCliStream(source, config, on_progress=_progress, stall_sec=run_stall)
+            run = stream.__aiter__()
+            run_start = len(done)
+            seen: list[WhisperSegment] = []
+            confirmed = 0
+            bad_at: int | None = None
+            try:
+                async for segment in run:
+                    seen.append(segment)
+                    if watch:
+                        bad_at = find_loop(seen)
+                        if bad_at is not None:
+                            logger.warning(
+                                "whisper.cpp entró en loop cerca de %.0fs: %r",
+                                offset + segment.start,
+                                segment.text[:80],
+                            )
+                            break
+                    while len(seen) - confirmed > LOOP_WINDOW_SEGMENTS:
+                        _confirm(shift_segments([seen[confirmed]], offset))
+                        confirmed += 1
+            except WhisperStalled as error:
+                logger.warning("%s", error)
+                bad_at = len(seen)
+            finally:
+                await run.aclose()
+
+            if bad_at is None:
+                assert stream.result is not None
+                language = stream.result.language
+                # El JSON final trae las palabras: reemplaza a lo que salió por
+                # stdout, pero los confirmados ya se informaron a on_segment.
+                done[run_start:] = shift_segments(stream.result.segments, offset)
+                if on_segment is not None:
+                    for segment in shift_segments(seen[confirmed:], offset):
+                        on_segment(segment)
+                return WhisperResult(segments=done, language=language)
+
+            recoveries += 1
+            if recoveries > MAX_RECOVERIES:
+                raise RuntimeError(
+                    f"whisper.cpp se trabó o entró en loop {recoveries} veces en: "
+                    f"{audio_path}. Probá con otro modelo o revisá el audio."
+                )
+            if total is None:
+                try:
+                    total = wav_duration(audio_path)
+                except (OSError, wave.Error, EOFError) as exc:
+                    raise RuntimeError(
+                        f"No se pudo leer {audio_path} como WAV para recuperar el tramo: {exc}"
+                    ) from exc
+
+            _confirm(shift_segments(seen[confirmed:bad_at], offset))
+            if words_needed:
+                done[run_start:] = [
+                    seg.model_copy(update={"words": estimated_words(seg)})
+                    for seg in done[run_start:]
+                ]
+
+            resume = max(offset, done[-1].end) if done else offset
+            window_end = min(total, resume + RETRY_WINDOW_SEC)
+            print(
+                f"  whisper.cpp: recuperando {resume:.0f}s–{window_end:.0f}s "
+                f"({recoveries}/{MAX_RECOVERIES})..."
+            )
+            _confirm(await _retry_window(audio_path, config, resume, window_end, base))
+
+            if window_end >= total:
+                return WhisperResult(segments=done, language=language)
+            rest = f"{base}.rest.wav"
+            slice_wav(audio_path, window_end, total, rest)
+            source, offset = rest, window_end
+    finally:
+        for leftover in (f"{base}.rest.wav", f"{base}.retry.wav"):
+            if os.path.exists(leftover):
+                os.unlink(leftover)
+
+
+async def _retry_window(
+    audio_path: str, config: PipelineConfig, start: float, end: float, base: str
+) -> list[WhisperSegment]:
+    """Segmentos de [start, end) re-transcritos con ``RETRY_ARGS``, en tiempo absoluto."""
+    window = f"{base}.retry.wav"
+    slice_wav(audio_path, start, end, window)
+    try:
+        result = await asyncio.to_thread(
+            run_whisper_cli, window, config, None, True, RETRY_ARGS, RETRY_TIMEOUT_SEC
+        )
+    finally:
+        if os.path.exists(window):
+            os.unlink(window)
+
+    segments = [seg for seg in result.segments if seg.text]
+    for count in range(1, len(segments) + 1):
+        bad_at = find_loop(segments[:count])
+        if bad_at is not None:
+            # Si con otra decodificación igual repite, es un tramo sin habla
+            # (música, ruido): se descarta la repetición y se sigue.
+            logger.warning(
+                "La ventana %.0fs–%.0fs repite igual; se descarta el loop.", start, end
+            )
+            segments = segments[:bad_at]
+            break
+    return shift_segments(segments, start)
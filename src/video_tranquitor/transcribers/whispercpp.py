@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
+import re
 import subprocess
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import TextIO
 
+from video_tranquitor.resources import Lease, cpu_lease, get_budget
 from video_tranquitor.transcribers.chunking import result_to_transcriptions
 from video_tranquitor.types import (
     PipelineConfig,
@@ -21,19 +27,30 @@ logger = logging.getLogger(__name__)
 WHISPER_TIMEOUT_SEC = 30 * 60  # 30 minutos
 CHUNK_DURATION_SEC = 120  # 2 minutos
 
-# Techo para no dejar la máquina sin aire cuando el ensemble corre en paralelo.
+# Lectura del JSON de salida por bloques (ver _iter_json_array).
+JSON_READ_BLOCK = 64 * 1024
+_LANGUAGE_RE = re.compile(r'"result"\s*:\s*\{[^}]*?"language"\s*:\s*"([^"]*)"')
+
+# whisper.cpp en CPU deja de escalar pasando estos hilos; lo que sobre del
+# presupuesto queda para las otras etapas (ver resources.py).
 MAX_WHISPER_THREADS = 8
+# Nombre de la etapa en el presupuesto de CPU.
+WHISPER_STAGE = "whisper.cpp"
+
+
+class WhisperStalled(RuntimeError):
+    """whisper-cli dejó de emitir segmentos y progreso (ver ``WHISPER_STALL_SEC``)."""
 
 
-def _whisper_threads() -> int:
-    """Cantidad de hilos para whisper-cli, derivada del hardware.
+def _whisper_threads(config: PipelineConfig) -> int:
+    """Hilos para un whisper.cpp residente (server, bindings).
 
-    El binario usa 4 por defecto, un número que no tiene nada que ver con la
-    máquina donde corre. Con GGML_CUDA=ON el trabajo pesado va a la GPU, así
-    que subirlo ayuda poco y competir por todos los núcleos perjudica al leg
-    de WhisperX cuando el ensemble corre los dos en paralelo.
+    Esos procesos viven entre archivos y no pueden devolver hilos al
+    presupuesto, así que se quedan con la mitad: la otra mitad es para lo que
+    corra al lado (WhisperX en el ensemble, ffmpeg del archivo siguiente).
+    Un ``whisper-cli`` por archivo, en cambio, pide un lease en cada corrida.
     """
-    return max(4, min(MAX_WHISPER_THREADS, (os.cpu_count() or 4) // 2))
+    return max(1, min(MAX_WHISPER_THREADS, get_budget(config).total // 2))
 
 
 def _parse_whisper_timestamp(ts: str) -> float:
@@ -45,51 +62,166 @@ def _parse_whisper_timestamp(ts: str) -> float:
     return h * 3600 + m * 60 + s + ms / 1000.0
 
 
-def _parse_whisper_json(json_path: str) -> WhisperResult:
-    """Convierte la salida JSON de whisper.cpp en WhisperResult."""
-    with open(json_path, encoding="utf-8") as f:
-        data = json.load(f)
+def needs_word_timestamps(config: PipelineConfig) -> bool:
+    """Si algo aguas abajo va a usar las palabras con tiempos.
 
-    segments: list[WhisperSegment] = []
-    for seg in data.get("transcription", []):
-        start = seg["offsets"]["from"] / 1000.0
-        end = seg["offsets"]["to"] / 1000.0
-
-        words: list[WhisperWord] = []
-        for tok in seg.get("tokens", []):
-            offsets = tok.get("offsets")
-            if offsets and offsets.get("from", -1) >= 0 and offsets.get("to", -1) >= 0:
-                words.append(
-                    WhisperWord(
-                        word=tok.get("text", ""),
-                        start=offsets["from"] / 1000.0,
-                        end=offsets["to"] / 1000.0,
-                    )
-                )
+    Hoy solo la diarización: el aligner reparte los hablantes palabra por
+    palabra. El chunker, el TOON, la nota y el análisis trabajan con segmentos.
+    """
+    return config.enable_diarization
+
+
+def _segment_from_json(seg: dict) -> WhisperSegment:
+    """Un elemento de ``transcription`` del JSON de whisper.cpp, ya como modelo.
 
-        segments.append(
-            WhisperSegment(
-                text=seg.get("text", "").strip(),
-                start=start,
-                end=end,
-                words=words,
+    De cada token se queda solo con texto y offsets; probabilidades, ids y
+    demás campos de ``--output-json-full`` se descartan acá mismo.
+    """
+    words: list[WhisperWord] = []
+    for tok in seg.get("tokens", []):
+        offsets = tok.get("offsets")
+        if offsets and offsets.get("from", -1) >= 0 and offsets.get("to", -1) >= 0:
+            words.append(
+                WhisperWord(
+                    word=tok.get("text", ""),
+                    start=offsets["from"] / 1000.0,
+                    end=offsets["to"] / 1000.0,
+                )
             )
-        )
 
-    language = data.get("result", {}).get("language", "es")
+    return WhisperSegment(
+        text=seg.get("text", "").strip(),
+        start=seg["offsets"]["from"] / 1000.0,
+        end=seg["offsets"]["to"] / 1000.0,
+        words=words,
+    )
+
+
+def _iter_json_array(f: TextIO, key: str) -> Iterator[dict | str]:
+    """Recorre el array ``key`` de un objeto JSON sin cargar el archivo entero.
+
+    Lo primero que entrega es el texto previo al array (en whisper.cpp,
+    ``systeminfo``, ``model``, ``params`` y ``result``: unos pocos KB); después,
+    cada elemento ya decodificado. En memoria solo hay un bloque de lectura y
+    el elemento en curso, no el archivo ni el árbol de dicts completo.
+    """
+    decoder = json.JSONDecoder()
+    marker = f'"{key}"'
+    buf = ""
+    while True:
+        at = buf.find(marker)
+        bracket = buf.find("[", at) if at >= 0 else -1
+        if bracket >= 0:
+            yield buf[:at]
+            buf = buf[bracket + 1 :]
+            break
+        block = f.read(JSON_READ_BLOCK)
+        if not block:
+            yield buf
+            return
+        buf += block
+
+    eof = False
+    while True:
+        buf = buf.lstrip(" \t\r\n,")
+        if buf.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buf)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            block = f.read(JSON_READ_BLOCK)
+            eof = not block
+            buf += block
+            continue
+        yield item
+        buf = buf[end:]
+
+
+def _parse_whisper_json(json_path: str) -> WhisperResult:
+    """Convierte la salida JSON de whisper.cpp en WhisperResult, de a un segmento.
+
+    Con ``--output-json-full`` una reunión de varias horas son cientos de MB
+    de tokens con probabilidades; ``json.load`` los tenía todos a la vez como
+    dicts antes de pasarlos a pydantic. Ahora cada segmento se decodifica,
+    se reduce a lo que usa WhisperWord y se suelta antes de leer el siguiente.
+    """
+    segments: list[WhisperSegment] = []
+    language = "es"
+    with open(json_path, encoding="utf-8") as f:
+        items = _iter_json_array(f, "transcription")
+        header = next(items)
+        assert isinstance(header, str)
+        match = _LANGUAGE_RE.search(header)
+        if match:
+            language = match.group(1)
+        for seg in items:
+            assert isinstance(seg, dict)
+            segments.append(_segment_from_json(seg))
+
     return WhisperResult(segments=segments, language=language)
 
 
 def transcribe_local(audio_path: str, config: PipelineConfig) -> WhisperResult:
     """Transcribe un archivo de audio usando el binario local whisper.cpp.
 
-    Invoca ``whisper-cli`` con ``--output-json-full`` y parsea el JSON resultante.
-    El archivo JSON se elimina al finalizar.
+    Invoca ``whisper-cli`` con salida JSON (completa solo si hacen falta las
+    palabras, ver ``needs_word_timestamps``) y parsea el resultado.
+    El archivo JSON se elimina al finalizar. Con ``WHISPER_BACKEND=server`` el
+    audio va al ``whisper-server`` residente (ver whisper_server.py), con
+    ``WHISPER_BACKEND=bindings`` se transcribe dentro del proceso (ver
+    whispercpp_bindings.py), y con
+    ``WHISPER_SHARDS`` distinto de 1 un audio largo se reparte entre varios
+    procesos (ver sharded.py). Con ``WHISPER_WATCHDOG=true`` un solo
+    ``whisper-cli`` corre bajo el watchdog de loops y cuelgues (ver
+    whisper_watchdog.py).
 
     Raises:
         FileNotFoundError: Si el binario de whisper.cpp no existe (E_WHISPER_NOT_FOUND).
         RuntimeError:      Si whisper.cpp supera el tiempo límite o falla.
     """
+    if config.whisper_backend == "server":
+        # Import tardío: whisper_server usa los helpers de este módulo.
+        from video_tranquitor.transcribers.whisper_server import (  # noqa: PLC0415
+            transcribe_server,
+        )
+
+        return transcribe_server(audio_path, config)
+
+    if config.whisper_backend == "bindings":
+        from video_tranquitor.transcribers.whispercpp_bindings import (  # noqa: PLC0415
+            transcribe_bindings,
+        )
+
+        return transcribe_bindings(audio_path, config)
+
+    if config.whisper_shards != 1:
+        # Import tardío: sharded usa run_whisper_cli de este módulo.
+        from video_tranquitor.transcribers.sharded import transcribe_sharded  # noqa: PLC0415
+
+        sharded = transcribe_sharded(audio_path, config)
+        if sharded is not None:
+            return sharded
+
+    if config.whisper_watchdog:
+        # Import tardío: el watchdog usa WhisperCliStream y run_whisper_cli.
+        from video_tranquitor.transcribers.whisper_watchdog import (  # noqa: PLC0415
+            transcribe_watched,
+        )
+
+        return asyncio.run(transcribe_watched(audio_path, config))
+
+    return run_whisper_cli(audio_path, config)
+
+
+def _cli_args(audio_path: str, config: PipelineConfig, lease: Lease) -> tuple[list[str], str]:
+    """Argumentos de ``whisper-cli`` con los hilos (y núcleos) de ``lease``, y
+    ruta del JSON que va a dejar.
+
+    Raises:
+        FileNotFoundError: Si el binario de whisper.cpp no existe (E_WHISPER_NOT_FOUND).
+    """
     binary_path = config.whisper_cpp_path
 
     if not os.path.exists(binary_path):
@@ -98,33 +230,65 @@ def transcribe_local(audio_path: str, config: PipelineConfig) -> WhisperResult:
             "Compilá whisper.cpp con soporte CUDA y configurá WHISPER_CPP_PATH en tu .env"
         )
 
-    # whisper-cli escribe <audio_path>.json cuando se usa --output-json-full
-    output_base = audio_path
-    json_output_path = f"{audio_path}.json"
-
+    # whisper-cli escribe <audio_path>.json con --output-json / --output-json-full.
+    # La versión completa agrega cada token con probabilidades: solo se pide
+    # cuando alguien va a usar las palabras.
+    output_flag = "--output-json-full" if needs_word_timestamps(config) else "--output-json"
     args = [
         binary_path,
         "-m", config.whisper_model_path,
         "-f", audio_path,
         "-l", config.language,
-        "--threads", str(_whisper_threads()),
-        "--output-json-full",
-        "--output-file", output_base,
+        "--threads", str(lease.threads),
+        output_flag,
+        "--output-file", audio_path,
         "--no-prints",
     ]
+    return lease.wrap_command(args), f"{audio_path}.json"
+
+
+def run_whisper_cli(
+    audio_path: str,
+    config: PipelineConfig,
+    lease: Lease | None = None,
+    quiet: bool = False,
+    extra_args: list[str] | None = None,
+    timeout_sec: float = WHISPER_TIMEOUT_SEC,
+) -> WhisperResult:
+    """Una corrida de ``whisper-cli`` sobre ``audio_path``.
+
+    Sin ``lease`` pide uno al presupuesto de CPU para toda la corrida; los
+    shards pasan cada uno su parte del lease que pidieron juntos.
+    ``extra_args`` se agrega al final (el watchdog cambia la decodificación
+    al reintentar una ventana).
+
+    Raises:
+        FileNotFoundError: Si el binario de whisper.cpp no existe (E_WHISPER_NOT_FOUND).
+        RuntimeError:      Si whisper.cpp supera el tiempo límite o falla.
+    """
+    if lease is None:
+        with cpu_lease(config, WHISPER_STAGE, cap=MAX_WHISPER_THREADS) as own:
+            return run_whisper_cli(
+                audio_path, config, own, quiet, extra_args, timeout_sec
+            )
 
-    print("Ejecutando whisper.cpp (GPU/CUDA)...")
+    args, json_output_path = _cli_args(audio_path, config, lease)
+    args += extra_args or []
+
+    if not quiet:
+        print("Ejecutando whisper.cpp (GPU/CUDA)...")
 
     try:
         subprocess.run(
             args,
-            timeout=WHISPER_TIMEOUT_SEC,
+            timeout=timeout_sec,
             check=True,
             capture_output=True,
         )
     except subprocess.TimeoutExpired as exc:
         raise RuntimeError(
-            f"whisper.cpp superó el tiempo límite de 30 minutos para: {audio_path}"
+            f"whisper.cpp superó el tiempo límite de {timeout_sec / 60:.0f} minutos "
+            f"para: {audio_path}"
         ) from exc
     except subprocess.CalledProcessError as exc:
         stderr = exc.stderr.decode("utf-8", errors="replace") if exc.stderr else "(sin salida)"
@@ -144,6 +308,173 @@ def transcribe_local(audio_path: str, config: PipelineConfig) -> WhisperResult:
             os.unlink(json_output_path)
 
 
+# Línea de segmento que whisper-cli imprime en stdout apenas lo decodifica:
+#   [00:01:02.340 --> 00:01:05.120]   texto del segmento
+_SEGMENT_LINE_RE = re.compile(
+    r"^\[(\d+):(\d{2}):(\d{2})\.(\d{3}) --> (\d+):(\d{2}):(\d{2})\.(\d{3})\]\s?(.*)$"
+)
+# Progreso que imprime por stderr con --print-progress.
+_PROGRESS_RE = re.compile(r"progress\s*=\s*(\d+)%")
+
+
+def parse_segment_line(line: str) -> WhisperSegment | None:
+    """Parsea una línea de segmento de stdout; None si la línea es otra cosa."""
+    match = _SEGMENT_LINE_RE.match(line.rstrip("\n"))
+    if not match:
+        return None
+    g = match.groups()
+    start = int(g[0]) * 3600 + int(g[1]) * 60 + int(g[2]) + int(g[3]) / 1000.0
+    end = int(g[4]) * 3600 + int(g[5]) * 60 + int(g[6]) + int(g[7]) / 1000.0
+    return WhisperSegment(text=g[8].strip(), start=start, end=end)
+
+
+class WhisperCliStream:
+    """Corre ``whisper-cli`` y entrega los segmentos a medida que los decodifica.
+
+    ``transcribe_local`` espera a que el proceso termine para leer el JSON, así
+    que nada aguas abajo puede arrancar antes. Acá se leen las líneas que
+    whisper-cli imprime en stdout por cada segmento nuevo::
+
+        stream = WhisperCliStream(audio_path, config)
+        async for segment in stream:
+            ...                       # progreso, chunker, TOON parcial
+        result = stream.result        # del JSON final, con las palabras
+
+    Los segmentos de stdout no traen tokens. Al terminar el proceso se parsea
+    el JSON de salida y ``result`` queda con la versión definitiva, con las
+    palabras si la diarización las necesita.
+
+    Args:
+        audio_path:  WAV a transcribir.
+        config:      Configuración del pipeline.
+        on_progress: Se llama con el porcentaje que reporta whisper.cpp.
+        stall_sec:   Si pasan estos segundos sin un segmento ni una línea de
+                     progreso, se mata el proceso y se lanza ``WhisperStalled``.
+                     0 = sin límite más que ``timeout_sec``.
+        timeout_sec: Tope para la corrida entera (``WHISPER_TIMEOUT_SEC``).
+    """
+
+    def __init__(
+        self,
+        audio_path: str,
+        config: PipelineConfig,
+        on_progress: Callable[[int], None] | None = None,
+        stall_sec: float = 0.0,
+        timeout_sec: float | None = None,
+    ) -> None:
+        self.audio_path = audio_path
+        self.config = config
+        self.on_progress = on_progress
+        self.stall_sec = stall_sec
+        # None se resuelve al arrancar: los tests achican WHISPER_TIMEOUT_SEC.
+        self.timeout_sec = timeout_sec
+        self.result: WhisperResult | None = None
+        self._last_activity = 0.0
+
+    def __aiter__(self) -> AsyncIterator[WhisperSegment]:
+        return self._run()
+
+    async def _run(self) -> AsyncIterator[WhisperSegment]:
+        with cpu_lease(self.config, WHISPER_STAGE, cap=MAX_WHISPER_THREADS) as lease:
+            decoder = self._decode(lease)
+            try:
+                async for segment in decoder:
+                    yield segment
+            finally:
+                # Si el consumidor corta antes (el watchdog), el proceso se
+                # mata acá y no cuando el recolector pase por el generador.
+                await decoder.aclose()
+
+    async def _decode(self, lease: Lease) -> AsyncIterator[WhisperSegment]:
+        args, json_output_path = _cli_args(self.audio_path, self.config, lease)
+        args.append("--print-progress")
+        loop = asyncio.get_running_loop()
+        if self.timeout_sec is None:
+            self.timeout_sec = WHISPER_TIMEOUT_SEC
+        deadline = loop.time() + self.timeout_sec
+        self._last_activity = loop.time()
+
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        assert process.stdout is not None and process.stderr is not None
+        stderr_tail: deque[str] = deque(maxlen=40)
+        # stderr se drena en paralelo: con el progreso activado escribe bastante
+        # y, si nadie lo lee, el pipe se llena y whisper-cli se bloquea.
+        stderr_task = asyncio.create_task(self._drain_stderr(process.stderr, stderr_tail))
+
+        try:
+            while True:
+                raw = await self._next_line(process.stdout, deadline)
+                if not raw:
+                    break
+                self._last_activity = loop.time()
+                segment = parse_segment_line(raw.decode("utf-8", errors="replace"))
+                if segment is not None and segment.text:
+                    yield segment
+
+            returncode = await process.wait()
+            await stderr_task
+            if returncode != 0:
+                raise RuntimeError(
+                    f"Error al ejecutar whisper.cpp: returncode={returncode}\n"
+                    f"Stderr: {''.join(stderr_tail) or '(sin salida)'}"
+                )
+            if not os.path.exists(json_output_path):
+                raise RuntimeError(
+                    f"whisper.cpp no generó el archivo JSON esperado en: {json_output_path}"
+                )
+            self.result = _parse_whisper_json(json_output_path)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr_task.cancel()
+            if os.path.exists(json_output_path):
+                os.unlink(json_output_path)
+
+    async def _next_line(self, stdout: asyncio.StreamReader, deadline: float) -> bytes:
+        """La siguiente línea de stdout, vigilando el tiempo límite y el cuelgue.
+
+        La espera se corta en tramos para volver a mirar ``_last_activity``,
+        que también avanza con el progreso de stderr: un segmento largo que
+        tarda en salir no cuenta como cuelgue mientras el progreso se mueva.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            wait = deadline - now
+            if self.stall_sec > 0:
+                wait = min(wait, self._last_activity + self.stall_sec - now)
+            try:
+                # Cancelar readline no pierde datos: la línea a medias queda
+                # en el buffer del StreamReader para la próxima vuelta.
+                return await asyncio.wait_for(stdout.readline(), max(0.0, wait))
+            except TimeoutError as exc:
+                now = loop.time()
+                if now >= deadline:
+                    raise RuntimeError(
+                        "whisper.cpp superó el tiempo límite de "
+                        f"{(self.timeout_sec or 0) / 60:.0f} minutos para: {self.audio_path}"
+                    ) from exc
+                if self.stall_sec > 0 and now - self._last_activity >= self.stall_sec:
+                    raise WhisperStalled(
+                        f"whisper.cpp no avanzó en {self.stall_sec:.0f}s para: "
+                        f"{self.audio_path}"
+                    ) from exc
+
+    async def _drain_stderr(self, stream: asyncio.StreamReader, tail: deque[str]) -> None:
+        while raw := await stream.readline():
+            line = raw.decode("utf-8", errors="replace")
+            match = _PROGRESS_RE.search(line)
+            if match:
+                self._last_activity = asyncio.get_running_loop().time()
+            if match and self.on_progress is not None:
+                self.on_progress(int(match.group(1)))
+            elif not match:
+                tail.append(line)
+
+
 def whisper_result_to_transcriptions(
     result: WhisperResult,
     chunk_seconds: int = CHUNK_DURATION_SEC,
@@ -0,0 +1,125 @@
+"""whisper.cpp dentro del proceso, a través de pywhispercpp.
+
+Con ``WHISPER_BACKEND=bindings`` no hay subproceso ni archivo JSON: el WAV
+preprocesado se lee una vez como float32 y se le pasa directo al contexto de
+whisper.cpp, y el WhisperResult se arma desde los arrays nativos de segmentos y
+tokens. El contexto (el modelo cargado) queda vivo entre archivos, así que en
+el daemon cada nota de voz paga solo la inferencia.
+
+pywhispercpp es opcional (extra ``whispercpp``) y se importa recién al usarlo.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any
+
+from video_tranquitor.audio import read_wav_mono_float32
+from video_tranquitor.transcribers.whispercpp import _whisper_threads
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+
+logger = logging.getLogger(__name__)
+
+# whisper.cpp solo acepta 16 kHz mono; el preprocess ya lo deja así por defecto.
+WHISPER_SAMPLE_RATE = 16000
+
+# whisper.cpp mide los tiempos de segmentos y tokens en centésimas de segundo.
+_TICKS_PER_SEC = 100.0
+
+_model: Any = None
+_model_path: str | None = None
+# Un contexto de whisper.cpp no admite dos inferencias a la vez (el ensemble y
+# el watcher podrían pedirlo en paralelo).
+_lock = threading.Lock()
+
+
+def _import_bindings() -> tuple[Any, Any]:
+    try:
+        import _pywhispercpp as pw  # noqa: PLC0415
+        from pywhispercpp.model import Model  # noqa: PLC0415
+    except ImportError as exc:
+        raise RuntimeError(
+            "WHISPER_BACKEND=bindings necesita pywhispercpp. "
+            "Instalalo con `uv sync --extra whispercpp` o usá WHISPER_BACKEND=cli."
+        ) from exc
+    return Model, pw
+
+
+def get_model(config: PipelineConfig) -> Any:
+    """El modelo cargado del proceso. Cambiar de ``WHISPER_MODEL_PATH`` lo recarga."""
+    global _model, _model_path
+    with _lock:
+        if _model is None or _model_path != config.whisper_model_path:
+            Model, _ = _import_bindings()
+            print("Cargando modelo de whisper.cpp en el proceso (queda residente)...")
+            _model = Model(
+                config.whisper_model_path,
+                n_threads=_whisper_threads(config),
+                language=config.language,
+                print_progress=False,
+                print_realtime=False,
+                redirect_whispercpp_logs_to=None,
+            )
+            _model_path = config.whisper_model_path
+        return _model
+
+
+def _words(pw: Any, ctx: Any, segment: int) -> list[WhisperWord]:
+    """Tokens de texto del segmento con sus tiempos; descarta los especiales."""
+    eot = pw.whisper_token_eot(ctx)
+    words: list[WhisperWord] = []
+    for j in range(pw.whisper_full_n_tokens(ctx, segment)):
+        data = pw.whisper_full_get_token_data(ctx, segment, j)
+        if data.id >= eot or data.t0 < 0 or data.t1 < 0:
+            continue
+        words.append(
+            WhisperWord(
+                word=pw.whisper_full_get_token_text(ctx, segment, j),
+                start=data.t0 / _TICKS_PER_SEC,
+                end=data.t1 / _TICKS_PER_SEC,
+            )
+        )
+    return words
+
+
+def transcribe_bindings(audio_path: str, config: PipelineConfig) -> WhisperResult:
+    """Equivalente a ``transcribe_local`` con whisper.cpp dentro del proceso.
+
+    Raises:
+        RuntimeError: Si pywhispercpp no está instalado o el audio no se puede
+                      leer como WAV mono de 16 kHz.
+    """
+    from video_tranquitor.transcribers.whispercpp import needs_word_timestamps  # noqa: PLC0415
+
+    loaded = read_wav_mono_float32(audio_path)
+    if loaded is None:
+        raise RuntimeError(f"No se pudo leer {audio_path} como WAV PCM.")
+    samples, sample_rate = loaded
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        raise RuntimeError(
+            f"WHISPER_BACKEND=bindings necesita audio a {WHISPER_SAMPLE_RATE} Hz y el WAV "
+            f"está a {sample_rate} Hz. Ajustá TARGET_SAMPLE_RATE o usá WHISPER_BACKEND=cli."
+        )
+
+    words_needed = needs_word_timestamps(config)
+    model = get_model(config)
+    _, pw = _import_bindings()
+
+    print("Ejecutando whisper.cpp (bindings, modelo residente)...")
+    with _lock:
+        model.transcribe(samples, language=config.language, token_timestamps=words_needed)
+        # Se lee del contexto y no de los Segment de pywhispercpp, que no traen
+        # los tokens.
+        ctx = model._ctx
+        segments = [
+            WhisperSegment(
+                text=pw.whisper_full_get_segment_text(ctx, i).strip(),
+                start=pw.whisper_full_get_segment_t0(ctx, i) / _TICKS_PER_SEC,
+                end=pw.whisper_full_get_segment_t1(ctx, i) / _TICKS_PER_SEC,
+                words=_words(pw, ctx, i) if words_needed else [],
+            )
+            for i in range(pw.whisper_full_n_segments(ctx))
+        ]
+
+    return WhisperResult(segments=segments, language=config.language)
@@ -4,8 +4,13 @@ from __future__ import annotations
 
 import gc
 import logging
+from bisect import bisect_right
+from typing import TYPE_CHECKING
 
-from video_tranquitor.transcribers.chunking import result_to_transcriptions
+from video_tranquitor.audio import WHISPER_SAMPLE_RATE, read_whisper_audio
+from video_tranquitor.resources import cpu_lease, limit_current_process
+from video_tranquitor.transcribers.chunking import result_to_transcriptions, shift_segments
+from video_tranquitor.transcribers.whispercpp import needs_word_timestamps
 from video_tranquitor.types import (
     PipelineConfig,
     Transcription,
@@ -14,9 +19,17 @@ from video_tranquitor.types import (
     WhisperWord,
 )
 
+if TYPE_CHECKING:
+    import numpy as np
+
 logger = logging.getLogger(__name__)
 
 CHUNK_DURATION_SEC = 120  # 2 minutos
+# Nombre de la etapa en el presupuesto de CPU.
+WHISPERX_STAGE = "whisperx"
+# Silencio entre archivos al empaquetarlos en una sola pasada. Es más que un
+# chunk del VAD de WhisperX (30 s): ningún chunk junta audio de dos archivos.
+BATCH_GAP_SEC = 31.0
 
 
 def _to_whisper_result(result: dict, language: str) -> WhisperResult:
@@ -48,29 +61,145 @@ def transcribe_whisperx(
     audio_path: str,
     config: PipelineConfig,
     model_size: str = "large-v3",
+    resident: bool = False,
+    audio: np.ndarray | None = None,
 ) -> WhisperResult:
     """Transcribe un archivo de audio usando WhisperX como librería Python.
 
     Etapas:
     1. Carga del modelo y transcripción con VAD integrado.
-    2. Alineación forzada para timestamps a nivel de palabra (wav2vec2).
+    2. Alineación forzada para timestamps a nivel de palabra (wav2vec2), solo
+       si algo va a usar las palabras (ver ``aligns_upfront``).
 
-    La GPU se libera entre etapas para minimizar el uso de VRAM.
+    La GPU se libera entre etapas para minimizar el uso de VRAM, salvo con
+    ``resident``: el worker de WhisperX (ver whisperx_worker.py) deja los dos
+    modelos cargados para el archivo siguiente.
 
     Args:
         audio_path: Ruta al archivo de audio (WAV recomendado).
         config:     Configuración del pipeline (se usa config.language).
         model_size: Tamaño del modelo de Whisper (default "large-v3").
+        resident:   Reusar y conservar los modelos entre llamadas.
+        audio:      Muestras mono float32 a 16 kHz ya decodificadas (el worker
+                    las recibe por memoria compartida). Sin ellas se lee el
+                    WAV directo y recién si no se puede, con ffmpeg.
 
     Returns:
         WhisperResult con segmentos y palabras con timestamps.
     """
+    # torch y CTranslate2 usan todos los núcleos que ven; el lease los acota a
+    # la parte de WhisperX en el presupuesto (la mitad, en el ensemble).
+    with cpu_lease(config, WHISPERX_STAGE) as lease, limit_current_process(lease):
+        return _transcribe_whisperx(
+            audio_path, config, model_size, lease.threads, resident, audio
+        )
+
+
+def transcribe_whisperx_batch(
+    audio_paths: list[str],
+    config: PipelineConfig,
+    model_size: str = "large-v3",
+    resident: bool = False,
+    audios: list[np.ndarray | None] | None = None,
+) -> list[WhisperResult]:
+    """Transcribe varios archivos cortos en una sola pasada de WhisperX.
+
+    Los audios van uno detrás de otro, separados por ``BATCH_GAP_SEC`` de
+    silencio, y ``model.transcribe`` recibe todo junto: los chunks del VAD de
+    todas las notas llenan los mismos batches, en vez de un batch casi vacío
+    por nota. El resultado se corta de vuelta por archivo, cada uno desde 0.
+
+    Args:
+        audio_paths: WAVs a transcribir, en orden.
+        config:      Configuración del pipeline.
+        model_size:  Tamaño del modelo de Whisper.
+        resident:    Reusar y conservar los modelos entre llamadas.
+        audios:      Muestras ya decodificadas por archivo (None donde no hay).
+
+    Returns:
+        Un WhisperResult por archivo, en el orden de ``audio_paths``.
+    """
+    import numpy as np  # noqa: PLC0415
+
+    audios = audios or [None] * len(audio_paths)
+    gap = np.zeros(int(BATCH_GAP_SEC * WHISPER_SAMPLE_RATE), dtype=np.float32)
+    parts: list[np.ndarray] = []
+    offsets: list[float] = []
+    position = 0
+    for path, samples in zip(audio_paths, audios, strict=True):
+        if samples is None:
+            samples = _load_audio(path)
+        offsets.append(position / WHISPER_SAMPLE_RATE)
+        parts += [samples.astype(np.float32, copy=False), gap]
+        position += len(samples) + len(gap)
+    print(f"  [whisperx] {len(audio_paths)} archivos en una sola pasada...")
+
+    with cpu_lease(config, WHISPERX_STAGE) as lease, limit_current_process(lease):
+        packed = _transcribe_whisperx(
+            audio_paths[0], config, model_size, lease.threads, resident, np.concatenate(parts)
+        )
+    return split_packed(packed, offsets)
+
+
+def split_packed(result: WhisperResult, offsets: list[float]) -> list[WhisperResult]:
+    """Reparte los segmentos de una pasada empaquetada entre sus archivos.
+
+    Cada segmento va al archivo en cuyo tramo empieza; el corte está a mitad
+    del silencio entre dos archivos, para que el relleno del VAD no lo cambie.
+    """
+    bounds = [0.0] + [offset - BATCH_GAP_SEC / 2 for offset in offsets[1:]]
+    per_file: list[list[WhisperSegment]] = [[] for _ in offsets]
+    for segment in result.segments:
+        per_file[max(0, bisect_right(bounds, segment.start) - 1)].append(segment)
+    return [
+        WhisperResult(segments=shift_segments(segments, -offset), language=result.language)
+        for segments, offset in zip(per_file, offsets, strict=True)
+    ]
+
+
+# Modelos cargados por el worker residente. Fuera del worker quedan vacíos:
+# cada llamada carga y libera como siempre.
+_resident_asr: dict[tuple, object] = {}
+_resident_align: dict[tuple, tuple] = {}
+
+
+def _device(
+    config: PipelineConfig, model_size: str, threads: int
+) -> tuple[str, str, int, int]:
+    """(device, compute_type, batch_size, threads) según haya CUDA o no.
+
+    En CPU manda el ajuste medido en este host (``--tune-whisperx``), con los
+    hilos acotados al lease; sin ajuste, int8 con batch 4.
+    """
     import torch  # importación tardía: solo necesario al transcribir
-    import whisperx  # importación tardía: carga pesada
 
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    compute_type = "float16" if device == "cuda" else "int8"
-    batch_size = 16 if device == "cuda" else 4
+    if torch.cuda.is_available():
+        return "cuda", "float16", 16, threads
+
+    from video_tranquitor.whisperx_tuning import (  # noqa: PLC0415
+        DEFAULT_BATCH_SIZE,
+        DEFAULT_COMPUTE_TYPE,
+        load_whisperx_tuning,
+    )
+
+    tuning = load_whisperx_tuning(config, model_size)
+    if tuning is None:
+        return "cpu", DEFAULT_COMPUTE_TYPE, DEFAULT_BATCH_SIZE, threads
+    return "cpu", tuning.compute_type, tuning.batch_size, min(tuning.threads, threads)
+
+
+def _release(device: str) -> None:
+    import torch  # noqa: PLC0415
+
+    gc.collect()
+    if device == "cuda":
+        torch.cuda.empty_cache()
+
+
+def _load_asr_model(
+    config: PipelineConfig, model_size: str, device: str, compute_type: str, threads: int
+):
+    import whisperx  # importación tardía: carga pesada
 
     # NO se pasa `initial_prompt`, y no por olvido: se midió y EMPEORA.
     # config.transcription_prompt ("Mantiene nombres propios, numeros y siglas
@@ -85,43 +214,135 @@ def transcribe_whisperx(
         "beam_size": config.whisperx_beam_size,
         "best_of": config.whisperx_beam_size,
     }
-
-    print(
-        f"WhisperX — device: {device}, compute: {compute_type}, modelo: {model_size}, "
-        f"beam: {config.whisperx_beam_size}"
-    )
-
-    # Etapa 1: Transcripción con VAD integrado
     print("  [whisperx] Cargando modelo...")
-    model = whisperx.load_model(
+    return whisperx.load_model(
         model_size,
         device,
         compute_type=compute_type,
         language=config.language,
         asr_options=asr_options,
+        threads=threads,
     )
 
-    print("  [whisperx] Cargando audio...")
-    audio = whisperx.load_audio(audio_path)
+
+def _asr_model(
+    config: PipelineConfig,
+    model_size: str,
+    device: str,
+    compute_type: str,
+    threads: int,
+    resident: bool,
+):
+    if not resident:
+        return _load_asr_model(config, model_size, device, compute_type, threads)
+    # Los hilos de CTranslate2 se fijan al cargar: van en la clave para que un
+    # lease con otra cantidad cargue su modelo en vez de heredar los hilos del
+    # primero (el calentamiento, que suele arrancar solo y con todo).
+    key = (model_size, device, compute_type, config.language, config.whisperx_beam_size, threads)
+    if key not in _resident_asr:
+        _resident_asr[key] = _load_asr_model(config, model_size, device, compute_type, threads)
+    return _resident_asr[key]
+
+
+def _align_model(language: str, device: str, resident: bool) -> tuple:
+    import whisperx  # noqa: PLC0415
+
+    key = (language, device)
+    if resident and key in _resident_align:
+        return _resident_align[key]
+    loaded = whisperx.load_align_model(language_code=language, device=device)
+    if resident:
+        _resident_align[key] = loaded
+    return loaded
+
+
+def preload_whisperx(config: PipelineConfig, model_size: str) -> None:
+    """Deja cargados en el worker los modelos que va a pedir ``config``."""
+    with cpu_lease(config, WHISPERX_STAGE) as lease, limit_current_process(lease):
+        device, compute_type, _, threads = _device(config, model_size, lease.threads)
+        _asr_model(config, model_size, device, compute_type, threads, resident=True)
+        if aligns_upfront(config) or needs_word_timestamps(config):
+            _align_model(config.language, device, resident=True)
+
+
+def _load_audio(audio_path: str) -> np.ndarray:
+    """El WAV del preprocess tal cual lo deja ``whisperx.load_audio``, sin ffmpeg.
+
+    ``load_audio`` corre ffmpeg de nuevo sobre un WAV que ya es mono a 16 kHz;
+    queda solo para lo que no se puede leer directo.
+    """
+    samples = read_whisper_audio(audio_path)
+    if samples is not None:
+        return samples
+
+    import whisperx  # noqa: PLC0415
+
+    return whisperx.load_audio(audio_path)
+
+
+def _transcribe_whisperx(
+    audio_path: str,
+    config: PipelineConfig,
+    model_size: str,
+    threads: int,
+    resident: bool = False,
+    audio: np.ndarray | None = None,
+) -> WhisperResult:
+    device, compute_type, batch_size, threads = _device(config, model_size, threads)
+
+    print(
+        f"WhisperX — device: {device}, compute: {compute_type}, batch: {batch_size}, "
+        f"modelo: {model_size}, beam: {config.whisperx_beam_size}"
+    )
+
+    # Etapa 1: Transcripción con VAD integrado
+    model = _asr_model(config, model_size, device, compute_type, threads, resident)
+
+    if audio is None:
+        print("  [whisperx] Cargando audio...")
+        audio = _load_audio(audio_path)
 
     print("  [whisperx] Transcribiendo (con VAD integrado)...")
     result = model.transcribe(audio, batch_size=batch_size, language=config.language)
 
     # Liberar VRAM antes de cargar el modelo de alineación
     del model
-    gc.collect()
-    if device == "cuda":
-        torch.cuda.empty_cache()
+    if not resident:
+        _release(device)
+
+    # Etapa 2: Alineación forzada para timestamps a nivel de palabra, solo si
+    # alguien va a usar las palabras.
+    if aligns_upfront(config):
+        result = _align(result["segments"], audio, config, device, resident)
+    else:
+        print("  [whisperx] Sin alineación: nada usa las palabras.")
+
+    return _to_whisper_result(result, config.language)
+
+
+def aligns_upfront(config: PipelineConfig) -> bool:
+    """Si la transcripción sale ya alineada palabra por palabra.
+
+    ``WHISPERX_ALIGN=auto`` alinea solo cuando la diarización va a usar las
+    palabras; ``turns`` lo deja para después de diarizar (``align_whisperx``
+    sobre los segmentos con cambio de hablante).
+    """
+    if config.whisperx_align == "always":
+        return True
+    return config.whisperx_align == "auto" and needs_word_timestamps(config)
+
 
-    # Etapa 2: Alineación forzada para timestamps a nivel de palabra
-    print("  [whisperx] Alineando palabras (wav2vec2)...")
+def _align(
+    segments: list[dict], audio: np.ndarray, config: PipelineConfig, device: str, resident: bool
+) -> dict:
+    """``whisperx.align`` sobre ``segments``; si falla quedan los tiempos de Whisper."""
+    import whisperx  # noqa: PLC0415
+
+    print(f"  [whisperx] Alineando palabras de {len(segments)} segmentos (wav2vec2)...")
     try:
-        model_a, metadata = whisperx.load_align_model(
-            language_code=config.language,
-            device=device,
-        )
+        model_a, metadata = _align_model(config.language, device, resident)
         result = whisperx.align(
-            result["segments"],
+            segments,
             model_a,
             metadata,
             audio,
@@ -129,15 +350,41 @@ def transcribe_whisperx(
             return_char_alignments=False,
         )
         del model_a
-        gc.collect()
-        if device == "cuda":
-            torch.cuda.empty_cache()
+        if not resident:
+            _release(device)
+        return result
     except Exception as exc:
         logger.warning(
             "Alineación de palabras falló, usando timestamps de Whisper: %s", exc
         )
+        return {"segments": segments}
 
-    return _to_whisper_result(result, config.language)
+
+def align_whisperx(
+    audio_path: str,
+    config: PipelineConfig,
+    segments: list[WhisperSegment],
+    resident: bool = False,
+    audio: np.ndarray | None = None,
+) -> list[WhisperSegment]:
+    """Alinea palabra por palabra solo ``segments``, sobre su tramo del audio.
+
+    wav2vec2 corre sobre el audio de cada segmento: alinear unos pocos cuesta
+    una fracción de alinear la transcripción entera. whisperx puede partir un
+    segmento en oraciones, así que lo devuelto no tiene por qué ser uno a uno.
+    """
+    with cpu_lease(config, WHISPERX_STAGE) as lease, limit_current_process(lease):
+        device = _device(config, config.whisperx_model, lease.threads)[0]
+        if audio is None:
+            audio = _load_audio(audio_path)
+        aligned = _align(
+            [{"text": seg.text, "start": seg.start, "end": seg.end} for seg in segments],
+            audio,
+            config,
+            device,
+            resident,
+        )
+    return _to_whisper_result(aligned, config.language).segments
 
 
 def whisperx_result_to_transcriptions(
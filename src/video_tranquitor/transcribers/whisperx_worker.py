@@ -0,0 +1,368 @@
+"""Proceso residente de WhisperX con los modelos cargados entre archivos.
+
+Antes cada archivo pagaba el arranque completo: el ensemble creaba un
+``ProcessPoolExecutor`` nuevo por llamada, y con ``TRANSCRIBER=whisperx`` el
+modelo se cargaba y se tiraba en cada pipeline. Son el import de torch, el
+init de CUDA, ``whisperx.load_model`` y ``load_align_model``: segundos que en
+el daemon, con notas de voz cortas, pesan más que la transcripción.
+
+El worker es un proceso ``spawn`` (sin heredar el estado de CUDA del padre)
+que el daemon levanta la primera vez que hace falta o en el calentamiento.
+Recibe pedidos por un ``Pipe`` de a uno, deja el modelo ASR y el de alineación
+cargados (``transcribe_whisperx(..., resident=True)``) y se apaga solo tras
+``WHISPERX_WORKER_IDLE_SEC`` sin pedidos, para devolver la memoria y la VRAM.
+Si se cae en medio de un pedido (falta de VRAM, un segfault de CTranslate2),
+se levanta de nuevo y el pedido se reintenta una vez.
+
+El lease de CPU lo pide el proceso principal, que es el que conoce el resto
+del presupuesto, y viaja con el pedido. El audio también: el principal lee el
+WAV y le pasa las muestras float32 por memoria compartida, así el worker no
+vuelve a decodificarlo con ffmpeg (``whisperx.load_audio``). El resultado
+vuelve por el mismo camino, empaquetado por ``result_transport``: el pipe
+lleva la referencia al bloque y no un dict por palabra.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager, ExitStack, nullcontext
+from multiprocessing.connection import Connection
+
+from video_tranquitor.audio import read_whisper_audio, shared_samples
+from video_tranquitor.resources import Lease, cpu_lease
+from video_tranquitor.result_transport import result_from_shared
+from video_tranquitor.transcribers.whisperx import WHISPERX_STAGE
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto se mira si el worker sigue vivo mientras se espera la respuesta.
+POLL_SEC = 0.5
+STOP_TIMEOUT_SEC = 10
+
+
+class WorkerDied(RuntimeError):
+    """El proceso de WhisperX terminó sin responder el pedido."""
+
+
+def _serve(conn: Connection) -> None:
+    """Loop del proceso hijo: un pedido por vez hasta recibir None o perder el pipe."""
+    from video_tranquitor.audio import samples_from_shared  # noqa: PLC0415
+    from video_tranquitor.resources import use_leases  # noqa: PLC0415
+    from video_tranquitor.result_transport import share_result  # noqa: PLC0415
+    from video_tranquitor.transcribers.whisperx import (  # noqa: PLC0415
+        align_whisperx,
+        preload_whisperx,
+        transcribe_whisperx,
+        transcribe_whisperx_batch,
+    )
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        try:
+            config = PipelineConfig.model_validate_json(job["config"])
+            lease = Lease.model_validate_json(job["lease"])
+            with use_leases({WHISPERX_STAGE: lease}):
+                if job["op"] == "load":
+                    preload_whisperx(config, job["model_size"])
+                    reply: dict = {"ok": True}
+                elif job["op"] == "align":
+                    shared = job.get("samples")
+                    segments = align_whisperx(
+                        job["audio_path"],
+                        config,
+                        [WhisperSegment.model_validate(s) for s in job["segments"]],
+                        resident=True,
+                        audio=samples_from_shared(shared) if shared else None,
+                    )
+                    aligned = WhisperResult(segments=segments, language=config.language)
+                    reply = {"ok": True, "segments": share_result(aligned)}
+                elif job["op"] == "transcribe_batch":
+                    results = transcribe_whisperx_batch(
+                        job["audio_paths"],
+                        config,
+                        job["model_size"],
+                        resident=True,
+                        audios=[samples_from_shared(s) if s else None for s in job["samples"]],
+                    )
+                    reply = {"ok": True, "results": [share_result(r) for r in results]}
+                else:
+                    shared = job.get("samples")
+                    result = transcribe_whisperx(
+                        job["audio_path"],
+                        config,
+                        job["model_size"],
+                        resident=True,
+                        audio=samples_from_shared(shared) if shared else None,
+                    )
+                    reply = {"ok": True, "result": share_result(result)}
+        except Exception as error:  # noqa: BLE001 — el error viaja al proceso principal
+            reply = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+        conn.send(reply)
+
+
+class WhisperXWorker:
+    """El proceso de WhisperX del daemon, con arranque perezoso y apagado por inactividad."""
+
+    def __init__(self, idle_sec: float) -> None:
+        self.idle_sec = idle_sec
+        self._process: multiprocessing.process.BaseProcess | None = None
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+        # El pipe atiende un pedido por vez; el ensemble y el calentamiento
+        # pueden pedir a la vez desde hilos distintos.
+        self._job_lock = threading.Lock()
+        self._idle_timer: threading.Timer | None = None
+        self._busy = 0
+
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def ensure_started(self) -> None:
+        """Deja el worker listo, levantándolo si no está o si se cayó."""
+        with self._lock:
+            if self.running():
+                return
+            if self._process is not None:
+                logger.warning(
+                    "El worker de WhisperX terminó (código %s); se vuelve a levantar.",
+                    self._process.exitcode,
+                )
+                self._close()
+            self._start()
+
+    def _start(self) -> None:
+        # spawn: el proceso arranca limpio, sin heredar el estado de CUDA del padre.
+        ctx = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_serve, args=(child_conn,), name="vt-whisperx", daemon=True)
+        process.start()
+        child_conn.close()
+        self._process, self._conn = process, parent_conn
+        print("Levantando el worker de WhisperX (los modelos quedan cargados)...")
+
+    def _request(self, job: dict) -> dict:
+        process, conn = self._process, self._conn
+        assert process is not None and conn is not None
+        try:
+            conn.send(job)
+            while not conn.poll(POLL_SEC):
+                if not process.is_alive():
+                    raise WorkerDied(f"el worker de WhisperX murió (código {process.exitcode})")
+            return conn.recv()
+        except (EOFError, OSError) as error:
+            raise WorkerDied(f"el worker de WhisperX murió: {error}") from error
+
+    def run(
+        self, config: PipelineConfig, make_job: Callable[[Lease], dict], wait: bool = True
+    ) -> dict | None:
+        """Arma el pedido con ``make_job`` y espera la respuesta. Si el worker
+        se cae, lo levanta y reintenta una vez.
+
+        El lease de CPU se pide recién con el turno del pipe: un pedido en
+        cola no retiene núcleos que nadie usa. Con ``wait=False``, si hay otro
+        pedido en curso no se espera y devuelve None.
+
+        Raises:
+            RuntimeError: Si el pedido falló dentro del worker o si el worker
+                          murió dos veces seguidas.
+        """
+        if not self._job_lock.acquire(blocking=wait):
+            return None
+        self._cancel_idle_timer()
+        with self._lock:
+            self._busy += 1
+        try:
+            with cpu_lease(config, WHISPERX_STAGE) as lease:
+                job = make_job(lease)
+                self.ensure_started()
+                try:
+                    reply = self._request(job)
+                except WorkerDied as error:
+                    logger.warning("%s; reintentando con un worker nuevo.", error)
+                    # Con el pipe cortado el proceso puede figurar vivo unos
+                    # instantes más: se lo termina antes de levantar otro.
+                    with self._lock:
+                        self._stop()
+                    self.ensure_started()
+                    reply = self._request(job)
+        finally:
+            self._job_lock.release()
+            with self._lock:
+                self._busy -= 1
+                if not self._busy:
+                    self._schedule_idle_stop()
+        if not reply["ok"]:
+            raise RuntimeError(f"WhisperX falló: {reply['error']}")
+        return reply
+
+    def _schedule_idle_stop(self) -> None:
+        if self.idle_sec <= 0:
+            return
+        self._idle_timer = threading.Timer(self.idle_sec, self._stop_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self) -> None:
+        timer, self._idle_timer = self._idle_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _stop_if_idle(self) -> None:
+        with self._lock:
+            if self._busy or not self.running():
+                return
+            logger.info("Worker de WhisperX inactivo %ss; se apaga.", self.idle_sec)
+            self._stop()
+
+    def stop(self) -> None:
+        self._cancel_idle_timer()
+        with self._lock:
+            self._stop()
+
+    def _stop(self) -> None:
+        process, conn = self._process, self._conn
+        if process is None:
+            return
+        if process.is_alive() and conn is not None:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join(STOP_TIMEOUT_SEC)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        self._close()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._process, self._conn = None, None
+
+
+_worker: WhisperXWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def get_worker(config: PipelineConfig) -> WhisperXWorker:
+    """El worker del proceso. Un cambio de ``WHISPERX_WORKER_IDLE_SEC`` rige
+    desde el próximo pedido; los modelos se eligen por pedido."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = WhisperXWorker(config.whisperx_worker_idle_sec)
+        _worker.idle_sec = config.whisperx_worker_idle_sec
+        return _worker
+
+
+def _job(op: str, config: PipelineConfig, model_size: str, lease: Lease, **extra) -> dict:
+    return {
+        "op": op,
+        "config": config.model_dump_json(),
+        "model_size": model_size,
+        "lease": lease.model_dump_json(),
+        **extra,
+    }
+
+
+def _shared_audio(audio_path: str) -> AbstractContextManager[dict | None]:
+    """Las muestras del WAV en memoria compartida, o None si hay que pasar la ruta
+    (sin numpy en este proceso, o un WAV que no es mono a 16 kHz)."""
+    try:
+        samples = read_whisper_audio(audio_path)
+    except ImportError:
+        samples = None
+    return nullcontext() if samples is None else shared_samples(samples)
+
+
+def transcribe_in_worker(
+    audio_path: str, config: PipelineConfig, model_size: str = "large-v3"
+) -> WhisperResult:
+    """Equivalente a ``transcribe_whisperx`` corrido en el worker residente.
+
+    El lease es el que ``cpu_split`` le asignó a WhisperX (el ensemble) o
+    uno nuevo del presupuesto del proceso principal.
+    """
+    with _shared_audio(audio_path) as samples:
+        reply = get_worker(config).run(
+            config,
+            lambda lease: _job(
+                "transcribe", config, model_size, lease, audio_path=audio_path, samples=samples
+            ),
+        )
+    assert reply is not None
+    return result_from_shared(reply["result"])
+
+
+def transcribe_batch_in_worker(
+    audio_paths: list[str], config: PipelineConfig, model_size: str = "large-v3"
+) -> list[WhisperResult]:
+    """Equivalente a ``transcribe_whisperx_batch`` corrido en el worker residente."""
+    with ExitStack() as stack:
+        samples = [stack.enter_context(_shared_audio(path)) for path in audio_paths]
+        reply = get_worker(config).run(
+            config,
+            lambda lease: _job(
+                "transcribe_batch",
+                config,
+                model_size,
+                lease,
+                audio_paths=audio_paths,
+                samples=samples,
+            ),
+        )
+    assert reply is not None
+    return [result_from_shared(ref) for ref in reply["results"]]
+
+
+def align_in_worker(
+    audio_path: str, config: PipelineConfig, segments: list[WhisperSegment]
+) -> list[WhisperSegment]:
+    """Equivalente a ``align_whisperx`` corrido en el worker residente."""
+    with _shared_audio(audio_path) as samples:
+        reply = get_worker(config).run(
+            config,
+            lambda lease: _job(
+                "align",
+                config,
+                config.whisperx_model,
+                lease,
+                audio_path=audio_path,
+                samples=samples,
+                segments=[s.model_dump() for s in segments],
+            ),
+        )
+    assert reply is not None
+    return result_from_shared(reply["segments"]).segments
+
+
+def preload_in_worker(config: PipelineConfig, model_size: str) -> None:
+    """Levanta el worker y carga los modelos antes de que llegue el audio.
+
+    Si el worker está atendiendo un pedido no se hace nada: ya está levantado,
+    y esperar el turno solo demoraría al que viene atrás.
+    """
+    get_worker(config).run(
+        config, lambda lease: _job("load", config, model_size, lease), wait=False
+    )
+
+
+def shutdown_worker() -> None:
+    global _worker
+    with _worker_lock:
+        if _worker is not None:
+            _worker.stop()
+            _worker = None
+
+
+atexit.register(shutdown_worker)
@@ -14,7 +14,7 @@ from pydantic import BaseModel, field_validator
 class PipelineConfig(BaseModel):
     watch_dir: str
     output_dir: str
-    transcriber: Literal["local", "openai", "whisperx", "ensemble"]
+    transcriber: Literal["local", "openai", "whisperx", "ensemble", "faster-whisper"]
     whisperx_model: str
     whisper_cpp_path: str
     whisper_model_path: str
@@ -38,7 +38,63 @@ class PipelineConfig(BaseModel):
     # 5 es el default de WhisperX. Subirlo explora más hipótesis por segmento:
     # más lento, potencialmente más preciso.
     whisperx_beam_size: int = 5
+    # Segundos sin pedidos hasta apagar el worker de WhisperX y liberar sus
+    # modelos (ver transcribers/whisperx_worker.py).
+    whisperx_worker_idle_sec: float = 600.0
+    # Ventana en la que el watcher junta notas cortas para transcribirlas en
+    # una sola pasada (0 = apagado), y el largo máximo de una nota "corta".
+    # Ver transcribers/microbatch.py.
+    whisperx_microbatch_sec: float = 0.0
+    whisperx_microbatch_max_sec: float = 90.0
+    # Cuándo alinear palabras con wav2vec2: solo si la diarización las usa
+    # (auto), siempre, o después de diarizar y solo cerca de los cambios de
+    # hablante (turns). Ver transcribers/whisperx.py.
+    whisperx_align: Literal["auto", "always", "turns"] = "auto"
+    # TRANSCRIBER=faster-whisper: modelo (nombre o directorio CTranslate2) y
+    # compute type en CPU. Ver transcribers/fasterwhisper.py.
+    faster_whisper_model: str = "large-v3-turbo"
+    faster_whisper_compute_type: str = "int8"
+    # TRANSCRIBER=openai: chunks subiéndose a la vez y tope de pedidos por
+    # minuto, reintentos incluidos. Ver transcribers/openai_api.py.
+    openai_concurrency: int = 4
+    openai_requests_per_minute: float = 50.0
+    # Códec con el que se sube cada chunk y su largo en segundos.
+    openai_upload_codec: Literal["wav", "flac", "opus"] = "wav"
+    openai_chunk_sec: int = 120
     target_sample_rate: int
+    # Calibraciones y progreso que sobreviven entre corridas (ver state.py).
+    cache_dir: str = "~/.cache/video-tranquitor"
+    # Núcleos que se reparten entre las etapas que corren a la vez (0 = todos
+    # los disponibles) y si cada etapa queda fijada a los suyos. Ver resources.py.
+    cpu_threads: int = 0
+    cpu_pinning: bool = False
+    # Fracción de la máquina que puede usar el backfill del archivo histórico.
+    backfill_cpu_share: float = 0.5
+    backfill_gpu_share: float = 0.5
+    # Modo en vivo (--live): ancho de cada ventana y cuánto esperar a que un
+    # archivo que se está grabando vuelva a crecer antes de darlo por cerrado.
+    live_window_sec: int = 20
+    live_idle_timeout_sec: float = 30.0
+    # Cómo se invoca whisper.cpp: un whisper-cli por archivo, un whisper-server
+    # residente que carga el modelo una sola vez, o los bindings dentro del proceso.
+    whisper_backend: Literal["cli", "server", "bindings"] = "cli"
+    whisper_server_path: str = ""
+    whisper_server_idle_sec: float = 600.0
+    # Elección del ggml por archivo entre los calibrados con --calibrate-models
+    # (0 = apagado, siempre whisper_model_path). Ver model_selection.py.
+    whisper_latency_target_sec: float = 0.0
+    whisper_models_dir: str = ""
+    # Procesos whisper-cli en paralelo sobre tramos del audio (1 = apagado,
+    # 0 = según los núcleos). Ver transcribers/sharded.py.
+    whisper_shards: int = 1
+    # Leer los segmentos de whisper-cli por stdout mientras decodifica, en vez
+    # de esperar al JSON final (solo TRANSCRIBER=local con backend cli).
+    whisper_stream: bool = False
+    # Watchdog de una corrida de whisper-cli: corta los loops de alucinación y
+    # los cuelgues (sin segmentos ni progreso por whisper_stall_sec) y
+    # re-transcribe solo la ventana afectada. Ver transcribers/whisper_watchdog.py.
+    whisper_watchdog: bool = False
+    whisper_stall_sec: float = 120.0
 
 
 # ---------------------------------------------------------------------------
@@ -144,6 +200,24 @@ class PipelineResult(BaseModel):
     whisper_result: WhisperResult | None
 
 
+# ---------------------------------------------------------------------------
+# Artefacto de transcripción (lo que permite reanalizar sin volver a transcribir)
+# ---------------------------------------------------------------------------
+
+
+class TranscriptArtifact(BaseModel):
+    input_file: str
+    fecha: str
+    audio_duration_sec: float
+    transcriber: str
+    # Huella del modelo de ASR: permite saber si un archivo ya se transcribió
+    # con el motor y el modelo actuales (ver backfill).
+    model_fingerprint: str
+    transcription: list[AttributedSegment]
+    raw_transcriptions: list[Transcription]
+    obsidian_note_path: str | None = None
+
+
 # ---------------------------------------------------------------------------
 # Resultado ensemble
 # ---------------------------------------------------------------------------
@@ -0,0 +1,187 @@
+"""Calentamiento especulativo del daemon apenas aparece un archivo nuevo.
+
+El watcher ve el archivo en cuanto empieza la copia, pero no lo procesa hasta
+que pasa el debounce y termina el archivo anterior. Ese tiempo muerto se usa
+para pagar por adelantado el arranque en frío: sondear el medio, subir el
+modelo ggml al page cache e importar torch/whisperx/pyannote. Todo es
+best-effort: si algo falla, el pipeline lo vuelve a hacer cuando le toque.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import threading
+
+from video_tranquitor.preprocessor import get_audio_duration
+from video_tranquitor.types import PipelineConfig
+
+logger = logging.getLogger(__name__)
+
+# Módulos ya importados (o en curso) por el calentamiento. Importar dos veces es
+# inocuo, pero lanzar un hilo por archivo en una ráfaga de notas de voz no.
+_preloaded: set[str] = set()
+_preload_lock = threading.Lock()
+
+
+def modules_to_preload(config: PipelineConfig) -> list[str]:
+    """Módulos pesados que el pipeline va a importar en ESTE proceso.
+
+    Solo cuenta lo que corre dentro del proceso principal. WhisperX corre en
+    su worker (ver ``_start_whisperx_worker``), que importa todo por su cuenta,
+    así que precargarlo acá no le ahorraría nada.
+    """
+    modules: list[str] = []
+    if config.enable_diarization:
+        modules += ["torch", "pyannote.audio"]
+    return list(dict.fromkeys(modules))
+
+
+def prefetch_file(path: str) -> bool:
+    """Le pide al kernel que suba ``path`` al page cache sin bloquear.
+
+    ``posix_fadvise(WILLNEED)`` dispara la lectura en segundo plano y vuelve
+    enseguida. El ggml de large-v3-turbo pesa ~1.5 GB: leerlo de un disco frío
+    es parte del arranque de whisper-cli que sí se puede adelantar.
+
+    Returns:
+        True si se pudo dar el aviso, False si el archivo no existe o la
+        plataforma no tiene posix_fadvise (macOS).
+    """
+    fadvise = getattr(os, "posix_fadvise", None)
+    if fadvise is None or not path or not os.path.isfile(path):
+        return False
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError as error:
+        logger.debug("No se pudo abrir %s para precargarlo: %s", path, error)
+        return False
+    try:
+        fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError as error:
+        logger.debug("posix_fadvise falló sobre %s: %s", path, error)
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+def preload_modules(modules: list[str]) -> None:
+    """Importa ``modules`` en un hilo de fondo, una sola vez por proceso."""
+    with _preload_lock:
+        pending = [m for m in modules if m not in _preloaded]
+        _preloaded.update(pending)
+    if not pending:
+        return
+
+    def _import_all() -> None:
+        for name in pending:
+            try:
+                importlib.import_module(name)
+            except Exception as error:  # noqa: BLE001 — el pipeline reporta el error real
+                logger.debug("Precarga de %s falló: %s", name, error)
+
+    threading.Thread(target=_import_all, name="vt-preload", daemon=True).start()
+
+
+def _whisper_config(duration: float | None, config: PipelineConfig) -> PipelineConfig:
+    """``config`` con el ggml que ``config_for_file`` va a elegir para el archivo.
+
+    Con ``WHISPER_LATENCY_TARGET_SEC`` el modelo se elige por archivo: calentar
+    ``WHISPER_MODEL_PATH`` subiría al page cache uno que no se va a usar.
+    """
+    if not duration:
+        return config
+    from video_tranquitor.model_selection import select_model  # noqa: PLC0415
+
+    try:
+        chosen = select_model(duration, config)
+    except Exception as error:  # noqa: BLE001 — el pipeline elige de nuevo al procesar
+        logger.debug("No se pudo elegir el modelo por adelantado: %s", error)
+        return config
+    if chosen is None:
+        return config
+    return config.model_copy(update={"whisper_model_path": chosen.path})
+
+
+def _start_whisper_server(config: PipelineConfig) -> None:
+    """Levanta el whisper-server residente para que el modelo ya esté cargado."""
+    from video_tranquitor.transcribers.whisper_server import get_server  # noqa: PLC0415
+
+    try:
+        get_server(config).ensure_started()
+    except Exception as error:  # noqa: BLE001 — el pipeline reporta el error real
+        logger.debug("No se pudo levantar whisper-server por adelantado: %s", error)
+
+
+def _load_whisper_bindings(config: PipelineConfig) -> None:
+    """Carga el modelo de whisper.cpp en el proceso antes de que llegue el audio."""
+    from video_tranquitor.transcribers.whispercpp_bindings import get_model  # noqa: PLC0415
+
+    try:
+        get_model(config)
+    except Exception as error:  # noqa: BLE001 — el pipeline reporta el error real
+        logger.debug("No se pudo cargar whisper.cpp por adelantado: %s", error)
+
+
+def _load_faster_whisper(config: PipelineConfig) -> None:
+    """Carga el modelo de faster-whisper en el proceso; queda residente."""
+    from video_tranquitor.transcribers.fasterwhisper import (  # noqa: PLC0415
+        preload_faster_whisper,
+    )
+
+    try:
+        preload_faster_whisper(config)
+    except Exception as error:  # noqa: BLE001 — el pipeline reporta el error real
+        logger.debug("No se pudo cargar faster-whisper por adelantado: %s", error)
+
+
+def _start_whisperx_worker(config: PipelineConfig) -> None:
+    """Levanta el worker de WhisperX con los modelos ya cargados."""
+    from video_tranquitor.transcribers.whisperx_worker import (  # noqa: PLC0415
+        preload_in_worker,
+    )
+
+    try:
+        preload_in_worker(config, config.whisperx_model)
+    except Exception as error:  # noqa: BLE001 — el pipeline reporta el error real
+        logger.debug("No se pudo levantar el worker de WhisperX por adelantado: %s", error)
+
+
+def warm_up(path: str, config: PipelineConfig) -> threading.Thread:
+    """Lanza el calentamiento para ``path`` en un hilo de fondo y vuelve enseguida.
+
+    Se llama desde el hilo de eventos de watchdog, que no se puede bloquear.
+
+    Returns:
+        El hilo lanzado, para quien quiera esperarlo (los tests).
+    """
+
+    def _run() -> None:
+        modules = modules_to_preload(config)
+        if modules:
+            preload_modules(modules)
+        # El sondeo deja la duración en el caché de get_audio_duration (de ahí
+        # la leen la ETA, el micro-batch y la elección del modelo) y ffprobe y
+        # sus librerías en el de páginas. Con una copia a medias puede fallar, y
+        # está bien: por eso no avisa, y lo que no se pudo leer no queda guardado.
+        duration = get_audio_duration(path, warn_on_failure=False)
+        if duration:
+            logger.info("Calentamiento: %s dura %.0f s", path, duration)
+        if config.transcriber in ("local", "ensemble"):
+            file_config = _whisper_config(duration, config)
+            if config.whisper_backend == "server":
+                _start_whisper_server(file_config)
+            elif config.whisper_backend == "bindings":
+                _load_whisper_bindings(file_config)
+            else:
+                prefetch_file(file_config.whisper_model_path)
+        if config.transcriber in ("whisperx", "ensemble"):
+            _start_whisperx_worker(config)
+        if config.transcriber == "faster-whisper":
+            _load_faster_whisper(config)
+
+    thread = threading.Thread(target=_run, name="vt-warmup", daemon=True)
+    thread.start()
+    return thread
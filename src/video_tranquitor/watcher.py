@@ -7,6 +7,7 @@ import os
 import queue
 import signal
 import threading
+import time
 from collections.abc import Callable, Coroutine
 from pathlib import Path
 from typing import Any
@@ -15,8 +16,13 @@ from watchdog.events import FileCreatedEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
 from video_tranquitor.gpu import release_gpu_memory
+from video_tranquitor.model_selection import set_queued_audio
 from video_tranquitor.pipeline import AUDIO_EXTENSIONS, VIDEO_EXTENSIONS
+from video_tranquitor.planner import load_calibration, queue_eta
+from video_tranquitor.preprocessor import format_time, get_audio_duration
+from video_tranquitor.transcribers.microbatch import MICROBATCH_MAX_FILES, run_micro_batch
 from video_tranquitor.types import PipelineConfig
+from video_tranquitor.warmup import warm_up
 
 DEBOUNCE_S = 0.5
 
@@ -24,10 +30,15 @@ DEBOUNCE_S = 0.5
 class _Handler(FileSystemEventHandler):
     """Manejador de eventos del sistema de archivos."""
 
-    def __init__(self, file_queue: queue.Queue[str]) -> None:
+    def __init__(
+        self,
+        file_queue: queue.Queue[str],
+        on_first_seen: Callable[[str], object] | None = None,
+    ) -> None:
         super().__init__()
         self._queue = file_queue
         self._timers: dict[str, threading.Timer] = {}
+        self._on_first_seen = on_first_seen
 
     def on_created(self, event: FileCreatedEvent) -> None:  # type: ignore[override]
         if event.is_directory:
@@ -49,6 +60,10 @@ class _Handler(FileSystemEventHandler):
         existing = self._timers.get(path)
         if existing:
             existing.cancel()
+        elif self._on_first_seen is not None:
+            # La copia recién empieza: el calentamiento corre mientras termina
+            # y mientras el archivo espera su turno en la cola.
+            self._on_first_seen(path)
 
         def _fire() -> None:
             self._timers.pop(path, None)
@@ -59,6 +74,61 @@ class _Handler(FileSystemEventHandler):
         timer.start()
 
 
+def _print_queue_eta(current: str, waiting: list[str], config: PipelineConfig) -> None:
+    """Muestra cuánto falta para el archivo actual y para vaciar la cola.
+
+    Usa el mismo modelo que ``--plan``. Las duraciones salen del caché de
+    ``get_audio_duration``, que llenó el calentamiento: ffprobe corre una vez
+    por archivo, no una por archivo en cola cada vez que arranca otro.
+    De paso le avisa a la selección de modelo cuánto audio espera detrás.
+    """
+    calibration = load_calibration(config)
+    durations = [get_audio_duration(p, warn_on_failure=False) for p in [current, *waiting]]
+    set_queued_audio(sum(d or 0.0 for d in durations[1:]))
+    if not durations[0]:
+        return
+    own = queue_eta(durations[:1], config, calibration)
+    message = f"ETA de este archivo: {format_time(own)}"
+    if waiting:
+        total = queue_eta(durations, config, calibration)
+        message += f" — cola ({len(waiting)} en espera): {format_time(total)}"
+    print(message)
+
+
+def _micro_batching(config: PipelineConfig) -> bool:
+    return config.transcriber == "whisperx" and config.whisperx_microbatch_sec > 0
+
+
+def _is_short(path: str, config: PipelineConfig) -> bool:
+    duration = get_audio_duration(path, warn_on_failure=False)
+    return bool(duration) and duration <= config.whisperx_microbatch_max_sec
+
+
+async def _collect_batch(
+    first: str,
+    file_queue: queue.Queue[str],
+    config: PipelineConfig,
+    deferred: list[str],
+) -> list[str]:
+    """Junta las notas cortas que llegan dentro de la ventana del micro-batch.
+
+    La ventana corre desde la primera nota. Lo largo que llega mientras tanto
+    queda en ``deferred`` y se procesa después, de a uno como siempre.
+    """
+    batch = [first]
+    deadline = time.monotonic() + config.whisperx_microbatch_sec
+    while len(batch) < MICROBATCH_MAX_FILES:
+        try:
+            path = file_queue.get_nowait()
+        except queue.Empty:
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.1)
+            continue
+        (batch if _is_short(path, config) else deferred).append(path)
+    return batch
+
+
 def start_watcher(
     config: PipelineConfig,
     on_file: Callable[[str], Coroutine[Any, Any, None]],
@@ -83,7 +153,7 @@ def start_watcher(
         print(f"Directorio creado: {watch_dir}")
 
     file_queue: queue.Queue[str] = queue.Queue()
-    handler = _Handler(file_queue)
+    handler = _Handler(file_queue, on_first_seen=lambda path: warm_up(path, config))
     observer = Observer()
     observer.schedule(handler, watch_dir, recursive=False)
     observer.start()
@@ -102,22 +172,47 @@ def start_watcher(
     signal.signal(signal.SIGTERM, _shutdown)
     signal.signal(signal.SIGINT, _shutdown)
 
+    # Archivos largos que llegaron mientras se juntaba un micro-batch.
+    deferred: list[str] = []
+
+    async def _process(path: str) -> None:
+        print(f"\nArchivo detectado: {path}")
+        _print_queue_eta(path, [*deferred, *file_queue.queue], config)
+        try:
+            await on_file(path)
+        except Exception as exc:  # noqa: BLE001
+            print(f"Error al procesar {path}: {exc}")
+        finally:
+            # El daemon vive entre archivos: si no se libera acá, la VRAM
+            # reservada por el archivo anterior deja la GPU secuestrada.
+            # Va en finally porque un fallo también deja memoria colgada.
+            release_gpu_memory()
+
+    async def _process_batch(paths: list[str]) -> None:
+        print(f"\nMicro-batch de {len(paths)} notas cortas:")
+        for path in paths:
+            print(f"  {path}")
+        try:
+            errors = await run_micro_batch(paths, on_file)
+        finally:
+            release_gpu_memory()
+        for path, error in zip(paths, errors, strict=True):
+            if error is not None:
+                print(f"Error al procesar {path}: {error}")
+
     async def _drain() -> None:
         while True:
             try:
-                path = file_queue.get_nowait()
-                print(f"\nArchivo detectado: {path}")
-                try:
-                    await on_file(path)
-                except Exception as exc:  # noqa: BLE001
-                    print(f"Error al procesar {path}: {exc}")
-                finally:
-                    # El daemon vive entre archivos: si no se libera acá, la VRAM
-                    # reservada por el archivo anterior deja la GPU secuestrada.
-                    # Va en finally porque un fallo también deja memoria colgada.
-                    release_gpu_memory()
+                path = deferred.pop(0) if deferred else file_queue.get_nowait()
             except queue.Empty:
                 await asyncio.sleep(0.1)
+                continue
+            if _micro_batching(config) and _is_short(path, config):
+                batch = await _collect_batch(path, file_queue, config, deferred)
+                if len(batch) > 1:
+                    await _process_batch(batch)
+                    continue
+            await _process(path)
 
     try:
         loop.run_until_complete(_drain())
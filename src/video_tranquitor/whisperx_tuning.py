@@ -0,0 +1,182 @@
+"""Ajuste de WhisperX en CPU medido en este host.
+
+Sin GPU, ``transcribe_whisperx`` usaba siempre ``int8`` con ``batch_size=4``:
+un valor razonable para una máquina promedio, no para la que corre. Con
+muchos núcleos y RAM de sobra un batch más grande rinde más; en una máquina
+chica ``batch_size=4`` ya pagina, y los hilos de CTranslate2 que conviene
+dejar no siempre son todos los del lease.
+
+``--tune-whisperx`` transcribe un tramo corto de una muestra con cada
+combinación de ``compute_type``, ``batch_size`` e hilos de CTranslate2, y
+guarda por host y por modelo la más rápida cuyo texto coincide con el de
+``float32``. ``transcribe_whisperx`` la usa en CPU; con CUDA no cambia nada.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import tempfile
+import time
+
+from pydantic import BaseModel
+
+from video_tranquitor.audio import slice_wav, wav_duration
+from video_tranquitor.model_selection import MIN_AGREEMENT, agreement
+from video_tranquitor.preprocessor import format_time, preprocess_audio
+from video_tranquitor.resources import cpu_lease, limit_current_process
+from video_tranquitor.state import load_host_state, save_host_state
+from video_tranquitor.transcribers.whisperx import (
+    WHISPERX_STAGE,
+    _load_asr_model,
+    _load_audio,
+)
+from video_tranquitor.types import PipelineConfig
+
+logger = logging.getLogger(__name__)
+
+TUNING_STATE = "whisperx_tuning"
+
+# El tramo que se transcribe con cada combinación. Son hasta 24 corridas
+# (3 compute types × 2 opciones de hilos × 4 batches) y 6 cargas del modelo:
+# con un minuto alcanza para separarlas sin una hora de espera. Los hilos
+# inter-op no se barren: torch los fija una sola vez por proceso, y en
+# CTranslate2 cada hilo inter-op es otra réplica del modelo en RAM.
+TUNING_SAMPLE_SEC = 60
+# float32 va primero: es la referencia de precisión para las cuantizaciones.
+COMPUTE_TYPES = ("float32", "int8_float32", "int8")
+BATCH_SIZES = (1, 4, 8, 16)
+
+# Lo que usa WhisperX en CPU si este host no tiene un ajuste medido.
+DEFAULT_COMPUTE_TYPE = "int8"
+DEFAULT_BATCH_SIZE = 4
+
+
+class WhisperXTuning(BaseModel):
+    model: str
+    compute_type: str
+    batch_size: int
+    threads: int
+    rtf: float
+    agreement: float = 1.0
+    updated: str = ""
+
+
+def load_whisperx_tuning(config: PipelineConfig, model_size: str) -> WhisperXTuning | None:
+    """El ajuste guardado para ``model_size`` en este host, o None si no hay."""
+    entry = load_host_state(config, TUNING_STATE).get("models", {}).get(model_size)
+    if entry is None:
+        return None
+    try:
+        return WhisperXTuning.model_validate(entry)
+    except ValueError:
+        return None
+
+
+def _compute_types() -> list[str]:
+    """Los ``COMPUTE_TYPES`` que CTranslate2 soporta en esta CPU."""
+    try:
+        import ctranslate2  # noqa: PLC0415
+    except ImportError:
+        return list(COMPUTE_TYPES)
+    supported = ctranslate2.get_supported_compute_types("cpu")
+    return [c for c in COMPUTE_TYPES if c in supported] or [DEFAULT_COMPUTE_TYPE]
+
+
+def _thread_options(threads: int) -> list[int]:
+    """Todo el lease y la mitad: con hyperthreading la mitad suele rendir igual."""
+    return sorted({max(1, threads // 2), threads}, reverse=True)
+
+
+def tune_whisperx(
+    sample_path: str, config: PipelineConfig, model_size: str | None = None
+) -> WhisperXTuning:
+    """Mide cada combinación de WhisperX en CPU sobre ``sample_path``.
+
+    Guarda la más rápida de las que superan ``MIN_AGREEMENT`` contra
+    ``float32`` (o la más rápida de todas) en el estado del host, y la
+    devuelve.
+
+    Raises:
+        RuntimeError: Si WhisperX no está instalado, si hay CUDA, o si la
+                      muestra no se puede preprocesar.
+    """
+    model_size = model_size or config.whisperx_model
+    try:
+        import torch  # noqa: PLC0415
+        import whisperx  # noqa: F401, PLC0415
+    except ImportError as exc:
+        raise RuntimeError(
+            f"WhisperX no está instalado ({exc}). Instalalo con `uv sync --extra gpu`."
+        ) from exc
+    if torch.cuda.is_available():
+        raise RuntimeError(
+            "Hay CUDA: WhisperX usa float16 con batch 16 y el ajuste es solo para CPU."
+        )
+
+    with tempfile.TemporaryDirectory(prefix="vt-tune-") as scratch:
+        full_wav = os.path.join(scratch, "full.wav")
+        if not preprocess_audio(
+            sample_path, full_wav, config.audio_filter, config.target_sample_rate
+        ):
+            raise RuntimeError(f"No se pudo preprocesar la muestra: {sample_path}")
+        sample_wav = os.path.join(scratch, "sample.wav")
+        slice_wav(full_wav, 0.0, TUNING_SAMPLE_SEC, sample_wav)
+        duration = wav_duration(sample_wav)
+        audio = _load_audio(sample_wav)
+
+    with cpu_lease(config, WHISPERX_STAGE) as lease, limit_current_process(lease):
+        print(
+            f"Ajustando WhisperX {model_size} en CPU ({lease.threads} hilos) sobre "
+            f"{format_time(duration)} de {os.path.basename(sample_path)}..."
+        )
+        trials: list[WhisperXTuning] = []
+        reference_text: str | None = None
+        for compute_type in _compute_types():
+            for threads in _thread_options(lease.threads):
+                model = _load_asr_model(config, model_size, "cpu", compute_type, threads)
+                for batch_size in BATCH_SIZES:
+                    start = time.perf_counter()
+                    try:
+                        result = model.transcribe(
+                            audio, batch_size=batch_size, language=config.language
+                        )
+                    except (MemoryError, RuntimeError) as exc:
+                        # Un batch que no entra en RAM queda fuera, no corta el ajuste.
+                        print(f"  {compute_type:<13} batch {batch_size:>2}  falló: {exc}")
+                        continue
+                    elapsed = time.perf_counter() - start
+                    text = " ".join(seg.get("text", "") for seg in result.get("segments", []))
+                    if reference_text is None:
+                        reference_text = text
+                    trial = WhisperXTuning(
+                        model=model_size,
+                        compute_type=compute_type,
+                        batch_size=batch_size,
+                        threads=threads,
+                        rtf=elapsed / duration if duration else 0.0,
+                        agreement=agreement(text, reference_text),
+                        updated=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    )
+                    trials.append(trial)
+                    print(
+                        f"  {compute_type:<13} batch {batch_size:>2}  {threads:>2} hilos  "
+                        f"RTF {trial.rtf:.2f}  coincidencia {trial.agreement:.0%}"
+                    )
+                del model
+                gc.collect()
+
+    if not trials:
+        raise RuntimeError("Ninguna combinación de WhisperX terminó la muestra.")
+    acceptable = [t for t in trials if t.agreement >= MIN_AGREEMENT] or trials
+    best = min(acceptable, key=lambda t: t.rtf)
+    print(
+        f"Elegido: {best.compute_type}, batch {best.batch_size}, {best.threads} hilos "
+        f"(RTF {best.rtf:.2f})"
+    )
+
+    models = load_host_state(config, TUNING_STATE).get("models", {})
+    models[model_size] = best.model_dump()
+    save_host_state(config, TUNING_STATE, {"models": models})
+    return best
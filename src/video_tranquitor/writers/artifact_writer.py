@@ -0,0 +1,74 @@
+"""Artefacto JSON con la transcripción final de cada reunión.
+
+El TOON solo guarda los chunks de 2 minutos sin hablantes, y la nota de
+Obsidian es Markdown pensado para leer. Ninguno alcanza para volver a correr el
+análisis, así que cambiar el prompt o el proveedor obligaba a re-transcribir
+todo el archivo. Este artefacto guarda exactamente lo que consume
+``analyze_transcription`` y los writers.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+from video_tranquitor.state import atomic_write_text
+from video_tranquitor.types import PipelineConfig, TranscriptArtifact
+
+ARTIFACT_SUFFIX = "_transcript.json"
+
+
+def artifact_path(output_dir: str, base_name: str) -> Path:
+    return Path(output_dir) / f"{base_name}{ARTIFACT_SUFFIX}"
+
+
+def model_fingerprint(config: PipelineConfig) -> str:
+    """Identifica el motor y el modelo de ASR de ``config``.
+
+    Para whisper.cpp no alcanza con el nombre del archivo: al actualizar el
+    modelo es común pisar el mismo ``ggml-large-v3-turbo.bin``. El tamaño
+    cambia entre versiones y cuantizaciones, así que entra a la huella.
+    """
+    def _ggml() -> str:
+        path = config.whisper_model_path
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        return f"{os.path.basename(path)}@{size}"
+
+    if config.transcriber == "local":
+        return f"local:{_ggml()}"
+    if config.transcriber == "whisperx":
+        return f"whisperx:{config.whisperx_model}"
+    if config.transcriber == "faster-whisper":
+        return (
+            f"faster-whisper:{config.faster_whisper_model}"
+            f"@{config.faster_whisper_compute_type}"
+        )
+    if config.transcriber == "openai":
+        return f"openai:{config.transcribe_model}"
+    return f"ensemble:{_ggml()}+{config.whisperx_model}"
+
+
+def write_transcript_artifact(artifact: TranscriptArtifact, path: str | Path) -> Path:
+    """Escribe el artefacto de forma atómica y devuelve su ruta."""
+    path = Path(path)
+    atomic_write_text(path, artifact.model_dump_json(indent=2))
+    return path
+
+
+def load_transcript_artifact(path: str | Path) -> TranscriptArtifact:
+    """Lee un artefacto escrito por ``write_transcript_artifact``.
+
+    Raises:
+        FileNotFoundError: Si no existe.
+        pydantic.ValidationError: Si no es un artefacto válido.
+    """
+    return TranscriptArtifact.model_validate_json(Path(path).read_text(encoding="utf-8"))
+
+
+def today() -> str:
+    """Fecha del día como YYYY-MM-DD, la misma que usa la nota de Obsidian."""
+    return datetime.now().strftime("%Y-%m-%d")
@@ -3,11 +3,22 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import re
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
 
-from video_tranquitor.types import AttributedSegment, PipelineConfig, PipelineResult
+from video_tranquitor.state import atomic_write_text
+from video_tranquitor.types import (
+    AnalysisResult,
+    AttributedSegment,
+    PipelineConfig,
+    PipelineResult,
+)
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_VAULT_PATH = "/home/banar/Desktop/obsidian/Farinter/07-Reuniones"
 
@@ -38,6 +49,7 @@ def _build_frontmatter(
     fecha: str,
     audio_duration_sec: float,
     participants: list[str],
+    estado: str = "completado",
 ) -> str:
     participants_yaml = (
         "[" + ", ".join(json.dumps(p) for p in participants) + "]"
@@ -46,7 +58,7 @@ def _build_frontmatter(
         "---",
         "tags: [reunion, transcripcion]",
         f"fecha: {fecha}",
-        "estado: completado",
+        f"estado: {estado}",
         f'duracion: "{_format_seconds(audio_duration_sec)}"',
         f"participantes: {participants_yaml}",
         "---",
@@ -65,12 +77,109 @@ def _build_transcription_section(transcription: list[AttributedSegment]) -> str:
     return "## Transcripción\n\n" + "\n".join(lines)
 
 
-def write_obsidian_note(result: PipelineResult, config: PipelineConfig) -> Path:
+def _build_analysis_section(
+    analysis: AnalysisResult | None,
+    pending: bool,
+    status: str,
+) -> str:
+    """Arma las secciones de análisis, o el placeholder mientras el análisis corre."""
+    if analysis is None:
+        # Sin encabezados `## ...` a propósito: una nota a la que le falta el
+        # análisis no debe parecer una nota con el análisis vacío.
+        return f"\n> {status or 'Análisis en curso…'}" if pending else ""
+
+    sections: list[str] = []
+    if status:
+        sections.append(f"\n> {status}")
+
+    if analysis.resumen:
+        sections.append("\n## Resumen\n")
+        sections.append(analysis.resumen)
+
+    # Diagrama visual del problema y la solución (Obsidian renderiza ```mermaid nativo).
+    if analysis.diagrama:
+        sections.append("\n## Diagrama\n")
+        sections.append("```mermaid\n" + analysis.diagrama + "\n```")
+
+    if analysis.requerimientos:
+        sections.append("\n## Requerimientos\n")
+        req_lines = [
+            f"- [ ] **{r.id}** ({r.prioridad}): {r.descripcion}"
+            for r in analysis.requerimientos
+        ]
+        sections.append("\n".join(req_lines))
+
+    if analysis.accionables:
+        sections.append("\n## Accionables\n")
+        ac_lines: list[str] = []
+        for a in analysis.accionables:
+            fecha_part = f" — {a.fecha}" if a.fecha else ""
+            ac_lines.append(f"- [ ] **{a.responsable}**: {a.tarea}{fecha_part}")
+        sections.append("\n".join(ac_lines))
+
+    if analysis.decisiones:
+        sections.append("\n## Decisiones\n")
+        dec_lines = [f"- {d}" for d in analysis.decisiones]
+        sections.append("\n".join(dec_lines))
+
+    return "\n".join(sections)
+
+
+def _render_sections(
+    result: PipelineResult,
+    fecha: str,
+    estado: str,
+    pending_analysis: bool,
+    analysis_status: str,
+) -> dict[str, str]:
+    """Renderiza cada sección parcheable de la nota, ya envuelta en sus marcadores."""
+    participants = _extract_participants(result.transcription)
+
+    transcription = ""
+    if result.transcription:
+        transcription = "\n" + _build_transcription_section(result.transcription)
+
+    return {
+        "frontmatter": _build_frontmatter(
+            fecha, result.audio_duration_sec, participants, estado
+        ),
+        "transcripcion": _wrap_section("transcripcion", transcription),
+        "analisis": _wrap_section(
+            "analisis",
+            _build_analysis_section(result.analysis, pending_analysis, analysis_status),
+        ),
+    }
+
+
+def _wrap_section(name: str, body: str) -> str:
+    # Comentarios HTML: Obsidian no los muestra en modo lectura, y permiten
+    # reescribir una sección sin tocar lo que el usuario haya agregado afuera.
+    return f"<!-- vt:{name} -->{body}\n<!-- /vt:{name} -->"
+
+
+def write_obsidian_note(
+    result: PipelineResult,
+    config: PipelineConfig,
+    *,
+    estado: str = "completado",
+    pending_analysis: bool = False,
+    analysis_status: str = "",
+    fecha: str | None = None,
+) -> Path:
     """Escribe una nota Markdown en el vault de Obsidian.
 
+    El pipeline la escribe apenas existe la transcripción, con ``estado``
+    en proceso y ``pending_analysis`` para dejar un placeholder en lugar del
+    análisis; las etapas siguientes la completan con ``update_obsidian_note``.
+
     Args:
-        result: Resultado completo del pipeline.
-        config: Configuración del pipeline (contiene obsidian_vault_path).
+        result:           Resultado del pipeline (completo o parcial).
+        config:           Configuración del pipeline (contiene obsidian_vault_path).
+        estado:           Valor del campo ``estado`` del frontmatter.
+        pending_analysis: Si el análisis todavía no terminó y hay que anunciarlo.
+        analysis_status:  Línea de estado que acompaña al análisis, si la hay.
+        fecha:            Fecha de la reunión (YYYY-MM-DD). Default: hoy. El
+                          reanálisis la pasa para no fechar una reunión vieja hoy.
 
     Returns:
         Ruta absoluta del archivo .md generado.
@@ -85,59 +194,83 @@ def write_obsidian_note(result: PipelineResult, config: PipelineConfig) -> Path:
             f"E_VAULT_NOT_FOUND: No se encontró la ruta del vault de Obsidian: {vault_path}"
         )
 
-    fecha = _format_date_now()
+    fecha = fecha or _format_date_now()
     base_name = Path(result.input_file).stem
     file_name = f"{fecha} {base_name}.md"
     output_path = Path(vault_path) / file_name
 
-    participants = _extract_participants(result.transcription)
+    rendered = _render_sections(result, fecha, estado, pending_analysis, analysis_status)
 
-    sections: list[str] = []
+    sections = [
+        rendered["frontmatter"],
+        f"\n# Reunión {fecha} - {base_name}\n",
+        rendered["transcripcion"],
+        rendered["analisis"],
+    ]
 
-    # Frontmatter
-    sections.append(_build_frontmatter(fecha, result.audio_duration_sec, participants))
+    content = "\n".join(sections) + "\n"
+    atomic_write_text(output_path, content)
 
-    # Título
-    sections.append(f"\n# Reunión {fecha} - {base_name}\n")
+    return output_path
 
-    # Transcripción
-    if result.transcription:
-        sections.append("\n" + _build_transcription_section(result.transcription))
-
-    # Secciones de análisis (solo si existe)
-    analysis = result.analysis
-    if analysis:
-        if analysis.resumen:
-            sections.append("\n## Resumen\n")
-            sections.append(analysis.resumen)
-
-        # Diagrama visual del problema y la solución (Obsidian renderiza ```mermaid nativo).
-        if analysis.diagrama:
-            sections.append("\n## Diagrama\n")
-            sections.append("```mermaid\n" + analysis.diagrama + "\n```")
-
-        if analysis.requerimientos:
-            sections.append("\n## Requerimientos\n")
-            req_lines = [
-                f"- [ ] **{r.id}** ({r.prioridad}): {r.descripcion}"
-                for r in analysis.requerimientos
-            ]
-            sections.append("\n".join(req_lines))
-
-        if analysis.accionables:
-            sections.append("\n## Accionables\n")
-            ac_lines: list[str] = []
-            for a in analysis.accionables:
-                fecha_part = f" — {a.fecha}" if a.fecha else ""
-                ac_lines.append(f"- [ ] **{a.responsable}**: {a.tarea}{fecha_part}")
-            sections.append("\n".join(ac_lines))
-
-        if analysis.decisiones:
-            sections.append("\n## Decisiones\n")
-            dec_lines = [f"- {d}" for d in analysis.decisiones]
-            sections.append("\n".join(dec_lines))
 
-    content = "\n".join(sections) + "\n"
-    output_path.write_text(content, encoding="utf-8")
+def update_obsidian_note(
+    note_path: str | Path,
+    result: PipelineResult,
+    sections: Iterable[str],
+    *,
+    estado: str = "completado",
+    pending_analysis: bool = False,
+    analysis_status: str = "",
+) -> Path:
+    """Reescribe solo las secciones indicadas de una nota ya escrita.
 
-    return output_path
+    Cada etapa del pipeline toca lo suyo: la diarización la transcripción y los
+    participantes, cada pasada del análisis el análisis. Lo que esté fuera de
+    los marcadores —por ejemplo, algo que el usuario agregó mientras tanto— se
+    conserva tal cual.
+
+    Args:
+        note_path: Nota generada por ``write_obsidian_note``.
+        result:    Resultado parcial con los datos de las secciones a parchear.
+        sections:  Cualquier combinación de "frontmatter", "transcripcion" y "analisis".
+
+    Returns:
+        La misma ruta de la nota.
+
+    Raises:
+        FileNotFoundError: Si la nota ya no existe.
+        ValueError:        Si se pide una sección desconocida.
+    """
+    path = Path(note_path)
+    content = path.read_text(encoding="utf-8")
+    fecha = _extract_fecha(content) or _format_date_now()
+    rendered = _render_sections(result, fecha, estado, pending_analysis, analysis_status)
+
+    for name in sections:
+        if name not in rendered:
+            raise ValueError(f"Sección de nota desconocida: {name}")
+        if name == "frontmatter":
+            pattern = re.compile(r"\A---\n.*?\n---", re.DOTALL)
+        else:
+            pattern = re.compile(
+                rf"<!-- vt:{name} -->.*?<!-- /vt:{name} -->", re.DOTALL
+            )
+        # La función de reemplazo evita que un "\1" dentro del texto transcrito
+        # se interprete como referencia a un grupo.
+        content, count = pattern.subn(lambda _m, name=name: rendered[name], content, count=1)
+        if not count:
+            logger.warning(
+                "La nota %s no tiene la sección '%s' (¿editada a mano?); no se actualiza.",
+                path,
+                name,
+            )
+
+    atomic_write_text(path, content)
+    return path
+
+
+def _extract_fecha(content: str) -> str | None:
+    """Recupera la fecha original del frontmatter para no cambiarla al parchear."""
+    match = re.search(r"^fecha: (\S+)$", content, re.MULTILINE)
+    return match.group(1) if match else None
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from video_tranquitor.aligner import align_speakers
+from video_tranquitor.aligner import align_speakers, segments_near_turns
 from video_tranquitor.types import (
     DiarizationSegment,
     WhisperResult,
@@ -298,3 +298,28 @@ class TestAlignSpeakers:
         assert len(result) == 2
         assert result[0].text == "Hola mund"
         assert result[1].text == "o listo"
+
+
+class TestSegmentsNearTurns:
+    def test_solo_los_segmentos_con_cambio_de_hablante(self) -> None:
+        result = make_whisper_result(
+            [
+                make_segment("hola a todos", 0.0, 4.0, []),
+                make_segment("arrancamos", 4.5, 9.0, []),
+                make_segment("sí, dale", 9.2, 12.0, []),
+                make_segment("sigo yo", 13.0, 20.0, []),
+            ]
+        )
+        speakers = [
+            make_speaker("SPEAKER_00", 0.0, 8.5),
+            make_speaker("SPEAKER_00", 8.6, 9.0),
+            make_speaker("SPEAKER_01", 9.4, 20.0),
+        ]
+
+        # El cambio es a los 9.2 s: cae en el segundo segmento y, con la
+        # tolerancia, también en el tercero. La pausa del mismo hablante no cuenta.
+        assert segments_near_turns(result, speakers) == [1, 2]
+
+    def test_un_solo_hablante_no_alinea_nada(self) -> None:
+        result = make_whisper_result([make_segment("hola", 0.0, 4.0, [])])
+        assert segments_near_turns(result, [make_speaker("SPEAKER_00", 0.0, 4.0)]) == []
@@ -247,3 +247,27 @@ class TestAnalisisMultiPasada:
         resultado = await analyze_transcription([_segmento()], _config(passes=2))
 
         assert resultado is not None and resultado.resumen == "p1"
+
+    # Cada pasada se publica apenas termina, para que la nota no espere a la
+    # consolidación. El resultado final no pasa por el callback.
+    async def test_publica_cada_pasada_antes_de_consolidar(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        llamadas = {"n": 0}
+
+        async def fake_llm(**_kw):
+            llamadas["n"] += 1
+            return _resultado(f"p{llamadas['n']}")
+
+        monkeypatch.setattr(analyzer_mod, "call_llm_with_schema", fake_llm)
+        publicadas: list[tuple[str, str]] = []
+
+        resultado = await analyze_transcription(
+            [_segmento()],
+            _config(passes=2),
+            on_partial=lambda r, estado: publicadas.append((r.resumen, estado)),
+        )
+
+        assert [r for r, _ in publicadas] == ["p1", "p2"]
+        assert "2 de 2" in publicadas[-1][1]
+        assert resultado is not None and resultado.resumen == "p3"
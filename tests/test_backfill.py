@@ -0,0 +1,205 @@
+"""Tests para video_tranquitor.backfill — re-transcripción reanudable del archivo."""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from video_tranquitor import backfill as backfill_mod
+from video_tranquitor.types import PipelineConfig, PipelineResult, TranscriptArtifact
+from video_tranquitor.writers.artifact_writer import (
+    artifact_path,
+    load_transcript_artifact,
+    write_transcript_artifact,
+)
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path / "output"),
+        transcriber="whisperx",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=True,
+        enable_obsidian=True,
+        enable_toon=True,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="gpt-4o-transcribe",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        backfill_gpu_share=0.25,
+    )
+
+
+@pytest.fixture
+def archivo(tmp_path):
+    raiz = tmp_path / "archivo"
+    (raiz / "2025").mkdir(parents=True)
+    for nombre in ("2025/a.mp4", "2025/b.ogg", "c.wav", "notas.txt", ".oculto.mp4"):
+        (raiz / nombre).write_bytes(b"x")
+    return raiz
+
+
+def _artefacto(config, nombre: str, fingerprint: str, nota: str | None = None) -> None:
+    Path(config.output_dir).mkdir(parents=True, exist_ok=True)
+    write_transcript_artifact(
+        TranscriptArtifact(
+            input_file=nombre,
+            fecha="2025-01-01",
+            audio_duration_sec=60.0,
+            transcriber=config.transcriber,
+            model_fingerprint=fingerprint,
+            transcription=[],
+            raw_transcriptions=[],
+            obsidian_note_path=nota,
+        ),
+        artifact_path(config.output_dir, nombre),
+    )
+
+
+class _Procesador:
+    def __init__(self, config, fallar: set[str] | None = None) -> None:
+        self.config = config
+        self.fallar = fallar or set()
+        self.llamadas: list[tuple[str, PipelineConfig]] = []
+
+    async def __call__(self, path: str, job_config: PipelineConfig) -> PipelineResult:
+        self.llamadas.append((path, job_config))
+        if any(path.endswith(f) for f in self.fallar):
+            raise RuntimeError("audio roto")
+        _artefacto(self.config, Path(path).stem, "whisperx:large-v3")
+        return PipelineResult(
+            input_file=path,
+            wav_path="",
+            transcription=[],
+            analysis=None,
+            toon_output_path=None,
+            obsidian_output_path=None,
+            duration_ms=0.0,
+            audio_duration_sec=120.0,
+            stages_run=["transcription"],
+            whisper_result=None,
+        )
+
+
+async def _sin_espera(_segundos: float) -> None:
+    return None
+
+
+class TestEnumeracion:
+    def test_recorre_subdirectorios_y_filtra_extensiones(self, archivo):
+        nombres = [p.rsplit("/", 1)[1] for p in backfill_mod.enumerate_media(str(archivo))]
+        assert nombres == ["c.wav", "a.mp4", "b.ogg"]
+
+    def test_detecta_nombres_base_repetidos(self, archivo):
+        (archivo / "2024").mkdir()
+        (archivo / "2024" / "a.wav").write_bytes(b"x")
+        media = backfill_mod.enumerate_media(str(archivo))
+        repetidos = backfill_mod.duplicate_stems(media)
+        assert list(repetidos) == ["a"]
+        assert [p.rsplit("/", 2)[1] for p in repetidos["a"]] == ["2024", "2025"]
+
+
+class TestBackfill:
+    async def test_saltea_los_que_ya_tienen_el_modelo_nuevo(self, config, archivo):
+        _artefacto(config, "a", "whisperx:large-v3")
+        _artefacto(config, "b", "whisperx:medium")
+        procesar = _Procesador(config)
+
+        await backfill_mod.run_backfill(
+            str(archivo), config, procesar, _sin_espera, apply_cpu_limit=False
+        )
+
+        procesados = sorted(p.rsplit("/", 1)[1] for p, _ in procesar.llamadas)
+        assert procesados == ["b.ogg", "c.wav"]
+
+    async def test_nombres_repetidos_frenan_antes_de_procesar(self, config, archivo):
+        (archivo / "2024").mkdir()
+        (archivo / "2024" / "a.mp4").write_bytes(b"x")
+        procesar = _Procesador(config)
+
+        with pytest.raises(ValueError, match="2024/a.mp4"):
+            await backfill_mod.run_backfill(
+                str(archivo), config, procesar, _sin_espera, apply_cpu_limit=False
+            )
+        assert procesar.llamadas == []
+
+    async def test_solo_transcribe(self, config, archivo):
+        procesar = _Procesador(config)
+        await backfill_mod.run_backfill(
+            str(archivo), config, procesar, _sin_espera, apply_cpu_limit=False
+        )
+        _, job_config = procesar.llamadas[0]
+        assert not job_config.enable_analysis
+        assert not job_config.enable_obsidian
+        assert job_config.enable_toon
+
+    async def test_retoma_desde_el_journal(self, config, archivo):
+        procesar = _Procesador(config, fallar={"c.wav"})
+        await backfill_mod.run_backfill(
+            str(archivo), config, procesar, _sin_espera, apply_cpu_limit=False
+        )
+        assert len(procesar.llamadas) == 3
+
+        # Sin artefactos en output, el journal alcanza para no repetir; el que
+        # falló se reintenta.
+        shutil.rmtree(config.output_dir)
+        segundo = _Procesador(config)
+        journal = await backfill_mod.run_backfill(
+            str(archivo), config, segundo, _sin_espera, apply_cpu_limit=False
+        )
+        assert [p.rsplit("/", 1)[1] for p, _ in segundo.llamadas] == ["c.wav"]
+        assert len(journal.done) == 3
+
+    async def test_cambiar_de_modelo_arranca_de_cero(self, config, archivo):
+        await backfill_mod.run_backfill(
+            str(archivo), config, _Procesador(config), _sin_espera, apply_cpu_limit=False
+        )
+        nuevo = config.model_copy(update={"whisperx_model": "large-v3-turbo"})
+        procesar = _Procesador(nuevo)
+        await backfill_mod.run_backfill(
+            str(archivo), nuevo, procesar, _sin_espera, apply_cpu_limit=False
+        )
+        assert len(procesar.llamadas) == 3
+
+    async def test_descansa_segun_la_cuota_de_gpu(self, config, archivo, monkeypatch):
+        esperas: list[float] = []
+
+        async def dormir(segundos: float) -> None:
+            esperas.append(segundos)
+
+        reloj = iter(range(0, 1000, 10))
+        monkeypatch.setattr(backfill_mod.time, "time", lambda: float(next(reloj)))
+
+        await backfill_mod.run_backfill(
+            str(archivo), config, _Procesador(config), dormir, apply_cpu_limit=False
+        )
+
+        # 10 s de trabajo con 25% de GPU → 30 s de descanso; el último no espera.
+        assert esperas == [30.0, 30.0]
+
+    async def test_conserva_el_vinculo_a_la_nota(self, config, archivo):
+        _artefacto(config, "a", "whisperx:medium", nota="/vault/a.md")
+        await backfill_mod.run_backfill(
+            str(archivo), config, _Procesador(config), _sin_espera, apply_cpu_limit=False
+        )
+        artefacto = load_transcript_artifact(artifact_path(config.output_dir, "a"))
+        assert artefacto.model_fingerprint == "whisperx:large-v3"
+        assert artefacto.obsidian_note_path == "/vault/a.md"
+
+
+class TestCuota:
+    def test_ciclo_de_trabajo(self):
+        assert backfill_mod.duty_cycle_pause(10, 0.5) == pytest.approx(10)
+        assert backfill_mod.duty_cycle_pause(10, 1.0) == 0.0
@@ -0,0 +1,91 @@
+"""Tests para video_tranquitor.transcribers.chunk_store y su uso en el transcriptor de OpenAI."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from video_tranquitor.transcribers import openai_api
+from video_tranquitor.transcribers.chunk_store import ChunkStore
+
+
+@pytest.fixture
+def audio(tmp_path):
+    ruta = tmp_path / "temp_reunion.wav"
+    ruta.write_bytes(b"RIFF" + b"\x01" * 64)
+    return ruta
+
+
+class TestChunkStore:
+    def test_guarda_y_recupera_un_chunk(self, tmp_path, audio) -> None:
+        store = ChunkStore.for_audio(tmp_path / "cache", str(audio), "gpt-4o-transcribe")
+        store.put(120_000, 120_000, {"text": "hola"})
+
+        otra_corrida = ChunkStore.for_audio(tmp_path / "cache", str(audio), "gpt-4o-transcribe")
+
+        assert otra_corrida.get(120_000, 120_000) == {"text": "hola"}
+        assert otra_corrida.get(0, 120_000) is None
+
+    def test_otro_modelo_u_opciones_no_reusan_el_checkpoint(self, tmp_path, audio) -> None:
+        ChunkStore.for_audio(tmp_path, str(audio), "whisper-1", "es").put(0, 1, {"text": "x"})
+
+        assert ChunkStore.for_audio(tmp_path, str(audio), "gpt-4o", "es").get(0, 1) is None
+        assert ChunkStore.for_audio(tmp_path, str(audio), "whisper-1", "en").get(0, 1) is None
+
+    def test_otro_audio_no_reusa_el_checkpoint(self, tmp_path, audio) -> None:
+        ChunkStore.for_audio(tmp_path, str(audio), "m").put(0, 1, {"text": "x"})
+        audio.write_bytes(b"RIFF" + b"\x02" * 64)
+
+        assert ChunkStore.for_audio(tmp_path, str(audio), "m").get(0, 1) is None
+
+
+class TestReanudacionOpenAI:
+    # El caso que motivó el store: la corrida muere en el chunk 2 de 3 por
+    # cuota. El reintento no debe volver a pagar el chunk 1.
+    def test_el_reintento_solo_pide_los_chunks_que_faltan(
+        self, tmp_path, audio, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setitem(
+            sys.modules, "openai", types.SimpleNamespace(OpenAI=lambda **_kw: object())
+        )
+        monkeypatch.setattr(openai_api, "get_audio_duration", lambda _p: 300.0)
+        monkeypatch.setattr(openai_api.time, "sleep", lambda _s: None)
+
+        def ffmpeg(cmd, **_kw):
+            with open(cmd[-1], "wb") as f:
+                f.write(b"chunk")
+            return subprocess.CompletedProcess(cmd, 0)
+
+        monkeypatch.setattr(openai_api.subprocess, "run", ffmpeg)
+
+        pedidos: list[str] = []
+
+        def api_con_cuota(ruta, *_a):
+            pedidos.append(ruta)
+            # Los chunks se suben a la vez: falla el segundo del audio, no el
+            # segundo pedido.
+            return {"chunk_0.wav": "texto 1", "chunk_240000.wav": "texto 3"}.get(
+                Path(ruta).name
+            )
+
+        monkeypatch.setattr(openai_api, "_transcribe_chunk", api_con_cuota)
+        cache = str(tmp_path / "cache")
+
+        primera = openai_api.transcribe_openai(
+            str(audio), "sk", "gpt-4o-transcribe", "", 16000, "es", cache
+        )
+        assert [t.texto for t in primera] == ["texto 1", "texto 3"]
+
+        pedidos.clear()
+        monkeypatch.setattr(openai_api, "_transcribe_chunk", lambda ruta, *_a: "recuperado")
+
+        segunda = openai_api.transcribe_openai(
+            str(audio), "sk", "gpt-4o-transcribe", "", 16000, "es", cache
+        )
+
+        assert [t.texto for t in segunda] == ["texto 1", "recuperado", "texto 3"]
+        assert [t.inicio for t in segunda] == ["00:00:00", "00:02:00", "00:04:00"]
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
-from video_tranquitor.transcribers.chunking import result_to_transcriptions
-from video_tranquitor.types import WhisperResult, WhisperSegment
+from video_tranquitor.transcribers.chunking import (
+    StreamingChunker,
+    result_to_transcriptions,
+    shift_segments,
+)
+from video_tranquitor.types import WhisperResult, WhisperSegment, WhisperWord
 
 
 def make_result(*tramos: tuple[str, float, float]) -> WhisperResult:
@@ -73,3 +77,32 @@ class TestResultToTranscriptions:
         desde_wx = whisperx_result_to_transcriptions(resultado, 120)
 
         assert [(t.inicio, t.fin) for t in desde_cpp] == [(t.inicio, t.fin) for t in desde_wx]
+
+
+class TestShiftSegments:
+    def test_corre_segmentos_y_palabras(self) -> None:
+        seg = WhisperSegment(
+            text="hola", start=1.0, end=2.0, words=[WhisperWord(word="hola", start=1.0, end=2.0)]
+        )
+
+        (corrido,) = shift_segments([seg], 600.0)
+
+        assert (corrido.start, corrido.end) == (601.0, 602.0)
+        assert (corrido.words[0].start, corrido.words[0].end) == (601.0, 602.0)
+        assert seg.start == 1.0
+
+
+class TestStreamingChunker:
+    def test_da_lo_mismo_que_result_to_transcriptions(self) -> None:
+        resultado = make_result(
+            ("uno", 3.0, 10.0),
+            ("dos", 119.0, 125.0),
+            ("tres", 130.0, 140.0),
+            ("cuatro", 500.0, 512.0),
+        )
+        chunker = StreamingChunker(120)
+
+        cerrados = [c for seg in resultado.segments if (c := chunker.add(seg)) is not None]
+
+        assert [c.inicio for c in cerrados] == ["00:00:00", "00:02:00"]
+        assert chunker.finish() == result_to_transcriptions(resultado, 120)
@@ -338,3 +338,41 @@ class TestValidacionDeEsfuerzoPorProveedor:
 
         with pytest.raises(ValueError, match="tiene que ser 1 o más"):
             self._load()
+
+
+class TestStreamingYTramos:
+    _set_minimal_valid_env = TestLoadConfig._set_minimal_valid_env
+    _clear_env = TestLoadConfig._clear_env
+    _load = TestLoadConfig._load
+
+    def test_stream_con_tramos_se_rechaza(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._clear_env(monkeypatch)
+        monkeypatch.setenv("TRANSCRIBER", "local")
+        monkeypatch.setenv("WHISPER_CPP_PATH", "/bin/whisper-cli")
+        monkeypatch.setenv("WHISPER_MODEL_PATH", "/models/ggml.bin")
+        monkeypatch.setenv("WHISPER_STREAM", "true")
+        monkeypatch.setenv("WHISPER_SHARDS", "4")
+
+        with pytest.raises(ValueError, match="WHISPER_STREAM=true no se puede combinar"):
+            self._load()
+
+
+class TestChunksDeOpenAI:
+    _set_minimal_valid_env = TestLoadConfig._set_minimal_valid_env
+    _clear_env = TestLoadConfig._clear_env
+    _load = TestLoadConfig._load
+
+    def test_wav_no_pasa_de_780_segundos(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._set_minimal_valid_env(monkeypatch)
+        monkeypatch.setenv("OPENAI_UPLOAD_CODEC", "wav")
+        monkeypatch.setenv("OPENAI_CHUNK_SEC", "1400")
+
+        with pytest.raises(ValueError, match="máximo 780 segundos"):
+            self._load()
+
+    def test_comprimido_acepta_chunks_largos(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        self._set_minimal_valid_env(monkeypatch)
+        monkeypatch.setenv("OPENAI_UPLOAD_CODEC", "flac")
+        monkeypatch.setenv("OPENAI_CHUNK_SEC", "1400")
+
+        assert self._load().openai_chunk_sec == 1400
@@ -0,0 +1,137 @@
+"""Tests para el transcriptor de faster-whisper (CTranslate2 directo)."""
+
+from __future__ import annotations
+
+import sys
+import types
+
+import pytest
+
+from video_tranquitor.aligner import align_speakers
+from video_tranquitor.transcribers import fasterwhisper
+from video_tranquitor.transcribers.fasterwhisper import transcribe_faster_whisper
+from video_tranquitor.types import DiarizationSegment, PipelineConfig
+
+
+def _config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="faster-whisper",
+        whisperx_model="",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=True,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        cpu_threads=4,
+    )
+
+
+def _word(word: str, start: float, end: float):
+    return types.SimpleNamespace(word=word, start=start, end=end, probability=0.9)
+
+
+@pytest.fixture
+def faster_whisper_falso(monkeypatch) -> dict:
+    """Un faster_whisper que registra cómo se lo carga y se lo llama."""
+    registro: dict = {"cargas": []}
+
+    class WhisperModel:
+        def __init__(self, model, device, compute_type, cpu_threads):
+            registro["cargas"].append((model, device, compute_type, cpu_threads))
+
+        def transcribe(self, audio, **kwargs):
+            registro["kwargs"] = kwargs
+            segments = [
+                types.SimpleNamespace(
+                    text=" Hola equipo.",
+                    start=0.0,
+                    end=1.0,
+                    words=[_word(" Hola", 0.0, 0.4), _word(" equipo.", 0.5, 1.0)],
+                ),
+                types.SimpleNamespace(
+                    text=" Buen día.",
+                    start=2.0,
+                    end=3.0,
+                    words=[_word(" Buen", 2.0, 2.4), _word(" día.", 2.5, 3.0)],
+                ),
+            ]
+            return iter(segments), types.SimpleNamespace(language="es")
+
+    mod = types.ModuleType("faster_whisper")
+    mod.WhisperModel = WhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", mod)
+    monkeypatch.setattr(fasterwhisper, "read_whisper_audio", lambda path: None)
+    monkeypatch.setattr(fasterwhisper, "_model", None)
+    monkeypatch.setattr(fasterwhisper, "_model_key", None)
+    return registro
+
+
+class TestTranscribeFasterWhisper:
+    def test_palabras_con_vad_listas_para_diarizar(self, tmp_path, faster_whisper_falso):
+        result = transcribe_faster_whisper("nota.wav", _config(tmp_path))
+
+        assert faster_whisper_falso["kwargs"] == {
+            "language": "es",
+            "vad_filter": True,
+            "word_timestamps": True,
+        }
+        assert [s.text for s in result.segments] == ["Hola equipo.", "Buen día."]
+        # align_speakers las usa tal cual, como las de whisper.cpp.
+        atribuidos = align_speakers(
+            result,
+            [
+                DiarizationSegment(speaker="SPEAKER_00", start=0.0, end=1.2),
+                DiarizationSegment(speaker="SPEAKER_01", start=1.8, end=3.2),
+            ],
+        )
+        assert [(a.speaker, a.text) for a in atribuidos] == [
+            ("SPEAKER_00", "Hola equipo."),
+            ("SPEAKER_01", "Buen día."),
+        ]
+
+    def test_sin_diarizacion_no_pide_palabras(self, tmp_path, faster_whisper_falso):
+        config = _config(tmp_path).model_copy(update={"enable_diarization": False})
+        result = transcribe_faster_whisper("nota.wav", config)
+
+        assert faster_whisper_falso["kwargs"]["word_timestamps"] is False
+        assert result.segments[0].words == []
+
+    def test_el_modelo_queda_residente(self, tmp_path, faster_whisper_falso):
+        config = _config(tmp_path)
+        transcribe_faster_whisper("a.wav", config)
+        transcribe_faster_whisper("b.wav", config)
+        transcribe_faster_whisper(
+            "c.wav", config.model_copy(update={"faster_whisper_compute_type": "float32"})
+        )
+
+        assert faster_whisper_falso["cargas"] == [
+            ("large-v3-turbo", "cpu", "int8", 4),
+            ("large-v3-turbo", "cpu", "float32", 4),
+        ]
+
+    def test_otro_lease_recarga_con_sus_hilos(self, tmp_path, faster_whisper_falso):
+        config = _config(tmp_path)
+        fasterwhisper.get_model(config, 16)
+        fasterwhisper.get_model(config, 16)
+        fasterwhisper.get_model(config, 8)
+
+        assert [carga[3] for carga in faster_whisper_falso["cargas"]] == [16, 8]
+
+    def test_sin_faster_whisper_explica_como_instalarlo(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "faster_whisper", None)
+        monkeypatch.setattr(fasterwhisper, "_model", None)
+
+        with pytest.raises(RuntimeError, match="--extra fasterwhisper"):
+            transcribe_faster_whisper("nota.wav", _config(tmp_path))
@@ -0,0 +1,163 @@
+"""Tests para video_tranquitor.live — transcripción por ventanas de un stream."""
+
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+
+import pytest
+
+from video_tranquitor import live
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+from video_tranquitor.writers.artifact_writer import artifact_path, load_transcript_artifact
+
+SR = 16000
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path / "output"),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path="/bin/whisper-cli",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=True,
+        enable_toon=True,
+        obsidian_vault_path=str(vault),
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=SR,
+        cache_dir=str(tmp_path / "cache"),
+        live_window_sec=20,
+    )
+
+
+def _pcm(seconds: float, amplitude: int = 1000) -> bytes:
+    return array("h", [amplitude] * int(seconds * SR)).tobytes()
+
+
+class _Whisper:
+    """Devuelve un segmento por ventana, con tiempos relativos a la ventana."""
+
+    def __init__(self) -> None:
+        self.ventanas: list[float] = []
+
+    def __call__(self, pcm: bytes, sample_rate: int) -> WhisperResult:
+        dur = len(pcm) / (2 * sample_rate)
+        self.ventanas.append(dur)
+        n = len(self.ventanas)
+        return WhisperResult(
+            segments=[
+                WhisperSegment(
+                    text=f"ventana {n}",
+                    start=1.0,
+                    end=dur - 1.0,
+                    words=[WhisperWord(word="ventana", start=1.0, end=2.0)],
+                )
+            ],
+            language="es",
+        )
+
+
+class TestCorte:
+    def test_corta_en_el_silencio(self):
+        pcm = _pcm(19) + _pcm(0.1, amplitude=0) + _pcm(0.9)
+        cut = live.quietest_cut(pcm, len(pcm), SR)
+        assert 19.0 <= cut / (2 * SR) <= 19.1
+
+    def test_sin_silencio_no_pasa_del_final(self):
+        pcm = _pcm(20)
+        assert 0 < live.quietest_cut(pcm, len(pcm), SR) <= len(pcm)
+
+
+class TestSesion:
+    def test_desplaza_los_tiempos_al_lugar_de_la_grabacion(self, config):
+        whisper = _Whisper()
+        sesion = live.LiveSession("reunion", config, whisper)
+        for _ in range(5):
+            sesion.feed(_pcm(10))
+            if sesion.ready():
+                sesion.flush()
+        sesion.close()
+
+        assert sum(whisper.ventanas) == pytest.approx(50)
+        inicio_segunda = whisper.ventanas[0]
+        assert sesion.segments[1].start == pytest.approx(inicio_segunda + 1.0)
+        assert sesion.segments[1].words[0].start == pytest.approx(inicio_segunda + 1.0)
+
+    def test_publica_toon_y_nota_en_cada_ventana(self, config):
+        sesion = live.LiveSession("reunion", config, _Whisper())
+        sesion.feed(_pcm(25))
+        sesion.flush()
+
+        toon = Path(config.output_dir) / "reunion_transcription.toon"
+        assert "ventana 1" in toon.read_text(encoding="utf-8")
+        nota = sesion.note_path.read_text(encoding="utf-8")
+        assert "estado: en-proceso" in nota
+
+        sesion.feed(_pcm(25))
+        sesion.flush()
+        assert "ventana 2" in sesion.note_path.read_text(encoding="utf-8")
+
+    def test_usa_la_grilla_del_pipeline(self, config):
+        sesion = live.LiveSession("reunion", config, _Whisper())
+        for _ in range(15):
+            sesion.feed(_pcm(20))
+            sesion.flush()
+        sesion.close()
+        assert [t.inicio for t in sesion.transcriptions] == ["00:00:00", "00:02:00", "00:04:00"]
+
+    def test_al_cerrar_deja_el_artefacto_y_la_nota_completa(self, config):
+        sesion = live.LiveSession("reunion", config, _Whisper())
+        sesion.feed(_pcm(8))
+        sesion.close()
+
+        artefacto = load_transcript_artifact(artifact_path(config.output_dir, "reunion"))
+        assert artefacto.transcriber == "local"
+        assert artefacto.raw_transcriptions[0].texto == "ventana 1"
+        assert "estado: completado" in sesion.note_path.read_text(encoding="utf-8")
+
+    def test_mide_el_atraso_desde_la_llegada_del_audio(self, config):
+        reloj = iter([0.0, 10.0, 20.0, 27.0])
+        sesion = live.LiveSession("reunion", config, _Whisper(), clock=lambda: next(reloj))
+        sesion.feed(_pcm(10))
+        sesion.feed(_pcm(10))
+        sesion.feed(_pcm(10))
+        sesion.flush()
+        # La ventana cortó cerca de los 20 s, audio que llegó en t=10.
+        assert sesion.lags == [pytest.approx(17.0)]
+
+    def test_si_se_atrasa_junta_lo_pendiente(self, config):
+        whisper = _Whisper()
+        sesion = live.LiveSession("reunion", config, whisper)
+        sesion.feed(_pcm(70))
+        sesion.flush()
+        assert 58 <= whisper.ventanas[0] <= 60
+
+
+class TestRunLive:
+    def test_con_backend_cli_explica_que_hace_falta_el_residente(self, config):
+        config = config.model_copy(update={"whisper_backend": "cli"})
+
+        with pytest.raises(ValueError, match="WHISPER_BACKEND=server"):
+            live.run_live("-", config, name="stdin")
+
+    def test_transcribe_todo_lo_que_llega_por_stdin(self, config, monkeypatch):
+        monkeypatch.setattr(live, "pcm_from_stdin", lambda _sr: iter([_pcm(0.5)] * 90))
+        whisper = _Whisper()
+
+        sesion = live.run_live("-", config, name="stdin", transcribe=whisper)
+
+        assert sum(whisper.ventanas) == pytest.approx(45)
+        assert sesion.toon_path == Path(config.output_dir) / "stdin_transcription.toon"
+        assert sesion.toon_path.exists()
@@ -0,0 +1,208 @@
+"""Tests para los micro-batches de notas cortas con WhisperX."""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import sys
+import types
+
+import pytest
+
+from video_tranquitor import watcher
+from video_tranquitor.transcribers import microbatch
+from video_tranquitor.transcribers.microbatch import run_micro_batch, transcribe_whisperx_batched
+from video_tranquitor.transcribers.whisperx import (
+    BATCH_GAP_SEC,
+    split_packed,
+    transcribe_whisperx_batch,
+)
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+
+
+def _config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="whisperx",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        whisperx_microbatch_sec=1.0,
+    )
+
+
+class TestSplitPacked:
+    def test_cada_segmento_vuelve_a_su_archivo_desde_cero(self):
+        segundo = 10 + BATCH_GAP_SEC
+        packed = WhisperResult(
+            segments=[
+                WhisperSegment(text="uno", start=1.0, end=4.0),
+                WhisperSegment(
+                    text="dos",
+                    start=segundo + 0.5,
+                    end=segundo + 2.0,
+                    words=[WhisperWord(word="dos", start=segundo + 0.5, end=segundo + 1.0)],
+                ),
+                # El relleno del VAD puede empezar un poco antes del archivo.
+                WhisperSegment(text="tres", start=segundo - 0.2, end=segundo + 0.4),
+            ],
+            language="es",
+        )
+
+        primero, segundo_result = split_packed(packed, [0.0, segundo])
+
+        assert [s.text for s in primero.segments] == ["uno"]
+        assert [s.text for s in segundo_result.segments] == ["dos", "tres"]
+        assert segundo_result.segments[0].start == pytest.approx(0.5)
+        assert segundo_result.segments[0].words[0].end == pytest.approx(1.0)
+
+
+class TestTranscribeWhisperXBatch:
+    def test_una_pasada_con_las_notas_separadas_por_silencio(self, tmp_path, monkeypatch):
+        np = pytest.importorskip("numpy")
+        llamadas: list[int] = []
+
+        class ModeloFalso:
+            def transcribe(self, audio, **_kwargs):
+                # Un segmento por tramo con sonido, como haría el VAD.
+                llamadas.append(len(audio))
+                voz = np.flatnonzero(audio)
+                cortes = np.flatnonzero(np.diff(voz) > 1)
+                inicios = [voz[0], *voz[cortes + 1]]
+                finales = [*voz[cortes], voz[-1]]
+                segments = [
+                    {"text": f"{(b - a + 1) / 16000:.0f}s", "start": a / 16000, "end": b / 16000}
+                    for a, b in zip(inicios, finales, strict=True)
+                ]
+                return {"segments": segments}
+
+        whisperx = types.ModuleType("whisperx")
+        whisperx.load_model = lambda *a, **kw: ModeloFalso()
+        whisperx.load_align_model = lambda **kw: (_ for _ in ()).throw(RuntimeError("sin"))
+        torch = types.ModuleType("torch")
+        torch.cuda = types.SimpleNamespace(is_available=lambda: False, empty_cache=lambda: None)
+        torch.get_num_threads = lambda: 4
+        torch.set_num_threads = lambda n: None
+        monkeypatch.setitem(sys.modules, "whisperx", whisperx)
+        monkeypatch.setitem(sys.modules, "torch", torch)
+
+        notas = [np.full(16000 * s, 0.1, dtype=np.float32) for s in (20, 45, 30)]
+        results = transcribe_whisperx_batch(
+            ["a.wav", "b.wav", "c.wav"], _config(tmp_path), audios=notas
+        )
+
+        assert len(llamadas) == 1
+        assert [[s.text for s in r.segments] for r in results] == [["20s"], ["45s"], ["30s"]]
+        assert [r.segments[0].start for r in results] == [0.0, 0.0, 0.0]
+
+
+class TestMicroBatch:
+    async def test_las_notas_se_transcriben_juntas(self, tmp_path, monkeypatch):
+        config = _config(tmp_path)
+        pasadas: list[list[str]] = []
+
+        def fake_batch(paths, cfg, model_size):
+            pasadas.append(paths)
+            return [
+                WhisperResult(segments=[WhisperSegment(text=p, start=0, end=1)], language="es")
+                for p in paths
+            ]
+
+        monkeypatch.setattr(microbatch, "transcribe_batch_in_worker", fake_batch)
+        textos: dict[str, str] = {}
+
+        async def pipeline(path: str) -> None:
+            # Cada nota tarda distinto en llegar a la transcripción.
+            await asyncio.sleep(0.01 * len(path))
+            if path == "rota.ogg":
+                raise RuntimeError("no se pudo preprocesar")
+            result = await transcribe_whisperx_batched(f"{path}.wav", config, "large-v3")
+            textos[path] = result.segments[0].text
+
+        errores = await run_micro_batch(["a.ogg", "rota.ogg", "bb.ogg"], pipeline)
+
+        assert pasadas == [["a.ogg.wav", "bb.ogg.wav"]]
+        assert textos == {"a.ogg": "a.ogg.wav", "bb.ogg": "bb.ogg.wav"}
+        assert [type(e).__name__ if e else None for e in errores] == [
+            None,
+            "RuntimeError",
+            None,
+        ]
+
+    async def test_fuera_de_un_batch_va_directo_al_worker(self, tmp_path, monkeypatch):
+        resultado = WhisperResult(segments=[], language="es")
+        monkeypatch.setattr(microbatch, "transcribe_in_worker", lambda *a: resultado)
+        monkeypatch.setattr(microbatch, "transcribe_batch_in_worker", pytest.fail)
+
+        assert await transcribe_whisperx_batched("a.wav", _config(tmp_path), "x") is resultado
+
+    async def test_si_falla_la_pasada_falla_cada_nota(self, tmp_path, monkeypatch):
+        config = _config(tmp_path)
+
+        def fake_batch(paths, cfg, model_size):
+            raise RuntimeError("WhisperX falló: sin VRAM")
+
+        monkeypatch.setattr(microbatch, "transcribe_batch_in_worker", fake_batch)
+
+        async def pipeline(path: str) -> None:
+            await transcribe_whisperx_batched(path, config, "large-v3")
+
+        errores = await run_micro_batch(["a.ogg", "b.ogg"], pipeline)
+
+        assert [str(e) for e in errores] == ["WhisperX falló: sin VRAM"] * 2
+
+
+class TestCollectBatch:
+    async def test_junta_las_cortas_y_aparta_las_largas(self, tmp_path, monkeypatch):
+        duraciones = {"a.ogg": 30, "b.ogg": 40, "reunion.mp4": 3600, "c.ogg": 20}
+        monkeypatch.setattr(
+            watcher, "get_audio_duration", lambda path, warn_on_failure: duraciones[path]
+        )
+        cola: queue.Queue[str] = queue.Queue()
+        for path in ("b.ogg", "reunion.mp4", "c.ogg"):
+            cola.put(path)
+        apartados: list[str] = []
+
+        batch = await watcher._collect_batch("a.ogg", cola, _config(tmp_path), apartados)
+
+        assert batch == ["a.ogg", "b.ogg", "c.ogg"]
+        assert apartados == ["reunion.mp4"]
+
+    async def test_despues_del_asr_siguen_con_tope(self, tmp_path, monkeypatch):
+        config = _config(tmp_path)
+        monkeypatch.setattr(
+            microbatch,
+            "transcribe_batch_in_worker",
+            lambda paths, cfg, size: [WhisperResult(segments=[], language="es") for _ in paths],
+        )
+        en_curso = 0
+        maximo = 0
+
+        async def pipeline(path: str) -> None:
+            nonlocal en_curso, maximo
+            await transcribe_whisperx_batched(path, config, "large-v3")
+            en_curso += 1
+            maximo = max(maximo, en_curso)
+            # Diarización y análisis de la nota.
+            await asyncio.sleep(0.01)
+            en_curso -= 1
+
+        notas = [f"{i}.ogg" for i in range(6)]
+        errores = await run_micro_batch(notas, pipeline, post_asr_limit=2)
+
+        assert errores == [None] * 6
+        assert maximo == 2
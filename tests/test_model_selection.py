@@ -0,0 +1,123 @@
+"""Tests para video_tranquitor.model_selection — elección del ggml por archivo."""
+
+from __future__ import annotations
+
+import pytest
+
+from video_tranquitor import model_selection
+from video_tranquitor.model_selection import ModelCalibration
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path / "output"),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path="",
+        whisper_model_path=str(tmp_path / "models" / "ggml-large-v3-turbo.bin"),
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        whisper_latency_target_sec=60.0,
+    )
+
+
+def _models() -> list[ModelCalibration]:
+    return [
+        ModelCalibration(path="/m/turbo.bin", size=1, rtf=0.5, agreement=1.0, reference=True),
+        ModelCalibration(path="/m/turbo-q8.bin", size=1, rtf=0.3, agreement=0.97),
+        ModelCalibration(path="/m/turbo-q5.bin", size=1, rtf=0.2, agreement=0.93),
+        ModelCalibration(path="/m/tiny.bin", size=1, rtf=0.02, agreement=0.6),
+    ]
+
+
+class TestAgreement:
+    def test_textos_iguales_salvo_puntuacion_y_mayusculas(self):
+        assert model_selection.agreement("Hola, mundo.", "hola mundo") == 1.0
+
+    def test_una_palabra_cambiada_de_cuatro(self):
+        assert model_selection.agreement("la casa es azul", "la casa es roja") == 0.75
+
+    def test_nunca_baja_de_cero(self):
+        assert model_selection.agreement("a b c d e f", "x") == 0.0
+
+
+class TestSelectModel:
+    def test_nota_corta_usa_el_modelo_completo(self, config):
+        chosen = model_selection.select_model(60, config, _models(), queued_sec=0)
+        assert chosen.path == "/m/turbo.bin"
+
+    def test_archivo_largo_baja_al_mas_preciso_que_llega(self, config):
+        # 250 s de audio: turbo tardaría 125 s, q8 75 s y q5 50 s.
+        chosen = model_selection.select_model(250, config, _models(), queued_sec=0)
+        assert chosen.path == "/m/turbo-q5.bin"
+
+    def test_la_cola_cuenta_para_el_objetivo(self, config):
+        sola = model_selection.select_model(100, config, _models(), queued_sec=0)
+        en_rafaga = model_selection.select_model(100, config, _models(), queued_sec=100)
+        assert sola.path == "/m/turbo.bin"
+        assert en_rafaga.path == "/m/turbo-q8.bin"
+
+    def test_si_nada_llega_usa_el_mas_rapido_aceptable(self, config):
+        chosen = model_selection.select_model(10_000, config, _models(), queued_sec=0)
+        assert chosen.path == "/m/turbo-q5.bin"
+
+    def test_apagado_sin_objetivo(self, config):
+        config = config.model_copy(update={"whisper_latency_target_sec": 0.0})
+        assert model_selection.select_model(60, config, _models(), queued_sec=0) is None
+
+    def test_sin_calibracion_no_cambia_el_config(self, config):
+        assert model_selection.config_for_file(60, config) is config
+
+
+class TestCalibrateModels:
+    def test_mide_cada_modelo_contra_el_mas_grande(self, config, tmp_path, monkeypatch):
+        models_dir = tmp_path / "models"
+        models_dir.mkdir()
+        (models_dir / "ggml-large-v3-turbo.bin").write_bytes(b"x" * 300)
+        (models_dir / "ggml-large-v3-turbo-q5_0.bin").write_bytes(b"x" * 100)
+        (models_dir / "ggml-silero-v5.1.2.bin").write_bytes(b"x" * 10)
+        sample = tmp_path / "muestra.mp3"
+        sample.write_bytes(b"")
+
+        textos = {
+            "ggml-large-v3-turbo.bin": "la casa es azul",
+            "ggml-large-v3-turbo-q5_0.bin": "la casa es roja",
+        }
+
+        def fake_cli(audio_path, cfg, lease=None, quiet=False):
+            name = cfg.whisper_model_path.rsplit("/", 1)[-1]
+            segment = WhisperSegment(text=textos[name], start=0.0, end=1.0)
+            return WhisperResult(segments=[segment], language="es")
+
+        monkeypatch.setattr(model_selection, "preprocess_audio", lambda *a: True)
+        monkeypatch.setattr(model_selection, "slice_wav", lambda *a: None)
+        monkeypatch.setattr(model_selection, "wav_duration", lambda path: 120.0)
+        monkeypatch.setattr(model_selection, "run_whisper_cli", fake_cli)
+
+        results = model_selection.calibrate_models(str(sample), config)
+
+        assert [r.path.rsplit("/", 1)[-1] for r in results] == list(textos)
+        assert results[0].reference and results[0].agreement == 1.0
+        assert results[1].agreement == 0.75
+
+        guardados = model_selection.load_model_calibration(config)
+        assert {m.path for m in guardados} == {r.path for r in results}
+
+        # Un modelo pisado por otra versión deja de contar hasta recalibrar.
+        (models_dir / "ggml-large-v3-turbo-q5_0.bin").write_bytes(b"x" * 120)
+        guardados = model_selection.load_model_calibration(config)
+        assert [m.reference for m in guardados] == [True]
@@ -18,7 +18,7 @@ from video_tranquitor.types import (
     PipelineResult,
     Requirement,
 )
-from video_tranquitor.writers.obsidian_writer import write_obsidian_note
+from video_tranquitor.writers.obsidian_writer import update_obsidian_note, write_obsidian_note
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -361,3 +361,71 @@ class TestWriteObsidianNote:
 
         assert "## Diagrama" not in content
         assert "```mermaid" not in content
+
+
+class TestNotaTempranaYParches:
+    # La nota se escribe apenas existe la transcripción. Mientras el análisis
+    # corre hay un aviso, pero ningún encabezado de análisis vacío.
+    def test_placeholder_de_analisis_sin_encabezados(self, tmp_path: Path) -> None:
+        result = make_result(analysis=None, override_analysis=False)
+
+        output_path = write_obsidian_note(
+            result, make_config(str(tmp_path)), estado="en-proceso", pending_analysis=True
+        )
+        content = output_path.read_text(encoding="utf-8")
+
+        assert "estado: en-proceso" in content
+        assert "Análisis en curso" in content
+        assert "## Resumen" not in content
+
+    def test_parchea_solo_el_analisis(self, tmp_path: Path) -> None:
+        temprana = make_result(analysis=None, override_analysis=False)
+        output_path = write_obsidian_note(
+            temprana, make_config(str(tmp_path)), estado="en-proceso", pending_analysis=True
+        )
+
+        # Otra transcripción en el resultado: no debe aparecer porque solo se
+        # pide la sección de análisis.
+        final = make_result(transcription=[make_segment("SPEAKER_09", "Otro texto", 0, 1)])
+        update_obsidian_note(output_path, final, ("analisis",), estado="en-proceso")
+        content = output_path.read_text(encoding="utf-8")
+
+        assert "## Resumen" in content
+        assert "Análisis en curso" not in content
+        assert "Buenos dias a todos" in content
+        assert "Otro texto" not in content
+        assert "estado: en-proceso" in content
+
+    def test_conserva_lo_que_el_usuario_agrego_fuera_de_las_secciones(
+        self, tmp_path: Path
+    ) -> None:
+        output_path = write_obsidian_note(
+            make_result(analysis=None, override_analysis=False),
+            make_config(str(tmp_path)),
+            pending_analysis=True,
+        )
+        output_path.write_text(
+            output_path.read_text(encoding="utf-8") + "\nMis notas a mano\n",
+            encoding="utf-8",
+        )
+
+        update_obsidian_note(output_path, make_result(), ("frontmatter", "analisis"))
+        content = output_path.read_text(encoding="utf-8")
+
+        assert "Mis notas a mano" in content
+        assert "estado: completado" in content
+        assert "## Decisiones" in content
+
+    def test_el_texto_transcrito_no_se_interpreta_como_regex(self, tmp_path: Path) -> None:
+        output_path = write_obsidian_note(make_result(), make_config(str(tmp_path)))
+
+        result = make_result(transcription=[make_segment(None, r"ruta C:\1\g<0>", 0, 1)])
+        update_obsidian_note(output_path, result, ("transcripcion",))
+
+        assert r"ruta C:\1\g<0>" in output_path.read_text(encoding="utf-8")
+
+    def test_no_deja_temporales_en_el_vault(self, tmp_path: Path) -> None:
+        output_path = write_obsidian_note(make_result(), make_config(str(tmp_path)))
+        update_obsidian_note(output_path, make_result(), ("analisis",))
+
+        assert [p.name for p in tmp_path.iterdir()] == [output_path.name]
@@ -0,0 +1,281 @@
+"""Tests para el transcriptor de OpenAI: cortes en memoria, subidas concurrentes y códecs."""
+
+from __future__ import annotations
+
+import io
+import struct
+import subprocess
+import sys
+import threading
+import time
+import types
+import wave
+from pathlib import Path
+
+import pytest
+
+from video_tranquitor.audio import wav_slice
+from video_tranquitor.transcribers import openai_api
+from video_tranquitor.transcribers.openai_api import TokenBucket, _transcribe_chunk
+
+
+class RelojFalso:
+    """Reemplaza ``openai_api.time``: ``sleep`` avanza el reloj sin esperar."""
+
+    def __init__(self) -> None:
+        self.ahora = 0.0
+        self.esperas: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.ahora
+
+    def time(self) -> float:
+        return 1_700_000_000 + self.ahora
+
+    def sleep(self, segundos: float) -> None:
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+
+@pytest.fixture
+def reloj(monkeypatch) -> RelojFalso:
+    falso = RelojFalso()
+    monkeypatch.setattr(openai_api, "time", falso)
+    return falso
+
+
+class ErrorDeApi(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = types.SimpleNamespace(headers=headers or {})
+
+
+@pytest.fixture
+def openai_falso(monkeypatch) -> type:
+    class OpenAI:
+        def __init__(self, respuestas: list) -> None:
+            self.respuestas = respuestas
+            self.pedidos: list[dict] = []
+            self.audio = types.SimpleNamespace(
+                transcriptions=types.SimpleNamespace(create=self._create)
+            )
+
+        def _create(self, **kwargs):
+            self.pedidos.append(kwargs)
+            respuesta = self.respuestas.pop(0)
+            if isinstance(respuesta, Exception):
+                raise respuesta
+            return types.SimpleNamespace(text=respuesta)
+
+    monkeypatch.setitem(sys.modules, "openai", types.SimpleNamespace(OpenAI=OpenAI))
+    return OpenAI
+
+
+def _wav(path: Path, seconds: int, sample_rate: int = 16000) -> str:
+    """Un WAV PCM mono donde cada segundo repite su número como muestra."""
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        for second in range(seconds):
+            wav.writeframes(struct.pack("<h", second) * sample_rate)
+    return str(path)
+
+
+class TestWavSlice:
+    def test_corta_el_tramo_sin_ffmpeg(self, tmp_path):
+        audio = _wav(tmp_path / "audio.wav", 10, sample_rate=100)
+
+        with wave.open(io.BytesIO(wav_slice(audio, 4.0, 3.0, 100)), "rb") as chunk:
+            assert (chunk.getnchannels(), chunk.getsampwidth(), chunk.getframerate()) == (1, 2, 100)
+            muestras = struct.unpack(f"<{chunk.getnframes()}h", chunk.readframes(-1))
+
+        assert muestras == (4,) * 100 + (5,) * 100 + (6,) * 100
+
+    def test_el_ultimo_tramo_llega_hasta_el_final(self, tmp_path):
+        audio = _wav(tmp_path / "audio.wav", 5, sample_rate=100)
+
+        with wave.open(io.BytesIO(wav_slice(audio, 4.0, 120.0, 100)), "rb") as chunk:
+            assert chunk.getnframes() == 100
+
+    def test_otro_formato_queda_para_ffmpeg(self, tmp_path):
+        audio = _wav(tmp_path / "audio.wav", 1, sample_rate=44100)
+
+        assert wav_slice(audio, 0.0, 1.0, 16000) is None
+        assert wav_slice(str(tmp_path / "no-existe.wav"), 0.0, 1.0, 16000) is None
+
+
+class TestTokenBucket:
+    def test_despues_de_la_rafaga_respeta_el_ritmo(self, reloj):
+        bucket = TokenBucket(rate=2.0, burst=3)
+
+        for _ in range(5):
+            bucket.acquire()
+
+        # Tres de la ráfaga y dos más a 2 por segundo.
+        assert reloj.ahora == pytest.approx(1.0)
+
+    def test_una_pausa_frena_todo_y_no_devuelve_la_rafaga(self, reloj):
+        bucket = TokenBucket(rate=1.0, burst=4)
+        bucket.pause(10)
+
+        bucket.acquire()
+        bucket.acquire()
+
+        assert reloj.ahora == pytest.approx(11.0)
+
+
+class TestReintentos:
+    def test_un_429_espera_lo_que_pide_retry_after(self, reloj, openai_falso):
+        client = openai_falso([ErrorDeApi(429, {"retry-after": "7"}), " hola "])
+
+        texto = _transcribe_chunk(
+            "chunk_0.wav", b"RIFF", client, "whisper-1", "", "es", TokenBucket(5, 1)
+        )
+
+        assert texto == "hola"
+        assert reloj.ahora == pytest.approx(7.0)
+
+    def test_retry_after_ms_y_backoff_sin_cabecera(self, reloj, openai_falso):
+        client = openai_falso(
+            [ErrorDeApi(429, {"retry-after-ms": "1500"}), ErrorDeApi(503), "listo"]
+        )
+
+        assert _transcribe_chunk("chunk_0.wav", b"RIFF", client, "whisper-1", "", "es") == "listo"
+        # 1.5 s pedidos por la API y 2 s de backoff en el segundo intento.
+        assert reloj.esperas == [pytest.approx(1.5), pytest.approx(2.0)]
+
+    def test_un_400_no_se_reintenta(self, reloj, openai_falso):
+        client = openai_falso([ErrorDeApi(400), "no debería llegar"])
+
+        assert _transcribe_chunk("chunk_0.wav", b"RIFF", client, "whisper-1", "", "es") is None
+        assert reloj.esperas == []
+
+
+class TestSubidasConcurrentes:
+    def test_suben_a_la_vez_y_vuelven_en_orden(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(
+            sys.modules, "openai", types.SimpleNamespace(OpenAI=lambda **_kw: object())
+        )
+        audio = _wav(tmp_path / "audio.wav", 600)
+        monkeypatch.setattr(openai_api, "get_audio_duration", lambda _p: 600.0)
+        monkeypatch.setattr(openai_api.subprocess, "run", pytest.fail)
+        en_curso = {"ahora": 0, "maximo": 0}
+        lock = threading.Lock()
+
+        def api(ruta, _audio, _client, _model, _prompt, _language, limiter):
+            with lock:
+                en_curso["ahora"] += 1
+                en_curso["maximo"] = max(en_curso["maximo"], en_curso["ahora"])
+            # Los primeros chunks tardan más: vuelven después de los últimos.
+            offset = int(Path(ruta).stem.split("_")[1])
+            time.sleep(0.05 - offset / 12_000_000)
+            with lock:
+                en_curso["ahora"] -= 1
+            return f"desde {offset // 1000} s"
+
+        monkeypatch.setattr(openai_api, "_transcribe_chunk", api)
+
+        result = openai_api.transcribe_openai(
+            audio, "sk", "whisper-1", "", 16000, "es", None, 3, 6000
+        )
+
+        assert [t.texto for t in result] == [
+            "desde 0 s",
+            "desde 120 s",
+            "desde 240 s",
+            "desde 360 s",
+            "desde 480 s",
+        ]
+        assert [t.inicio for t in result][:2] == ["00:00:00", "00:02:00"]
+        assert en_curso["maximo"] == 3
+
+
+class TestCodecDeSubida:
+    @pytest.fixture
+    def subidas(self, tmp_path, monkeypatch) -> list[tuple[str, bytes]]:
+        monkeypatch.setitem(
+            sys.modules, "openai", types.SimpleNamespace(OpenAI=lambda **_kw: object())
+        )
+        monkeypatch.setattr(openai_api, "get_audio_duration", lambda _p: 600.0)
+        registro: list[tuple[str, bytes]] = []
+
+        def api(nombre, audio, *_a):
+            registro.append((nombre, audio))
+            return nombre
+
+        monkeypatch.setattr(openai_api, "_transcribe_chunk", api)
+        return registro
+
+    def test_flac_se_comprime_en_memoria_y_sube_con_su_extension(
+        self, tmp_path, monkeypatch, subidas
+    ):
+        audio = _wav(tmp_path / "audio.wav", 600)
+        comandos: list[list[str]] = []
+
+        def ffmpeg(cmd, input, **_kw):
+            comandos.append(cmd)
+            assert input[:4] == b"RIFF"
+            return subprocess.CompletedProcess(cmd, 0, stdout=b"fLaC" + input[44:1000])
+
+        monkeypatch.setattr(openai_api.subprocess, "run", ffmpeg)
+
+        result = openai_api.transcribe_openai(
+            audio, "sk", "whisper-1", "", 16000, "es", None, 2, 6000, "flac", 300
+        )
+
+        assert [t.texto for t in result] == ["chunk_0.flac", "chunk_300000.flac"]
+        assert [t.fin for t in result] == ["00:05:00", "00:10:00"]
+        assert all(enviado.startswith(b"fLaC") for _, enviado in subidas)
+        assert all(cmd[-3:] == ["-f", "flac", "pipe:1"] for cmd in comandos)
+
+    def test_si_ffmpeg_falla_el_chunk_sube_como_wav(self, tmp_path, monkeypatch, subidas):
+        audio = _wav(tmp_path / "audio.wav", 600)
+
+        def ffmpeg(cmd, **_kw):
+            raise subprocess.CalledProcessError(1, cmd)
+
+        monkeypatch.setattr(openai_api.subprocess, "run", ffmpeg)
+
+        openai_api.transcribe_openai(
+            audio, "sk", "whisper-1", "", 16000, "es", None, 1, 6000, "opus", 600
+        )
+
+        [(nombre, enviado)] = subidas
+        assert nombre == "chunk_0.wav"
+        assert enviado[:4] == b"RIFF"
+
+    def test_un_wav_que_no_entra_en_un_pedido_sube_en_partes(
+        self, tmp_path, monkeypatch, subidas
+    ):
+        audio = _wav(tmp_path / "audio.wav", 600)
+        monkeypatch.setattr(openai_api, "_MAX_UPLOAD_BYTES", 8 * 1024 * 1024)
+
+        def ffmpeg(cmd, **_kw):
+            raise subprocess.CalledProcessError(1, cmd)
+
+        monkeypatch.setattr(openai_api.subprocess, "run", ffmpeg)
+
+        [transcripcion] = openai_api.transcribe_openai(
+            audio, "sk", "whisper-1", "", 16000, "es", None, 1, 6000, "flac", 600
+        )
+
+        # 19,2 MB de WAV con un tope de 8 MB: tres partes de 200 s.
+        assert transcripcion.texto == "chunk_0.wav chunk_200000.wav chunk_400000.wav"
+        assert all(len(enviado) <= 8 * 1024 * 1024 for _, enviado in subidas)
+
+    @pytest.mark.parametrize(
+        ("nombre", "mime"),
+        [
+            ("chunk_0.wav", "audio/wav"),
+            ("chunk_0.flac", "audio/flac"),
+            ("chunk_0.ogg", "audio/ogg"),
+        ],
+    )
+    def test_mime_segun_el_codec(self, openai_falso, nombre, mime):
+        client = openai_falso(["ok"])
+
+        _transcribe_chunk(nombre, b"...", client, "whisper-1", "", "es")
+
+        assert client.pedidos[0]["file"] == (nombre, b"...", mime)
@@ -8,7 +8,13 @@ import pytest
 
 from video_tranquitor import pipeline as pipeline_mod
 from video_tranquitor.pipeline import run_pipeline
-from video_tranquitor.types import PipelineConfig
+from video_tranquitor.types import (
+    DiarizationSegment,
+    PipelineConfig,
+    WhisperResult,
+    WhisperSegment,
+    WhisperWord,
+)
 
 
 @pytest.fixture
@@ -32,6 +38,7 @@ def config(tmp_path) -> PipelineConfig:
         transcription_prompt="",
         transcribe_model="gpt-4o-transcribe",
         target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
     )
 
 
@@ -50,7 +57,7 @@ class TestLimpiezaDelWavTemporal:
         entrada.write_bytes(b"RIFF")
         wav = _wav_temporal(config, "reunion")
 
-        def fake_preprocess(_src, destino, _filtro, _sr):
+        def fake_preprocess(_src, destino, _filtro, _sr, lease=None):
             os.makedirs(os.path.dirname(destino), exist_ok=True)
             with open(destino, "wb") as f:
                 f.write(b"x" * 1024)
@@ -77,7 +84,7 @@ class TestLimpiezaDelWavTemporal:
         entrada.write_bytes(b"RIFF")
         wav = _wav_temporal(config, "reunion")
 
-        def preprocess_a_medias(_src, destino, _filtro, _sr):
+        def preprocess_a_medias(_src, destino, _filtro, _sr, lease=None):
             os.makedirs(os.path.dirname(destino), exist_ok=True)
             with open(destino, "wb") as f:
                 f.write(b"parcial")
@@ -89,3 +96,115 @@ class TestLimpiezaDelWavTemporal:
             await run_pipeline(str(entrada), config)
 
         assert not os.path.exists(wav), "el WAV parcial quedó colgado"
+
+
+class TestNotaTemprana:
+    # La nota tiene que existir antes de que empiece el análisis: con varias
+    # pasadas el análisis suma minutos que no deberían demorar la lectura.
+    async def test_la_nota_existe_antes_del_analisis_y_se_completa_al_final(
+        self, config: PipelineConfig, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from video_tranquitor.types import AnalysisResult, WhisperResult, WhisperSegment
+
+        vault = tmp_path / "vault"
+        vault.mkdir()
+        config = config.model_copy(
+            update={
+                "enable_obsidian": True,
+                "enable_analysis": True,
+                "obsidian_vault_path": str(vault),
+            }
+        )
+        entrada = tmp_path / "reunion.wav"
+        entrada.write_bytes(b"RIFF")
+
+        def fake_preprocess(_src, destino, _filtro, _sr, lease=None):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            with open(destino, "wb") as f:
+                f.write(b"x")
+            return True
+
+        monkeypatch.setattr(pipeline_mod, "preprocess_audio", fake_preprocess)
+        monkeypatch.setattr(pipeline_mod, "get_audio_duration", lambda _p: 10.0)
+        monkeypatch.setattr(
+            pipeline_mod,
+            "transcribe_local",
+            lambda *_a, **_k: WhisperResult(
+                segments=[WhisperSegment(text="hola equipo", start=0.0, end=2.0)],
+                language="es",
+            ),
+        )
+
+        vista_durante_el_analisis: list[str] = []
+
+        async def fake_analyze(_transcription, _config, on_partial=None):
+            (nota,) = vault.iterdir()
+            vista_durante_el_analisis.append(nota.read_text(encoding="utf-8"))
+            return AnalysisResult(
+                resumen="Resumen final", requerimientos=[], accionables=[], decisiones=[]
+            )
+
+        monkeypatch.setattr(pipeline_mod, "analyze_transcription", fake_analyze)
+
+        result = await run_pipeline(str(entrada), config)
+
+        (durante,) = vista_durante_el_analisis
+        assert "hola equipo" in durante
+        assert "estado: en-proceso" in durante
+        assert "Resumen final" not in durante
+
+        final = open(result.obsidian_output_path, encoding="utf-8").read()
+        assert "estado: completado" in final
+        assert "Resumen final" in final
+        assert "Análisis en curso" not in final
+
+
+class TestAlineacionCercaDeLosTurnos:
+    async def test_alinea_solo_donde_cambia_el_hablante(
+        self, config: PipelineConfig, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        config = config.model_copy(
+            update={"transcriber": "whisperx", "whisperx_align": "turns"}
+        )
+        result = WhisperResult(
+            segments=[
+                WhisperSegment(text="hola a todos", start=0.0, end=4.0),
+                WhisperSegment(text="bien, vos?", start=4.0, end=8.0),
+                WhisperSegment(text="sigo yo", start=9.0, end=12.0),
+            ],
+            language="es",
+        )
+        speakers = [
+            DiarizationSegment(speaker="SPEAKER_00", start=0.0, end=6.0),
+            DiarizationSegment(speaker="SPEAKER_01", start=6.0, end=12.0),
+        ]
+        pedidos: list[list[str]] = []
+
+        def fake_align(_wav, _cfg, segments):
+            pedidos.append([s.text for s in segments])
+            # whisperx parte el segmento en dos oraciones al alinearlo.
+            return [
+                WhisperSegment(
+                    text="bien,", start=4.0, end=5.5,
+                    words=[WhisperWord(word="bien,", start=4.0, end=5.5)],
+                ),
+                WhisperSegment(
+                    text="vos?", start=6.2, end=8.0,
+                    words=[WhisperWord(word="vos?", start=6.2, end=8.0)],
+                ),
+            ]
+
+        monkeypatch.setattr(pipeline_mod, "align_in_worker", fake_align)
+
+        assert pipeline_mod._aligns_after_diarization(config, result)
+        aligned = await pipeline_mod._align_near_turns("x.wav", config, result, speakers)
+
+        assert pedidos == [["bien, vos?"]]
+        assert [s.text for s in aligned.segments] == ["hola a todos", "bien,", "vos?", "sigo yo"]
+        # Lo que no se alineó lleva palabras repartidas en su segmento.
+        assert [w.word for w in aligned.segments[0].words] == ["hola", "a", "todos"]
+        atribuidos = pipeline_mod.align_speakers(aligned, speakers)
+        assert [(a.speaker, a.text) for a in atribuidos] == [
+            ("SPEAKER_00", "hola a todos bien,"),
+            ("SPEAKER_01", "vos? sigo yo"),
+        ]
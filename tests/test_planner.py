@@ -0,0 +1,152 @@
+"""Tests para video_tranquitor.planner — estimación y calibración por host."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from video_tranquitor import planner
+from video_tranquitor.state import atomic_write_text
+from video_tranquitor.types import PipelineConfig
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir="./output",
+        transcriber="whisperx",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=True,
+        enable_analysis=True,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="hf_x",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="gpt-4o-transcribe",
+        analysis_passes=3,
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+    )
+
+
+class TestPlan:
+    def test_incluye_solo_las_etapas_configuradas_en_orden(
+        self, config: PipelineConfig
+    ) -> None:
+        plan = planner.plan_for(3600, config.model_copy(update={"enable_diarization": False}))
+
+        assert [s.stage for s in plan.stages] == [
+            "preprocess",
+            "transcribe:whisperx",
+            "analysis:3",
+        ]
+
+    def test_sin_calibracion_usa_los_defaults(self, config: PipelineConfig) -> None:
+        plan = planner.plan_for(1000, config)
+
+        assert not any(s.calibrated for s in plan.stages)
+        transcribe = next(s for s in plan.stages if s.stage == "transcribe:whisperx")
+        esperado = 1000 * planner.DEFAULT_RTF["transcribe:whisperx"]
+        assert transcribe.seconds == pytest.approx(esperado)
+
+    def test_la_nota_temprana_llega_al_terminar_la_transcripcion(
+        self, config: PipelineConfig
+    ) -> None:
+        plan = planner.plan_for(1000, config)
+
+        assert plan.first_note_sec == pytest.approx(
+            plan.stages[0].seconds + plan.stages[1].seconds
+        )
+        assert plan.total_sec > plan.first_note_sec
+
+
+class TestCalibracion:
+    def test_la_primera_medicion_reemplaza_al_default(self, config: PipelineConfig) -> None:
+        planner.record_stage(config, "diarization", elapsed_sec=30, audio_duration_sec=600)
+
+        plan = planner.plan_for(600, config)
+
+        diarizacion = next(s for s in plan.stages if s.stage == "diarization")
+        assert diarizacion.calibrated
+        assert diarizacion.seconds == pytest.approx(30)
+
+    def test_las_siguientes_se_promedian(self, config: PipelineConfig) -> None:
+        planner.record_stage(config, "diarization", elapsed_sec=60, audio_duration_sec=600)
+        planner.record_stage(config, "diarization", elapsed_sec=120, audio_duration_sec=600)
+
+        rtf, _ = planner.rtf_for("diarization", planner.load_calibration(config))
+
+        esperado = (1 - planner.EMA_ALPHA) * 0.1 + planner.EMA_ALPHA * 0.2
+        assert rtf == pytest.approx(esperado)
+
+    # El tiempo de un audio de 2 s lo domina el arranque, no el audio.
+    def test_ignora_audios_muy_cortos(self, config: PipelineConfig) -> None:
+        planner.record_stage(config, "diarization", elapsed_sec=30, audio_duration_sec=2)
+
+        assert planner.load_calibration(config) == {}
+
+    def test_eta_de_la_cola_suma_los_archivos(self, config: PipelineConfig) -> None:
+        uno = planner.plan_for(100, config).total_sec
+
+        assert planner.queue_eta([100, 100, 100], config) == pytest.approx(3 * uno)
+
+    def test_la_calibracion_es_por_modelo_y_backend(
+        self, config: PipelineConfig, tmp_path
+    ) -> None:
+        modelo = tmp_path / "ggml-medium.bin"
+        modelo.write_bytes(b"x" * 10)
+        local = config.model_copy(
+            update={"transcriber": "local", "whisper_model_path": str(modelo)}
+        )
+        planner.record_stage(
+            local, planner.transcribe_stage_key(local), elapsed_sec=60, audio_duration_sec=600
+        )
+
+        grande = local.model_copy(update={"whisper_model_path": str(tmp_path / "ggml-large.bin")})
+        server = local.model_copy(update={"whisper_backend": "server"})
+        calibracion = planner.load_calibration(config)
+        assert planner.rtf_for(planner.transcribe_stage_key(local), calibracion) == (0.1, True)
+        for otro in (grande, server):
+            rtf, medido = planner.rtf_for(planner.transcribe_stage_key(otro), calibracion)
+            assert not medido
+            assert rtf == planner.DEFAULT_RTF["transcribe:local"]
+
+    def test_el_plan_muestra_el_modelo_como_detalle(self, config: PipelineConfig) -> None:
+        plan = planner.plan_for(100, config)
+
+        transcribe = next(s for s in plan.stages if s.stage == "transcribe:whisperx")
+        assert transcribe.detail == "large-v3"
+
+
+class TestEscrituraAtomica:
+    def test_reemplaza_sin_dejar_temporales(self, tmp_path) -> None:
+        destino = tmp_path / "calibration.json"
+        destino.write_text("viejo", encoding="utf-8")
+
+        atomic_write_text(destino, "nuevo")
+
+        assert destino.read_text(encoding="utf-8") == "nuevo"
+        assert [p.name for p in tmp_path.iterdir()] == ["calibration.json"]
+
+    def test_cada_escritura_usa_su_propio_temporal(self, tmp_path, monkeypatch) -> None:
+        temporales: list[str] = []
+        replace = os.replace
+
+        def _replace(origen, destino):
+            temporales.append(os.path.basename(origen))
+            replace(origen, destino)
+
+        monkeypatch.setattr(os, "replace", _replace)
+        atomic_write_text(tmp_path / "a.json", "1")
+        atomic_write_text(tmp_path / "a.json", "2")
+
+        assert len(set(temporales)) == 2
+        assert all(t.startswith(".a.json.") for t in temporales)
@@ -78,3 +78,23 @@ class TestGetAudioDuration:
         )
 
         assert pre.get_audio_duration("audio.wav") == pytest.approx(123.45)
+
+    def test_no_vuelve_a_sondear_un_archivo_que_no_cambio(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        audio = tmp_path / "nota.ogg"
+        audio.write_bytes(b"a" * 10)
+        sondeos: list[str] = []
+
+        def ffprobe(cmd, **_kw):
+            sondeos.append(cmd[-1])
+            return subprocess.CompletedProcess([], 0, stdout=f"{len(sondeos)}.0\n", stderr="")
+
+        monkeypatch.setattr(pre.subprocess, "run", ffprobe)
+
+        assert pre.get_audio_duration(str(audio)) == 1.0
+        assert pre.get_audio_duration(str(audio), warn_on_failure=False) == 1.0
+        # La copia siguió creciendo: es otro archivo y se vuelve a sondear.
+        audio.write_bytes(b"a" * 20)
+        assert pre.get_audio_duration(str(audio)) == 2.0
+        assert len(sondeos) == 2
@@ -0,0 +1,155 @@
+"""Tests para video_tranquitor.reanalyze — reanálisis en lote sin ASR."""
+
+from __future__ import annotations
+
+import pytest
+
+from video_tranquitor import reanalyze as reanalyze_mod
+from video_tranquitor.types import (
+    AnalysisResult,
+    AttributedSegment,
+    PipelineConfig,
+    TranscriptArtifact,
+    Transcription,
+)
+from video_tranquitor.writers.artifact_writer import (
+    load_transcript_artifact,
+    write_transcript_artifact,
+)
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path / "output"),
+        transcriber="whisperx",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=True,
+        enable_obsidian=True,
+        enable_toon=False,
+        obsidian_vault_path=str(vault),
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="gpt-4o-transcribe",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+    )
+
+
+def _artefactos(tmp_path, n: int) -> list[str]:
+    rutas = []
+    for i in range(n):
+        ruta = tmp_path / f"reunion{i}_transcript.json"
+        write_transcript_artifact(
+            TranscriptArtifact(
+                input_file=f"/audios/reunion{i}.mp4",
+                fecha="2026-01-0" + str(i + 1),
+                audio_duration_sec=60.0,
+                transcriber="whisperx",
+                model_fingerprint="whisperx:large-v3",
+                transcription=[
+                    AttributedSegment(speaker=None, text=f"texto {i}", start=0.0, end=5.0)
+                ],
+                raw_transcriptions=[
+                    Transcription(inicio="00:00:00", fin="00:00:05", texto=f"texto {i}")
+                ],
+            ),
+            ruta,
+        )
+        rutas.append(str(ruta))
+    return rutas
+
+
+def _analisis(resumen: str) -> AnalysisResult:
+    return AnalysisResult(resumen=resumen, requerimientos=[], accionables=[], decisiones=[])
+
+
+class TestReanalisis:
+    async def test_genera_la_nota_con_la_fecha_original(
+        self, config: PipelineConfig, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (ruta,) = _artefactos(tmp_path, 1)
+
+        async def fake_analyze(transcription, _config):
+            return _analisis(f"nuevo: {transcription[0].text}")
+
+        monkeypatch.setattr(reanalyze_mod, "analyze_transcription", fake_analyze)
+
+        summary = await reanalyze_mod.reanalyze([str(tmp_path)], config)
+
+        assert summary.done == [ruta]
+        nota = load_transcript_artifact(ruta).obsidian_note_path
+        assert nota is not None and nota.endswith("2026-01-01 reunion0.md")
+        assert "nuevo: texto 0" in open(nota, encoding="utf-8").read()
+
+    # Un lote interrumpido retoma donde quedó: lo ya hecho con la misma
+    # configuración no vuelve a gastar LLM.
+    async def test_retoma_sin_repetir_lo_hecho(
+        self, config: PipelineConfig, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        rutas = _artefactos(tmp_path, 3)
+        llamadas: list[str] = []
+
+        async def falla_la_segunda(transcription, _config):
+            llamadas.append(transcription[0].text)
+            return None if transcription[0].text == "texto 1" else _analisis("ok")
+
+        monkeypatch.setattr(reanalyze_mod, "analyze_transcription", falla_la_segunda)
+        primera = await reanalyze_mod.reanalyze(rutas, config, concurrency=3)
+        assert primera.failed == [rutas[1]]
+
+        monkeypatch.setattr(
+            reanalyze_mod, "analyze_transcription", lambda *_a: _async(_analisis("ok"))
+        )
+        segunda = await reanalyze_mod.reanalyze(rutas, config)
+
+        assert segunda.done == [rutas[1]]
+        assert sorted(segunda.skipped) == [rutas[0], rutas[2]]
+
+    async def test_otra_configuracion_de_analisis_reprocesa_todo(
+        self, config: PipelineConfig, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        rutas = _artefactos(tmp_path, 2)
+        monkeypatch.setattr(
+            reanalyze_mod, "analyze_transcription", lambda *_a: _async(_analisis("ok"))
+        )
+        await reanalyze_mod.reanalyze(rutas, config)
+
+        otra = config.model_copy(update={"analysis_passes": 3})
+        resumen = await reanalyze_mod.reanalyze(rutas, otra)
+
+        assert len(resumen.done) == 2 and resumen.skipped == []
+
+    async def test_respeta_el_tope_de_concurrencia(
+        self, config: PipelineConfig, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import asyncio
+
+        rutas = _artefactos(tmp_path, 5)
+        activas = {"ahora": 0, "max": 0}
+
+        async def lento(*_a):
+            activas["ahora"] += 1
+            activas["max"] = max(activas["max"], activas["ahora"])
+            await asyncio.sleep(0.01)
+            activas["ahora"] -= 1
+            return _analisis("ok")
+
+        monkeypatch.setattr(reanalyze_mod, "analyze_transcription", lento)
+
+        await reanalyze_mod.reanalyze(rutas, config, concurrency=2)
+
+        assert activas["max"] == 2
+
+
+async def _async(valor):
+    return valor
@@ -0,0 +1,132 @@
+"""Tests para video_tranquitor.resources — presupuesto de CPU por etapa."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from video_tranquitor import resources
+from video_tranquitor.resources import CpuBudget, Lease
+from video_tranquitor.types import PipelineConfig
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="ensemble",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        cpu_threads=16,
+    )
+
+
+class TestCpuBudget:
+    def test_un_lease_se_lleva_lo_libre_hasta_su_tope(self):
+        budget = CpuBudget(16, pin=False)
+        primero = budget.acquire("whisper.cpp", cap=8)
+        segundo = budget.acquire("ffmpeg")
+        assert (primero.threads, segundo.threads) == (8, 8)
+
+    def test_sin_nucleos_libres_da_la_parte_justa(self):
+        budget = CpuBudget(4, pin=False)
+        budget.acquire("whisperx")
+        # El primero se llevó todo; el segundo comparte en vez de quedar con uno.
+        assert budget.acquire("pyannote").threads == 2
+
+    def test_la_parte_justa_baja_con_cada_etapa_activa(self):
+        budget = CpuBudget(12, pin=False)
+        budget.acquire("calentamiento")
+        budget.acquire("whisperx")
+        assert budget.acquire("pyannote").threads == 4
+        assert budget.acquire("ffmpeg", cap=2).threads == 2
+
+    def test_con_pinning_la_parte_justa_comparte_los_ultimos_nucleos(self):
+        budget = CpuBudget(8, pin=True, cpus=list(range(8)))
+        budget.acquire("whisper.cpp", cap=6)
+        # Quedan 6 y 7 libres; la parte justa es 4: se suman 5 y 4.
+        assert budget.acquire("pyannote").cpus == [6, 7, 5, 4]
+
+    def test_liberar_devuelve_los_hilos(self):
+        budget = CpuBudget(8, pin=False)
+        lease = budget.acquire("ffmpeg")
+        budget.release(lease)
+        assert budget.acquire("whisper.cpp").threads == 8
+
+    def test_split_reparte_por_peso_y_respeta_topes(self):
+        budget = CpuBudget(32, pin=False)
+        leases = budget.acquire_split(
+            {"whisper.cpp": 1.0, "whisperx": 1.0}, caps={"whisper.cpp": 8}
+        )
+        assert leases["whisper.cpp"].threads == 8
+        # Lo que el tope de whisper.cpp no usa va a whisperx: no queda nada ocioso.
+        assert leases["whisperx"].threads == 24
+
+    def test_el_sobrante_de_un_tope_se_reparte_por_peso(self):
+        budget = CpuBudget(32, pin=True, cpus=list(range(32)))
+        leases = budget.acquire_split(
+            {"whisper.cpp": 2.0, "whisperx": 1.0, "pyannote": 1.0}, caps={"whisper.cpp": 8}
+        )
+        assert [leases[s].threads for s in ("whisper.cpp", "whisperx", "pyannote")] == [8, 12, 12]
+        assert sum(len(lease.cpus) for lease in leases.values()) == 32
+
+    def test_sin_topes_que_muerdan_reparte_todo(self):
+        budget = CpuBudget(10, pin=False)
+        leases = budget.acquire_split(
+            {"whisper.cpp": 1.0, "whisperx": 1.0, "pyannote": 1.0}, caps={"whisper.cpp": 8}
+        )
+        assert sum(lease.threads for lease in leases.values()) == 10
+
+    def test_con_pinning_los_nucleos_no_se_repiten(self):
+        budget = CpuBudget(8, pin=True, cpus=list(range(8)))
+        leases = budget.acquire_split({"whisper.cpp": 1.0, "whisperx": 1.0})
+        assert leases["whisper.cpp"].cpus == [0, 1, 2, 3]
+        assert leases["whisperx"].cpus == [4, 5, 6, 7]
+        # Dos leases vivos: a ffmpeg le toca un tercio, de los últimos núcleos.
+        assert budget.acquire("ffmpeg").cpus == [7, 6]
+
+
+class TestLease:
+    def test_split_para_shards(self):
+        lease = Lease(stage="whisper.cpp", threads=24, cpus=list(range(24)))
+        partes = lease.split(3)
+        assert [p.threads for p in partes] == [8, 8, 8]
+        assert partes[1].cpus == list(range(1, 24, 3))
+
+    def test_pinning_con_taskset(self, monkeypatch):
+        monkeypatch.setattr(resources.shutil, "which", lambda _n: "/usr/bin/taskset")
+        lease = Lease(stage="ffmpeg", threads=2, cpus=[2, 3])
+        assert lease.wrap_command(["ffmpeg", "-i", "x"]) == [
+            "/usr/bin/taskset", "-c", "2,3", "ffmpeg", "-i", "x",
+        ]
+        assert Lease(stage="ffmpeg", threads=2).wrap_command(["ffmpeg"]) == ["ffmpeg"]
+
+
+class TestAsignacion:
+    async def test_el_hilo_lanzado_en_un_split_usa_su_lease(self, config):
+        def pedir() -> int:
+            with resources.cpu_lease(config, "whisper.cpp", cap=8) as lease:
+                return lease.threads
+
+        with resources.cpu_split(config, {"whisper.cpp": 1.0, "whisperx": 3.0}) as leases:
+            hilos = await asyncio.to_thread(pedir)
+
+        assert hilos == leases["whisper.cpp"].threads == 4
+        # Fuera del split vuelve a pedir al presupuesto, que quedó libre.
+        assert await asyncio.to_thread(pedir) == 8
@@ -0,0 +1,69 @@
+"""Tests para el transporte binario de WhisperResult entre procesos."""
+
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+
+import pytest
+
+from video_tranquitor.result_transport import (
+    pack_result,
+    result_from_shared,
+    share_result,
+    unpack_result,
+)
+from video_tranquitor.types import WhisperResult, WhisperSegment, WhisperWord
+
+
+def _result() -> WhisperResult:
+    return WhisperResult(
+        segments=[
+            WhisperSegment(
+                text="Hola, ¿cómo andás?",
+                start=0.0,
+                end=1.5,
+                words=[
+                    WhisperWord(word=" Hola,", start=0.0, end=0.4),
+                    WhisperWord(word=" ¿cómo", start=0.5, end=0.9),
+                    WhisperWord(word=" andás?", start=1.0, end=1.5),
+                ],
+            ),
+            WhisperSegment(text="", start=2.0, end=2.1),
+            WhisperSegment(
+                text="Bien.",
+                start=3.25,
+                end=4.0,
+                words=[WhisperWord(word="Bien.", start=3.25, end=4.0)],
+            ),
+        ],
+        language="es",
+    )
+
+
+class TestPackResult:
+    def test_ida_y_vuelta_sin_perder_nada(self):
+        result = _result()
+        assert unpack_result(pack_result(result)) == result
+
+    def test_resultado_vacio(self):
+        vacio = WhisperResult(segments=[], language="es")
+        assert unpack_result(pack_result(vacio)) == vacio
+
+    def test_un_nul_en_el_texto_no_corre_los_demas(self):
+        result = WhisperResult(
+            segments=[WhisperSegment(text="a\x00b", start=0, end=1)], language="es"
+        )
+        assert unpack_result(pack_result(result)).segments[0].text == "ab"
+
+    def test_rechaza_datos_ajenos(self):
+        with pytest.raises(ValueError, match="empaquetado"):
+            unpack_result(b"XXXX" + bytes(20))
+
+
+class TestSharedResult:
+    def test_el_bloque_se_libera_al_leerlo(self):
+        ref = share_result(_result())
+
+        assert result_from_shared(ref) == _result()
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=ref["shm"])
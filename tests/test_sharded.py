@@ -0,0 +1,144 @@
+"""Tests para transcribers.sharded — whisper.cpp en tramos paralelos."""
+
+from __future__ import annotations
+
+import subprocess
+import wave
+from array import array
+
+import pytest
+
+from video_tranquitor.transcribers import sharded
+from video_tranquitor.transcribers.whispercpp import transcribe_local
+from video_tranquitor.types import PipelineConfig, WhisperResult, WhisperSegment, WhisperWord
+
+SR = 1000  # tasa baja a propósito: solo importan las posiciones
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path="/bin/whisper-cli",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        whisper_shards=3,
+    )
+
+
+def _wav(path, seconds: int) -> str:
+    # Cada sample vale su segundo: así se puede verificar qué tramo llegó.
+    samples = array("h", [i // SR for i in range(seconds * SR)])
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SR)
+        wav.writeframes(samples.tobytes())
+    return str(path)
+
+
+class _WhisperCli:
+    def __init__(self) -> None:
+        self.llamadas: list[tuple[int, int]] = []
+
+    def __call__(self, path, config, lease=None, quiet=False) -> WhisperResult:
+        with wave.open(path, "rb") as wav:
+            frames = array("h", wav.readframes(wav.getnframes()))
+        primer_segundo, dur = frames[0], len(frames) / SR
+        self.llamadas.append((primer_segundo, lease.threads if lease else None))
+        return WhisperResult(
+            segments=[
+                WhisperSegment(
+                    text=f"desde {primer_segundo}",
+                    start=0.5,
+                    end=dur - 0.5,
+                    words=[WhisperWord(word="desde", start=0.5, end=1.0)],
+                )
+            ],
+            language="es",
+        )
+
+
+class TestCortes:
+    def test_cae_en_el_silencio_cercano(self):
+        cortes = sharded.plan_cuts(1800, 3, [(590.0, 596.0), (1250.0, 1252.0)])
+        assert cortes == [593.0, 1251.0]
+
+    def test_sin_silencio_cerca_usa_el_punto_ideal(self):
+        assert sharded.plan_cuts(1800, 2, [(100.0, 101.0)]) == [900.0]
+
+    def test_parsea_silencedetect(self, monkeypatch):
+        stderr = (
+            b"[silencedetect @ 0x1] silence_start: 12.5\n"
+            b"[silencedetect @ 0x1] silence_end: 14.1 | silence_duration: 1.6\n"
+            b"[silencedetect @ 0x1] silence_start: -0.01\n"
+            b"[silencedetect @ 0x1] silence_end: 2 | silence_duration: 2\n"
+        )
+        monkeypatch.setattr(
+            sharded.subprocess,
+            "run",
+            lambda *a, **k: subprocess.CompletedProcess(a, 0, b"", stderr),
+        )
+        assert sharded.detect_silences("x.wav") == [(12.5, 14.1), (0.0, 2.0)]
+
+    def test_recorta_los_tramos_cortos(self, config):
+        assert sharded.shard_count(config, 11 * 60) == 2
+        assert sharded.shard_count(config, 60) == 1
+
+
+class TestTranscripcionRepartida:
+    @pytest.fixture(autouse=True)
+    def _sin_ffmpeg(self, monkeypatch):
+        monkeypatch.setattr(sharded, "detect_silences", lambda _p: [])
+
+    def test_une_los_tramos_en_orden_y_corridos(self, config, tmp_path, monkeypatch):
+        cli = _WhisperCli()
+        monkeypatch.setattr(sharded, "run_whisper_cli", cli)
+        config = config.model_copy(update={"cpu_threads": 24})
+
+        result = transcribe_local(_wav(tmp_path / "a.wav", 1800), config)
+
+        assert sorted(cli.llamadas) == [(0, 8), (600, 8), (1200, 8)]
+        assert [s.text for s in result.segments] == ["desde 0", "desde 600", "desde 1200"]
+        assert [s.start for s in result.segments] == [0.5, 600.5, 1200.5]
+        assert result.segments[2].words[0].start == pytest.approx(1200.5)
+        assert not list(tmp_path.glob("*.shard*.wav"))
+
+    def test_un_reintento_solo_repite_lo_que_falta(self, config, tmp_path, monkeypatch):
+        audio = _wav(tmp_path / "a.wav", 1800)
+
+        def falla_el_ultimo(path, config, lease=None, quiet=False):
+            result = _WhisperCli()(path, config, lease)
+            if result.segments[0].text == "desde 1200":
+                raise RuntimeError("whisper.cpp murió")
+            return result
+
+        monkeypatch.setattr(sharded, "run_whisper_cli", falla_el_ultimo)
+        with pytest.raises(RuntimeError):
+            transcribe_local(audio, config)
+
+        cli = _WhisperCli()
+        monkeypatch.setattr(sharded, "run_whisper_cli", cli)
+        result = transcribe_local(audio, config)
+
+        assert [c[0] for c in cli.llamadas] == [1200]
+        assert len(result.segments) == 3
+
+    def test_audio_corto_no_se_reparte(self, config, tmp_path, monkeypatch):
+        monkeypatch.setattr(sharded, "run_whisper_cli", _WhisperCli())
+        assert sharded.transcribe_sharded(_wav(tmp_path / "a.wav", 120), config) is None
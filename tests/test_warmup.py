@@ -0,0 +1,137 @@
+"""Tests para video_tranquitor.warmup y su enganche en el watcher."""
+
+from __future__ import annotations
+
+import os
+import queue
+
+import pytest
+
+from video_tranquitor import warmup
+from video_tranquitor.types import PipelineConfig
+from video_tranquitor.watcher import _Handler
+
+
+def _config(**overrides) -> PipelineConfig:
+    base = {
+        "watch_dir": ".",
+        "output_dir": "./output",
+        "transcriber": "local",
+        "whisperx_model": "large-v3",
+        "whisper_cpp_path": "",
+        "whisper_model_path": "",
+        "enable_diarization": False,
+        "enable_analysis": False,
+        "enable_obsidian": False,
+        "enable_toon": False,
+        "obsidian_vault_path": "",
+        "hf_token": "",
+        "openai_api_key": "",
+        "audio_filter": "",
+        "language": "es",
+        "transcription_prompt": "",
+        "transcribe_model": "gpt-4o-transcribe",
+        "target_sample_rate": 16000,
+    }
+    base.update(overrides)
+    return PipelineConfig(**base)
+
+
+class TestModulosAPrecargar:
+    def test_local_sin_diarizacion_no_precarga_nada(self) -> None:
+        assert warmup.modules_to_preload(_config()) == []
+
+    # WhisperX corre en su worker, un proceso spawn que importa todo por su
+    # cuenta: precargarlo en el proceso principal no le ahorra nada. torch sí
+    # hace falta acá para pyannote.
+    def test_whisperx_con_diarizacion_solo_precarga_pyannote(self) -> None:
+        modulos = warmup.modules_to_preload(
+            _config(transcriber="whisperx", enable_diarization=True)
+        )
+
+        assert modulos == ["torch", "pyannote.audio"]
+
+    def test_ensemble_no_precarga_whisperx(self) -> None:
+        assert "whisperx" not in warmup.modules_to_preload(_config(transcriber="ensemble"))
+
+    def test_whisperx_levanta_el_worker_con_los_modelos(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from video_tranquitor.transcribers import whisperx_worker  # noqa: PLC0415
+
+        pedidos: list[str] = []
+        monkeypatch.setattr(
+            whisperx_worker, "preload_in_worker", lambda _cfg, model: pedidos.append(model)
+        )
+        monkeypatch.setattr(warmup, "get_audio_duration", lambda *_a, **_k: None)
+
+        warmup.warm_up(str(tmp_path / "nota.ogg"), _config(transcriber="whisperx")).join(5)
+
+        assert pedidos == ["large-v3"]
+
+
+class TestPrefetch:
+    def test_avisa_willneed_sobre_el_modelo(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        if not hasattr(os, "posix_fadvise"):
+            pytest.skip("plataforma sin posix_fadvise")
+        modelo = tmp_path / "ggml.bin"
+        modelo.write_bytes(b"\0" * 16)
+        avisos: list[int] = []
+        monkeypatch.setattr(
+            warmup.os, "posix_fadvise", lambda _fd, _o, _l, advice: avisos.append(advice)
+        )
+
+        assert warmup.prefetch_file(str(modelo)) is True
+        assert avisos == [os.POSIX_FADV_WILLNEED]
+
+    def test_archivo_inexistente_no_rompe(self) -> None:
+        assert warmup.prefetch_file("/no/existe.bin") is False
+
+    def test_precarga_el_modelo_que_se_va_a_elegir(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from video_tranquitor import model_selection  # noqa: PLC0415
+
+        elegido = model_selection.ModelCalibration(
+            path=str(tmp_path / "ggml-small.bin"), size=1, rtf=0.2, agreement=0.95
+        )
+        monkeypatch.setattr(model_selection, "select_model", lambda _d, _c: elegido)
+        monkeypatch.setattr(warmup, "get_audio_duration", lambda *_a, **_k: 600.0)
+        precargados: list[str] = []
+        monkeypatch.setattr(warmup, "prefetch_file", precargados.append)
+
+        config = _config(whisper_model_path=str(tmp_path / "ggml-large.bin"))
+        warmup.warm_up(str(tmp_path / "nota.ogg"), config).join(5)
+
+        assert precargados == [str(tmp_path / "ggml-small.bin")]
+
+    def test_sin_duracion_precarga_el_configurado(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(warmup, "get_audio_duration", lambda *_a, **_k: None)
+        precargados: list[str] = []
+        monkeypatch.setattr(warmup, "prefetch_file", precargados.append)
+
+        config = _config(whisper_model_path=str(tmp_path / "ggml-large.bin"))
+        warmup.warm_up(str(tmp_path / "nota.ogg"), config).join(5)
+
+        assert precargados == [str(tmp_path / "ggml-large.bin")]
+
+
+class TestHandlerPrimeraVez:
+    # El calentamiento se dispara al ver el archivo, no cuando vence el debounce.
+    def test_dispara_una_sola_vez_por_archivo(self, tmp_path) -> None:
+        vistos: list[str] = []
+        handler = _Handler(queue.Queue(), on_first_seen=vistos.append)
+        evento = type(
+            "Evento", (), {"is_directory": False, "src_path": str(tmp_path / "a.mp4")}
+        )()
+
+        handler.on_created(evento)
+        handler.on_created(evento)
+        for timer in handler._timers.values():
+            timer.cancel()
+
+        assert vistos == [str(tmp_path / "a.mp4")]
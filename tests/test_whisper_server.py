@@ -0,0 +1,181 @@
+"""Tests para transcribers.whisper_server — whisper.cpp residente vía HTTP."""
+
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from video_tranquitor.transcribers import whisper_server
+from video_tranquitor.transcribers.whispercpp import transcribe_local
+from video_tranquitor.types import PipelineConfig
+
+# Un whisper-server de mentira: mismo CLI y mismos endpoints que el real.
+# Cada arranque se anota en launches.txt; si existe crash.flag, el próximo
+# /inference mata el proceso antes de responder (y borra el flag).
+_FAKE_SERVER = '''\
+import http.server, json, os, sys
+args = sys.argv[1:]
+port = int(args[args.index("--port") + 1])
+here = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(here, "launches.txt"), "a") as f:
+    f.write(" ".join(args) + "\\n")
+
+class H(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *a):
+        pass
+
+    def do_GET(self):
+        self.send_response(200 if self.path == "/health" else 404)
+        self.end_headers()
+        self.wfile.write(b'{"status":"ok"}')
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        flag = os.path.join(here, "crash.flag")
+        if os.path.exists(flag):
+            os.unlink(flag)
+            os._exit(1)
+        assert b'name="response_format"' in body and b"verbose_json" in body
+        data = {"segments": [{"text": " hola mundo", "start": 0.5, "end": 1.7, "words": [
+            {"word": "[_BEG_]", "start": 0.0, "end": 0.0},
+            {"word": " hola", "start": 0.5, "end": 1.0},
+            {"word": " mundo", "start": 1.0, "end": 1.7}]}]}
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+http.server.HTTPServer(("127.0.0.1", port), H).serve_forever()
+'''
+
+
+@pytest.fixture
+def server_dir(tmp_path) -> Path:
+    script = tmp_path / "whisper-server"
+    script.write_text(f"#!{sys.executable}\n{_FAKE_SERVER}", encoding="utf-8")
+    script.chmod(0o755)
+    (tmp_path / "whisper-cli").write_text("", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def config(tmp_path, server_dir) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path / "output"),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path=str(server_dir / "whisper-cli"),
+        whisper_model_path="/modelos/ggml-large-v3-turbo.bin",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        whisper_backend="server",
+    )
+
+
+@pytest.fixture
+def audio(tmp_path) -> str:
+    path = tmp_path / "audio.wav"
+    path.write_bytes(b"RIFF....WAVE")
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def _apagar_server():
+    yield
+    whisper_server.shutdown_server()
+
+
+def _arranques(server_dir: Path) -> list[str]:
+    launches = server_dir / "launches.txt"
+    return launches.read_text().splitlines() if launches.exists() else []
+
+
+class TestParseo:
+    def test_descarta_tokens_especiales_y_usa_el_idioma_pedido(self):
+        result = whisper_server.parse_verbose_json(
+            {
+                "language": "spanish",
+                "segments": [
+                    {
+                        "text": " hola ",
+                        "start": 1.0,
+                        "end": 2.0,
+                        "words": [
+                            {"word": "[_TT_50]", "start": 1.0, "end": 1.0},
+                            {"word": " hola", "start": 1.0, "end": 2.0},
+                        ],
+                    }
+                ],
+            },
+            "es",
+        )
+        assert result.language == "es"
+        assert result.segments[0].text == "hola"
+        assert [w.word for w in result.segments[0].words] == [" hola"]
+
+
+class TestServerResidente:
+    def test_carga_el_modelo_una_sola_vez(self, config, server_dir, audio):
+        primero = transcribe_local(audio, config)
+        segundo = transcribe_local(audio, config)
+
+        assert primero == segundo
+        assert primero.segments[0].words[1].end == pytest.approx(1.7)
+        arranques = _arranques(server_dir)
+        assert len(arranques) == 1
+        assert "-m /modelos/ggml-large-v3-turbo.bin" in arranques[0]
+        assert "--host 127.0.0.1" in arranques[0]
+
+    def test_se_reinicia_si_se_cae(self, config, server_dir, audio):
+        transcribe_local(audio, config)
+        (server_dir / "crash.flag").touch()
+
+        result = transcribe_local(audio, config)
+
+        assert result.segments[0].text == "hola mundo"
+        assert len(_arranques(server_dir)) == 2
+
+    def test_se_apaga_tras_el_tiempo_ocioso(self, config, audio):
+        config = config.model_copy(update={"whisper_server_idle_sec": 0.2})
+        transcribe_local(audio, config)
+        server = whisper_server.get_server(config)
+        assert server.running()
+
+        deadline = time.time() + 5
+        while server.running() and time.time() < deadline:
+            time.sleep(0.05)
+        assert not server.running()
+
+        # El próximo pedido lo vuelve a levantar.
+        assert transcribe_local(audio, config).segments
+
+    def test_cambiar_de_modelo_reemplaza_el_server(self, config, server_dir, audio):
+        transcribe_local(audio, config)
+        otro = config.model_copy(update={"whisper_model_path": "/modelos/ggml-small.bin"})
+        transcribe_local(audio, otro)
+
+        arranques = _arranques(server_dir)
+        assert len(arranques) == 2
+        assert "ggml-small.bin" in arranques[1]
+
+    def test_binario_ausente(self, config, audio):
+        config = config.model_copy(update={"whisper_server_path": "/no/existe/whisper-server"})
+        with pytest.raises(FileNotFoundError, match="E_WHISPER_NOT_FOUND"):
+            transcribe_local(audio, config)
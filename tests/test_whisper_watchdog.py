@@ -0,0 +1,175 @@
+"""Tests para el watchdog de loops y cuelgues de whisper-cli."""
+
+from __future__ import annotations
+
+import sys
+import time
+import wave
+
+import pytest
+
+from video_tranquitor.planner import transcribe_stage_key
+from video_tranquitor.transcribers import whisper_watchdog
+from video_tranquitor.transcribers.whisper_watchdog import find_loop, transcribe_watched
+from video_tranquitor.types import PipelineConfig, WhisperSegment
+
+# whisper-cli de mentira. La corrida normal dice una frase y entra en loop (o
+# se cuelga sin progreso, si el audio se llama "colgado"); la ventana que se
+# reintenta con --max-context 0 sale bien, y el resto del audio también.
+_FAKE_CLI = '''\
+import json, sys, time
+args = sys.argv[1:]
+out = args[args.index("--output-file") + 1]
+
+def line(a, b, text):
+    ts = lambda s: f"00:{int(s) // 60:02d}:{int(s) % 60:02d}.000"
+    print(f"[{ts(a)} --> {ts(b)}]  {text}", flush=True)
+
+def finish(segs):
+    data = {"result": {"language": "es"}, "transcription": [
+        {"offsets": {"from": a * 1000, "to": b * 1000}, "text": t,
+         "tokens": [{"text": t.split()[0], "offsets": {"from": a * 1000, "to": a * 1000 + 300}}]}
+        for a, b, t in segs]}
+    with open(out + ".json", "w") as f:
+        json.dump(data, f)
+
+if "--max-context" in args:
+    finish([(1, 5, " ventana recuperada")])
+elif ".rest" in out:
+    line(0, 4, " después del loop")
+    finish([(0, 4, " después del loop")])
+else:
+    line(0, 4, " hola equipo")
+    if "colgado" in out:
+        time.sleep(60)
+    for i in range(50):
+        line(10 + 2 * i, 12 + 2 * i, " lo mismo de siempre otra vez")
+    time.sleep(60)
+'''
+
+
+def _wav(path, seconds: int) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\0\0" * 8000 * seconds)
+    return str(path)
+
+
+def _config(tmp_path, **overrides) -> PipelineConfig:
+    cli = tmp_path / "whisper-cli"
+    cli.write_text(f"#!{sys.executable}\n{_FAKE_CLI}", encoding="utf-8")
+    cli.chmod(0o755)
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path=str(cli),
+        whisper_model_path="",
+        enable_diarization=True,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        **{"whisper_watchdog": True, **overrides},
+    )
+
+
+def _segs(*texts: str) -> list[WhisperSegment]:
+    return [WhisperSegment(text=t, start=i, end=i + 1) for i, t in enumerate(texts)]
+
+
+class TestFindLoop:
+    def test_charla_normal_no_es_loop(self):
+        segs = _segs("hola a todos", "sí", "sí", "arrancamos con la demo", "no, no, no, esperá")
+        assert find_loop(segs) is None
+
+    def test_el_mismo_segmento_tres_veces_conserva_el_primero(self):
+        repetido = "esto se repite igual"
+        segs = _segs("hola", repetido, repetido, "Esto se repite igual.")
+        assert find_loop(segs) == 2
+
+    def test_los_segmentos_cortos_necesitan_mas_repeticiones(self):
+        assert find_loop(_segs("Gracias.", "Gracias.", "Gracias.")) is None
+        assert find_loop(_segs("x", *["Gracias."] * 5)) == 2
+
+    def test_un_ngrama_repetido_dentro_del_segmento(self):
+        texto = "y entonces " + "vamos a ver " * 5
+        assert find_loop(_segs("hola", texto)) == 1
+
+
+class TestStallSec:
+    def test_un_audio_corto_usa_el_configurado(self, tmp_path):
+        assert whisper_watchdog.stall_sec(_config(tmp_path), 60) == 120.0
+
+    def test_crece_con_el_audio_y_el_rtf_medido(self, tmp_path, monkeypatch):
+        config = _config(tmp_path)
+        monkeypatch.setattr(
+            whisper_watchdog,
+            "load_calibration",
+            lambda _c: {transcribe_stage_key(config): {"rtf": 0.5, "runs": 3}},
+        )
+
+        # Dos horas a 0,5x: cada 5 % tarda 180 s; tres pasos sin avance son 540 s.
+        assert whisper_watchdog.stall_sec(config, 7200) == pytest.approx(540.0)
+
+
+class TestTranscribeWatched:
+    async def test_loop_recupera_la_ventana_y_sigue(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(whisper_watchdog, "RETRY_WINDOW_SEC", 60.0)
+        config = _config(tmp_path)
+        audio = _wav(tmp_path / "reunion.wav", 200)
+        confirmados: list[str] = []
+
+        start = time.monotonic()
+        result = await transcribe_watched(
+            audio, config, on_segment=lambda s: confirmados.append(s.text)
+        )
+
+        # El proceso en loop se mató apenas se detectó, sin esperar el sleep.
+        assert time.monotonic() - start < 30
+        textos = [s.text for s in result.segments]
+        assert textos == [
+            "hola equipo",
+            "lo mismo de siempre otra vez",
+            "ventana recuperada",
+            "después del loop",
+        ]
+        assert confirmados == textos
+        assert [s.start for s in result.segments] == [0, 10, 13, 72]
+        # Lo conservado de stdout recibe palabras estimadas para la diarización.
+        assert [w.word for w in result.segments[0].words] == [" hola", " equipo"]
+        assert result.segments[3].words[0].start == pytest.approx(72)
+        assert not list(tmp_path.glob("reunion.*.wav"))
+
+    async def test_un_cuelgue_cuesta_el_stall_no_el_timeout(self, tmp_path, monkeypatch):
+        config = _config(tmp_path, whisper_stall_sec=0.5)
+        monkeypatch.setattr(whisper_watchdog, "STALL_PROGRESS_STEPS", 0)
+        audio = _wav(tmp_path / "colgado.wav", 30)
+
+        start = time.monotonic()
+        result = await transcribe_watched(audio, config)
+
+        assert time.monotonic() - start < 30
+        # La ventana llega al final del audio: no queda resto por transcribir.
+        assert [s.text for s in result.segments] == ["hola equipo", "ventana recuperada"]
+
+    async def test_apagado_no_corta_nada(self, tmp_path, monkeypatch):
+        config = _config(tmp_path, whisper_watchdog=False)
+        audio = _wav(tmp_path / "reunion.wav", 30)
+        monkeypatch.setattr(whisper_watchdog, "find_loop", pytest.fail)
+        # Sin watchdog queda solo el tiempo límite; se achica para el test.
+        monkeypatch.setattr("video_tranquitor.transcribers.whispercpp.WHISPER_TIMEOUT_SEC", 1)
+
+        with pytest.raises(RuntimeError, match="tiempo límite"):
+            await transcribe_watched(audio, config)
@@ -0,0 +1,183 @@
+"""Tests para transcribers.whispercpp_bindings — whisper.cpp dentro del proceso."""
+
+from __future__ import annotations
+
+import sys
+import types
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from video_tranquitor.audio import read_wav_float32, read_wav_mono_float32  # noqa: E402
+from video_tranquitor.transcribers import whispercpp_bindings  # noqa: E402
+from video_tranquitor.transcribers.whispercpp import transcribe_local  # noqa: E402
+from video_tranquitor.types import PipelineConfig  # noqa: E402
+
+_EOT = 50257
+
+
+class _TokenData:
+    def __init__(self, token_id: int, t0: int, t1: int) -> None:
+        self.id, self.t0, self.t1 = token_id, t0, t1
+
+
+class _FakeModel:
+    """Imita pywhispercpp.model.Model: guarda lo que recibe y deja un contexto."""
+
+    loads = 0
+
+    def __init__(self, model_path: str, **params) -> None:
+        _FakeModel.loads += 1
+        self.model_path = model_path
+        self.params = params
+        self.calls: list[tuple] = []
+        self._ctx = object()
+
+    def transcribe(self, media, **params):
+        self.calls.append((media, params))
+        return []
+
+
+def _fake_bindings() -> tuple[types.ModuleType, types.ModuleType, types.ModuleType]:
+    # Un segmento de 0.50 a 1.70 s con [_BEG_], dos palabras y el EOT.
+    tokens = [
+        ("[_BEG_]", _TokenData(_EOT + 1, 50, 50)),
+        (" hola", _TokenData(100, 50, 100)),
+        (" mundo", _TokenData(101, 100, 170)),
+        ("", _TokenData(_EOT, 170, 170)),
+    ]
+    pw = types.ModuleType("_pywhispercpp")
+    pw.whisper_full_n_segments = lambda ctx: 1
+    pw.whisper_full_get_segment_text = lambda ctx, i: " hola mundo"
+    pw.whisper_full_get_segment_t0 = lambda ctx, i: 50
+    pw.whisper_full_get_segment_t1 = lambda ctx, i: 170
+    pw.whisper_full_n_tokens = lambda ctx, i: len(tokens)
+    pw.whisper_full_get_token_text = lambda ctx, i, j: tokens[j][0]
+    pw.whisper_full_get_token_data = lambda ctx, i, j: tokens[j][1]
+    pw.whisper_token_eot = lambda ctx: _EOT
+
+    package = types.ModuleType("pywhispercpp")
+    model = types.ModuleType("pywhispercpp.model")
+    model.Model = _FakeModel
+    package.model = model
+    return pw, package, model
+
+
+@pytest.fixture(autouse=True)
+def fake_pywhispercpp(monkeypatch):
+    pw, package, model = _fake_bindings()
+    monkeypatch.setitem(sys.modules, "_pywhispercpp", pw)
+    monkeypatch.setitem(sys.modules, "pywhispercpp", package)
+    monkeypatch.setitem(sys.modules, "pywhispercpp.model", model)
+    monkeypatch.setattr(whispercpp_bindings, "_model", None)
+    monkeypatch.setattr(whispercpp_bindings, "_model_path", None)
+    _FakeModel.loads = 0
+
+
+def _write_wav(path, samples, sample_rate: int = 16000, channels: int = 1) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    return str(path)
+
+
+def _config(tmp_path, **overrides) -> PipelineConfig:
+    values = {
+        "watch_dir": ".",
+        "output_dir": str(tmp_path / "output"),
+        "transcriber": "local",
+        "whisperx_model": "",
+        "whisper_cpp_path": "",
+        "whisper_model_path": str(tmp_path / "ggml.bin"),
+        "enable_diarization": False,
+        "enable_analysis": False,
+        "enable_obsidian": False,
+        "enable_toon": False,
+        "obsidian_vault_path": "",
+        "hf_token": "",
+        "openai_api_key": "",
+        "audio_filter": "",
+        "language": "es",
+        "transcription_prompt": "",
+        "transcribe_model": "",
+        "target_sample_rate": 16000,
+        "cache_dir": str(tmp_path / "cache"),
+        "whisper_backend": "bindings",
+    }
+    values.update(overrides)
+    return PipelineConfig(**values)
+
+
+class TestLecturaDeAudio:
+    def test_estereo_queda_canales_por_tiempo(self, tmp_path):
+        path = _write_wav(tmp_path / "a.wav", [16384, -16384, 0, 32767], channels=2)
+        waveform, rate = read_wav_float32(path)
+        assert rate == 16000
+        assert waveform.shape == (2, 2)
+        assert waveform.dtype == np.float32
+        assert waveform[0].tolist() == [0.5, 0.0]
+
+    def test_mono_promedia_los_canales(self, tmp_path):
+        path = _write_wav(tmp_path / "a.wav", [16384, -16384, 16384, 16384], channels=2)
+        mono, _ = read_wav_mono_float32(path)
+        assert mono.tolist() == [0.0, 0.5]
+
+    def test_archivo_no_wav_devuelve_none(self, tmp_path):
+        path = tmp_path / "a.wav"
+        path.write_bytes(b"no es un wav")
+        assert read_wav_float32(str(path)) is None
+
+
+class TestTranscribeBindings:
+    def test_pasa_el_buffer_float32_sin_archivos_intermedios(self, tmp_path):
+        path = _write_wav(tmp_path / "a.wav", [0, 16384, -16384])
+        result = transcribe_local(path, _config(tmp_path))
+
+        model = whispercpp_bindings._model
+        media, params = model.calls[0]
+        assert media.dtype == np.float32
+        assert media.tolist() == [0.0, 0.5, -0.5]
+        assert params["token_timestamps"] is False
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["a.wav"]
+
+        assert len(result.segments) == 1
+        assert result.segments[0].text == "hola mundo"
+        assert (result.segments[0].start, result.segments[0].end) == (0.5, 1.7)
+        assert result.segments[0].words == []
+
+    def test_palabras_desde_los_tokens_sin_especiales(self, tmp_path):
+        path = _write_wav(tmp_path / "a.wav", [0] * 10)
+        result = transcribe_local(path, _config(tmp_path, enable_diarization=True))
+
+        words = result.segments[0].words
+        assert [w.word for w in words] == [" hola", " mundo"]
+        assert [(w.start, w.end) for w in words] == [(0.5, 1.0), (1.0, 1.7)]
+
+    def test_el_modelo_queda_cargado_entre_archivos(self, tmp_path):
+        config = _config(tmp_path)
+        for name in ("a.wav", "b.wav"):
+            transcribe_local(_write_wav(tmp_path / name, [0] * 10), config)
+        assert _FakeModel.loads == 1
+        assert len(whispercpp_bindings._model.calls) == 2
+
+    def test_cambiar_de_modelo_lo_recarga(self, tmp_path):
+        path = _write_wav(tmp_path / "a.wav", [0] * 10)
+        transcribe_local(path, _config(tmp_path))
+        transcribe_local(path, _config(tmp_path, whisper_model_path=str(tmp_path / "otro.bin")))
+        assert _FakeModel.loads == 2
+        assert whispercpp_bindings._model.model_path.endswith("otro.bin")
+
+    def test_sample_rate_distinto_de_16k_falla_claro(self, tmp_path):
+        path = _write_wav(tmp_path / "a.wav", [0] * 10, sample_rate=44100)
+        with pytest.raises(RuntimeError, match="16000 Hz"):
+            transcribe_local(path, _config(tmp_path))
+
+    def test_sin_pywhispercpp_sugiere_el_extra(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(sys.modules, "pywhispercpp.model", None)
+        path = _write_wav(tmp_path / "a.wav", [0] * 10)
+        with pytest.raises(RuntimeError, match="--extra whispercpp"):
+            transcribe_local(path, _config(tmp_path))
@@ -0,0 +1,117 @@
+"""Tests para el parseo incremental del JSON de whisper.cpp y la granularidad pedida."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from video_tranquitor.resources import Lease
+from video_tranquitor.transcribers import whispercpp
+from video_tranquitor.types import PipelineConfig
+
+
+def _config(tmp_path, enable_diarization: bool) -> PipelineConfig:
+    cli = tmp_path / "whisper-cli"
+    cli.write_text("", encoding="utf-8")
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path=str(cli),
+        whisper_model_path="ggml.bin",
+        enable_diarization=enable_diarization,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+    )
+
+
+def _salida_full(n: int) -> dict:
+    return {
+        "systeminfo": "AVX = 1 | CUDA = 0",
+        "model": {"type": "large-v3", "multilingual": True},
+        "params": {"model": "ggml.bin", "language": "es", "translate": False},
+        "result": {"language": "pt"},
+        "transcription": [
+            {
+                "timestamps": {"from": "00:00:00,000", "to": "00:00:01,000"},
+                "offsets": {"from": i * 1000, "to": i * 1000 + 900},
+                "text": f' texto [{i}] con "comillas" y ]corchetes[',
+                "tokens": [
+                    {"text": "[_BEG_]", "offsets": {"from": -1, "to": -1}, "id": 1, "p": 0.9},
+                    {
+                        "text": f" palabra{i}",
+                        "timestamps": {"from": "x", "to": "y"},
+                        "offsets": {"from": i * 1000, "to": i * 1000 + 400},
+                        "id": 2,
+                        "p": 0.8,
+                        "t_dtw": -1,
+                    },
+                ],
+            }
+            for i in range(n)
+        ],
+    }
+
+
+_LEASE = Lease(stage="whisper.cpp", threads=4)
+
+
+class TestGranularidad:
+    def test_sin_diarizacion_pide_la_salida_liviana(self, tmp_path):
+        args, _ = whispercpp._cli_args("a.wav", _config(tmp_path, False), _LEASE)
+        assert "--output-json" in args
+        assert "--output-json-full" not in args
+
+    def test_con_diarizacion_pide_los_tokens(self, tmp_path):
+        args, _ = whispercpp._cli_args("a.wav", _config(tmp_path, True), _LEASE)
+        assert "--output-json-full" in args
+
+
+class TestParseoIncremental:
+    @pytest.mark.parametrize("bloque", [7, 64, 64 * 1024])
+    def test_igual_que_cargar_todo(self, tmp_path, monkeypatch, bloque):
+        monkeypatch.setattr(whispercpp, "JSON_READ_BLOCK", bloque)
+        data = _salida_full(30)
+        path = tmp_path / "a.json"
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+        result = whispercpp._parse_whisper_json(str(path))
+
+        assert result.language == "pt"
+        assert len(result.segments) == 30
+        assert result.segments[29] == whispercpp._segment_from_json(data["transcription"][29])
+        assert [w.word for w in result.segments[3].words] == [" palabra3"]
+        assert result.segments[3].text == 'texto [3] con "comillas" y ]corchetes['
+
+    def test_salida_liviana_sin_tokens(self, tmp_path):
+        data = _salida_full(2)
+        for seg in data["transcription"]:
+            del seg["tokens"]
+        path = tmp_path / "a.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+        result = whispercpp._parse_whisper_json(str(path))
+
+        assert [s.words for s in result.segments] == [[], []]
+
+    def test_transcripcion_vacia(self, tmp_path):
+        path = tmp_path / "a.json"
+        path.write_text('{"result": {"language": "es"}, "transcription": []}', encoding="utf-8")
+        assert whispercpp._parse_whisper_json(str(path)).segments == []
+
+    def test_json_truncado_falla(self, tmp_path):
+        path = tmp_path / "a.json"
+        path.write_text(json.dumps(_salida_full(3))[:-120], encoding="utf-8")
+        with pytest.raises(json.JSONDecodeError):
+            whispercpp._parse_whisper_json(str(path))
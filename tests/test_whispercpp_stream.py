@@ -0,0 +1,128 @@
+"""Tests para la lectura en streaming de whisper-cli (WhisperCliStream)."""
+
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+from video_tranquitor.transcribers.whispercpp import WhisperCliStream, parse_segment_line
+from video_tranquitor.types import PipelineConfig
+
+# whisper-cli de mentira: imprime los segmentos por stdout de a uno, el
+# progreso por stderr y deja el JSON completo (con tokens) al terminar.
+_FAKE_CLI = '''\
+import json, sys, time
+args = sys.argv[1:]
+out = args[args.index("--output-file") + 1]
+assert "--print-progress" in args and "--output-json-full" in args
+if "FALLAR" in out:
+    sys.stderr.write("error: modelo corrupto\\n")
+    sys.exit(3)
+segs = [("00:00:00.000", "00:00:04.500", 0, 4500, " hola equipo"),
+        ("00:02:01.000", "00:02:03.250", 121000, 123250, " segundo chunk")]
+for i, (a, b, fa, fb, text) in enumerate(segs):
+    print(f"[{a} --> {b}]  {text}", flush=True)
+    sys.stderr.write(f"whisper_print_progress_callback: progress = {50 * (i + 1)}%\\n")
+    sys.stderr.flush()
+data = {"result": {"language": "es"}, "transcription": [
+    {"offsets": {"from": fa, "to": fb}, "text": text,
+     "tokens": [{"text": text.split()[0], "offsets": {"from": fa, "to": fa + 500}}]}
+    for a, b, fa, fb, text in segs]}
+with open(out + ".json", "w") as f:
+    json.dump(data, f)
+'''
+
+
+def _config(tmp_path) -> PipelineConfig:
+    cli = tmp_path / "whisper-cli"
+    cli.write_text(f"#!{sys.executable}\n{_FAKE_CLI}", encoding="utf-8")
+    cli.chmod(0o755)
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="local",
+        whisperx_model="",
+        whisper_cpp_path=str(cli),
+        whisper_model_path="",
+        # Con diarización el JSON final tiene que traer las palabras.
+        enable_diarization=True,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        whisper_stream=True,
+    )
+
+
+class TestLineas:
+    def test_parsea_la_linea_de_segmento(self):
+        seg = parse_segment_line("[01:02:03.450 --> 01:02:05.000]   ¿[sic] qué tal?\n")
+        assert seg is not None
+        assert seg.start == pytest.approx(3723.45)
+        assert seg.end == pytest.approx(3725.0)
+        assert seg.text == "¿[sic] qué tal?"
+
+    def test_ignora_lo_que_no_es_segmento(self):
+        assert parse_segment_line("whisper_init_from_file: loading model\n") is None
+
+
+class TestStream:
+    async def test_entrega_los_segmentos_y_despues_el_json(self, tmp_path):
+        config = _config(tmp_path)
+        audio = tmp_path / "a.wav"
+        audio.write_bytes(b"RIFF")
+        progreso: list[int] = []
+        stream = WhisperCliStream(str(audio), config, on_progress=progreso.append)
+
+        vistos = []
+        async for seg in stream:
+            # Mientras llegan los segmentos todavía no hay resultado final.
+            assert stream.result is None
+            vistos.append((seg.text, seg.start))
+
+        assert vistos == [("hola equipo", 0.0), ("segundo chunk", 121.0)]
+        assert progreso == [50, 100]
+        assert stream.result is not None
+        assert stream.result.segments[1].words[0].word == "segundo"
+        assert not (tmp_path / "a.wav.json").exists()
+
+    async def test_reporta_el_error_de_whisper(self, tmp_path):
+        config = _config(tmp_path)
+        audio = tmp_path / "FALLAR.wav"
+        audio.write_bytes(b"RIFF")
+
+        with pytest.raises(RuntimeError, match="modelo corrupto"):
+            async for _ in WhisperCliStream(str(audio), config):
+                pass
+
+
+class TestPipelineEnStreaming:
+    async def test_el_toon_parcial_aparece_antes_del_final(self, tmp_path, monkeypatch):
+        from video_tranquitor import pipeline as pipeline_mod  # noqa: PLC0415
+
+        config = _config(tmp_path).model_copy(update={"enable_toon": True})
+        toon = tmp_path / "reunion_transcription.toon"
+        parciales: list[str] = []
+        write_toon = pipeline_mod.write_toon
+
+        def espiar(data, path):
+            parciales.append(json.dumps([t.texto for t in data]))
+            write_toon(data, path)
+
+        monkeypatch.setattr(pipeline_mod, "write_toon", espiar)
+        audio = tmp_path / "reunion.wav"
+        audio.write_bytes(b"RIFF")
+
+        result = await pipeline_mod._transcribe_local_streaming(str(audio), config, str(toon))
+
+        assert parciales == [json.dumps(["hola equipo"])]
+        assert len(result.segments) == 2
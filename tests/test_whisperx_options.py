@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import sys
 import types
+import wave
 
 import pytest
 
@@ -48,13 +49,20 @@ def whisperx_falso(monkeypatch: pytest.MonkeyPatch) -> dict:
     mod = types.ModuleType("whisperx")
     mod.load_model = lambda *a, **kw: (registro.update(load_model_kwargs=kw), ModeloFalso())[1]
     mod.load_audio = lambda _p: object()
-    mod.load_align_model = lambda **_kw: (_ for _ in ()).throw(RuntimeError("sin alineación"))
+
+    def load_align_model(**_kw):
+        registro["alineaciones"] = registro.get("alineaciones", 0) + 1
+        raise RuntimeError("sin alineación")
+
+    mod.load_align_model = load_align_model
     mod.align = lambda *a, **kw: {}
 
     torch_falso = types.ModuleType("torch")
     torch_falso.cuda = types.SimpleNamespace(
         is_available=lambda: False, empty_cache=lambda: None
     )
+    torch_falso.get_num_threads = lambda: 4
+    torch_falso.set_num_threads = lambda n: registro.setdefault("torch_threads", []).append(n)
 
     monkeypatch.setitem(sys.modules, "whisperx", mod)
     monkeypatch.setitem(sys.modules, "torch", torch_falso)
@@ -95,3 +103,62 @@ class TestOpcionesDeWhisperX:
         opciones = whisperx_falso["load_model_kwargs"]["asr_options"]
         assert opciones["beam_size"] == 10
         assert opciones["best_of"] == 10
+
+    def test_hilos_acotados_al_lease_y_restaurados(self, whisperx_falso: dict) -> None:
+        from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+
+        transcribe_whisperx("audio.wav", _config(cpu_threads=3), "large-v3")
+
+        assert whisperx_falso["load_model_kwargs"]["threads"] == 3
+        # Se fija al lease y al salir vuelve a lo que tenía el proceso.
+        assert whisperx_falso["torch_threads"] == [3, 4]
+
+    def test_lee_el_wav_sin_pasar_por_ffmpeg(self, whisperx_falso: dict, tmp_path) -> None:
+        pytest.importorskip("numpy")
+        from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+
+        path = tmp_path / "nota.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(b"\0\0" * 16000)
+        sys.modules["whisperx"].load_audio = lambda _p: pytest.fail("no debía correr ffmpeg")
+
+        result = transcribe_whisperx(str(path), _config(), "large-v3")
+
+        assert result.segments[0].text == "hola"
+
+
+class TestAlineacionBajoDemanda:
+    def test_sin_diarizacion_no_carga_wav2vec2(self, whisperx_falso: dict) -> None:
+        from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+
+        transcribe_whisperx("audio.wav", _config(), "large-v3")
+
+        assert "alineaciones" not in whisperx_falso
+
+    def test_con_diarizacion_alinea(self, whisperx_falso: dict) -> None:
+        from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+
+        transcribe_whisperx("audio.wav", _config(enable_diarization=True), "large-v3")
+
+        assert whisperx_falso["alineaciones"] == 1
+
+    def test_always_alinea_aunque_nadie_use_las_palabras(self, whisperx_falso: dict) -> None:
+        from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+
+        transcribe_whisperx("audio.wav", _config(whisperx_align="always"), "large-v3")
+
+        assert whisperx_falso["alineaciones"] == 1
+
+    def test_turns_deja_la_alineacion_para_despues_de_diarizar(
+        self, whisperx_falso: dict
+    ) -> None:
+        from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+
+        config = _config(enable_diarization=True, whisperx_align="turns")
+        result = transcribe_whisperx("audio.wav", config, "large-v3")
+
+        assert "alineaciones" not in whisperx_falso
+        assert result.segments[0].words == []
@@ -0,0 +1,145 @@
+"""Tests para video_tranquitor.whisperx_tuning — ajuste de WhisperX en CPU."""
+
+from __future__ import annotations
+
+import sys
+import time
+import types
+
+import pytest
+
+from video_tranquitor import whisperx_tuning
+from video_tranquitor.transcribers.whisperx import transcribe_whisperx
+from video_tranquitor.types import PipelineConfig
+
+# Segundos que tarda el doble de WhisperX con cada (compute_type, batch). Con
+# medio lease todo tarda un 50 % más; batch 16 no entra en RAM.
+_COSTOS = {
+    ("float32", 1): 60, ("float32", 4): 40, ("float32", 8): 30,
+    ("int8_float32", 1): 40, ("int8_float32", 4): 20, ("int8_float32", 8): 15,
+    ("int8", 1): 30, ("int8", 4): 12, ("int8", 8): 9,
+}
+
+
+@pytest.fixture
+def config(tmp_path) -> PipelineConfig:
+    return PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path / "output"),
+        transcriber="whisperx",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+        cpu_threads=8,
+    )
+
+
+@pytest.fixture
+def whisperx_falso(monkeypatch) -> dict:
+    """Dobles de whisperx y torch, con un reloj que avanza lo que cuesta cada corrida."""
+    registro: dict = {"reloj": 0.0, "cargas": []}
+
+    class ModeloFalso:
+        def __init__(self, compute_type: str, threads: int) -> None:
+            self.compute_type, self.threads = compute_type, threads
+
+        def transcribe(self, _audio, batch_size, **_kwargs):
+            registro["batch_size"] = batch_size
+            if batch_size == 16:
+                raise MemoryError("sin RAM")
+            costo = _COSTOS.get((self.compute_type, batch_size), 1)
+            registro["reloj"] += costo * (1.5 if self.threads < 8 else 1.0)
+            # int8 puro se come palabras: no llega a la coincidencia mínima.
+            texto = "la casa" if self.compute_type == "int8" else "la casa es azul"
+            return {"segments": [{"text": texto, "start": 0.0, "end": 1.0}]}
+
+    def load_model(_model, _device, compute_type, threads, **_kwargs):
+        registro["cargas"].append((compute_type, threads))
+        return ModeloFalso(compute_type, threads)
+
+    whisperx = types.ModuleType("whisperx")
+    whisperx.load_model = load_model
+    whisperx.load_align_model = lambda **_kw: (_ for _ in ()).throw(RuntimeError("sin alineación"))
+
+    torch = types.ModuleType("torch")
+    torch.cuda = types.SimpleNamespace(is_available=lambda: False, empty_cache=lambda: None)
+    torch.get_num_threads = lambda: 8
+    torch.set_num_threads = lambda n: None
+
+    monkeypatch.setitem(sys.modules, "whisperx", whisperx)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "ctranslate2", None)
+    monkeypatch.setattr(
+        whisperx_tuning,
+        "time",
+        types.SimpleNamespace(perf_counter=lambda: registro["reloj"], strftime=time.strftime),
+    )
+    return registro
+
+
+class TestTuneWhisperX:
+    def test_elige_la_mas_rapida_que_coincide(self, config, whisperx_falso, tmp_path, monkeypatch):
+        sample = tmp_path / "muestra.mp3"
+        sample.write_bytes(b"")
+        monkeypatch.setattr(whisperx_tuning, "preprocess_audio", lambda *a: True)
+        monkeypatch.setattr(whisperx_tuning, "slice_wav", lambda *a: None)
+        monkeypatch.setattr(whisperx_tuning, "wav_duration", lambda path: 60.0)
+        monkeypatch.setattr(whisperx_tuning, "_load_audio", lambda path: object())
+
+        best = whisperx_tuning.tune_whisperx(str(sample), config)
+
+        # int8 es más rápido pero pierde texto: gana int8_float32 con batch 8.
+        assert (best.compute_type, best.batch_size, best.threads) == ("int8_float32", 8, 8)
+        assert best.rtf == pytest.approx(0.25)
+        # Un modelo por compute type y cantidad de hilos, no uno por batch.
+        assert len(whisperx_falso["cargas"]) == 6
+        assert whisperx_tuning.load_whisperx_tuning(config, "large-v3") == best
+        assert whisperx_tuning.load_whisperx_tuning(config, "medium") is None
+
+    def test_con_cuda_no_ajusta(self, config, whisperx_falso, monkeypatch):
+        monkeypatch.setattr(sys.modules["torch"].cuda, "is_available", lambda: True)
+        with pytest.raises(RuntimeError, match="CUDA"):
+            whisperx_tuning.tune_whisperx("muestra.mp3", config)
+
+
+class TestTranscribeUsaElAjuste:
+    def test_sin_ajuste_int8_con_batch_4(self, config, whisperx_falso):
+        transcribe_whisperx("audio.wav", config, "large-v3", audio=object())
+
+        assert whisperx_falso["cargas"] == [("int8", 8)]
+        assert whisperx_falso["batch_size"] == 4
+
+    def test_con_ajuste_acota_los_hilos_al_lease(self, config, whisperx_falso):
+        whisperx_tuning.save_host_state(
+            config,
+            whisperx_tuning.TUNING_STATE,
+            {
+                "models": {
+                    "large-v3": {
+                        "model": "large-v3",
+                        "compute_type": "int8_float32",
+                        "batch_size": 8,
+                        "threads": 16,
+                        "rtf": 0.25,
+                    }
+                }
+            },
+        )
+
+        transcribe_whisperx("audio.wav", config, "large-v3", audio=object())
+
+        assert whisperx_falso["cargas"] == [("int8_float32", 8)]
+        assert whisperx_falso["batch_size"] == 8
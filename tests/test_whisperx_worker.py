@@ -0,0 +1,249 @@
+"""Tests para el worker residente de WhisperX."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import wave
+
+import pytest
+
+from video_tranquitor import resources
+from video_tranquitor.audio import samples_from_shared, shared_samples
+from video_tranquitor.transcribers import whisperx_worker
+from video_tranquitor.transcribers.whisperx_worker import (
+    align_in_worker,
+    transcribe_batch_in_worker,
+    transcribe_in_worker,
+)
+from video_tranquitor.types import PipelineConfig, WhisperSegment
+
+# Dobles de whisperx y torch que importa el worker. Es un proceso spawn, así
+# que no alcanza con sys.modules: van como archivos en su sys.path. Cada carga
+# de modelo queda anotada en VT_FAKE_LOG.
+_FAKE_WHISPERX = '''\
+import os
+
+def _log(line):
+    with open(os.environ["VT_FAKE_LOG"], "a") as f:
+        f.write(line + "\\n")
+
+class _Modelo:
+    def transcribe(self, audio, **kwargs):
+        if not isinstance(audio, str):
+            return {"segments": [{"text": f"{len(audio)} muestras", "start": 0.0, "end": 1.0}]}
+        if "crash" in audio and not os.path.exists(audio + ".crashed"):
+            open(audio + ".crashed", "w").close()
+            os._exit(1)
+        if "falla" in audio:
+            raise ValueError("audio ilegible")
+        return {"segments": [{"text": os.path.basename(audio), "start": 0.0, "end": 1.0}]}
+
+def load_model(*args, **kwargs):
+    _log("load_model")
+    return _Modelo()
+
+def load_audio(path):
+    _log("load_audio")
+    return path
+
+def load_align_model(**kwargs):
+    _log("load_align_model")
+    return object(), {}
+
+def align(segments, *args, **kwargs):
+    words = [{"word": "hola", "start": 0.0, "end": 0.5}]
+    return {"segments": [dict(s, words=words) for s in segments]}
+'''
+
+_FAKE_TORCH = '''\
+import types
+cuda = types.SimpleNamespace(is_available=lambda: False, empty_cache=lambda: None)
+_threads = [4]
+def get_num_threads():
+    return _threads[0]
+def set_num_threads(n):
+    _threads[0] = n
+'''
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch) -> PipelineConfig:
+    fakes = tmp_path / "fakes"
+    fakes.mkdir()
+    (fakes / "whisperx.py").write_text(_FAKE_WHISPERX, encoding="utf-8")
+    (fakes / "torch.py").write_text(_FAKE_TORCH, encoding="utf-8")
+    monkeypatch.setattr(sys, "path", [str(fakes), *sys.path])
+    monkeypatch.setenv("VT_FAKE_LOG", str(tmp_path / "cargas.log"))
+    yield PipelineConfig(
+        watch_dir=".",
+        output_dir=str(tmp_path),
+        transcriber="whisperx",
+        whisperx_model="large-v3",
+        whisper_cpp_path="",
+        whisper_model_path="",
+        enable_diarization=False,
+        enable_analysis=False,
+        enable_obsidian=False,
+        enable_toon=False,
+        obsidian_vault_path="",
+        hf_token="",
+        openai_api_key="",
+        audio_filter="",
+        language="es",
+        transcription_prompt="",
+        transcribe_model="",
+        target_sample_rate=16000,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    whisperx_worker.shutdown_worker()
+
+
+def _cargas(tmp_path) -> list[str]:
+    return (tmp_path / "cargas.log").read_text(encoding="utf-8").split()
+
+
+def _wav(path, seconds: float, rate: int = 16000) -> str:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x10\x00" * int(rate * seconds))
+    return str(path)
+
+
+class TestMemoriaCompartida:
+    def test_ida_y_vuelta(self):
+        np = pytest.importorskip("numpy")
+        muestras = np.linspace(-1, 1, 1000, dtype=np.float32)
+
+        with shared_samples(muestras) as ref:
+            recibidas = samples_from_shared(ref)
+
+        assert ref["length"] == 1000
+        assert np.array_equal(recibidas, muestras)
+
+
+class TestWorkerResidente:
+    def test_los_modelos_se_cargan_una_sola_vez(self, config, tmp_path):
+        config = config.model_copy(update={"whisperx_align": "always"})
+        primero = transcribe_in_worker(str(tmp_path / "a.wav"), config)
+        segundo = transcribe_in_worker(str(tmp_path / "b.wav"), config)
+
+        assert [primero.segments[0].text, segundo.segments[0].text] == ["a.wav", "b.wav"]
+        assert segundo.segments[0].words[0].word == "hola"
+        cargas = _cargas(tmp_path)
+        assert (cargas.count("load_model"), cargas.count("load_align_model")) == (1, 1)
+
+    def test_el_audio_viaja_decodificado_sin_ffmpeg(self, config, tmp_path):
+        pytest.importorskip("numpy")
+
+        result = transcribe_in_worker(_wav(tmp_path / "nota.wav", 1.5), config)
+
+        assert result.segments[0].text == "24000 muestras"
+        assert "load_audio" not in _cargas(tmp_path)
+
+    def test_alinea_solo_los_segmentos_pedidos(self, config, tmp_path):
+        segmentos = [WhisperSegment(text="bien, vos?", start=4.0, end=8.0)]
+
+        aligned = align_in_worker(str(tmp_path / "a.wav"), config, segmentos)
+
+        assert [(s.text, s.words[0].word) for s in aligned] == [("bien, vos?", "hola")]
+        assert _cargas(tmp_path).count("load_model") == 0
+
+    def test_un_batch_es_una_sola_pasada(self, config, tmp_path):
+        pytest.importorskip("numpy")
+        notas = [_wav(tmp_path / f"nota{i}.wav", 1) for i in range(3)]
+
+        results = transcribe_batch_in_worker(notas, config)
+
+        # El doble devuelve un solo segmento al principio: cae en la primera nota.
+        assert [len(r.segments) for r in results] == [1, 0, 0]
+        assert results[0].segments[0].text == f"{3 * 16000 + 3 * 31 * 16000} muestras"
+        assert _cargas(tmp_path).count("load_model") == 1
+
+    def test_otra_frecuencia_cae_a_load_audio(self, config, tmp_path):
+        transcribe_in_worker(_wav(tmp_path / "nota.wav", 1, rate=8000), config)
+        assert "load_audio" in _cargas(tmp_path)
+
+    def test_si_se_cae_se_levanta_y_reintenta(self, config, tmp_path):
+        transcribe_in_worker(str(tmp_path / "a.wav"), config)
+
+        result = transcribe_in_worker(str(tmp_path / "crash.wav"), config)
+
+        assert result.segments[0].text == "crash.wav"
+        # El worker nuevo volvió a cargar el modelo.
+        assert _cargas(tmp_path).count("load_model") == 2
+
+    def test_un_error_de_whisperx_no_tira_el_worker(self, config, tmp_path):
+        with pytest.raises(RuntimeError, match="ValueError: audio ilegible"):
+            transcribe_in_worker(str(tmp_path / "falla.wav"), config)
+
+        transcribe_in_worker(str(tmp_path / "a.wav"), config)
+        assert _cargas(tmp_path).count("load_model") == 1
+
+    def test_se_apaga_tras_el_tiempo_sin_pedidos(self, config, tmp_path):
+        config = config.model_copy(update={"whisperx_worker_idle_sec": 0.2})
+        transcribe_in_worker(str(tmp_path / "a.wav"), config)
+        worker = whisperx_worker.get_worker(config)
+
+        deadline = time.monotonic() + 10
+        while worker.running() and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+        assert not worker.running()
+        # El pedido siguiente lo levanta de nuevo.
+        assert transcribe_in_worker(str(tmp_path / "b.wav"), config).segments
+
+
+class TestTurnoYLease:
+    """El lease se pide con el turno del pipe, no mientras se espera."""
+
+    @pytest.fixture
+    def worker(self, monkeypatch) -> whisperx_worker.WhisperXWorker:
+        worker = whisperx_worker.WhisperXWorker(idle_sec=0)
+        monkeypatch.setattr(worker, "ensure_started", lambda: None)
+        return worker
+
+    def test_el_pedido_en_cola_no_retiene_nucleos(self, config, worker, monkeypatch):
+        adentro = threading.Event()
+        seguir = threading.Event()
+        monkeypatch.setattr(
+            worker, "_request", lambda job: (adentro.set(), seguir.wait(5), {"ok": True})[2]
+        )
+        presupuesto = resources.get_budget(config)
+        leases: list[int] = []
+
+        primero = threading.Thread(
+            target=worker.run, args=(config, lambda lease: leases.append(lease.threads) or {})
+        )
+        primero.start()
+        adentro.wait(5)
+        segundo = threading.Thread(
+            target=worker.run, args=(config, lambda lease: leases.append(lease.threads) or {})
+        )
+        segundo.start()
+        time.sleep(0.1)
+
+        # El segundo espera el turno sin lease: solo está el del primero.
+        assert len(presupuesto._held) == 1
+        seguir.set()
+        primero.join(5)
+        segundo.join(5)
+        # Cuando le toca, el primero ya devolvió lo suyo: se lleva todo.
+        assert leases == [presupuesto.total, presupuesto.total]
+
+    def test_el_calentamiento_no_espera_a_un_pedido_en_curso(self, config, worker, monkeypatch):
+        pedidos: list[str] = []
+        monkeypatch.setattr(
+            worker, "_request", lambda job: pedidos.append(job["op"]) or {"ok": True}
+        )
+        monkeypatch.setattr(whisperx_worker, "get_worker", lambda _config: worker)
+
+        with worker._job_lock:
+            whisperx_worker.preload_in_worker(config, "large-v3")
+        assert pedidos == []
+
+        whisperx_worker.preload_in_worker(config, "large-v3")
+        assert pedidos == ["load"]